@@ -24,7 +24,7 @@ from app.models.base import BaseModel
 from app.models.user import Usuario
 from app.models.empresa import Empresa, TipoAutorizacion, AutorizacionEmpresa
 from app.models.conductor import Conductor
-from app.models.habilitacion import Habilitacion, Pago, ConceptoTUPA
+from app.models.habilitacion import Habilitacion, Pago, PagoResumenDiario, ConceptoTUPA
 # Importar otros modelos aquí cuando se creen
 
 # this is the Alembic Config object
@@ -0,0 +1,28 @@
+"""Add VENCIDO to estadohabilitacion
+
+Revision ID: 20261019_0000
+Revises: 20241117_0000
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_0000'
+down_revision = '20241117_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE no puede ejecutarse dentro de un bloque de transacción
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE estadohabilitacion ADD VALUE IF NOT EXISTS 'VENCIDO'")
+
+
+def downgrade() -> None:
+    # PostgreSQL no permite eliminar valores de un enum; se revierten los datos
+    op.execute(
+        "UPDATE habilitaciones SET estado = 'HABILITADO' WHERE estado = 'VENCIDO'"
+    )
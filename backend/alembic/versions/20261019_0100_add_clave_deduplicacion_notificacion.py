@@ -0,0 +1,34 @@
+"""Add clave_deduplicacion to notificaciones
+
+Revision ID: 20261019_0100
+Revises: 20261019_0000
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_0100'
+down_revision = '20261019_0000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'notificaciones',
+        sa.Column('clave_deduplicacion', sa.String(length=255), nullable=True)
+    )
+    op.create_index(
+        'idx_notificacion_clave_deduplicacion',
+        'notificaciones',
+        ['clave_deduplicacion'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notificacion_clave_deduplicacion', table_name='notificaciones')
+    op.drop_column('notificaciones', 'clave_deduplicacion')
@@ -0,0 +1,140 @@
+"""Partition auditoria by month on created_at
+
+Revision ID: 20261019_0200
+Revises: 20261019_0100
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_0200'
+down_revision = '20261019_0100'
+branch_labels = None
+depends_on = None
+
+
+# Meses creados por adelantado; luego los mantiene la tarea
+# app.tasks.auditoria.mantener_particiones
+PARTICIONES_FUTURAS = 3
+
+COLUMNAS = (
+    "id, created_at, updated_at, usuario_id, tabla, accion, registro_id, "
+    "datos_anteriores, datos_nuevos, ip_address, user_agent, descripcion"
+)
+
+INDICES_ANTERIORES = (
+    'idx_auditoria_fecha',
+    'idx_auditoria_registro',
+    'idx_auditoria_tabla_accion',
+    'idx_auditoria_usuario_fecha',
+    'ix_auditoria_accion',
+    'ix_auditoria_id',
+    'ix_auditoria_registro_id',
+    'ix_auditoria_tabla',
+    'ix_auditoria_usuario_id',
+)
+
+
+def _columnas():
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('usuario_id', sa.UUID(), nullable=False),
+        sa.Column('tabla', sa.String(length=100), nullable=False),
+        sa.Column('accion', sa.String(length=50), nullable=False),
+        sa.Column('registro_id', sa.String(length=100), nullable=True),
+        sa.Column('datos_anteriores', sa.JSON(), nullable=True),
+        sa.Column('datos_nuevos', sa.JSON(), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=500), nullable=True),
+        sa.Column('descripcion', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    ]
+
+
+def _sumar_meses(mes: date, meses: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _renombrar_anterior(nombre: str) -> None:
+    op.rename_table('auditoria', nombre)
+    op.execute(f"ALTER TABLE {nombre} RENAME CONSTRAINT auditoria_pkey TO {nombre}_pkey")
+    for indice in INDICES_ANTERIORES:
+        op.execute(f"DROP INDEX IF EXISTS {indice}")
+
+
+def _crear_indices(particionada: bool) -> None:
+    # En la tabla particionada los índices terminan en (created_at, id) para
+    # la paginación keyset y un índice único debe incluir created_at
+    orden = ['created_at', 'id'] if particionada else []
+    op.create_index('idx_auditoria_fecha', 'auditoria', ['created_at'] + orden[1:], unique=False)
+    op.create_index('idx_auditoria_registro', 'auditoria', ['tabla', 'registro_id'] + orden, unique=False)
+    op.create_index('idx_auditoria_tabla_accion', 'auditoria', ['tabla', 'accion'], unique=False)
+    if particionada:
+        op.create_index('idx_auditoria_tabla_fecha', 'auditoria', ['tabla'] + orden, unique=False)
+    op.create_index('idx_auditoria_usuario_fecha', 'auditoria', ['usuario_id', 'created_at'] + orden[1:], unique=False)
+    op.create_index(op.f('ix_auditoria_accion'), 'auditoria', ['accion'], unique=False)
+    op.create_index(op.f('ix_auditoria_id'), 'auditoria', ['id'], unique=not particionada)
+    op.create_index(op.f('ix_auditoria_registro_id'), 'auditoria', ['registro_id'], unique=False)
+    op.create_index(op.f('ix_auditoria_tabla'), 'auditoria', ['tabla'], unique=False)
+    op.create_index(op.f('ix_auditoria_usuario_id'), 'auditoria', ['usuario_id'], unique=False)
+
+
+def upgrade() -> None:
+    _renombrar_anterior('auditoria_sin_particionar')
+
+    op.create_table(
+        'auditoria',
+        *_columnas(),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # Red de seguridad: recibe filas si el mantenimiento no creó el mes a tiempo
+    op.execute("CREATE TABLE auditoria_default PARTITION OF auditoria DEFAULT")
+
+    primera = op.get_bind().execute(
+        sa.text("SELECT min(created_at) FROM auditoria_sin_particionar")
+    ).scalar()
+    mes_actual = date.today().replace(day=1)
+    mes = (primera.date() if primera else mes_actual).replace(day=1)
+    ultimo = _sumar_meses(mes_actual, PARTICIONES_FUTURAS)
+    while mes <= ultimo:
+        siguiente = _sumar_meses(mes, 1)
+        op.execute(
+            f"CREATE TABLE auditoria_p{mes:%Y_%m} PARTITION OF auditoria "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{siguiente.isoformat()}')"
+        )
+        mes = siguiente
+
+    op.execute(
+        f"INSERT INTO auditoria ({COLUMNAS}) SELECT {COLUMNAS} FROM auditoria_sin_particionar"
+    )
+    op.drop_table('auditoria_sin_particionar')
+
+    # Crear los índices después de copiar los datos es más rápido
+    _crear_indices(particionada=True)
+
+
+def downgrade() -> None:
+    # Las particiones ya archivadas por la política de retención no se reincorporan
+    _renombrar_anterior('auditoria_particionada')
+
+    op.create_table(
+        'auditoria',
+        *_columnas(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        f"INSERT INTO auditoria ({COLUMNAS}) SELECT {COLUMNAS} FROM auditoria_particionada"
+    )
+    op.drop_table('auditoria_particionada')
+
+    _crear_indices(particionada=False)
@@ -0,0 +1,47 @@
+"""Add pagos_resumen_diario rollup
+
+Revision ID: 20261019_0300
+Revises: 20261019_0200
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_0300'
+down_revision = '20261019_0200'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pagos_resumen_diario',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column(
+            'estado',
+            postgresql.ENUM('PENDIENTE', 'CONFIRMADO', 'RECHAZADO', name='estadopago', create_type=False),
+            nullable=False
+        ),
+        sa.Column('concepto_tupa_id', sa.UUID(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('monto_total', sa.Numeric(precision=14, scale=2), nullable=False, comment='Suma de montos en soles (PEN)'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['concepto_tupa_id'], ['conceptos_tupa.id'], ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('fecha', 'estado', 'concepto_tupa_id')
+    )
+
+    # Carga inicial; luego se mantiene de forma incremental desde la aplicación
+    op.execute(
+        "INSERT INTO pagos_resumen_diario "
+        "(fecha, estado, concepto_tupa_id, cantidad, monto_total, updated_at) "
+        "SELECT fecha_pago, estado, concepto_tupa_id, count(*), sum(monto), now() "
+        "FROM pagos GROUP BY fecha_pago, estado, concepto_tupa_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pagos_resumen_diario')
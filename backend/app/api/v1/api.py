@@ -6,6 +6,10 @@ from app.api.v1.endpoints import auth, usuarios, empresas
 from app.api.v1.endpoints.conductores import router as conductores_router
 from app.api.v1.endpoints.habilitaciones import router as habilitaciones_router
 from app.api.v1.endpoints.pagos import router as pagos_router
+from app.api.v1.endpoints.jobs import router as jobs_router
+from app.api.v1.endpoints.eventos import router as eventos_router
+from app.api.v1.endpoints.auditoria import router as auditoria_router
+from app.api.v1.endpoints.diagnostico import router as diagnostico_router
 
 
 api_router = APIRouter()
@@ -17,3 +21,7 @@ api_router.include_router(empresas.router)
 api_router.include_router(conductores_router)
 api_router.include_router(habilitaciones_router)
 api_router.include_router(pagos_router, prefix="/pagos", tags=["pagos"])
+api_router.include_router(jobs_router)
+api_router.include_router(eventos_router)
+api_router.include_router(auditoria_router)
+api_router.include_router(diagnostico_router)
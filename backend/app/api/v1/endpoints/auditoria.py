@@ -0,0 +1,59 @@
+"""
+Endpoints de consulta de auditoría
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.exceptions import ValidacionError
+from app.core.rbac import require_roles
+from app.models.user import Usuario, RolUsuario
+from app.schemas.auditoria import AuditoriaPaginaResponse
+from app.services.auditoria_service import AuditoriaService
+
+router = APIRouter(prefix="/auditoria", tags=["auditoria"])
+
+
+@router.get("", response_model=AuditoriaPaginaResponse, status_code=status.HTTP_200_OK)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR)
+async def listar_auditoria(
+    tabla: Optional[str] = Query(None, description="Tabla auditada"),
+    registro_id: Optional[str] = Query(None, description="ID del registro (requiere tabla)"),
+    usuario_id: Optional[UUID] = Query(None, description="Usuario que realizó la acción"),
+    desde: Optional[datetime] = Query(None, description="Fecha y hora mínima (inclusive)"),
+    hasta: Optional[datetime] = Query(None, description="Fecha y hora máxima (exclusive)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior"),
+    limite: int = Query(50, ge=1, le=200, description="Registros por página"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Listar registros de auditoría del más reciente al más antiguo
+
+    - **tabla**, **registro_id**, **usuario_id**: filtros opcionales
+    - **desde** / **hasta**: acotan el rango y las particiones consultadas
+    - **cursor**: valor `siguiente_cursor` de la respuesta anterior
+
+    La paginación es por cursor sobre (created_at, id): los registros
+    nuevos no desplazan las páginas ya recorridas.
+
+    Requiere roles: SUPERUSUARIO, DIRECTOR
+    """
+    service = AuditoriaService(db)
+    try:
+        return await service.consultar(
+            tabla=tabla,
+            registro_id=registro_id,
+            usuario_id=usuario_id,
+            desde=desde,
+            hasta=hasta,
+            cursor=cursor,
+            limite=limite
+        )
+    except ValidacionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -8,13 +8,16 @@ from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.consultas import presupuesto_consultas
+from app.core.dependencies import AlcanceEmpresa, get_alcance_empresa, get_current_user
 from app.core.rbac import require_roles
 from app.core.exceptions import RecursoNoEncontrado, ValidacionError, ConflictoError
+from app.models.conductor import EstadoConductor
 from app.models.user import Usuario, RolUsuario
 from app.models.documento_conductor import TipoDocumento
 from app.services.conductor_service import ConductorService
 from app.services.documento_service import DocumentoService
+from app.services.importacion_service import ImportacionService
 from app.repositories.empresa_repository import EmpresaRepository
 from app.schemas.conductor import (
     ConductorCreate,
@@ -25,7 +28,13 @@ from app.schemas.conductor import (
     ConductorBusqueda,
     ConductorValidacionCategoria,
     ConductorValidacionCategoriaResponse,
-    ConductorCambioEstado
+    ConductorValidacionCategoriasLote,
+    ConductorValidacionCategoriasLoteResponse,
+    ConductorImportacionResponse,
+    ConductorCambioEstado,
+    ConductorCambioEstadoMasivo,
+    ConductorCambioEstadoMasivoResponse,
+    ConductorFicha
 )
 from app.schemas.documento import (
     DocumentoConductorResponse,
@@ -36,30 +45,9 @@ from app.schemas.documento import (
 router = APIRouter(prefix="/conductores", tags=["conductores"])
 
 
-async def get_empresa_gerente(current_user: Usuario, db: AsyncSession) -> UUID:
-    """Helper para obtener la empresa de un gerente"""
-    if current_user.rol != RolUsuario.GERENTE:
-        return None
-    
-    from app.models.empresa import Empresa
-    from sqlalchemy import select
-    
-    # Buscar empresa del gerente
-    query = select(Empresa).where(Empresa.gerente_id == current_user.id)
-    result = await db.execute(query)
-    empresa = result.scalar_one_or_none()
-    
-    if not empresa:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Gerente no tiene empresa asignada"
-        )
-    
-    return empresa.id
-
-
 @router.get("", response_model=ConductorListResponse)
 @require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+@presupuesto_consultas(5)
 async def listar_conductores(
     dni: str = Query(None, description="Filtrar por DNI"),
     nombres: str = Query(None, description="Filtrar por nombres"),
@@ -72,6 +60,7 @@ async def listar_conductores(
     page: int = Query(1, ge=1, description="Número de página"),
     page_size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -85,7 +74,7 @@ async def listar_conductores(
     
     # Si es gerente, filtrar por su empresa
     if current_user.rol == RolUsuario.GERENTE:
-        empresa_id = await get_empresa_gerente(current_user, db)
+        empresa_id = alcance.empresa_id
     
     busqueda = ConductorBusqueda(
         dni=dni,
@@ -115,6 +104,7 @@ async def listar_conductores(
 async def crear_conductor(
     conductor_data: ConductorCreate,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -127,7 +117,7 @@ async def crear_conductor(
     
     # Si es gerente, verificar que solo cree conductores para su empresa
     if current_user.rol == RolUsuario.GERENTE:
-        empresa_gerente_id = await get_empresa_gerente(current_user, db)
+        empresa_gerente_id = alcance.empresa_id
         
         if conductor_data.empresa_id != empresa_gerente_id:
             raise HTTPException(
@@ -158,11 +148,104 @@ async def crear_conductor(
         )
 
 
+@router.post("/importar", response_model=ConductorImportacionResponse)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+async def importar_conductores(
+    file: UploadFile = File(..., description="Archivo CSV o XLSX con un conductor por fila"),
+    empresa_id: Optional[UUID] = Form(None, description="Empresa de los conductores (los gerentes usan la suya)"),
+    current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importar conductores en lote desde un archivo CSV o XLSX
+    
+    - La primera fila lleva los nombres de campo (dni, nombres, apellidos, ...)
+    - Se importan todas las filas válidas; el resultado detalla los errores por fila
+    - Gerentes solo pueden importar conductores para su propia empresa
+    """
+    if current_user.rol == RolUsuario.GERENTE:
+        empresa_gerente_id = alcance.empresa_id
+        if empresa_id is not None and empresa_id != empresa_gerente_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo puede importar conductores para su propia empresa"
+            )
+        empresa_id = empresa_gerente_id
+    elif empresa_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe indicar la empresa de los conductores"
+        )
+    
+    service = ImportacionService(db)
+    
+    try:
+        return await service.importar_conductores(file.file, file.filename, empresa_id)
+    except RecursoNoEncontrado as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.message
+        )
+    except ValidacionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.message
+        )
+    except ConflictoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=e.message
+        )
+
+
+@router.post("/cambiar-estado-masivo", response_model=ConductorCambioEstadoMasivoResponse)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR)
+async def cambiar_estado_masivo(
+    cambio_estado: ConductorCambioEstadoMasivo,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cambiar en bloque el estado de los conductores de una empresa
+    
+    - Solo cambian los conductores cuyo estado admite la transición
+      (por ejemplo, HABILITADO → SUSPENDIDO al caducar una autorización)
+    - Se registra la auditoría de cada conductor y un aviso al gerente
+    """
+    service = ConductorService(db)
+    
+    try:
+        return await service.cambiar_estado_empresa(
+            empresa_id=cambio_estado.empresa_id,
+            nuevo_estado=EstadoConductor(cambio_estado.nuevo_estado),
+            motivo=cambio_estado.motivo,
+            observaciones=cambio_estado.observaciones,
+            estados=(
+                [EstadoConductor(estado) for estado in cambio_estado.estados]
+                if cambio_estado.estados is not None else None
+            ),
+            conductor_ids=cambio_estado.conductor_ids
+        )
+    except RecursoNoEncontrado as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.message
+        )
+    except ValidacionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.message
+        )
+
+
 @router.get("/{conductor_id}", response_model=ConductorResponse)
 @require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+@presupuesto_consultas(3)
 async def obtener_conductor(
     conductor_id: UUID,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -177,7 +260,7 @@ async def obtener_conductor(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -192,12 +275,50 @@ async def obtener_conductor(
         )
 
 
+@router.get("/{conductor_id}/ficha", response_model=ConductorFicha)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+@presupuesto_consultas(3)
+async def obtener_ficha_conductor(
+    conductor_id: UUID,
+    infracciones: int = Query(None, ge=1, le=50, description="Infracciones recientes a incluir"),
+    current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener la ficha de un conductor: empresa, última habilitación con pago,
+    resumen de infracciones y documentos, y las infracciones más recientes
+    
+    - Se resuelve en una sola consulta a la base de datos
+    - Gerentes solo pueden ver conductores de su empresa
+    """
+    service = ConductorService(db)
+    
+    try:
+        ficha = await service.obtener_ficha(conductor_id, infracciones)
+        
+        if current_user.rol == RolUsuario.GERENTE:
+            if ficha["conductor"].empresa_id != alcance.empresa_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="No tiene permisos para ver este conductor"
+                )
+        
+        return ficha
+    except RecursoNoEncontrado as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.message
+        )
+
+
 @router.put("/{conductor_id}", response_model=ConductorResponse)
 @require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
 async def actualizar_conductor(
     conductor_id: UUID,
     conductor_data: ConductorUpdate,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -212,7 +333,7 @@ async def actualizar_conductor(
         conductor = await service.obtener_conductor_por_id(conductor_id)
         
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -275,9 +396,11 @@ async def eliminar_conductor(
 
 @router.get("/dni/{dni}", response_model=ConductorResponse)
 @require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+@presupuesto_consultas(6)
 async def obtener_conductor_por_dni(
     dni: str,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -292,7 +415,7 @@ async def obtener_conductor_por_dni(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -381,6 +504,34 @@ async def validar_categoria_licencia(
     )
 
 
+@router.post("/validar-categorias", response_model=ConductorValidacionCategoriasLoteResponse)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+async def validar_categorias_lote(
+    lote: ConductorValidacionCategoriasLote,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Validar en lote pares de categoría de licencia y empresa
+    
+    - Pensado para importaciones masivas de conductores
+    - Cada par es válido si la categoría corresponde a alguna autorización
+      vigente de la empresa
+    """
+    service = ConductorService(db)
+    
+    resultados = await service.validar_categorias_lote(
+        (par.licencia_categoria, par.empresa_id) for par in lote.pares
+    )
+    validos = sum(resultados)
+    
+    return ConductorValidacionCategoriasLoteResponse(
+        resultados=resultados,
+        validos=validos,
+        invalidos=len(resultados) - validos
+    )
+
+
 
 @router.post("/{conductor_id}/documentos", response_model=DocumentoUploadResponse, status_code=status.HTTP_201_CREATED)
 @require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
@@ -390,6 +541,7 @@ async def subir_documento_conductor(
     tipo_documento: TipoDocumento = Form(..., description="Tipo de documento"),
     descripcion: Optional[str] = Form(None, description="Descripción opcional del documento"),
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -408,7 +560,7 @@ async def subir_documento_conductor(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -451,6 +603,7 @@ async def listar_documentos_conductor(
     conductor_id: UUID,
     tipo_documento: Optional[TipoDocumento] = Query(None, description="Filtrar por tipo de documento"),
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -467,7 +620,7 @@ async def listar_documentos_conductor(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -497,6 +650,7 @@ async def descargar_documento_conductor(
     conductor_id: UUID,
     documento_id: UUID,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -513,7 +667,7 @@ async def descargar_documento_conductor(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -556,6 +710,7 @@ async def eliminar_documento_conductor(
     conductor_id: UUID,
     documento_id: UUID,
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -572,7 +727,7 @@ async def eliminar_documento_conductor(
         
         # Si es gerente, verificar que el conductor sea de su empresa
         if current_user.rol == RolUsuario.GERENTE:
-            empresa_gerente_id = await get_empresa_gerente(current_user, db)
+            empresa_gerente_id = alcance.empresa_id
             if conductor.empresa_id != empresa_gerente_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,155 @@
+"""
+Endpoints de diagnóstico de rendimiento
+"""
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import FileResponse
+
+from app.core.consultas_lentas import consultas_lentas
+from app.core.dependencies import get_current_user
+from app.core.config import settings
+from app.core.monitor_loop import monitor_loop
+from app.core.perfilador import PARAMETRO_PERFIL, PERFIL_ID, ruta_perfil
+from app.core.rbac import require_roles
+from app.core.security import create_profile_token
+from app.models.user import Usuario, RolUsuario
+from app.schemas.diagnostico import (
+    BloqueoLoopResponse,
+    BloqueosLoopResponse,
+    ConsultaLentaResponse,
+    ConsultasLentasResponse,
+    PerfilTokenResponse,
+)
+
+router = APIRouter(prefix="/diagnostico", tags=["diagnostico"])
+
+
+@router.get("/consultas-lentas", response_model=ConsultasLentasResponse, status_code=status.HTTP_200_OK)
+@require_roles(RolUsuario.SUPERUSUARIO)
+async def listar_consultas_lentas(
+    limite: int = Query(20, ge=1, le=200, description="Huellas a mostrar"),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Consultas lentas con más tiempo total acumulado y sus planes
+
+    - **limite**: número de huellas, de mayor a menor tiempo total
+
+    Los datos son del proceso que atiende la petición y se pierden al
+    reiniciarlo.
+
+    Requiere roles: SUPERUSUARIO
+    """
+    return ConsultasLentasResponse(
+        umbral_ms=consultas_lentas.umbral_ms,
+        consultas=[
+            ConsultaLentaResponse(
+                huella=consulta.huella,
+                sentencia=consulta.sentencia,
+                ejecuciones=consulta.ejecuciones,
+                total_ms=round(consulta.total_ms, 2),
+                promedio_ms=round(consulta.promedio_ms, 2),
+                max_ms=round(consulta.max_ms, 2),
+                ultima_vez=consulta.ultima_vez,
+                plan=plan.plan if plan else None,
+                plan_analyze=plan.analyze if plan else False,
+                plan_capturado_en=plan.capturado_en if plan else None
+            )
+            for consulta, plan in consultas_lentas.top(limite)
+        ]
+    )
+
+
+@router.delete("/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+@require_roles(RolUsuario.SUPERUSUARIO)
+async def limpiar_consultas_lentas(
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Descartar las consultas lentas y los planes acumulados del proceso
+
+    Requiere roles: SUPERUSUARIO
+    """
+    consultas_lentas.limpiar()
+
+
+@router.get("/bloqueos", response_model=BloqueosLoopResponse, status_code=status.HTTP_200_OK)
+@require_roles(RolUsuario.SUPERUSUARIO)
+async def listar_bloqueos_loop(
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Bloqueos recientes del event loop con la pila que los causaba
+
+    Solo se capturan pilas en desarrollo o con MONITOR_LOOP_PILAS; el
+    retraso del loop se publica siempre en /metrics. Los datos son del
+    proceso que atiende la petición, del más reciente al más antiguo.
+
+    Requiere roles: SUPERUSUARIO
+    """
+    return BloqueosLoopResponse(
+        umbral_ms=monitor_loop.umbral * 1000,
+        capturando_pilas=monitor_loop.capturar_pilas,
+        bloqueos=[
+            BloqueoLoopResponse(
+                detectado_en=bloqueo.detectado_en,
+                duracion_ms=bloqueo.duracion_ms,
+                pila=bloqueo.pila
+            )
+            for bloqueo in reversed(monitor_loop.bloqueos)
+        ]
+    )
+
+
+@router.post("/perfiles/token", response_model=PerfilTokenResponse, status_code=status.HTTP_201_CREATED)
+@require_roles(RolUsuario.SUPERUSUARIO)
+async def crear_token_perfil(
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Token firmado para perfilar peticiones
+
+    Las peticiones que lo envían en la cabecera X-Perfil (en desarrollo,
+    también en el parámetro _perfil) se perfilan; la respuesta indica el
+    perfil en X-Perfil-Id y X-Perfil-Url. Vence a los
+    PERFILADOR_TOKEN_MINUTOS.
+
+    Requiere roles: SUPERUSUARIO
+    """
+    vigencia = timedelta(minutes=settings.PERFILADOR_TOKEN_MINUTOS)
+    token = create_profile_token(
+        {"sub": str(current_user.id), "rol": current_user.rol.value},
+        expires_delta=vigencia
+    )
+    return PerfilTokenResponse(
+        token=token,
+        expira_en=datetime.utcnow() + vigencia,
+        parametro=PARAMETRO_PERFIL if settings.ENVIRONMENT == "development" else None
+    )
+
+
+@router.get("/perfiles/{perfil_id}", response_class=FileResponse)
+@require_roles(RolUsuario.SUPERUSUARIO)
+async def obtener_perfil(
+    perfil_id: str = Path(..., pattern=PERFIL_ID.pattern, description="Valor de X-Perfil-Id"),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Perfil de una petición en formato speedscope
+
+    Se abre en https://www.speedscope.app. Se conservan los últimos
+    PERFILADOR_MAX_ARCHIVOS perfiles.
+
+    Requiere roles: SUPERUSUARIO
+
+    Raises:
+        HTTPException 404: Si el perfil no existe o ya se descartó
+    """
+    ruta = ruta_perfil(perfil_id)
+    if not ruta.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Perfil {perfil_id} no encontrado"
+        )
+    return FileResponse(ruta, media_type="application/json", filename=ruta.name)
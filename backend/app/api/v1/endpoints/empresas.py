@@ -2,10 +2,11 @@
 Endpoints para gestión de empresas
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import AlcanceEmpresa, get_alcance_empresa, get_current_user, get_empresa_gerente
 from app.core.rbac import require_roles
 from app.models.user import Usuario, RolUsuario
 from app.schemas.empresa import (
@@ -14,11 +15,14 @@ from app.schemas.empresa import (
     EmpresaResponse,
     EmpresaListResponse,
     AutorizacionEmpresaCreate,
-    AutorizacionEmpresaResponse
+    AutorizacionEmpresaResponse,
+    NominaDiferenciasResponse,
+    NominaAplicar,
+    NominaAplicarResponse
 )
 from app.schemas.auth import MessageResponse
 from app.services.empresa_service import EmpresaService
-from app.core.exceptions import RecursoNoEncontrado, ValidacionError
+from app.core.exceptions import RecursoNoEncontrado, ValidacionError, ConflictoError
 import math
 
 
@@ -34,6 +38,7 @@ router = APIRouter(prefix="/empresas", tags=["empresas"])
 @require_roles(RolUsuario.GERENTE)
 async def obtener_mi_empresa(
     current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -41,10 +46,8 @@ async def obtener_mi_empresa(
     
     Solo accesible para usuarios con rol GERENTE
     """
-    from app.core.dependencies import get_empresa_gerente
-    
     try:
-        empresa = await get_empresa_gerente(current_user, db)
+        empresa = await get_empresa_gerente(alcance, db)
         return empresa
     except HTTPException:
         raise
@@ -286,7 +289,7 @@ async def agregar_autorizacion(
     
     try:
         autorizacion = await service.agregar_autorizacion(empresa_id, autorizacion_data)
-        return autorizacion
+        return await service.respuesta_autorizacion(autorizacion)
     except RecursoNoEncontrado as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -302,3 +305,83 @@ async def agregar_autorizacion(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": "ERROR_INTERNO", "message": str(e)}
         )
+
+
+def _verificar_nomina_gerente(alcance: AlcanceEmpresa, empresa_id: UUID) -> None:
+    """Los gerentes solo gestionan la nómina de su propia empresa"""
+    if not alcance.permite(empresa_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error": "PERMISOS_DENEGADOS", "message": "No tiene permisos para gestionar la nómina de esta empresa"}
+        )
+
+
+@router.post(
+    "/{empresa_id}/nomina/diferencias",
+    response_model=NominaDiferenciasResponse,
+    summary="Calcular diferencias de nómina",
+    description="Compara la nómina completa de un archivo CSV o XLSX con los conductores registrados. "
+                "No modifica datos. SUPERUSUARIO, DIRECTOR, SUBDIRECTOR, OPERARIO, GERENTE (su empresa)."
+)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+async def calcular_diferencias_nomina(
+    empresa_id: UUID,
+    file: UploadFile = File(..., description="Archivo CSV o XLSX con la nómina completa"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa)
+):
+    """Calcula altas, cambios y bajas de la nómina de una empresa"""
+    _verificar_nomina_gerente(alcance, empresa_id)
+    service = EmpresaService(db)
+    
+    try:
+        return await service.calcular_diferencias_nomina(empresa_id, file.file, file.filename)
+    except RecursoNoEncontrado as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": e.code, "message": e.message}
+        )
+    except ValidacionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": e.code, "message": e.message}
+        )
+
+
+@router.post(
+    "/{empresa_id}/nomina/aplicar",
+    response_model=NominaAplicarResponse,
+    summary="Aplicar diferencias de nómina",
+    description="Aplica en una transacción las diferencias calculadas. Si la nómina cambió desde "
+                "entonces responde 409. SUPERUSUARIO, DIRECTOR, SUBDIRECTOR, OPERARIO, GERENTE (su empresa)."
+)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+async def aplicar_diferencias_nomina(
+    empresa_id: UUID,
+    diferencias: NominaAplicar,
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa)
+):
+    """Aplica altas, cambios y bajas a la nómina de una empresa"""
+    _verificar_nomina_gerente(alcance, empresa_id)
+    service = EmpresaService(db)
+    
+    try:
+        return await service.aplicar_diferencias_nomina(empresa_id, diferencias)
+    except RecursoNoEncontrado as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": e.code, "message": e.message}
+        )
+    except ValidacionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": e.code, "message": e.message}
+        )
+    except ConflictoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": e.code, "message": e.message}
+        )
@@ -0,0 +1,90 @@
+"""
+Endpoints de eventos en tiempo real (Server-Sent Events)
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.dependencies import get_current_user
+from app.core.eventos import CANAL_HABILITACIONES, canal_usuario, distribuidor_eventos
+from app.models.user import Usuario, RolUsuario
+
+router = APIRouter(prefix="/eventos", tags=["eventos"])
+
+
+# Roles que atienden la cola de habilitaciones
+ROLES_COLA_HABILITACIONES = {
+    RolUsuario.SUPERUSUARIO,
+    RolUsuario.DIRECTOR,
+    RolUsuario.SUBDIRECTOR,
+    RolUsuario.OPERARIO,
+}
+
+
+def canales_para_usuario(usuario: Usuario) -> List[str]:
+    """Canales a los que se suscribe la conexión de un usuario"""
+    canales = [canal_usuario(usuario.id)]
+    if usuario.rol in ROLES_COLA_HABILITACIONES:
+        canales.append(CANAL_HABILITACIONES)
+    return canales
+
+
+def formatear_sse(evento: str, datos: Dict[str, Any]) -> str:
+    """Formatea un mensaje según el protocolo text/event-stream"""
+    return f"event: {evento}\ndata: {json.dumps(datos, default=str)}\n\n"
+
+
+async def flujo_eventos(
+    request: Request,
+    canales: List[str],
+    intervalo_latido: float
+) -> AsyncIterator[str]:
+    """
+    Generador de la respuesta SSE
+
+    No usa la base de datos: solo lee de la cola local del distribuidor.
+    Envía un comentario de latido cuando no hay eventos para mantener la
+    conexión abierta a través de proxies.
+    """
+    cola = await distribuidor_eventos.suscribir(canales)
+    try:
+        yield f"retry: {settings.EVENTOS_REINTENTO_MS}\n\n"
+        while not await request.is_disconnected():
+            try:
+                mensaje = await asyncio.wait_for(cola.get(), timeout=intervalo_latido)
+            except asyncio.TimeoutError:
+                yield ": latido\n\n"
+                continue
+            yield formatear_sse(mensaje["evento"], mensaje["datos"])
+    finally:
+        distribuidor_eventos.desuscribir(cola, canales)
+
+
+@router.get("/stream")
+async def stream_eventos(
+    request: Request,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Flujo de eventos en tiempo real para el usuario autenticado
+
+    Reemplaza el sondeo periódico de la cola de habilitaciones:
+
+    - **habilitacion**: cambio de estado de una habilitación (solo personal de la DRTC)
+    - **notificacion**: nuevas notificaciones para el usuario
+
+    La autenticación se valida una sola vez al conectar. Los clientes
+    deben enviar el header Authorization (p. ej. con fetch y ReadableStream).
+    """
+    return StreamingResponse(
+        flujo_eventos(request, canales_para_usuario(current_user), settings.EVENTOS_LATIDO_SEGUNDOS),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
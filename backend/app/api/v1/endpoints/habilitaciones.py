@@ -14,6 +14,7 @@ from app.core.exceptions import RecursoNoEncontrado, ValidacionError
 from app.models.user import Usuario, RolUsuario
 from app.models.habilitacion import EstadoHabilitacion
 from app.services.habilitacion_service import HabilitacionService
+from app.schemas.job import JobEncoladoResponse
 from app.schemas.habilitacion import (
     HabilitacionResponse,
     HabilitacionReview,
@@ -400,3 +401,30 @@ async def descargar_certificado(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generando certificado: {str(e)}"
         )
+
+
+@router.post("/{habilitacion_id}/certificado/async", response_model=JobEncoladoResponse, status_code=status.HTTP_202_ACCEPTED)
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO, RolUsuario.GERENTE)
+async def encolar_certificado(
+    habilitacion_id: UUID,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Encolar la generación del certificado de habilitación en PDF
+    
+    - **habilitacion_id**: ID de la habilitación
+    
+    Retorna el ID del trabajo; consultar su estado en GET /jobs/{job_id}
+    
+    Requiere roles: SUPERUSUARIO, DIRECTOR, SUBDIRECTOR, OPERARIO, GERENTE
+    """
+    from app.tasks.pdf import generar_certificado_habilitacion
+    from app.tasks.celery_app import COLA_PDF, encolar_para_usuario
+    
+    resultado = encolar_para_usuario(generar_certificado_habilitacion, current_user.id, str(habilitacion_id))
+    
+    return JobEncoladoResponse(
+        job_id=resultado.id,
+        estado=resultado.state,
+        cola=COLA_PDF
+    )
@@ -0,0 +1,67 @@
+"""
+Endpoints para consultar trabajos en segundo plano
+"""
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.dependencies import get_current_user
+from app.models.user import Usuario
+from app.schemas.job import JobEstadoResponse
+from app.tasks.celery_app import celery_app, propietario_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _leer_estado(job_id: str, backend) -> JobEstadoResponse:
+    """Lee el estado de un trabajo desde el backend de resultados (bloqueante)"""
+    resultado = AsyncResult(job_id, app=celery_app, backend=backend)
+    estado = resultado.state
+    listo = resultado.ready()
+
+    respuesta = JobEstadoResponse(
+        job_id=job_id,
+        estado=estado,
+        listo=listo,
+        tarea=resultado.name
+    )
+
+    if listo:
+        respuesta.exitoso = resultado.successful()
+        respuesta.fecha_fin = resultado.date_done
+        if respuesta.exitoso:
+            respuesta.resultado = resultado.result
+        else:
+            respuesta.error = str(resultado.result)
+
+    return respuesta
+
+
+@router.get("/{job_id}", response_model=JobEstadoResponse, status_code=status.HTTP_200_OK)
+async def obtener_estado_job(
+    job_id: str,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Obtener el estado de un trabajo en segundo plano
+
+    - **job_id**: ID retornado al encolar el trabajo
+
+    Solo el usuario que encoló el trabajo y los administradores pueden
+    consultarlo. Para los administradores, los trabajos desconocidos o
+    expirados se reportan como PENDING. Los resultados expiran según
+    CELERY_RESULT_EXPIRES.
+
+    Raises:
+        HTTPException 404: Si el trabajo no es del usuario (o no se conoce)
+    """
+    # El backend se resuelve en este hilo; la lectura bloqueante va al threadpool
+    backend = celery_app.backend
+    if not current_user.es_administrador():
+        propietario = await run_in_threadpool(propietario_job, job_id, backend)
+        if propietario != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Trabajo {job_id} no encontrado"
+            )
+    return await run_in_threadpool(_leer_estado, job_id, backend)
@@ -2,6 +2,7 @@
 Endpoints para gestión de pagos TUPA
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
@@ -9,11 +10,14 @@ from datetime import date
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
-from app.models.user import Usuario
+from app.core.rbac import require_roles
+from app.models.user import Usuario, RolUsuario
 from app.models.habilitacion import EstadoPago
 from app.services.pago_service import PagoService
 from app.schemas.pago import PagoCreate, PagoConDetalles, OrdenPago, ReporteIngresos
+from app.schemas.job import JobEncoladoResponse
 from app.core.exceptions import RecursoNoEncontrado, ValidacionError
+from app.utils.exportacion import MEDIA_TYPE_CSV, MEDIA_TYPE_XLSX
 
 router = APIRouter()
 
@@ -51,6 +55,47 @@ async def registrar_pago(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.get("/exportar")
+@require_roles(RolUsuario.SUPERUSUARIO, RolUsuario.DIRECTOR, RolUsuario.SUBDIRECTOR, RolUsuario.OPERARIO)
+async def exportar_pagos(
+    formato: str = Query("csv", pattern="^(csv|xlsx)$", description="Formato del archivo"),
+    estado: Optional[EstadoPago] = Query(None, description="Filtrar por estado"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Exportar pagos con su concepto TUPA y habilitación en CSV o Excel
+    
+    Incluye los pagos de todas las empresas.
+    
+    Requiere roles: SUPERUSUARIO, DIRECTOR, SUBDIRECTOR, OPERARIO
+    """
+    service = PagoService(db)
+    try:
+        bloques = service.exportar_pagos(formato, estado=estado, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+    except ValidacionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def contenido():
+        # FastAPI cierra las dependencias con yield antes de enviar el cuerpo
+        # de un StreamingResponse: la sesión se reabre al consultar y se
+        # cierra aquí al terminar el envío
+        try:
+            async for bloque in bloques:
+                yield bloque
+        finally:
+            await db.close()
+    
+    periodo = "_".join(f.isoformat() for f in (fecha_inicio, fecha_fin) if f) or date.today().isoformat()
+    return StreamingResponse(
+        contenido(),
+        media_type=MEDIA_TYPE_CSV if formato == "csv" else MEDIA_TYPE_XLSX,
+        headers={"Content-Disposition": f'attachment; filename="pagos_{periodo}.{formato}"'}
+    )
+
+
 @router.get("/{pago_id}", response_model=PagoConDetalles)
 async def get_pago(
     pago_id: UUID,
@@ -146,6 +191,25 @@ async def generar_reporte_ingresos(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post("/reportes/ingresos/async", response_model=JobEncoladoResponse, status_code=status.HTTP_202_ACCEPTED)
+async def encolar_reporte_ingresos(
+    fecha_inicio: date = Query(..., description="Fecha inicial del reporte"),
+    fecha_fin: date = Query(..., description="Fecha final del reporte"),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Encolar la generación del reporte de ingresos; consultar en GET /jobs/{job_id}"""
+    from app.tasks.reportes import generar_reporte_ingresos as tarea_reporte
+    from app.tasks.celery_app import COLA_REPORTES, encolar_para_usuario
+    
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La fecha de inicio debe ser anterior a la fecha de fin")
+    
+    resultado = encolar_para_usuario(
+        tarea_reporte, current_user.id, fecha_inicio.isoformat(), fecha_fin.isoformat()
+    )
+    return JobEncoladoResponse(job_id=resultado.id, estado=resultado.state, cola=COLA_REPORTES)
+
+
 @router.post("/habilitacion/{habilitacion_id}/generar-orden", response_model=OrdenPago)
 async def generar_orden_pago(
     habilitacion_id: UUID,
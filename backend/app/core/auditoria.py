@@ -0,0 +1,446 @@
+"""
+Registro de auditoría a partir de los eventos de sesión de SQLAlchemy
+
+Cada flush se inspecciona para capturar las altas, modificaciones y bajas
+de los modelos con sus diferencias. Hay dos modos de escritura:
+
+- Durable: la fila de auditoría se inserta en la misma transacción que el
+  cambio. Se usa para las tablas sensibles (AUDITORIA_TABLAS_SENSIBLES) y
+  siempre que no haya un escritor en segundo plano (workers, scripts).
+- Diferido: los registros se encolan en memoria al confirmar la transacción
+  y un escritor en segundo plano los inserta por lotes, fuera de la latencia
+  de la petición.
+
+Solo se audita cuando hay un usuario en el contexto (peticiones autenticadas
+o bloques `contexto_auditoria`), porque Auditoria.usuario_id es obligatorio.
+"""
+import asyncio
+import enum
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.models.auditoria import AccionAuditoria, Auditoria
+from app.models.base import BaseModel
+
+logger = get_logger(__name__)
+
+
+# Columnas que no se guardan en los diffs
+COLUMNAS_OMITIDAS = {"created_at", "updated_at"}
+COLUMNAS_ENMASCARADAS = {"password_hash"}
+VALOR_ENMASCARADO = "***"
+
+_CLAVE_PENDIENTES = "auditoria_pendientes"
+
+
+# ---------------------------------------------------------------------------
+# Contexto de la petición
+# ---------------------------------------------------------------------------
+
+_contexto: ContextVar[Optional[Dict[str, Any]]] = ContextVar("contexto_auditoria", default=None)
+
+
+def iniciar_contexto(ip_address: Optional[str] = None, user_agent: Optional[str] = None):
+    """
+    Abre un contexto de auditoría para la petición actual
+
+    Returns:
+        Token para restaurar el contexto anterior con finalizar_contexto()
+    """
+    return _contexto.set({
+        "usuario_id": None,
+        "ip_address": ip_address,
+        "user_agent": user_agent[:500] if user_agent else None,
+    })
+
+
+def finalizar_contexto(token) -> None:
+    """Restaura el contexto anterior a iniciar_contexto()"""
+    _contexto.reset(token)
+
+
+def establecer_usuario(usuario_id: uuid.UUID) -> None:
+    """Registra el usuario autenticado en el contexto actual"""
+    contexto = _contexto.get()
+    if contexto is None:
+        iniciar_contexto()
+        contexto = _contexto.get()
+    contexto["usuario_id"] = usuario_id
+
+
+@contextmanager
+def contexto_auditoria(usuario_id: uuid.UUID, ip_address: Optional[str] = None) -> Iterator[None]:
+    """
+    Audita los cambios hechos dentro del bloque a nombre de un usuario
+
+    Útil fuera de las peticiones HTTP (tareas, scripts y tests).
+    """
+    token = iniciar_contexto(ip_address=ip_address)
+    establecer_usuario(usuario_id)
+    try:
+        yield
+    finally:
+        finalizar_contexto(token)
+
+
+def anotar(instancia: BaseModel, descripcion: str, accion: Optional[AccionAuditoria] = None) -> None:
+    """
+    Agrega una descripción (y opcionalmente la acción) al próximo registro
+    de auditoría de la instancia
+
+    Args:
+        instancia: Modelo que se va a modificar
+        descripcion: Motivo del cambio
+        accion: Acción a registrar en lugar de la detectada
+    """
+    inspect(instancia).info["auditoria"] = {"descripcion": descripcion, "accion": accion}
+
+
+# ---------------------------------------------------------------------------
+# Captura de cambios
+# ---------------------------------------------------------------------------
+
+def _lista_config(valor: str) -> frozenset:
+    return frozenset(t.strip() for t in valor.split(",") if t.strip())
+
+
+TABLAS_SENSIBLES = _lista_config(settings.AUDITORIA_TABLAS_SENSIBLES)
+TABLAS_EXCLUIDAS = _lista_config(settings.AUDITORIA_TABLAS_EXCLUIDAS) | {Auditoria.__tablename__}
+
+
+def _serializar(valor: Any) -> Any:
+    """Convierte un valor de columna a un tipo compatible con JSON"""
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (uuid.UUID, Decimal)):
+        return str(valor)
+    return valor
+
+
+def _valor(columna: str, valor: Any) -> Any:
+    return VALOR_ENMASCARADO if columna in COLUMNAS_ENMASCARADAS else _serializar(valor)
+
+
+def _columnas(instancia: BaseModel) -> Dict[str, Any]:
+    mapper = inspect(instancia).mapper
+    return {
+        attr.key: _valor(attr.key, getattr(instancia, attr.key))
+        for attr in mapper.column_attrs
+        if attr.key not in COLUMNAS_OMITIDAS
+    }
+
+
+def _diferencias(instancia: BaseModel):
+    """Retorna (anteriores, nuevos) de las columnas modificadas"""
+    estado = inspect(instancia)
+    anteriores, nuevos = {}, {}
+    for attr in estado.mapper.column_attrs:
+        if attr.key in COLUMNAS_OMITIDAS:
+            continue
+        historial = estado.attrs[attr.key].history
+        if not historial.has_changes():
+            continue
+        anteriores[attr.key] = _valor(attr.key, historial.deleted[0] if historial.deleted else None)
+        nuevos[attr.key] = _valor(attr.key, historial.added[0] if historial.added else None)
+    return anteriores, nuevos
+
+
+def _registro(
+    instancia: BaseModel,
+    accion: AccionAuditoria,
+    contexto: Dict[str, Any],
+    datos_anteriores: Optional[Dict[str, Any]],
+    datos_nuevos: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    anotacion = inspect(instancia).info.pop("auditoria", None) or {}
+    ahora = datetime.utcnow()
+    return {
+        "id": uuid.uuid4(),
+        "created_at": ahora,
+        "updated_at": ahora,
+        "usuario_id": contexto["usuario_id"],
+        "tabla": instancia.__tablename__,
+        "accion": (anotacion.get("accion") or accion).value,
+        "registro_id": str(instancia.id),
+        "datos_anteriores": datos_anteriores,
+        "datos_nuevos": datos_nuevos,
+        "ip_address": contexto.get("ip_address"),
+        "user_agent": contexto.get("user_agent"),
+        "descripcion": anotacion.get("descripcion"),
+    }
+
+
+def capturar_cambios(session: Session) -> List[Dict[str, Any]]:
+    """
+    Construye los registros de auditoría del flush en curso
+
+    Debe llamarse en after_flush, cuando new/dirty/deleted y el historial
+    de atributos todavía reflejan el estado previo al flush.
+    """
+    contexto = _contexto.get()
+    if contexto is None or contexto.get("usuario_id") is None:
+        return []
+
+    registros = []
+    for instancia in session.new:
+        if isinstance(instancia, BaseModel) and instancia.__tablename__ not in TABLAS_EXCLUIDAS:
+            registros.append(_registro(
+                instancia, AccionAuditoria.CREAR, contexto, None, _columnas(instancia)
+            ))
+
+    for instancia in session.dirty:
+        if not isinstance(instancia, BaseModel) or instancia.__tablename__ in TABLAS_EXCLUIDAS:
+            continue
+        anteriores, nuevos = _diferencias(instancia)
+        if not nuevos:
+            continue
+        accion = AccionAuditoria.CAMBIO_ESTADO if "estado" in nuevos else AccionAuditoria.ACTUALIZAR
+        registros.append(_registro(instancia, accion, contexto, anteriores, nuevos))
+
+    for instancia in session.deleted:
+        if isinstance(instancia, BaseModel) and instancia.__tablename__ not in TABLAS_EXCLUIDAS:
+            registros.append(_registro(
+                instancia, AccionAuditoria.ELIMINAR, contexto, _columnas(instancia), None
+            ))
+
+    return registros
+
+
+async def auditar_masivo(
+    db: AsyncSession,
+    tabla: str,
+    accion: AccionAuditoria,
+    cambios: Iterable[Tuple[Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    descripcion: Optional[str] = None
+) -> int:
+    """
+    Registra la auditoría de cambios hechos con SQL masivo
+
+    Los INSERT ... SELECT y UPDATE masivos no pasan por el flush del ORM, así
+    que quien los ejecuta informa aquí las filas afectadas. Los registros se
+    insertan siempre en la misma transacción: un lote masivo podría
+    desbordar la cola del escritor diferido.
+
+    Args:
+        db: Sesión con la transacción del cambio
+        tabla: Tabla modificada
+        accion: Acción registrada para todas las filas
+        cambios: Tuplas (id del registro, datos anteriores, datos nuevos)
+        descripcion: Descripción común a todos los registros
+
+    Returns:
+        Número de registros de auditoría insertados
+    """
+    contexto = _contexto.get()
+    if contexto is None or contexto.get("usuario_id") is None or tabla in TABLAS_EXCLUIDAS:
+        return 0
+
+    ahora = datetime.utcnow()
+    registros = [
+        {
+            "id": uuid.uuid4(),
+            "created_at": ahora,
+            "updated_at": ahora,
+            "usuario_id": contexto["usuario_id"],
+            "tabla": tabla,
+            "accion": accion.value,
+            "registro_id": str(registro_id),
+            "datos_anteriores": _serializar_datos(anteriores),
+            "datos_nuevos": _serializar_datos(nuevos),
+            "ip_address": contexto.get("ip_address"),
+            "user_agent": contexto.get("user_agent"),
+            "descripcion": descripcion,
+        }
+        for registro_id, anteriores, nuevos in cambios
+    ]
+    if registros:
+        await db.execute(insert(Auditoria.__table__), registros)
+    return len(registros)
+
+
+def _serializar_datos(datos: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if datos is None:
+        return None
+    return {
+        columna: _valor(columna, valor)
+        for columna, valor in datos.items()
+        if columna not in COLUMNAS_OMITIDAS
+    }
+
+
+# ---------------------------------------------------------------------------
+# Escritor en segundo plano
+# ---------------------------------------------------------------------------
+
+class EscritorAuditoria:
+    """
+    Inserta en lotes los registros de auditoría diferidos
+
+    Un lote se escribe cuando alcanza `tamano_lote` registros o cuando pasan
+    `intervalo` segundos desde el último. La cola en memoria está acotada a
+    `max_pendientes`; lo que no cabe se descarta y se cuenta en `descartados`.
+    """
+
+    def __init__(
+        self,
+        tamano_lote: int = 500,
+        intervalo: float = 1.0,
+        max_pendientes: int = 10000,
+        session_factory: Optional[async_sessionmaker] = None
+    ):
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.session_factory = session_factory
+        self.descartados = 0
+        self.escritos = 0
+        self._pendientes: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._tarea: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lote_listo: Optional[asyncio.Event] = None
+
+    @property
+    def activo(self) -> bool:
+        """Indica si hay un escritor en ejecución para el modo diferido"""
+        return self._tarea is not None and not self._tarea.done()
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._pendientes)
+
+    def encolar(self, registros: List[Dict[str, Any]]) -> None:
+        """Agrega registros a la cola (puede llamarse desde cualquier hilo)"""
+        with self._lock:
+            espacio = self.max_pendientes - len(self._pendientes)
+            if len(registros) > espacio:
+                self.descartados += len(registros) - max(espacio, 0)
+                logger.error(
+                    "Cola de auditoría llena: %d registros descartados en total",
+                    self.descartados
+                )
+                registros = registros[:max(espacio, 0)]
+            self._pendientes.extend(registros)
+            lleno = len(self._pendientes) >= self.tamano_lote
+
+        if lleno and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._lote_listo.set)
+
+    def _tomar_lote(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            lote = self._pendientes[:self.tamano_lote]
+            del self._pendientes[:self.tamano_lote]
+            return lote
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        if self.session_factory is None:
+            from app.core.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+        return self.session_factory
+
+    async def escribir_pendientes(self) -> int:
+        """
+        Insertar todos los registros en cola, un INSERT multi-fila por lote
+
+        Returns:
+            Número de registros escritos
+        """
+        total = 0
+        while True:
+            lote = self._tomar_lote()
+            if not lote:
+                return total
+            try:
+                async with self._get_session_factory()() as session:
+                    await session.execute(insert(Auditoria).values(lote))
+                    await session.commit()
+            except Exception:
+                logger.exception("No se pudo escribir un lote de %d registros de auditoría", len(lote))
+                self.descartados += len(lote)
+                continue
+            total += len(lote)
+            self.escritos += len(lote)
+
+    async def _ejecutar(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._lote_listo.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._lote_listo.clear()
+            await self.escribir_pendientes()
+
+    def iniciar(self) -> None:
+        """Arrancar el escritor en el event loop actual (inicio de la aplicación)"""
+        if self.activo:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._lote_listo = asyncio.Event()
+        self._tarea = asyncio.create_task(self._ejecutar())
+
+    async def detener(self) -> None:
+        """Detener el escritor y escribir lo que quede en cola"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._tarea = None
+        self._loop = None
+        await self.escribir_pendientes()
+
+
+escritor_auditoria = EscritorAuditoria(
+    tamano_lote=settings.AUDITORIA_TAMANO_LOTE,
+    intervalo=settings.AUDITORIA_INTERVALO_SEGUNDOS,
+    max_pendientes=settings.AUDITORIA_MAX_PENDIENTES
+)
+
+
+# ---------------------------------------------------------------------------
+# Eventos de sesión
+# ---------------------------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _despues_de_flush(session: Session, flush_context) -> None:
+    registros = capturar_cambios(session)
+    if not registros:
+        return
+
+    if escritor_auditoria.activo:
+        durables = [r for r in registros if r["tabla"] in TABLAS_SENSIBLES]
+        diferidos = [r for r in registros if r["tabla"] not in TABLAS_SENSIBLES]
+    else:
+        durables, diferidos = registros, []
+
+    if durables:
+        # Misma conexión y transacción que el cambio auditado
+        session.connection().execute(insert(Auditoria.__table__), durables)
+    if diferidos:
+        session.info.setdefault(_CLAVE_PENDIENTES, []).extend(diferidos)
+
+
+@event.listens_for(Session, "after_commit")
+def _despues_de_commit(session: Session) -> None:
+    pendientes = session.info.pop(_CLAVE_PENDIENTES, None)
+    if pendientes:
+        escritor_auditoria.encolar(pendientes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _despues_de_rollback(session: Session) -> None:
+    session.info.pop(_CLAVE_PENDIENTES, None)
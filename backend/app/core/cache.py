@@ -0,0 +1,94 @@
+"""
+Caché de resultados en Redis
+
+Guarda resultados serializables a JSON compartidos por todos los workers.
+Es de mejor esfuerzo: si Redis no está disponible, las lecturas se
+consideran fallos de caché y las escrituras se omiten.
+"""
+import json
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.eventos import get_redis
+from app.core.logging_config import get_logger
+from app.core.metricas import espacio_de_clave, registrar_cache
+
+logger = get_logger(__name__)
+
+
+PREFIJO_CACHE = "cache:"
+
+
+async def leer_cache(clave: str) -> Optional[Any]:
+    """
+    Leer un valor de la caché
+
+    Args:
+        clave: Clave sin prefijo
+
+    Returns:
+        Valor deserializado o None si no existe
+    """
+    try:
+        valor = await get_redis().get(f"{PREFIJO_CACHE}{clave}")
+    except (RedisError, OSError) as e:
+        logger.warning("No se pudo leer la caché %s: %s", clave, e)
+        registrar_cache(espacio_de_clave(clave), acierto=False)
+        return None
+    registrar_cache(espacio_de_clave(clave), acierto=valor is not None)
+    return json.loads(valor) if valor is not None else None
+
+
+async def escribir_cache(clave: str, valor: Any, ttl_segundos: int) -> None:
+    """
+    Guardar un valor en la caché
+
+    Args:
+        clave: Clave sin prefijo
+        valor: Valor serializable a JSON
+        ttl_segundos: Tiempo de expiración
+    """
+    try:
+        await get_redis().set(
+            f"{PREFIJO_CACHE}{clave}",
+            json.dumps(valor, default=str),
+            ex=ttl_segundos
+        )
+    except (RedisError, OSError) as e:
+        logger.warning("No se pudo escribir la caché %s: %s", clave, e)
+
+
+async def version_cache(espacio: str) -> Optional[int]:
+    """
+    Versión actual de un espacio de claves
+
+    Incluir la versión en las claves permite invalidar todo el espacio
+    con un solo INCR en lugar de buscar y borrar claves.
+
+    Args:
+        espacio: Nombre del espacio de claves
+
+    Returns:
+        Versión actual (0 si nunca se invalidó) o None si Redis no responde,
+        en cuyo caso no debe usarse la caché
+    """
+    try:
+        valor = await get_redis().get(f"{PREFIJO_CACHE}{espacio}:version")
+    except (RedisError, OSError) as e:
+        logger.warning("No se pudo leer la versión de caché %s: %s", espacio, e)
+        return None
+    return int(valor) if valor is not None else 0
+
+
+async def invalidar_cache(espacio: str) -> None:
+    """
+    Invalidar todas las claves de un espacio
+
+    Args:
+        espacio: Nombre del espacio de claves
+    """
+    try:
+        await get_redis().incr(f"{PREFIJO_CACHE}{espacio}:version")
+    except (RedisError, OSError) as e:
+        logger.warning("No se pudo invalidar la caché %s: %s", espacio, e)
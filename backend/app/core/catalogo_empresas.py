@@ -0,0 +1,66 @@
+"""
+Catálogo en memoria del estado de las empresas
+
+Resuelve sin consultar la base de datos si una empresa está activa y cuál
+es la empresa de un gerente. Lo usa el alcance de empresa de cada petición
+(app.core.dependencies.get_alcance_empresa): los gerentes son los usuarios
+con más peticiones y todas se limitan a su empresa.
+
+Se invalida como los demás catálogos (ver app.core.catalogos) al cambiar
+cualquier empresa por el ORM: alta, activación o cambio de gerente.
+"""
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalogos import CatalogoEnMemoria, registrar_catalogo
+from app.core.config import settings
+from app.models.empresa import Empresa
+
+
+class EstadoEmpresas:
+    """Estado de las empresas, de solo lectura"""
+
+    def __init__(self, activo: Dict[UUID, bool], empresa_por_gerente: Dict[UUID, UUID]):
+        self._activo: Mapping[UUID, bool] = MappingProxyType(activo)
+        self._empresa_por_gerente: Mapping[UUID, UUID] = MappingProxyType(empresa_por_gerente)
+
+    def __len__(self) -> int:
+        return len(self._activo)
+
+    def existe(self, empresa_id: UUID) -> bool:
+        return empresa_id in self._activo
+
+    def activa(self, empresa_id: UUID) -> bool:
+        return self._activo.get(empresa_id, False)
+
+    def empresa_de_gerente(self, gerente_id: UUID) -> Optional[UUID]:
+        """Empresa cuyo gerente_id es el usuario, o None"""
+        return self._empresa_por_gerente.get(gerente_id)
+
+
+class CatalogoEmpresas(CatalogoEnMemoria[EstadoEmpresas]):
+    """Estado activo y gerente de cada empresa"""
+
+    nombre = "empresas"
+    modelos = (Empresa,)
+
+    async def construir(self, db: AsyncSession) -> EstadoEmpresas:
+        result = await db.execute(select(Empresa.id, Empresa.activo, Empresa.gerente_id))
+
+        activo: Dict[UUID, bool] = {}
+        empresa_por_gerente: Dict[UUID, UUID] = {}
+        for empresa_id, es_activa, gerente_id in result.all():
+            activo[empresa_id] = es_activa
+            if gerente_id is not None:
+                empresa_por_gerente[gerente_id] = empresa_id
+
+        return EstadoEmpresas(activo, empresa_por_gerente)
+
+
+catalogo_empresas = registrar_catalogo(
+    CatalogoEmpresas(ttl_segundos=settings.CATALOGO_EMPRESAS_TTL_SEGUNDOS)
+)
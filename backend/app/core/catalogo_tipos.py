@@ -0,0 +1,175 @@
+"""
+Catálogo en memoria de tipos de autorización y de infracción
+
+Ambas tablas tienen pocas filas y casi no cambian. Mantenerlas en memoria
+(ver app.core.catalogos para la carga y la invalidación) permite:
+
+- Validar un tipo_autorizacion_id o resolver su código sin consultar la
+  tabla ni cargar la relación AutorizacionEmpresa.tipo_autorizacion.
+- Filtrar infracciones por gravedad con `tipo_infraccion_id IN (...)` en
+  lugar de un JOIN con tipos_infraccion.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalogos import CatalogoEnMemoria, registrar_catalogo
+from app.core.config import settings
+from app.models.empresa import TipoAutorizacion
+from app.models.infraccion import GravedadInfraccion, TipoInfraccion
+
+
+@dataclass(frozen=True)
+class TipoAutorizacionCatalogo:
+    """Copia inmutable de un TipoAutorizacion"""
+
+    id: UUID
+    codigo: str
+    nombre: str
+    descripcion: Optional[str]
+    requisitos_especiales: Optional[Mapping[str, Any]]
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class TipoInfraccionCatalogo:
+    """Copia inmutable de un TipoInfraccion"""
+
+    id: UUID
+    codigo: str
+    descripcion: str
+    gravedad: GravedadInfraccion
+    puntos: int
+    activo: bool
+
+
+class IndiceTipos:
+    """Mapas id→tipo, código→tipo y gravedad→ids, de solo lectura"""
+
+    def __init__(
+        self,
+        tipos_autorizacion: Iterable[TipoAutorizacionCatalogo],
+        tipos_infraccion: Iterable[TipoInfraccionCatalogo]
+    ):
+        autorizacion_por_id = {tipo.id: tipo for tipo in tipos_autorizacion}
+        infraccion_por_id = {tipo.id: tipo for tipo in tipos_infraccion}
+
+        por_gravedad: Dict[GravedadInfraccion, FrozenSet[UUID]] = {
+            gravedad: frozenset(
+                tipo.id for tipo in infraccion_por_id.values() if tipo.gravedad == gravedad
+            )
+            for gravedad in GravedadInfraccion
+        }
+
+        self.tipos_autorizacion: Mapping[UUID, TipoAutorizacionCatalogo] = MappingProxyType(autorizacion_por_id)
+        self.tipos_autorizacion_por_codigo: Mapping[str, TipoAutorizacionCatalogo] = MappingProxyType(
+            {tipo.codigo: tipo for tipo in autorizacion_por_id.values()}
+        )
+        self.tipos_infraccion: Mapping[UUID, TipoInfraccionCatalogo] = MappingProxyType(infraccion_por_id)
+        self.tipos_infraccion_por_codigo: Mapping[str, TipoInfraccionCatalogo] = MappingProxyType(
+            {tipo.codigo: tipo for tipo in infraccion_por_id.values()}
+        )
+        self.tipos_infraccion_por_gravedad: Mapping[GravedadInfraccion, FrozenSet[UUID]] = MappingProxyType(por_gravedad)
+
+    def ids_tipos_infraccion(self, *gravedades: GravedadInfraccion) -> FrozenSet[UUID]:
+        """
+        IDs de los tipos de infracción de las gravedades indicadas
+
+        Args:
+            gravedades: Una o más gravedades
+
+        Returns:
+            Conjunto de IDs (vacío si no hay tipos con esas gravedades)
+        """
+        return frozenset().union(
+            *(self.tipos_infraccion_por_gravedad[gravedad] for gravedad in gravedades)
+        )
+
+
+class CatalogoTipos(CatalogoEnMemoria[IndiceTipos]):
+    """Tipos de autorización y de infracción"""
+
+    nombre = "tipos"
+    modelos = (TipoAutorizacion, TipoInfraccion)
+
+    async def construir(self, db: AsyncSession) -> IndiceTipos:
+        autorizaciones = await db.execute(select(
+            TipoAutorizacion.id,
+            TipoAutorizacion.codigo,
+            TipoAutorizacion.nombre,
+            TipoAutorizacion.descripcion,
+            TipoAutorizacion.requisitos_especiales,
+            TipoAutorizacion.created_at,
+            TipoAutorizacion.updated_at
+        ))
+        infracciones = await db.execute(select(
+            TipoInfraccion.id,
+            TipoInfraccion.codigo,
+            TipoInfraccion.descripcion,
+            TipoInfraccion.gravedad,
+            TipoInfraccion.puntos,
+            TipoInfraccion.activo
+        ))
+        return IndiceTipos(
+            (
+                TipoAutorizacionCatalogo(
+                    id=fila.id,
+                    codigo=fila.codigo,
+                    nombre=fila.nombre,
+                    descripcion=fila.descripcion,
+                    requisitos_especiales=(
+                        MappingProxyType(dict(fila.requisitos_especiales))
+                        if fila.requisitos_especiales is not None else None
+                    ),
+                    created_at=fila.created_at,
+                    updated_at=fila.updated_at
+                )
+                for fila in autorizaciones
+            ),
+            (
+                TipoInfraccionCatalogo(
+                    id=fila.id,
+                    codigo=fila.codigo,
+                    descripcion=fila.descripcion,
+                    gravedad=fila.gravedad,
+                    puntos=fila.puntos,
+                    # La columna guarda "true"/"false" como texto
+                    activo=str(fila.activo).lower() == "true"
+                )
+                for fila in infracciones
+            )
+        )
+
+    async def tipo_autorizacion(
+        self,
+        db: AsyncSession,
+        tipo_autorizacion_id: UUID
+    ) -> Optional[TipoAutorizacionCatalogo]:
+        """
+        Tipo de autorización por ID
+
+        Si no está en el índice se recarga una vez, por si fue creado en
+        otro proceso y el aviso de invalidación aún no llegó.
+
+        Args:
+            db: Sesión para recargar el índice si hace falta
+            tipo_autorizacion_id: ID del tipo
+
+        Returns:
+            Tipo de autorización o None si no existe
+        """
+        tipo = (await self.obtener(db)).tipos_autorizacion.get(tipo_autorizacion_id)
+        if tipo is None:
+            tipo = (await self.cargar(db)).tipos_autorizacion.get(tipo_autorizacion_id)
+        return tipo
+
+
+catalogo_tipos = registrar_catalogo(
+    CatalogoTipos(ttl_segundos=settings.CATALOGO_TIPOS_TTL_SEGUNDOS)
+)
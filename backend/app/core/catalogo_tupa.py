@@ -0,0 +1,146 @@
+"""
+Catálogo en memoria de los conceptos TUPA
+
+Los conceptos TUPA son pocos y cambian rara vez, pero se consultan en cada
+orden de pago. Cada proceso mantiene un índice inmutable de los conceptos
+activos por código y fecha de vigencia (ver app.core.catalogos para la
+carga y la invalidación) y resuelve (código, fecha) sin consultar la base
+de datos.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalogos import CatalogoEnMemoria, registrar_catalogo
+from app.core.config import settings
+from app.models.habilitacion import ConceptoTUPA
+
+
+@dataclass(frozen=True)
+class ConceptoTUPACatalogo:
+    """Copia inmutable de un ConceptoTUPA, independiente de la sesión"""
+
+    id: UUID
+    codigo: str
+    descripcion: str
+    monto: Decimal
+    vigencia_desde: date
+    vigencia_hasta: Optional[date]
+    activo: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def desde_modelo(cls, concepto: ConceptoTUPA) -> "ConceptoTUPACatalogo":
+        return cls(
+            id=concepto.id,
+            codigo=concepto.codigo,
+            descripcion=concepto.descripcion,
+            monto=concepto.monto,
+            vigencia_desde=concepto.vigencia_desde,
+            vigencia_hasta=concepto.vigencia_hasta,
+            activo=concepto.activo,
+            created_at=concepto.created_at,
+            updated_at=concepto.updated_at
+        )
+
+    def vigente_en(self, fecha: date) -> bool:
+        """Indica si `fecha` está dentro del periodo de vigencia"""
+        return self.vigencia_desde <= fecha and (
+            self.vigencia_hasta is None or fecha <= self.vigencia_hasta
+        )
+
+    @property
+    def esta_vigente(self) -> bool:
+        """Verifica si el concepto TUPA está vigente hoy"""
+        return self.activo and self.vigente_en(date.today())
+
+
+class IndiceVigencias:
+    """
+    Índice de conceptos por código y fecha de inicio de vigencia
+
+    Para cada código guarda los conceptos ordenados por vigencia_desde; una
+    búsqueda binaria ubica el último que empezó en o antes de la fecha y,
+    si hubiera periodos superpuestos, gana el de inicio más reciente.
+    """
+
+    def __init__(self, conceptos: Iterable[ConceptoTUPACatalogo]):
+        por_codigo: Dict[str, List[ConceptoTUPACatalogo]] = defaultdict(list)
+        for concepto in conceptos:
+            if concepto.activo:
+                por_codigo[concepto.codigo].append(concepto)
+
+        self._por_codigo: Dict[str, Tuple[List[date], Tuple[ConceptoTUPACatalogo, ...]]] = {}
+        for codigo, lista in por_codigo.items():
+            lista.sort(key=lambda c: c.vigencia_desde)
+            self._por_codigo[codigo] = ([c.vigencia_desde for c in lista], tuple(lista))
+
+    def __len__(self) -> int:
+        return sum(len(conceptos) for _, conceptos in self._por_codigo.values())
+
+    def resolver(self, codigo: str, fecha: date) -> Optional[ConceptoTUPACatalogo]:
+        """
+        Concepto activo de un código vigente en una fecha
+
+        Args:
+            codigo: Código del concepto
+            fecha: Fecha de referencia
+
+        Returns:
+            Concepto vigente o None si no hay ninguno
+        """
+        entrada = self._por_codigo.get(codigo)
+        if entrada is None:
+            return None
+
+        inicios, conceptos = entrada
+        for posicion in range(bisect_right(inicios, fecha) - 1, -1, -1):
+            concepto = conceptos[posicion]
+            if concepto.vigente_en(fecha):
+                return concepto
+        return None
+
+
+class CatalogoTUPA(CatalogoEnMemoria[IndiceVigencias]):
+    """Conceptos TUPA activos indexados por código y vigencia"""
+
+    nombre = "conceptos_tupa"
+    modelos = (ConceptoTUPA,)
+
+    async def construir(self, db: AsyncSession) -> IndiceVigencias:
+        from app.repositories.pago_repository import ConceptoTUPARepository
+
+        conceptos = await ConceptoTUPARepository(db).get_activos()
+        return IndiceVigencias(ConceptoTUPACatalogo.desde_modelo(c) for c in conceptos)
+
+    async def obtener_vigente(
+        self,
+        db: AsyncSession,
+        codigo: str,
+        fecha: Optional[date] = None
+    ) -> Optional[ConceptoTUPACatalogo]:
+        """
+        Concepto TUPA vigente por código, desde memoria
+
+        Args:
+            db: Sesión para recargar el índice si no está vigente
+            codigo: Código del concepto
+            fecha: Fecha de referencia (por defecto hoy)
+
+        Returns:
+            Concepto vigente o None si no existe
+        """
+        indice = await self.obtener(db)
+        return indice.resolver(codigo, fecha or date.today())
+
+
+catalogo_tupa = registrar_catalogo(
+    CatalogoTUPA(ttl_segundos=settings.CATALOGO_TUPA_TTL_SEGUNDOS)
+)
@@ -0,0 +1,243 @@
+"""
+Catálogos de datos de referencia en memoria
+
+Tablas pequeñas que cambian rara vez (conceptos TUPA, tipos de
+autorización, tipos de infracción) se cargan en cada proceso como índices
+inmutables y se consultan sin ir a la base de datos.
+
+Invalidación:
+
+- Al confirmar una transacción que crea, modifica o elimina filas de los
+  modelos de un catálogo por el ORM, el índice local se descarta y se
+  publica un aviso en el canal del catálogo en Redis.
+- Cada proceso de uvicorn escucha esos avisos con la suscripción de
+  app.core.eventos y descarta su índice.
+- Como respaldo (cambios por SQL directo, procesos sin suscripción como los
+  workers de Celery, avisos perdidos durante una reconexión) el índice se
+  recarga cuando supera su TTL.
+"""
+import asyncio
+import time
+from typing import Generic, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.eventos import PREFIJO_CANAL, distribuidor_eventos, publicar_evento
+from app.core.logging_config import get_logger
+from app.core.metricas import registrar_cache
+
+logger = get_logger(__name__)
+
+
+EVENTO_INVALIDAR = "invalidar"
+
+_CLAVE_MODIFICADOS = "catalogos_modificados"
+
+Indice = TypeVar("Indice")
+
+
+def canal_catalogo(nombre: str) -> str:
+    """Canal de invalidación de un catálogo"""
+    return f"{PREFIJO_CANAL}catalogo:{nombre}"
+
+
+class CatalogoEnMemoria(Generic[Indice]):
+    """
+    Índice de datos de referencia del proceso con invalidación
+
+    Las subclases definen `nombre`, `modelos` y `construir()`. El índice se
+    reemplaza completo en cada carga, nunca se modifica, por lo que las
+    lecturas no necesitan bloqueos. Una invalidación que llega mientras se
+    carga hace que el resultado de esa carga no se conserve.
+    """
+
+    nombre: str = ""
+    modelos: Tuple[type, ...] = ()
+
+    def __init__(self, ttl_segundos: float = 3600):
+        self.ttl_segundos = ttl_segundos
+        self.cargas = 0
+        self._indice: Optional[Indice] = None
+        self._cargado_en = 0.0
+        self._generacion = 0
+        self._tarea: Optional[asyncio.Task] = None
+
+    @property
+    def canal(self) -> str:
+        return canal_catalogo(self.nombre)
+
+    @property
+    def vigente(self) -> bool:
+        """Indica si el índice cargado puede usarse sin recargar"""
+        return (
+            self._indice is not None
+            and time.monotonic() - self._cargado_en < self.ttl_segundos
+        )
+
+    async def construir(self, db: AsyncSession) -> Indice:
+        """Consultar las tablas y construir un índice nuevo"""
+        raise NotImplementedError
+
+    def invalidar(self) -> None:
+        """Descartar el índice; la próxima consulta lo recarga"""
+        self._generacion += 1
+        self._indice = None
+
+    async def cargar(self, db: AsyncSession) -> Indice:
+        """
+        Construir el índice y reemplazar el actual
+
+        Args:
+            db: Sesión con la que consultar las tablas
+
+        Returns:
+            Índice recién cargado
+        """
+        generacion = self._generacion
+        indice = await self.construir(db)
+        self.cargas += 1
+
+        if generacion == self._generacion:
+            self._indice = indice
+            self._cargado_en = time.monotonic()
+        return indice
+
+    async def obtener(self, db: AsyncSession) -> Indice:
+        """
+        Índice actual, recargándolo si fue invalidado o venció su TTL
+
+        Args:
+            db: Sesión para recargar el índice si hace falta
+
+        Returns:
+            Índice del catálogo
+        """
+        vigente = self.vigente
+        registrar_cache(f"catalogo:{self.nombre}", acierto=vigente)
+        return self._indice if vigente else await self.cargar(db)
+
+    async def _escuchar(self) -> None:
+        cola = await distribuidor_eventos.suscribir([self.canal])
+        try:
+            while True:
+                await cola.get()
+                self.invalidar()
+        finally:
+            distribuidor_eventos.desuscribir(cola, [self.canal])
+
+    async def iniciar(self) -> None:
+        """
+        Cargar el índice y escuchar las invalidaciones de otros procesos
+
+        Si la base de datos no responde, el índice se cargará en la
+        primera consulta.
+        """
+        from app.core.database import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.cargar(db)
+            logger.info("Catálogo %s cargado", self.nombre)
+        except Exception as e:
+            logger.warning("No se pudo cargar el catálogo %s al iniciar: %s", self.nombre, e)
+
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.create_task(self._escuchar())
+
+    async def detener(self) -> None:
+        """Dejar de escuchar invalidaciones (apagado de la aplicación y tests)"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._tarea = None
+
+
+# Catálogos del proceso que se invalidan con los eventos de sesión
+_catalogos: List[CatalogoEnMemoria] = []
+
+
+def registrar_catalogo(catalogo: CatalogoEnMemoria) -> CatalogoEnMemoria:
+    """Registrar la instancia del proceso de un catálogo"""
+    _catalogos.append(catalogo)
+    return catalogo
+
+
+async def iniciar_catalogos() -> None:
+    """Cargar todos los catálogos registrados (inicio de la aplicación)"""
+    for catalogo in _catalogos:
+        await catalogo.iniciar()
+
+
+async def detener_catalogos() -> None:
+    """Detener la escucha de invalidaciones de todos los catálogos"""
+    for catalogo in _catalogos:
+        await catalogo.detener()
+
+
+def invalidar_catalogos() -> None:
+    """Descartar el índice de todos los catálogos (tests y scripts)"""
+    for catalogo in _catalogos:
+        catalogo.invalidar()
+
+
+async def notificar_cambio(catalogo: CatalogoEnMemoria) -> None:
+    """
+    Invalidar un catálogo en este y en los demás procesos
+
+    Para los cambios que no pasan por el ORM (UPDATE masivos), que los
+    eventos de sesión no detectan. Debe llamarse tras confirmar la
+    transacción.
+
+    Args:
+        catalogo: Catálogo afectado
+    """
+    catalogo.invalidar()
+    await publicar_evento(catalogo.canal, EVENTO_INVALIDAR, {})
+
+
+# ---------------------------------------------------------------------------
+# Eventos de sesión
+# ---------------------------------------------------------------------------
+
+# Tareas de publicación en curso (evita que el recolector las descarte)
+_publicaciones: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_flush")
+def _despues_de_flush(session: Session, flush_context) -> None:
+    instancias = (*session.new, *session.dirty, *session.deleted)
+    for catalogo in _catalogos:
+        if any(isinstance(instancia, catalogo.modelos) for instancia in instancias):
+            session.info.setdefault(_CLAVE_MODIFICADOS, set()).add(id(catalogo))
+
+
+@event.listens_for(Session, "after_commit")
+def _despues_de_commit(session: Session) -> None:
+    modificados = session.info.pop(_CLAVE_MODIFICADOS, None)
+    if not modificados:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sin event loop (scripts síncronos): los demás procesos recargan por TTL
+        loop = None
+
+    for catalogo in _catalogos:
+        if id(catalogo) not in modificados:
+            continue
+        catalogo.invalidar()
+        if loop is not None:
+            tarea = loop.create_task(publicar_evento(catalogo.canal, EVENTO_INVALIDAR, {}))
+            _publicaciones.add(tarea)
+            tarea.add_done_callback(_publicaciones.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _despues_de_rollback(session: Session) -> None:
+    session.info.pop(_CLAVE_MODIFICADOS, None)
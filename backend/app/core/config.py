@@ -13,6 +13,12 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     ENVIRONMENT: str = "development"
     
+    # Logging: nivel del logger raíz, niveles por logger ("nombre=NIVEL,...")
+    # y registros en espera de escribirse antes de descartar
+    LOG_NIVEL: str = "INFO"
+    LOG_NIVELES: str = "uvicorn=WARNING,sqlalchemy=WARNING"
+    LOG_COLA_MAX: int = 10000
+    
     # Base de datos
     DATABASE_URL: str
     
@@ -56,6 +62,72 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    CELERY_RESULT_EXPIRES: int = 86400  # 24 horas
+    CELERY_TASK_ALWAYS_EAGER: bool = False
+    CELERY_METRICAS_PUERTO: int = 9808  # 0 desactiva el servidor de métricas del worker
+    
+    # Barrido de vencimientos
+    VENCIMIENTOS_TAMANO_LOTE: int = 1000
+    
+    # Notificaciones de vencimiento
+    NOTIFICACIONES_VENTANAS_DIAS: str = "30,15,7"
+    NOTIFICACIONES_TAMANO_LOTE: int = 500
+    
+    # Eventos en tiempo real (SSE)
+    EVENTOS_LATIDO_SEGUNDOS: int = 15
+    EVENTOS_REINTENTO_MS: int = 5000
+    
+    # Auditoría
+    AUDITORIA_TABLAS_SENSIBLES: str = "usuarios,permisos_usuario,pagos,habilitaciones"
+    AUDITORIA_TABLAS_EXCLUIDAS: str = "notificaciones"
+    AUDITORIA_TAMANO_LOTE: int = 500
+    AUDITORIA_INTERVALO_SEGUNDOS: float = 1.0
+    AUDITORIA_MAX_PENDIENTES: int = 10000
+    AUDITORIA_PARTICIONES_FUTURAS: int = 3
+    AUDITORIA_RETENCION_MESES: int = 24
+    AUDITORIA_ESQUEMA_ARCHIVO: str = "auditoria_archivo"
+    
+    # Reportes de pagos
+    PAGOS_ESTADISTICAS_CACHE_SEGUNDOS: int = 86400
+    PAGOS_EXPORTACION_TAMANO_LOTE: int = 1000
+    
+    # Catálogos en memoria
+    CATALOGO_TUPA_TTL_SEGUNDOS: int = 3600
+    CATALOGO_TIPOS_TTL_SEGUNDOS: int = 3600
+    CATALOGO_MATRIZ_LICENCIAS_TTL_SEGUNDOS: int = 300
+    CATALOGO_EMPRESAS_TTL_SEGUNDOS: int = 300
+    
+    # Importación masiva de conductores
+    CONDUCTORES_IMPORTACION_TAMANO_LOTE: int = 1000
+    CONDUCTORES_IMPORTACION_MAX_FILAS: int = 20000
+    
+    # Ficha del conductor: infracciones recientes incluidas
+    CONDUCTORES_FICHA_INFRACCIONES: int = 10
+    
+    # Habilitaciones e infracciones cargadas con un conductor (consulta por DNI)
+    CONDUCTORES_HISTORIAL_RECIENTE: int = 10
+    
+    # Desglose de tiempos por petición (Server-Timing y log): fracción de
+    # peticiones medidas fuera de desarrollo, donde se miden todas
+    TIEMPOS_MUESTREO: float = 0.05
+    
+    # Registro de consultas lentas y sus planes (por proceso)
+    CONSULTAS_LENTAS_UMBRAL_MS: float = 200
+    CONSULTAS_LENTAS_MAX_HUELLAS: int = 500
+    CONSULTAS_LENTAS_PLANES: int = 100
+    CONSULTAS_LENTAS_ANALYZE: bool = False
+    
+    # Monitor del event loop: intervalo de medición, retraso que cuenta como
+    # bloqueo y captura de la pila bloqueante (siempre activa en desarrollo)
+    MONITOR_LOOP_INTERVALO_MS: float = 100
+    MONITOR_LOOP_UMBRAL_MS: float = 100
+    MONITOR_LOOP_PILAS: bool = False
+    
+    # Perfilador por petición (token de SUPERUSUARIO en la cabecera X-Perfil)
+    PERFILADOR_INTERVALO_MS: float = 2
+    PERFILADOR_TOKEN_MINUTOS: int = 10
+    PERFILADOR_DIRECTORIO: str = "perfiles"
+    PERFILADOR_MAX_ARCHIVOS: int = 50
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -72,6 +144,11 @@ class Settings(BaseSettings):
     def allowed_extensions_list(self) -> List[str]:
         """Retorna lista de extensiones permitidas"""
         return [ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(",")]
+    
+    @property
+    def notificaciones_ventanas_list(self) -> List[int]:
+        """Retorna las ventanas de aviso en días, de menor a mayor"""
+        return sorted(int(dias) for dias in self.NOTIFICACIONES_VENTANAS_DIAS.split(","))
 
 
 # Instancia global de configuración
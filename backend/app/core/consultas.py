@@ -0,0 +1,153 @@
+"""
+Conteo de consultas SQL y cargas diferidas por petición
+
+Dos listeners globales de SQLAlchemy alimentan el contador de la petición
+actual, guardado en un ContextVar como el contexto de auditoría:
+
+- before_cursor_execute (Engine): cada sentencia enviada a la base de datos.
+- do_orm_execute (Session): cada carga diferida (lazy load) de una relación,
+  con el atributo que la provocó. Bajo AsyncSession una carga diferida
+  falla con MissingGreenlet, pero se registra antes de fallar.
+
+ConsultasMiddleware abre el contador de cada petición. Los endpoints pueden
+declarar un presupuesto con @presupuesto_consultas; si una petición lo
+supera se registra una advertencia y, durante los tests, el plugin
+tests/presupuesto_consultas.py hace fallar el test.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+@dataclass
+class ContadorConsultas:
+    """Sentencias SQL y cargas diferidas de una petición"""
+
+    sentencias: int = 0
+    # "Clase.atributo" de cada carga diferida, en orden
+    cargas_diferidas: List[str] = field(default_factory=list)
+
+
+class Presupuesto(NamedTuple):
+    """Máximo de sentencias y de cargas diferidas de un endpoint"""
+
+    sentencias: int
+    cargas_diferidas: int = 0
+
+
+class Exceso(NamedTuple):
+    """Petición que superó el presupuesto de su endpoint"""
+
+    ruta: str
+    presupuesto: Presupuesto
+    sentencias: int
+    cargas_diferidas: List[str]
+
+
+_contador: ContextVar[Optional[ContadorConsultas]] = ContextVar("contador_consultas", default=None)
+
+# Lista donde se registran los excesos mientras vigilar_presupuestos() está activo
+_excesos: Optional[List[Exceso]] = None
+
+
+@contextmanager
+def contar_consultas() -> Iterator[ContadorConsultas]:
+    """
+    Contar las sentencias y cargas diferidas ejecutadas dentro del bloque
+
+    Los contadores anidados no se suman al exterior: cada bloque cuenta
+    solo lo suyo.
+    """
+    contador = ContadorConsultas()
+    token = _contador.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador.reset(token)
+
+
+def contador_actual() -> Optional[ContadorConsultas]:
+    """Contador de la petición actual, o None fuera de una petición"""
+    return _contador.get()
+
+
+def presupuesto_consultas(sentencias: int, cargas_diferidas: int = 0) -> Callable:
+    """
+    Declarar el presupuesto de consultas de un endpoint
+
+    Va debajo de @require_roles, que copia el atributo al envolver la
+    función.
+
+    Args:
+        sentencias: Máximo de sentencias SQL por petición, incluidas las
+            del usuario autenticado y la construcción de catálogos en frío
+        cargas_diferidas: Máximo de cargas diferidas de relaciones
+
+    Example:
+        @router.get("/{conductor_id}")
+        @require_roles(RolUsuario.DIRECTOR)
+        @presupuesto_consultas(4)
+        async def obtener_conductor(...):
+            ...
+    """
+    def decorador(funcion: Callable) -> Callable:
+        funcion.presupuesto_consultas = Presupuesto(sentencias, cargas_diferidas)
+        return funcion
+
+    return decorador
+
+
+def verificar_presupuesto(ruta: str, endpoint: Optional[Callable], contador: ContadorConsultas) -> Optional[Exceso]:
+    """
+    Comparar el contador de una petición con el presupuesto de su endpoint
+
+    Returns:
+        El exceso, o None si el endpoint no declara presupuesto o lo cumple
+    """
+    presupuesto: Optional[Presupuesto] = getattr(endpoint, "presupuesto_consultas", None)
+    if presupuesto is None:
+        return None
+    if (
+        contador.sentencias <= presupuesto.sentencias
+        and len(contador.cargas_diferidas) <= presupuesto.cargas_diferidas
+    ):
+        return None
+
+    exceso = Exceso(ruta, presupuesto, contador.sentencias, list(contador.cargas_diferidas))
+    if _excesos is not None:
+        _excesos.append(exceso)
+    return exceso
+
+
+@contextmanager
+def vigilar_presupuestos() -> Iterator[List[Exceso]]:
+    """Registrar los excesos de presupuesto ocurridos dentro del bloque"""
+    global _excesos
+    anterior = _excesos
+    _excesos = []
+    try:
+        yield _excesos
+    finally:
+        _excesos = anterior
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _contar_sentencia(conn, cursor, sentencia, parametros, contexto, executemany) -> None:
+    contador = _contador.get()
+    if contador is not None:
+        contador.sentencias += 1
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _contar_carga_diferida(estado: ORMExecuteState) -> None:
+    contador = _contador.get()
+    if contador is None or not estado.is_select or estado.lazy_loaded_from is None:
+        return
+    ruta = estado.loader_strategy_path
+    atributo = ruta[-1].key if ruta and hasattr(ruta[-1], "key") else "?"
+    contador.cargas_diferidas.append(f"{estado.lazy_loaded_from.class_.__name__}.{atributo}")
@@ -0,0 +1,251 @@
+"""
+Registro de consultas lentas con su plan de ejecución
+
+Un listener del Engine mide cada sentencia. Las que superan
+CONSULTAS_LENTAS_UMBRAL_MS se normalizan (parámetros y literales como ?,
+listas IN colapsadas) y se agrupan por huella, el hash del texto
+normalizado, acumulando ejecuciones y tiempo.
+
+La primera vez que aparece una huella, y mientras su plan no esté en el
+buffer, se captura EXPLAIN (FORMAT JSON) en una tarea aparte, con otra
+conexión y fuera de la transacción de la petición. Los planes se guardan en
+un buffer circular de CONSULTAS_LENTAS_PLANES entradas. Con
+CONSULTAS_LENTAS_ANALYZE las SELECT se explican con ANALYZE: se ejecutan
+otra vez, dentro de una transacción que se descarta.
+
+Los datos son del proceso: con varios workers, cada uno tiene los suyos.
+GET /api/v1/diagnostico/consultas-lentas los muestra.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Opción de ejecución que excluye una sentencia del registro (los EXPLAIN)
+OPCION_SIN_REGISTRO = "sin_registro_lentas"
+
+_NORMALIZACIONES: Tuple[Tuple["re.Pattern[str]", str], ...] = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+|%\(\w+\)s|%s"), "?"),
+    (re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\s+"), " "),
+)
+
+_EXPLICABLES = ("select", "with", "insert", "update", "delete")
+
+
+def normalizar(sentencia: str) -> str:
+    """
+    Texto de una sentencia sin valores concretos
+
+    Args:
+        sentencia: SQL tal como se envió al driver
+
+    Returns:
+        Sentencia con parámetros y literales como ? y las listas IN de
+        cualquier longitud como (?)
+    """
+    for patron, reemplazo in _NORMALIZACIONES:
+        sentencia = patron.sub(reemplazo, sentencia)
+    return sentencia.strip()
+
+
+def huella(normalizada: str) -> str:
+    """Identificador corto de una sentencia normalizada"""
+    return hashlib.sha1(normalizada.encode()).hexdigest()[:16]
+
+
+@dataclass
+class ConsultaLenta:
+    """Ejecuciones lentas acumuladas de una huella"""
+
+    huella: str
+    sentencia: str
+    ejecuciones: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    ultima_vez: Optional[datetime] = None
+
+    @property
+    def promedio_ms(self) -> float:
+        return self.total_ms / self.ejecuciones if self.ejecuciones else 0.0
+
+
+@dataclass(frozen=True)
+class PlanCapturado:
+    """Plan de ejecución de una huella"""
+
+    huella: str
+    plan: Any
+    analyze: bool
+    capturado_en: datetime
+
+
+class RegistroConsultasLentas:
+    """
+    Consultas lentas del proceso por huella y sus planes
+
+    Args:
+        umbral_ms: Duración a partir de la cual una sentencia es lenta
+        max_huellas: Huellas conservadas; al superarlo se descarta la de
+            menor tiempo total
+        max_planes: Tamaño del buffer circular de planes
+        analyze: Explicar las SELECT con ANALYZE
+    """
+
+    def __init__(self, umbral_ms: float, max_huellas: int, max_planes: int, analyze: bool = False):
+        self.umbral_ms = umbral_ms
+        self.max_huellas = max_huellas
+        self.analyze = analyze
+        self._consultas: Dict[str, ConsultaLenta] = {}
+        self._planes: Deque[PlanCapturado] = deque(maxlen=max_planes)
+        self._capturando: Set[str] = set()
+        self._tareas: Set[asyncio.Task] = set()
+
+    def registrar(
+        self,
+        engine: Engine,
+        sentencia: str,
+        parametros: Any,
+        duracion_ms: float,
+        executemany: bool
+    ) -> None:
+        """
+        Acumular una sentencia lenta y capturar su plan si no lo tiene
+
+        Args:
+            engine: Engine que la ejecutó, para el EXPLAIN
+            sentencia: SQL tal como se envió al driver
+            parametros: Parámetros del driver
+            duracion_ms: Duración de la ejecución
+            executemany: Si fue una ejecución por lotes (no se explica)
+        """
+        normalizada = normalizar(sentencia)
+        clave = huella(normalizada)
+
+        consulta = self._consultas.get(clave)
+        if consulta is None:
+            if len(self._consultas) >= self.max_huellas:
+                menor = min(self._consultas.values(), key=lambda c: c.total_ms)
+                del self._consultas[menor.huella]
+            consulta = self._consultas[clave] = ConsultaLenta(clave, normalizada)
+            logger.warning("Consulta lenta %s (%.1f ms): %s", clave, duracion_ms, normalizada)
+
+        consulta.ejecuciones += 1
+        consulta.total_ms += duracion_ms
+        consulta.max_ms = max(consulta.max_ms, duracion_ms)
+        consulta.ultima_vez = datetime.utcnow()
+
+        if (
+            executemany
+            or clave in self._capturando
+            or self.plan(clave) is not None
+            or not normalizada.lower().startswith(_EXPLICABLES)
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Engine síncrono (migraciones, scripts): sin captura de planes
+            return
+
+        self._capturando.add(clave)
+        tarea = loop.create_task(self._capturar_plan(engine, clave, sentencia, parametros))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    def plan(self, clave: str) -> Optional[PlanCapturado]:
+        """Plan de una huella si sigue en el buffer"""
+        for plan in reversed(self._planes):
+            if plan.huella == clave:
+                return plan
+        return None
+
+    def top(self, limite: int) -> List[Tuple[ConsultaLenta, Optional[PlanCapturado]]]:
+        """
+        Huellas con más tiempo total acumulado
+
+        Args:
+            limite: Número de huellas
+
+        Returns:
+            Pares (consulta, plan) de mayor a menor tiempo total
+        """
+        consultas = sorted(self._consultas.values(), key=lambda c: c.total_ms, reverse=True)[:limite]
+        return [(consulta, self.plan(consulta.huella)) for consulta in consultas]
+
+    def limpiar(self) -> None:
+        """Descartar las huellas y los planes acumulados"""
+        self._consultas.clear()
+        self._planes.clear()
+
+    async def esperar_capturas(self) -> None:
+        """Esperar a que terminen los EXPLAIN en curso"""
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+
+    async def _capturar_plan(self, engine: Engine, clave: str, sentencia: str, parametros: Any) -> None:
+        try:
+            async with AsyncEngine(engine).connect() as conn:
+                conn = await conn.execution_options(**{OPCION_SIN_REGISTRO: True})
+                plan, analyze = await self._explicar(conn, sentencia, parametros)
+        except Exception as e:
+            logger.warning("No se pudo capturar el plan de la consulta %s: %s", clave, e)
+        else:
+            self._planes.append(PlanCapturado(clave, plan, analyze, datetime.utcnow()))
+        finally:
+            self._capturando.discard(clave)
+
+    async def _explicar(self, conn: AsyncConnection, sentencia: str, parametros: Any) -> Tuple[Any, bool]:
+        if conn.dialect.name != "postgresql":
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sentencia}", parametros)
+            return [dict(fila._mapping) for fila in result], False
+
+        analyze = self.analyze and normalizar(sentencia).lower().startswith(("select", "with"))
+        opciones = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        transaccion = await conn.begin()
+        try:
+            result = await conn.exec_driver_sql(f"EXPLAIN ({opciones}) {sentencia}", parametros)
+            plan = result.scalar()
+        finally:
+            await transaccion.rollback()
+        return (json.loads(plan) if isinstance(plan, str) else plan), analyze
+
+
+consultas_lentas = RegistroConsultasLentas(
+    umbral_ms=settings.CONSULTAS_LENTAS_UMBRAL_MS,
+    max_huellas=settings.CONSULTAS_LENTAS_MAX_HUELLAS,
+    max_planes=settings.CONSULTAS_LENTAS_PLANES,
+    analyze=settings.CONSULTAS_LENTAS_ANALYZE
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _iniciar_sentencia(conn, cursor, sentencia, parametros, contexto, executemany) -> None:
+    conn.info["lentas_inicio"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _terminar_sentencia(conn, cursor, sentencia, parametros, contexto, executemany) -> None:
+    inicio = conn.info.pop("lentas_inicio", None)
+    if inicio is None:
+        return
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    if duracion_ms >= consultas_lentas.umbral_ms and not conn.get_execution_options().get(OPCION_SIN_REGISTRO):
+        consultas_lentas.registrar(conn.engine, sentencia, parametros, duracion_ms, executemany)
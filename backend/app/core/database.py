@@ -6,10 +6,12 @@ from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator
 
 from app.core.config import settings
+from app.core.metricas import PoolMedido
 
-# Crear engine asíncrono
+# Crear engine asíncrono (el pool publica sus métricas en /metrics)
 engine = create_async_engine(
     settings.DATABASE_URL,
+    poolclass=PoolMedido,
     echo=settings.ENVIRONMENT == "development",
     future=True,
     pool_pre_ping=True,
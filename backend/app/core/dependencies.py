@@ -5,45 +5,66 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from uuid import UUID
+from app.core.auditoria import establecer_usuario
+from app.core.catalogo_empresas import catalogo_empresas
 from app.core.database import get_db
 from app.core.security import verify_token
-from app.models.user import Usuario
+from app.models.user import Usuario, RolUsuario
 
 
 # Esquema de seguridad HTTP Bearer
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> Usuario:
+async def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
     """
-    Obtiene el usuario actual desde el token JWT
-    Valida el token, verifica que el usuario exista y esté activo
+    Valida el token de acceso y devuelve sus claims
+    
+    FastAPI resuelve la dependencia una vez por petición, así que el token
+    se verifica una sola vez aunque varias dependencias lean sus claims.
     
     Args:
         credentials: Credenciales HTTP Bearer
-        db: Sesión de base de datos
         
     Returns:
-        Usuario autenticado
+        Claims del token (sub, email, rol y empresa_id de los gerentes)
         
     Raises:
-        HTTPException: Si el token es inválido o el usuario no existe/inactivo
+        HTTPException: Si el token es inválido o expiró
     """
-    token = credentials.credentials
-    
-    # Verificar el token
-    payload = verify_token(token, token_type="access")
+    payload = verify_token(credentials.credentials, token_type="access")
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido o expirado",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+
+async def get_current_user(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+) -> Usuario:
+    """
+    Obtiene el usuario actual desde el token JWT
+    Valida el token, verifica que el usuario exista y esté activo
     
+    Args:
+        payload: Claims del token de acceso
+        db: Sesión de base de datos
+        
+    Returns:
+        Usuario autenticado
+        
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe/inactivo
+    """
     # Obtener el ID del usuario del payload
     user_id = payload.get("sub")
     if user_id is None:
@@ -54,7 +75,6 @@ async def get_current_user(
         )
     
     # Buscar el usuario en la base de datos
-    from uuid import UUID
     try:
         user_uuid = UUID(user_id)
     except (ValueError, AttributeError):
@@ -83,6 +103,9 @@ async def get_current_user(
             detail="Usuario inactivo. Contacte al administrador.",
         )
     
+    # Los cambios de esta petición se auditan a nombre del usuario
+    establecer_usuario(user.id)
+    
     return user
 
 
@@ -128,64 +151,124 @@ def get_optional_current_user(
         return None
     
     try:
-        return get_current_user(credentials, db)
+        return get_current_user(verify_token(credentials.credentials, token_type="access") or {}, db)
     except HTTPException:
         return None
 
 
 
-async def get_empresa_gerente(
+@dataclass(frozen=True)
+class AlcanceEmpresa:
+    """
+    Empresas a las que puede acceder el usuario de la petición
+    
+    empresa_id es la empresa del gerente, o None para los roles que ven
+    todas las empresas.
+    """
+    usuario: Usuario
+    empresa_id: Optional[UUID] = None
+    
+    @property
+    def restringido(self) -> bool:
+        return self.empresa_id is not None
+    
+    def permite(self, empresa_id: Optional[UUID]) -> bool:
+        """Indica si el usuario puede acceder a datos de la empresa"""
+        return self.empresa_id is None or self.empresa_id == empresa_id
+
+
+async def get_alcance_empresa(
+    payload: Dict[str, Any] = Depends(get_token_payload),
     current_user: Usuario = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-):
+) -> AlcanceEmpresa:
     """
-    Obtiene la empresa del gerente actual
-    Solo funciona si el usuario es gerente y tiene empresa asignada
+    Obtiene el alcance de empresa de la petición sin consultar la empresa
+    
+    Para los gerentes se confía en el claim empresa_id del token firmado en
+    el login. El claim se contrasta con el usuario ya cargado por
+    get_current_user: si un administrador cambió la empresa asignada, el
+    token deja de servir. Los tokens sin claim usan la empresa de la que el
+    usuario es gerente. Que la empresa exista y esté activa se resuelve con
+    catalogo_empresas, en memoria.
     
     Args:
+        payload: Claims del token de acceso
         current_user: Usuario actual
-        db: Sesión de base de datos
+        db: Sesión para recargar el catálogo si fue invalidado
         
     Returns:
-        Empresa del gerente
+        Alcance de empresa del usuario
         
     Raises:
-        HTTPException: Si el usuario no es gerente o no tiene empresa asignada
+        HTTPException: Si la asignación cambió o la empresa no está disponible
     """
-    from app.models.user import RolUsuario
-    from app.models.empresa import Empresa
-    
     if current_user.rol != RolUsuario.GERENTE:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los gerentes pueden acceder a esta funcionalidad"
-        )
+        return AlcanceEmpresa(usuario=current_user)
+    
+    estado = await catalogo_empresas.obtener(db)
     
-    if not current_user.empresa_id:
+    claim = payload.get("empresa_id")
+    if claim is not None:
+        if str(current_user.empresa_id) != claim:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="La empresa asignada cambió. Inicie sesión nuevamente.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        empresa_id = current_user.empresa_id
+    else:
+        empresa_id = estado.empresa_de_gerente(current_user.id) or current_user.empresa_id
+    
+    if empresa_id is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El gerente no tiene una empresa asignada"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Gerente no tiene empresa asignada"
         )
     
-    # Obtener la empresa con sus relaciones
-    result = await db.execute(
-        select(Empresa).where(Empresa.id == current_user.empresa_id)
-    )
-    empresa = result.scalar_one_or_none()
-    
-    if not empresa:
+    if not estado.existe(empresa_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Empresa no encontrada"
         )
     
-    if not empresa.activo:
+    if not estado.activa(empresa_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="La empresa está inactiva"
         )
     
-    return empresa
+    return AlcanceEmpresa(usuario=current_user, empresa_id=empresa_id)
+
+
+async def get_empresa_gerente(
+    alcance: AlcanceEmpresa = Depends(get_alcance_empresa),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtiene la empresa del gerente actual
+    Solo funciona si el usuario es gerente y tiene empresa asignada
+    
+    Args:
+        alcance: Alcance de empresa del usuario actual
+        db: Sesión de base de datos
+        
+    Returns:
+        Empresa del gerente
+        
+    Raises:
+        HTTPException: Si el usuario no es gerente o no tiene empresa asignada
+    """
+    from app.models.empresa import Empresa
+    
+    if alcance.usuario.rol != RolUsuario.GERENTE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los gerentes pueden acceder a esta funcionalidad"
+        )
+    
+    # La existencia y el estado activo ya se verificaron con el catálogo
+    return await db.get(Empresa, alcance.empresa_id)
 
 
 def require_admin_or_gerente_own_empresa(empresa_id: str):
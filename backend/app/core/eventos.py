@@ -0,0 +1,225 @@
+"""
+Eventos en tiempo real sobre Redis pub/sub
+
+Los servicios publican eventos en Redis y cada proceso de uvicorn mantiene
+una única suscripción que reparte los mensajes entre sus conexiones SSE
+locales. Así los eventos llegan a los operadores conectados a cualquier
+worker sin consultar la base de datos.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from redis import asyncio as redis_asyncio
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+PREFIJO_CANAL = "eventos:"
+CANAL_HABILITACIONES = f"{PREFIJO_CANAL}habilitaciones"
+
+EVENTO_HABILITACION = "habilitacion"
+EVENTO_NOTIFICACION = "notificacion"
+
+
+def canal_usuario(usuario_id: UUID) -> str:
+    """Canal privado de un usuario"""
+    return f"{PREFIJO_CANAL}usuario:{usuario_id}"
+
+
+_cliente: Optional[redis_asyncio.Redis] = None
+_cliente_loop: Optional[asyncio.AbstractEventLoop] = None
+_cliente_configurado: Optional[redis_asyncio.Redis] = None
+
+
+def get_redis() -> redis_asyncio.Redis:
+    """
+    Obtiene el cliente Redis del event loop actual
+
+    Las conexiones de redis.asyncio quedan ligadas al loop que las creó;
+    las tareas Celery usan un loop por ejecución, por lo que el cliente se
+    recrea cuando cambia el loop.
+    """
+    global _cliente, _cliente_loop
+
+    if _cliente_configurado is not None:
+        return _cliente_configurado
+
+    loop = asyncio.get_running_loop()
+    if _cliente is None or _cliente_loop is not loop:
+        _cliente = redis_asyncio.from_url(settings.REDIS_URL)
+        _cliente_loop = loop
+    return _cliente
+
+
+def configurar_redis(cliente: Optional[redis_asyncio.Redis]) -> None:
+    """
+    Reemplaza el cliente Redis (usado en tests)
+
+    Args:
+        cliente: Cliente a usar o None para volver al de REDIS_URL
+    """
+    global _cliente_configurado
+    _cliente_configurado = cliente
+
+
+def _serializar(evento: str, datos: Dict[str, Any]) -> str:
+    return json.dumps({"evento": evento, "datos": datos}, default=str)
+
+
+async def publicar_evento(canal: str, evento: str, datos: Dict[str, Any]) -> None:
+    """
+    Publicar un evento
+
+    La publicación es de mejor esfuerzo: si Redis no está disponible se
+    registra una advertencia y la operación de negocio continúa.
+
+    Args:
+        canal: Canal de destino
+        evento: Nombre del evento SSE
+        datos: Contenido del evento (serializable a JSON)
+    """
+    await publicar_eventos([(canal, evento, datos)])
+
+
+async def publicar_eventos(eventos: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+    """
+    Publicar varios eventos en un único viaje a Redis
+
+    Args:
+        eventos: Tuplas (canal, evento, datos)
+    """
+    eventos = list(eventos)
+    if not eventos:
+        return
+
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for canal, evento, datos in eventos:
+                pipe.publish(canal, _serializar(evento, datos))
+            await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.warning("No se pudieron publicar %d eventos: %s", len(eventos), e)
+
+
+class DistribuidorEventos:
+    """
+    Reparte los mensajes de Redis entre las conexiones locales
+
+    Mantiene una sola suscripción por patrón (`eventos:*`) por proceso y una
+    cola acotada por conexión. Si un cliente no consume a tiempo, los
+    eventos que no caben en su cola se descartan.
+    """
+
+    def __init__(self, tamano_cola: int = 100):
+        self.tamano_cola = tamano_cola
+        self._suscriptores: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._tarea: Optional[asyncio.Task] = None
+        self._listo: Optional[asyncio.Event] = None
+        self.descartados = 0
+
+    @property
+    def conexiones(self) -> int:
+        """Número de conexiones locales suscritas"""
+        return len({id(cola) for colas in self._suscriptores.values() for cola in colas})
+
+    async def suscribir(self, canales: List[str]) -> asyncio.Queue:
+        """
+        Registrar una conexión en los canales indicados
+
+        Args:
+            canales: Canales a escuchar
+
+        Returns:
+            Cola de la que leer los eventos ({"evento", "datos"})
+        """
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self.tamano_cola)
+        for canal in canales:
+            self._suscriptores[canal].add(cola)
+
+        if self._tarea is None or self._tarea.done():
+            self._listo = asyncio.Event()
+            self._tarea = asyncio.create_task(self._escuchar())
+        await self._listo.wait()
+        return cola
+
+    def desuscribir(self, cola: asyncio.Queue, canales: List[str]) -> None:
+        """
+        Retirar una conexión de sus canales
+
+        Args:
+            cola: Cola retornada por suscribir()
+            canales: Canales en los que se registró
+        """
+        for canal in canales:
+            colas = self._suscriptores.get(canal)
+            if colas is None:
+                continue
+            colas.discard(cola)
+            if not colas:
+                del self._suscriptores[canal]
+
+    def _repartir(self, canal: str, datos: bytes) -> None:
+        colas = self._suscriptores.get(canal)
+        if not colas:
+            return
+
+        try:
+            mensaje = json.loads(datos)
+        except ValueError:
+            logger.warning("Evento con formato inválido en %s", canal)
+            return
+
+        for cola in list(colas):
+            try:
+                cola.put_nowait(mensaje)
+            except asyncio.QueueFull:
+                self.descartados += 1
+
+    async def _escuchar(self) -> None:
+        """Bucle de suscripción; se reconecta si Redis se cae"""
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{PREFIJO_CANAL}*")
+                self._listo.set()
+                async for mensaje in pubsub.listen():
+                    if mensaje["type"] != "pmessage":
+                        continue
+                    canal = mensaje["channel"]
+                    if isinstance(canal, bytes):
+                        canal = canal.decode()
+                    self._repartir(canal, mensaje["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.warning("Suscripción de eventos interrumpida: %s", e)
+                # Las conexiones esperan en sus colas mientras se reconecta
+                self._listo.set()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+
+    async def cerrar(self) -> None:
+        """Detener la suscripción (apagado de la aplicación y tests)"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._tarea = None
+        self._suscriptores.clear()
+
+
+# Instancia por proceso
+distribuidor_eventos = DistribuidorEventos()
@@ -1,58 +1,217 @@
 """
 Configuración de logging
+
+Los loggers no escriben en archivos ni en la consola desde el hilo que
+registra: el logger raíz tiene un solo ColaLogHandler que deja cada
+registro en una cola acotada, y un QueueListener en su propio hilo lo pasa
+a los handlers de salida (archivo con rotación, consola y archivo de
+errores). Así el event loop no espera escrituras ni rotaciones.
+
+Si la cola se llena (el disco no da abasto) los registros nuevos se
+descartan en lugar de bloquear; se cuentan por nivel en
+log_records_dropped_total y, cuando vuelve a haber espacio, se registra
+una advertencia con la cantidad descartada.
 """
+import atexit
+import copy
 import logging
+import queue
 import sys
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from pythonjsonlogger import jsonlogger
+from typing import Dict, List, Optional
+
+from pythonjsonlogger.json import JsonFormatter
+
+from app.core.config import settings
+from app.core.metricas import LOG_DESCARTADOS
+
+
+class ColaLogHandler(QueueHandler):
+    """
+    QueueHandler con cola acotada que descarta en lugar de bloquear
+
+    Args:
+        cola: Cola acotada que consume el QueueListener
+    """
+
+    def __init__(self, cola: "queue.Queue[logging.LogRecord]"):
+        super().__init__(cola)
+        self.descartados: Counter = Counter()
+        self._pendientes_de_avisar = 0
+        self._lock_descartes = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copia del registro lista para otro hilo
+
+        A diferencia de QueueHandler.prepare, el mensaje queda sin formato
+        y la traza de la excepción en exc_text, para que cada handler de
+        salida aplique su formato (JSON con exc_info como campo propio).
+        """
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.message = record.msg
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartes:
+                self.descartados[record.levelname] += 1
+                self._pendientes_de_avisar += 1
+            LOG_DESCARTADOS.labels(level=record.levelname).inc()
+            return
+
+        if self._pendientes_de_avisar:
+            self._avisar_descartes()
 
+    def _avisar_descartes(self) -> None:
+        with self._lock_descartes:
+            cantidad, self._pendientes_de_avisar = self._pendientes_de_avisar, 0
+        aviso = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Se descartaron %d registros de log por cola llena", (cantidad,), None
+        )
+        try:
+            self.queue.put_nowait(self.prepare(aviso))
+        except queue.Full:
+            with self._lock_descartes:
+                self._pendientes_de_avisar += cantidad
 
-def setup_logging():
-    """Configurar sistema de logging"""
-    
-    # Crear directorio de logs si no existe
-    log_dir = Path("logs")
+
+class ListenerLog(QueueListener):
+    """QueueListener cuyo aviso de fin espera lugar en la cola llena"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[ListenerLog] = None
+_handler_cola: Optional[ColaLogHandler] = None
+
+
+def crear_handlers(log_dir: Path) -> List[logging.Handler]:
+    """
+    Handlers de salida: archivo con rotación, consola y archivo de errores
+
+    Formato JSON en archivos (y en consola fuera de desarrollo), con los
+    campos pasados en extra= como claves propias.
+
+    Args:
+        log_dir: Directorio de app.log y error.log
+
+    Returns:
+        Handlers con su nivel y formato
+    """
     log_dir.mkdir(exist_ok=True)
-    
-    # Formato para logs
+
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
-    # Handler para archivo con rotación
+    json_format = JsonFormatter(
+        "%(asctime)s %(name)s %(levelname)s %(message)s",
+        rename_fields={"asctime": "timestamp", "levelname": "level", "name": "logger"}
+    )
+    console_format = (
+        logging.Formatter(log_format) if settings.ENVIRONMENT == "development" else json_format
+    )
+
+    # Archivo con rotación
     file_handler = RotatingFileHandler(
-        "logs/app.log",
+        log_dir / "app.log",
         maxBytes=10485760,  # 10MB
         backupCount=10
     )
     file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(logging.Formatter(log_format))
-    
-    # Handler para consola
+    file_handler.setFormatter(json_format)
+
+    # Consola
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(logging.Formatter(log_format))
-    
-    # Handler para errores (archivo separado)
+    console_handler.setFormatter(console_format)
+
+    # Errores (archivo separado)
     error_handler = RotatingFileHandler(
-        "logs/error.log",
+        log_dir / "error.log",
         maxBytes=10485760,
         backupCount=10
     )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(logging.Formatter(log_format))
-    
-    # Configurar logger raíz
+    error_handler.setFormatter(json_format)
+
+    return [file_handler, console_handler, error_handler]
+
+
+def niveles_por_modulo(definicion: str) -> Dict[str, str]:
+    """
+    Interpretar LOG_NIVELES
+
+    Args:
+        definicion: Pares "logger=NIVEL" separados por comas, p. ej.
+            "uvicorn=WARNING,app.core.consultas_lentas=DEBUG"
+
+    Returns:
+        Nivel por nombre de logger
+    """
+    niveles = {}
+    for par in definicion.split(","):
+        if par.strip():
+            nombre, nivel = par.split("=", 1)
+            niveles[nombre.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def setup_logging(log_dir: Path = Path("logs")) -> ColaLogHandler:
+    """
+    Configurar sistema de logging
+
+    Volver a llamarla reemplaza la cola y los handlers anteriores.
+
+    Args:
+        log_dir: Directorio de los archivos de log
+
+    Returns:
+        Handler de la cola instalado en el logger raíz
+    """
+    global _listener, _handler_cola
+    detener_logging()
+
+    cola: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_COLA_MAX)
+    _handler_cola = ColaLogHandler(cola)
+    _listener = ListenerLog(cola, *crear_handlers(log_dir), respect_handler_level=True)
+    _listener.start()
+
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(error_handler)
-    
-    # Reducir verbosidad de librerías externas
-    logging.getLogger("uvicorn").setLevel(logging.WARNING)
-    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
-    
+    root_logger.setLevel(settings.LOG_NIVEL.upper())
+    root_logger.addHandler(_handler_cola)
+
+    for nombre, nivel in niveles_por_modulo(settings.LOG_NIVELES).items():
+        logging.getLogger(nombre).setLevel(nivel)
+
     logging.info("Sistema de logging configurado correctamente")
+    return _handler_cola
+
+
+def detener_logging() -> None:
+    """Escribir los registros en cola y cerrar los handlers de salida"""
+    global _listener, _handler_cola
+    if _handler_cola is not None:
+        logging.getLogger().removeHandler(_handler_cola)
+        _handler_cola = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(detener_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,122 @@
+"""
+Matriz de compatibilidad entre categorías de licencia y empresas
+
+Para cada empresa con autorizaciones se precalcula el conjunto de
+categorías de licencia que admiten sus autorizaciones vigentes. La matriz
+se mantiene en memoria como un catálogo (ver app.core.catalogos): se
+recarga cuando cambian las autorizaciones o los tipos de autorización, y
+validar miles de pares (categoría, empresa) es una búsqueda por par.
+"""
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalogo_tipos import catalogo_tipos
+from app.core.catalogos import CatalogoEnMemoria, registrar_catalogo
+from app.core.config import settings
+from app.models.empresa import AutorizacionEmpresa, TipoAutorizacion
+
+
+# Categorías de licencia admitidas por cada tipo de autorización
+REQUISITOS_CATEGORIA: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'MERCANCIAS': ('A-IIIb', 'A-IIIc'),
+    'TURISMO': ('A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'),
+    'TRABAJADORES': ('A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'),
+    'ESPECIALES': ('A-IIIa', 'A-IIIb', 'A-IIIc'),
+    'ESTUDIANTES': ('A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'),
+    'RESIDUOS_PELIGROSOS': ('A-IIIb', 'A-IIIc'),
+})
+
+
+class MatrizCategorias:
+    """Categorías permitidas por empresa, de solo lectura"""
+
+    def __init__(self, categorias_por_empresa: Dict[UUID, FrozenSet[str]]):
+        self._por_empresa: Mapping[UUID, FrozenSet[str]] = MappingProxyType(categorias_por_empresa)
+
+    def __len__(self) -> int:
+        return len(self._por_empresa)
+
+    def categorias(self, empresa_id: UUID) -> Optional[FrozenSet[str]]:
+        """
+        Categorías permitidas para una empresa
+
+        Returns:
+            Conjunto de categorías (vacío si ninguna autorización está
+            vigente) o None si la empresa no tiene autorizaciones
+        """
+        return self._por_empresa.get(empresa_id)
+
+    def es_valida(self, licencia_categoria: str, empresa_id: UUID) -> bool:
+        """Indica si la categoría es válida para alguna autorización vigente de la empresa"""
+        return licencia_categoria in self._por_empresa.get(empresa_id, frozenset())
+
+    def validar_lote(self, pares: Iterable[Tuple[str, UUID]]) -> List[bool]:
+        """
+        Validar muchos pares (categoría, empresa) de una vez
+
+        Args:
+            pares: Pares (licencia_categoria, empresa_id)
+
+        Returns:
+            Resultado de cada par, en el mismo orden
+        """
+        vacio: FrozenSet[str] = frozenset()
+        por_empresa = self._por_empresa
+        return [categoria in por_empresa.get(empresa_id, vacio) for categoria, empresa_id in pares]
+
+
+class CatalogoMatrizLicencias(CatalogoEnMemoria[MatrizCategorias]):
+    """Matriz de categorías permitidas por empresa"""
+
+    nombre = "matriz_licencias"
+    modelos = (AutorizacionEmpresa, TipoAutorizacion)
+
+    async def construir(self, db: AsyncSession) -> MatrizCategorias:
+        tipos = (await catalogo_tipos.obtener(db)).tipos_autorizacion
+        result = await db.execute(select(
+            AutorizacionEmpresa.empresa_id,
+            AutorizacionEmpresa.tipo_autorizacion_id,
+            AutorizacionEmpresa.vigente
+        ))
+
+        categorias: Dict[UUID, Set[str]] = defaultdict(set)
+        for empresa_id, tipo_autorizacion_id, vigente in result.all():
+            # Toda empresa con autorizaciones figura, aunque ninguna esté vigente
+            permitidas = categorias[empresa_id]
+            tipo = tipos.get(tipo_autorizacion_id)
+            if vigente and tipo is not None:
+                permitidas.update(REQUISITOS_CATEGORIA.get(tipo.codigo, ()))
+
+        return MatrizCategorias({
+            empresa_id: frozenset(permitidas) for empresa_id, permitidas in categorias.items()
+        })
+
+    async def categorias(self, db: AsyncSession, empresa_id: UUID) -> Optional[FrozenSet[str]]:
+        """
+        Categorías permitidas para una empresa
+
+        Si la empresa no está en la matriz se recarga una vez, por si otro
+        proceso registró su primera autorización y el aviso de invalidación
+        aún no llegó.
+
+        Args:
+            db: Sesión para recargar la matriz si hace falta
+            empresa_id: ID de la empresa
+
+        Returns:
+            Conjunto de categorías o None si la empresa no tiene autorizaciones
+        """
+        categorias = (await self.obtener(db)).categorias(empresa_id)
+        if categorias is None:
+            categorias = (await self.cargar(db)).categorias(empresa_id)
+        return categorias
+
+
+matriz_licencias = registrar_catalogo(
+    CatalogoMatrizLicencias(ttl_segundos=settings.CATALOGO_MATRIZ_LICENCIAS_TTL_SEGUNDOS)
+)
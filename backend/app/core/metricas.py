@@ -0,0 +1,273 @@
+"""
+Métricas de Prometheus
+
+Se exponen en GET /metrics, sin autenticación: nginx solo lo deja pasar
+desde redes internas (nginx/nginx.conf) y responde 403 al resto.
+
+- http_request_duration_seconds: latencia por método, plantilla de ruta
+  (/api/v1/conductores/{conductor_id}, no la URL con el id) y código de
+  estado; el _count por código da la tasa de errores.
+- db_pool_connections_checked_out, db_pool_overflow y
+  db_pool_checkout_wait_seconds: uso del pool de conexiones del engine.
+- repository_call_duration_seconds: duración de cada método público de
+  los repositorios, con sus consultas.
+- bcrypt_duration_seconds y pdf_render_duration_seconds: trabajo de CPU
+  que bloquea el event loop.
+- cache_requests_total: aciertos y fallos de la caché de Redis y de los
+  catálogos en memoria.
+- celery_task_queue_wait_seconds y celery_task_duration_seconds: espera
+  en la cola y ejecución de cada tarea Celery, por tarea y cola. Las mide
+  el worker, que las publica en su propio puerto (CELERY_METRICAS_PUERTO),
+  no en /metrics de la API.
+
+Varios workers de uvicorn: si la variable de entorno
+PROMETHEUS_MULTIPROC_DIR apunta a un directorio (vacío al arrancar el
+servidor) antes de iniciar los procesos, cada worker escribe sus valores en
+archivos de ese directorio y /metrics responde con la suma de todos, sin
+importar qué worker atienda la petición. Sin la variable se exportan solo
+las métricas del proceso. Lo mismo vale para el worker de Celery con
+el pool prefork, cuyas tareas se ejecutan en procesos hijos.
+"""
+import os
+import re
+import time
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Optional
+
+from prometheus_client import (  # noqa: F401 - CONTENT_TYPE_LATEST para /metrics
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+MULTIPROCESO = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+RUTA_SIN_PLANTILLA = "sin_ruta"
+
+PETICIONES_DURACION = Histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones HTTP",
+    ["method", "route", "status"]
+)
+
+POOL_EN_USO = Gauge(
+    "db_pool_connections_checked_out",
+    "Conexiones del pool entregadas a sesiones",
+    multiprocess_mode="livesum"
+)
+
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Conexiones abiertas por encima de pool_size",
+    multiprocess_mode="livesum"
+)
+
+POOL_ESPERA = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo hasta obtener una conexión del pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+REPOSITORIO_DURACION = Histogram(
+    "repository_call_duration_seconds",
+    "Duración de los métodos de los repositorios",
+    ["repository", "method"]
+)
+
+BCRYPT_DURACION = Histogram(
+    "bcrypt_duration_seconds",
+    "Duración del hash y la verificación de contraseñas",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2)
+)
+
+PDF_DURACION = Histogram(
+    "pdf_render_duration_seconds",
+    "Duración de la generación de documentos PDF",
+    ["document"]
+)
+
+CACHE_CONSULTAS = Counter(
+    "cache_requests_total",
+    "Lecturas de caché por resultado (hit o miss)",
+    ["cache", "result"]
+)
+
+LOG_DESCARTADOS = Counter(
+    "log_records_dropped_total",
+    "Registros de log descartados por cola llena",
+    ["level"]
+)
+
+LOOP_RETRASO = Histogram(
+    "event_loop_lag_seconds",
+    "Retraso del event loop al despertar una tarea programada",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+LOOP_BLOQUEOS = Counter(
+    "event_loop_blocked_total",
+    "Mediciones con un retraso del event loop sobre el umbral"
+)
+
+TAREAS_ESPERA = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Tiempo desde que se encola una tarea Celery hasta que empieza",
+    ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+TAREAS_DURACION = Histogram(
+    "celery_task_duration_seconds",
+    "Duración de la ejecución de las tareas Celery",
+    ["task", "queue", "state"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+
+# Las claves versionadas de la caché son "<espacio>:v<versión>:..."
+_CLAVE_VERSIONADA = re.compile(r"^(.*?):v\d+(?::|$)")
+
+# Método de repositorio en curso: las llamadas anidadas (un método que usa
+# otro o super()) se miden solo en la más externa
+_en_repositorio: ContextVar[bool] = ContextVar("en_repositorio", default=False)
+
+
+def _registro() -> CollectorRegistry:
+    if MULTIPROCESO:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return registro
+    return REGISTRY
+
+
+def generar_metricas() -> bytes:
+    """
+    Métricas en el formato de texto de Prometheus
+
+    Returns:
+        Cuerpo de la respuesta, con el tipo CONTENT_TYPE_LATEST
+    """
+    return generate_latest(_registro())
+
+
+def iniciar_servidor(puerto: int) -> None:
+    """
+    Publicar las métricas en un servidor HTTP propio (hilo en segundo plano)
+
+    Para procesos sin la aplicación web, como el worker de Celery.
+
+    Args:
+        puerto: Puerto en el que escucha el servidor
+    """
+    start_http_server(puerto, registry=_registro())
+
+
+def finalizar_proceso() -> None:
+    """Quitar los gauges del proceso actual de la suma entre workers"""
+    if MULTIPROCESO:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def registrar_cache(cache: str, acierto: bool) -> None:
+    """
+    Contar una lectura de caché
+
+    Args:
+        cache: Nombre de la caché o del espacio de claves
+        acierto: Si el valor estaba en caché
+    """
+    CACHE_CONSULTAS.labels(cache=cache, result="hit" if acierto else "miss").inc()
+
+
+def espacio_de_clave(clave: str) -> str:
+    """Espacio de claves de Redis al que pertenece una clave de caché"""
+    versionada = _CLAVE_VERSIONADA.match(clave)
+    return versionada.group(1) if versionada else clave.split(":", 1)[0]
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """
+    Pool del engine que publica su uso y el tiempo de espera por conexión
+
+    La espera incluye la cola del pool cuando están todas en uso, la
+    apertura de conexiones nuevas y el pre-ping.
+    """
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_ESPERA.observe(time.perf_counter() - inicio)
+            self._publicar_uso()
+
+    def _do_return_conn(self, record) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._publicar_uso()
+
+    def _publicar_uso(self) -> None:
+        POOL_EN_USO.set(self.checkedout())
+        POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def _medir_metodo(metodo: Callable) -> Callable:
+    @wraps(metodo)
+    async def medido(self, *args: Any, **kwargs: Any) -> Any:
+        if _en_repositorio.get():
+            return await metodo(self, *args, **kwargs)
+
+        token = _en_repositorio.set(True)
+        inicio = time.perf_counter()
+        try:
+            return await metodo(self, *args, **kwargs)
+        finally:
+            REPOSITORIO_DURACION.labels(
+                repository=type(self).__name__,
+                method=metodo.__name__
+            ).observe(time.perf_counter() - inicio)
+            _en_repositorio.reset(token)
+
+    medido.medido = True
+    return medido
+
+
+def medir_repositorio(clase: type) -> type:
+    """
+    Medir la duración de los métodos asíncronos públicos de un repositorio
+
+    Los métodos heredados se miden con el nombre de la clase de la
+    instancia. BaseRepository lo aplica a sus subclases; los repositorios
+    que no heredan de él usan el decorador directamente.
+
+    Args:
+        clase: Clase del repositorio
+
+    Returns:
+        La misma clase, con los métodos envueltos
+    """
+    for nombre, atributo in list(vars(clase).items()):
+        if (
+            not nombre.startswith("_")
+            and iscoroutinefunction(atributo)
+            and not getattr(atributo, "medido", False)
+        ):
+            setattr(clase, nombre, _medir_metodo(atributo))
+    return clase
+
+
+def ruta_de(scope: dict) -> str:
+    """Plantilla de la ruta que atendió la petición"""
+    ruta: Optional[Any] = scope.get("route")
+    return getattr(ruta, "path", None) or RUTA_SIN_PLANTILLA
@@ -0,0 +1,304 @@
+"""
+Middlewares de la aplicación
+"""
+import asyncio
+import random
+import sys
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.auditoria import finalizar_contexto, iniciar_contexto
+from app.core.consultas import contador_actual, contar_consultas, verificar_presupuesto
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.metricas import PETICIONES_DURACION, ruta_de
+from app.core.perfilador import Muestreador, guardar_perfil, nuevo_perfil_id, token_de_perfil
+from app.core.security import verify_token
+from app.core.tiempos import medir_tiempos
+from app.models.user import RolUsuario
+
+logger = get_logger(__name__)
+
+
+class _GZipSinEventosResponder(GZipResponder):
+    """Compresor que entrega sin tocar las respuestas text/event-stream"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 9) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.sin_comprimir = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            tipo = Headers(raw=message["headers"]).get("content-type", "")
+            self.sin_comprimir = tipo.startswith("text/event-stream")
+        if self.sin_comprimir:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+
+class GZipSinEventosMiddleware(GZipMiddleware):
+    """
+    GZip que deja pasar sin comprimir los flujos Server-Sent Events
+
+    El compresor acumula la salida en un buffer, lo que retendría los
+    eventos en lugar de entregarlos al cliente apenas se publican. Se
+    decide por el content-type de la respuesta, no por el Accept de la
+    petición: fetch envía Accept: */*.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _GZipSinEventosResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def ip_cliente(scope: Scope, headers: Headers) -> Optional[str]:
+    """
+    IP del cliente según el proxy de confianza
+
+    nginx reemplaza X-Real-IP con la dirección de quien le conecta, así que
+    el cliente no puede falsificarla. Sin ella se usa la última entrada de
+    X-Forwarded-For, la que agregó el proxy (las anteriores las controla el
+    cliente), y si no hay proxy, la dirección de la conexión.
+    """
+    real = headers.get("x-real-ip")
+    if real:
+        return real.strip()
+    reenviado = headers.get("x-forwarded-for")
+    if reenviado:
+        return reenviado.split(",")[-1].strip()
+    return scope["client"][0] if scope.get("client") else None
+
+
+class ContextoAuditoriaMiddleware:
+    """
+    Abre un contexto de auditoría por petición con la IP y el user agent
+
+    El usuario se completa en get_current_user una vez validado el token.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        ip_address = ip_cliente(scope, headers)
+
+        token = iniciar_contexto(ip_address=ip_address, user_agent=headers.get("user-agent"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finalizar_contexto(token)
+
+
+class ConsultasMiddleware:
+    """
+    Cuenta las sentencias SQL y cargas diferidas de cada petición
+
+    Con cabeceras=True (entorno de desarrollo) la respuesta incluye
+    X-DB-Queries y X-DB-Lazy-Loads con lo contado hasta enviarla. Las
+    cargas diferidas y los excesos sobre el presupuesto del endpoint
+    (ver app.core.consultas.presupuesto_consultas) se registran como
+    advertencias.
+    """
+
+    def __init__(self, app: ASGIApp, cabeceras: bool = False):
+        self.app = app
+        self.cabeceras = cabeceras
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with contar_consultas() as contador:
+            async def enviar(message: Message) -> None:
+                if self.cabeceras and message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(contador.sentencias)
+                    headers["X-DB-Lazy-Loads"] = str(len(contador.cargas_diferidas))
+                await send(message)
+
+            await self.app(scope, receive, enviar)
+
+        ruta = f"{scope['method']} {scope['path']}"
+        exceso = verificar_presupuesto(ruta, scope.get("endpoint"), contador)
+        if exceso is not None:
+            logger.warning(
+                "%s superó su presupuesto de consultas: %d sentencias (máximo %d), "
+                "cargas diferidas %s (máximo %d)",
+                ruta, exceso.sentencias, exceso.presupuesto.sentencias,
+                exceso.cargas_diferidas, exceso.presupuesto.cargas_diferidas
+            )
+        elif contador.cargas_diferidas:
+            logger.warning("%s hizo cargas diferidas: %s", ruta, contador.cargas_diferidas)
+        else:
+            logger.debug("%s: %d sentencias SQL", ruta, contador.sentencias)
+
+
+class MetricasMiddleware:
+    """
+    Registra la duración de cada petición por plantilla de ruta
+
+    La ruta se lee del scope después de atenderla, cuando el router ya
+    guardó la que coincidió; las URLs que no coinciden con ninguna se
+    agrupan para no crear una serie por URL. Una excepción sin manejar
+    cuenta como 500.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+        inicio = time.perf_counter()
+
+        async def enviar(message: Message) -> None:
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            PETICIONES_DURACION.labels(
+                method=scope["method"],
+                route=ruta_de(scope),
+                status=str(estado)
+            ).observe(time.perf_counter() - inicio)
+
+
+class TiemposMiddleware:
+    """
+    Desglosa el tiempo de una muestra de las peticiones por tipo de trabajo
+
+    Para cada petición muestreada (ver app.core.tiempos) la respuesta
+    incluye la cabecera Server-Timing con lo acumulado hasta enviarla, y al
+    terminar se registra una línea de log con la ruta, el estado, la
+    duración total, el desglose en milisegundos y las sentencias SQL
+    contadas por ConsultasMiddleware, que debe envolver a este middleware.
+
+    Args:
+        muestreo: Fracción de peticiones medidas, de 0 a 1
+    """
+
+    def __init__(self, app: ASGIApp, muestreo: float = 1.0):
+        self.app = app
+        self.muestreo = muestreo
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.muestreo:
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+        inicio = time.perf_counter()
+        with medir_tiempos() as tiempos:
+            async def enviar(message: Message) -> None:
+                nonlocal estado
+                if message["type"] == "http.response.start":
+                    estado = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", tiempos.server_timing(time.perf_counter() - inicio))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                duracion_ms = round((time.perf_counter() - inicio) * 1000, 2)
+                desglose = tiempos.en_milisegundos()
+                contador = contador_actual()
+                logger.info(
+                    "%s %s %d %.2f ms %s",
+                    scope["method"], scope["path"], estado, duracion_ms,
+                    " ".join(f"{categoria}={ms}" for categoria, ms in desglose.items()),
+                    extra={
+                        "metodo": scope["method"],
+                        "ruta": ruta_de(scope),
+                        "path": scope["path"],
+                        "estado": estado,
+                        "duracion_ms": duracion_ms,
+                        "tiempos_ms": desglose,
+                        "sentencias_sql": contador.sentencias if contador is not None else None,
+                    }
+                )
+
+
+class PerfilMiddleware:
+    """
+    Perfila las peticiones que traen un token de perfil de SUPERUSUARIO
+
+    El token se emite en POST /api/v1/diagnostico/perfiles/token y llega
+    en la cabecera X-Perfil (en desarrollo, también en el parámetro
+    _perfil). Mientras se atiende la petición un Muestreador toma su pila
+    (ver app.core.perfilador); la respuesta lleva X-Perfil-Id y
+    X-Perfil-Url, y al terminar el perfil se guarda fuera del event loop.
+    Un token inválido o vencido responde 403.
+    Las peticiones sin token pasan sin más costo que buscarlo.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = token_de_perfil(scope) if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        payload = verify_token(token, token_type="perfil")
+        if payload is None or payload.get("rol") != RolUsuario.SUPERUSUARIO.value:
+            response = JSONResponse(
+                {"detail": "Token de perfil inválido o expirado"},
+                status_code=403
+            )
+            await response(scope, receive, send)
+            return
+
+        perfil_id = nuevo_perfil_id()
+
+        async def enviar(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Perfil-Id", perfil_id)
+                headers.append("X-Perfil-Url", f"/api/v1/diagnostico/perfiles/{perfil_id}")
+            await send(message)
+
+        muestreador = Muestreador(
+            asyncio.current_task(),
+            raiz=sys._getframe().f_code,
+            intervalo=settings.PERFILADOR_INTERVALO_MS / 1000
+        )
+        muestreador.iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            muestreador.detener()
+            perfil = muestreador.speedscope(f"{scope['method']} {scope['path']}")
+            await asyncio.to_thread(guardar_perfil, perfil_id, perfil)
+            logger.info(
+                "Perfil %s de %s %s: %d muestras",
+                perfil_id, scope["method"], scope["path"], len(muestreador.muestras),
+                extra={"perfil_id": perfil_id, "usuario_id": payload.get("sub")}
+            )
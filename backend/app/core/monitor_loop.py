@@ -0,0 +1,138 @@
+"""
+Monitor del retraso del event loop y detector de llamadas bloqueantes
+
+Una tarea duerme `intervalo` segundos en bucle; lo que tarda de más en
+despertar es el retraso del loop (event_loop_lag_seconds). Si supera el
+umbral, se cuenta en event_loop_blocked_total.
+
+Con captura de pilas (desarrollo o MONITOR_LOOP_PILAS) un hilo vigía
+revisa que la tarea siga despertando. Cuando pasa más del umbral sin que
+lo haga, toma la pila del hilo del loop en ese momento, que muestra el
+código que lo está bloqueando (bcrypt, ReportLab, E/S de archivos...). Al
+terminar el bloqueo se registra una advertencia con la duración y la
+pila, y se guarda en un buffer que muestra
+GET /api/v1/diagnostico/bloqueos.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, List, Optional
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.metricas import LOOP_BLOQUEOS, LOOP_RETRASO
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Bloqueo:
+    """Bloqueo del event loop con la pila que lo causaba"""
+
+    detectado_en: datetime
+    pila: List[str]
+    duracion_ms: Optional[float] = None
+
+
+class MonitorLoop:
+    """
+    Mide el retraso del event loop y captura la pila de los bloqueos
+
+    Args:
+        intervalo: Segundos entre mediciones
+        umbral: Retraso en segundos a partir del cual hay un bloqueo
+        capturar_pilas: Arrancar el hilo vigía que captura las pilas
+        max_bloqueos: Bloqueos conservados en el buffer
+    """
+
+    def __init__(self, intervalo: float, umbral: float, capturar_pilas: bool = False, max_bloqueos: int = 50):
+        self.intervalo = intervalo
+        self.umbral = umbral
+        self.capturar_pilas = capturar_pilas
+        self.bloqueos: Deque[Bloqueo] = deque(maxlen=max_bloqueos)
+        self._tarea: Optional[asyncio.Task] = None
+        self._vigia: Optional[threading.Thread] = None
+        self._detener_vigia = threading.Event()
+        self._id_hilo_loop: Optional[int] = None
+        self._latido = 0.0
+        self._en_curso: Optional[Bloqueo] = None
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    def iniciar(self) -> None:
+        """Arrancar el monitor en el event loop actual (inicio de la aplicación)"""
+        if self.activo:
+            return
+        self._id_hilo_loop = threading.get_ident()
+        self._latido = time.monotonic()
+        self._tarea = asyncio.create_task(self._medir())
+        if self.capturar_pilas:
+            self._detener_vigia.clear()
+            self._vigia = threading.Thread(target=self._vigilar, name="monitor-loop", daemon=True)
+            self._vigia.start()
+
+    async def detener(self) -> None:
+        """Detener la medición y el hilo vigía"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        self._tarea = None
+        if self._vigia is not None:
+            self._detener_vigia.set()
+            self._vigia.join()
+            self._vigia = None
+
+    async def _medir(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            inicio = loop.time()
+            await asyncio.sleep(self.intervalo)
+            self._latido = time.monotonic()
+            retraso = max(loop.time() - inicio - self.intervalo, 0.0)
+            LOOP_RETRASO.observe(retraso)
+
+            with self._lock:
+                bloqueo, self._en_curso = self._en_curso, None
+            if retraso >= self.umbral:
+                LOOP_BLOQUEOS.inc()
+                if bloqueo is not None:
+                    bloqueo.duracion_ms = round(retraso * 1000, 1)
+                    self.bloqueos.append(bloqueo)
+                    logger.warning(
+                        "Event loop bloqueado %.1f ms en:\n%s",
+                        bloqueo.duracion_ms, "".join(bloqueo.pila)
+                    )
+
+    def _vigilar(self) -> None:
+        # La tarea despierta cada `intervalo`: hay bloqueo si tarda más del umbral en hacerlo
+        limite = self.intervalo + self.umbral
+        capturado = None
+        while not self._detener_vigia.wait(min(self.intervalo, self.umbral) / 2):
+            latido = self._latido
+            if latido == capturado or time.monotonic() - latido < limite:
+                continue
+
+            frame = sys._current_frames().get(self._id_hilo_loop)
+            if frame is None:
+                continue
+            capturado = latido
+            with self._lock:
+                self._en_curso = Bloqueo(datetime.utcnow(), traceback.format_stack(frame))
+
+
+monitor_loop = MonitorLoop(
+    intervalo=settings.MONITOR_LOOP_INTERVALO_MS / 1000,
+    umbral=settings.MONITOR_LOOP_UMBRAL_MS / 1000,
+    capturar_pilas=settings.MONITOR_LOOP_PILAS or settings.ENVIRONMENT == "development"
+)
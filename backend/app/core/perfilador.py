@@ -0,0 +1,210 @@
+"""
+Perfilador por petición bajo demanda
+
+Un SUPERUSUARIO obtiene un token de perfil firmado
+(POST /api/v1/diagnostico/perfiles/token) y lo envía en la cabecera
+X-Perfil de la petición a perfilar. En desarrollo también se acepta el
+parámetro _perfil; fuera de él no, porque los logs de acceso del proxy y
+de uvicorn guardarían el token. Solo esa petición se muestrea: un hilo
+toma cada PERFILADOR_INTERVALO_MS la pila de la tarea que la atiende.
+
+- Si la tarea está ejecutándose, la pila del hilo del event loop.
+- Si está esperando (consultas a la base de datos, Redis, el threadpool),
+  la cadena de corrutinas hasta el await pendiente, con una hoja
+  "(esperando)". Así el perfil incluye el tiempo de espera, no
+  solo el de CPU.
+
+Cada muestra pesa el tiempo transcurrido desde la anterior. El perfil se
+guarda en formato speedscope (https://www.speedscope.app) en
+PERFILADOR_DIRECTORIO, compartido por los workers; la respuesta indica su
+id en X-Perfil-Id y se descarga con GET /api/v1/diagnostico/perfiles/{id}.
+
+Sin token, PerfilMiddleware solo busca la cabecera y el parámetro.
+"""
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from uuid import uuid4
+
+from app.core.config import settings
+
+CABECERA_PERFIL = b"x-perfil"
+PARAMETRO_PERFIL = "_perfil"
+
+PERFIL_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Marco de la pila: nombre, archivo y línea donde empieza la función
+Marco = Tuple[str, str, int]
+
+
+class Muestreador:
+    """
+    Hilo que muestrea la pila de una tarea de asyncio
+
+    Args:
+        tarea: Tarea a perfilar (la de la petición)
+        raiz: Código de la función desde la que se registran las pilas;
+            los marcos exteriores (servidor, event loop) se omiten
+        intervalo: Segundos entre muestras
+    """
+
+    def __init__(self, tarea: asyncio.Task, raiz: CodeType, intervalo: float):
+        self.tarea = tarea
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self.marcos: Dict[Marco, int] = {}
+        self.muestras: List[List[int]] = []
+        self.pesos: List[float] = []
+        self._loop = tarea.get_loop()
+        self._id_hilo_loop = threading.get_ident()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name="perfilador", daemon=True)
+        self._inicio = 0.0
+        self._fin = 0.0
+
+    def iniciar(self) -> None:
+        """Empezar a muestrear (desde el hilo del event loop)"""
+        self._inicio = time.perf_counter()
+        self._hilo.start()
+
+    def detener(self) -> None:
+        """Dejar de muestrear"""
+        self._detener.set()
+        self._hilo.join()
+        self._fin = time.perf_counter()
+
+    def _ejecutar(self) -> None:
+        anterior = self._inicio
+        while not self._detener.wait(self.intervalo):
+            ahora = time.perf_counter()
+            try:
+                pila = self._pila()
+            except Exception:
+                # La tarea avanzó mientras se leía su cadena de corrutinas
+                continue
+            if pila:
+                self.muestras.append([self._indice(marco) for marco in pila])
+                self.pesos.append((ahora - anterior) * 1000)
+                anterior = ahora
+
+    def _pila(self) -> List[Marco]:
+        if asyncio.current_task(self._loop) is self.tarea:
+            frame = sys._current_frames().get(self._id_hilo_loop)
+            frames: List[FrameType] = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()
+            return self._desde_raiz(frames)
+
+        frames, esperando = [], self.tarea.get_coro()
+        while True:
+            frame = getattr(esperando, "cr_frame", None) or getattr(esperando, "gi_frame", None)
+            if frame is None:
+                break
+            frames.append(frame)
+            esperando = getattr(esperando, "cr_await", None) or getattr(esperando, "gi_yieldfrom", None)
+        pila = self._desde_raiz(frames)
+        if pila:
+            pila.append(("(esperando)", "", 0))
+        return pila
+
+    def _desde_raiz(self, frames: List[FrameType]) -> List[Marco]:
+        for posicion, frame in enumerate(frames):
+            if frame.f_code is self.raiz:
+                return [
+                    (f.f_code.co_qualname, f.f_code.co_filename, f.f_code.co_firstlineno)
+                    for f in frames[posicion:]
+                ]
+        return []
+
+    def _indice(self, marco: Marco) -> int:
+        indice = self.marcos.get(marco)
+        if indice is None:
+            indice = self.marcos[marco] = len(self.marcos)
+        return indice
+
+    def speedscope(self, nombre: str) -> Dict[str, Any]:
+        """
+        Perfil en el formato de archivo de speedscope
+
+        Args:
+            nombre: Nombre del perfil (método y ruta de la petición)
+
+        Returns:
+            Documento JSON con un perfil muestreado en milisegundos
+        """
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": nombre,
+            "exporter": settings.APP_NAME,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": nombre_marco, "file": archivo, "line": linea}
+                    for nombre_marco, archivo, linea in self.marcos
+                ]
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": nombre,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round((self._fin - self._inicio) * 1000, 3),
+                "samples": self.muestras,
+                "weights": [round(peso, 3) for peso in self.pesos],
+            }],
+        }
+
+
+def token_de_perfil(scope: dict) -> Optional[str]:
+    """Token de perfil de la petición, en la cabecera (o en el parámetro, solo en desarrollo)"""
+    for nombre, valor in scope["headers"]:
+        if nombre == CABECERA_PERFIL:
+            return valor.decode("latin-1")
+    if settings.ENVIRONMENT != "development":
+        return None
+    consulta = scope.get("query_string", b"")
+    if PARAMETRO_PERFIL.encode() in consulta:
+        valores = parse_qs(consulta.decode("latin-1")).get(PARAMETRO_PERFIL)
+        return valores[0] if valores else None
+    return None
+
+
+def ruta_perfil(perfil_id: str) -> Path:
+    """Archivo de un perfil guardado"""
+    return Path(settings.PERFILADOR_DIRECTORIO) / f"{perfil_id}.speedscope.json"
+
+
+def nuevo_perfil_id() -> str:
+    """Id de un perfil nuevo, válido como nombre de archivo"""
+    return uuid4().hex
+
+
+def guardar_perfil(perfil_id: str, perfil: Dict[str, Any]) -> Path:
+    """
+    Escribir un perfil y descartar los más antiguos (bloqueante)
+
+    Args:
+        perfil_id: Id del perfil
+        perfil: Documento de speedscope
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    directorio = Path(settings.PERFILADOR_DIRECTORIO)
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = ruta_perfil(perfil_id)
+    ruta.write_text(json.dumps(perfil))
+
+    guardados = sorted(directorio.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime)
+    for antiguo in guardados[:-settings.PERFILADOR_MAX_ARCHIVOS]:
+        antiguo.unlink(missing_ok=True)
+    return ruta
@@ -0,0 +1,114 @@
+"""
+Mantenimiento incremental del resumen diario de pagos
+
+Un evento after_flush traduce cada alta, cambio y baja de Pago en deltas
+(+1/-1 y su monto) sobre pagos_resumen_diario, y los aplica con un upsert
+en la misma transacción. Así PagoService.registrar_pago, confirmar_pago y
+rechazar_pago (y cualquier otra escritura por el ORM) mantienen el resumen
+al día sin recorrer la tabla de pagos.
+
+Las sentencias UPDATE/DELETE masivas sobre pagos no pasan por el ORM; tras
+ellas debe ejecutarse scripts/reconstruir_resumen_pagos.py para el rango
+afectado.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.habilitacion import Pago
+from app.repositories.pago_repository import sentencia_acumular_resumen
+
+
+# Atributos de Pago que determinan su fila en el resumen
+ATRIBUTOS_RESUMEN = ("fecha_pago", "estado", "concepto_tupa_id", "monto")
+
+Clave = Tuple[Any, Any, Any]
+
+
+# Con active_history el ORM carga el valor anterior al modificar el
+# atributo, aunque no estuviera cargado, para poder restar la fila previa
+for _atributo in ATRIBUTOS_RESUMEN:
+    event.listen(getattr(Pago, _atributo), "set", lambda *args: None, active_history=True)
+
+
+def _valores(pago: Pago, anteriores: bool) -> Optional[Dict[str, Any]]:
+    estado = inspect(pago)
+    valores = {}
+    for atributo in ATRIBUTOS_RESUMEN:
+        historial = estado.attrs[atributo].history
+        if anteriores:
+            valor = (historial.deleted or historial.unchanged or [None])[0]
+        else:
+            valor = (historial.added or historial.unchanged or [None])[0]
+        valores[atributo] = valor
+    if valores["fecha_pago"] is None or valores["concepto_tupa_id"] is None:
+        return None
+    return valores
+
+
+def _acumular(deltas: Dict[Clave, List], valores: Optional[Dict[str, Any]], signo: int) -> None:
+    if valores is None:
+        return
+    clave = (valores["fecha_pago"], valores["estado"], valores["concepto_tupa_id"])
+    deltas[clave][0] += signo
+    deltas[clave][1] += signo * Decimal(str(valores["monto"] or 0))
+
+
+def calcular_deltas(session: Session) -> List[Dict[str, Any]]:
+    """
+    Deltas del resumen diario para el flush en curso
+
+    Debe llamarse en after_flush, cuando el historial de atributos aún
+    refleja el estado previo al flush.
+
+    Returns:
+        Filas (fecha, estado, concepto_tupa_id, cantidad, monto_total) con
+        cambios distintos de cero
+    """
+    deltas: Dict[Clave, List] = defaultdict(lambda: [0, Decimal("0")])
+
+    for instancia in session.new:
+        if isinstance(instancia, Pago):
+            _acumular(deltas, _valores(instancia, anteriores=False), 1)
+
+    for instancia in session.dirty:
+        if not isinstance(instancia, Pago):
+            continue
+        estado = inspect(instancia)
+        if not any(estado.attrs[a].history.has_changes() for a in ATRIBUTOS_RESUMEN):
+            continue
+        _acumular(deltas, _valores(instancia, anteriores=True), -1)
+        _acumular(deltas, _valores(instancia, anteriores=False), 1)
+
+    for instancia in session.deleted:
+        if isinstance(instancia, Pago):
+            _acumular(deltas, _valores(instancia, anteriores=True), -1)
+
+    # Orden fijo de las claves para que dos transacciones concurrentes no
+    # bloqueen las mismas filas del resumen en orden inverso
+    return [
+        {
+            "fecha": fecha,
+            "estado": estado,
+            "concepto_tupa_id": concepto_tupa_id,
+            "cantidad": cantidad,
+            "monto_total": monto,
+        }
+        for (fecha, estado, concepto_tupa_id), (cantidad, monto) in sorted(
+            deltas.items(), key=lambda delta: tuple(str(v) for v in delta[0])
+        )
+        if cantidad or monto
+    ]
+
+
+@event.listens_for(Session, "after_flush")
+def _despues_de_flush(session: Session, flush_context) -> None:
+    filas = calcular_deltas(session)
+    if not filas:
+        return
+
+    conexion = session.connection()
+    conexion.execute(sentencia_acumular_resumen(conexion.dialect.name, filas))
@@ -6,6 +6,8 @@ from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metricas import BCRYPT_DURACION
+from app.core.tiempos import cronometrar, tiempo
 
 
 # Contexto de hashing de contraseñas con bcrypt
@@ -22,7 +24,8 @@ def hash_password(password: str) -> str:
     Returns:
         Hash de la contraseña
     """
-    return pwd_context.hash(password)
+    with BCRYPT_DURACION.labels(operation="hash").time(), tiempo("hash"):
+        return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -36,7 +39,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True si la contraseña es correcta, False en caso contrario
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    with BCRYPT_DURACION.labels(operation="verify").time(), tiempo("hash"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -95,13 +99,42 @@ def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta
     return encoded_jwt
 
 
+def create_profile_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Crea un token JWT para perfilar peticiones (cabecera X-Perfil)
+    
+    Args:
+        data: Datos a incluir en el token (sub, rol)
+        expires_delta: Tiempo de expiración personalizado (opcional)
+        
+    Returns:
+        Token JWT codificado
+    """
+    to_encode = data.copy()
+    
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=settings.PERFILADOR_TOKEN_MINUTOS)
+    
+    to_encode.update({
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "type": "perfil"
+    })
+    
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return encoded_jwt
+
+
+@cronometrar("jwt")
 def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
     """
     Verifica y decodifica un token JWT
     
     Args:
         token: Token JWT a verificar
-        token_type: Tipo de token esperado ("access" o "refresh")
+        token_type: Tipo de token esperado ("access", "refresh" o "perfil")
         
     Returns:
         Payload del token si es válido, None en caso contrario
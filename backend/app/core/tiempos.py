@@ -0,0 +1,172 @@
+"""
+Desglose del tiempo de cada petición por tipo de trabajo
+
+Mientras medir_tiempos() está activo (TiemposMiddleware lo abre para una
+fracción de las peticiones), el tiempo se acumula por categoría:
+
+- db: ejecución de sentencias SQL, con la espera de la respuesta
+  (listeners before/after_cursor_execute del Engine).
+- hash: bcrypt al crear o verificar contraseñas.
+- jwt: verificación de tokens.
+- serializacion: validación del response_model y render del JSON.
+- archivos: lectura y escritura de archivos subidos.
+- pdf: generación de documentos PDF.
+
+El resultado se envía en la cabecera Server-Timing y en la línea de log
+de la petición. Fuera de una petición medida, tiempo() solo consulta el
+ContextVar.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import fastapi.routing
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class TiemposPeticion:
+    """Segundos y número de operaciones por categoría de una petición"""
+
+    segundos: Dict[str, float] = field(default_factory=dict)
+    operaciones: Dict[str, int] = field(default_factory=dict)
+
+    def sumar(self, categoria: str, segundos: float) -> None:
+        self.segundos[categoria] = self.segundos.get(categoria, 0.0) + segundos
+        self.operaciones[categoria] = self.operaciones.get(categoria, 0) + 1
+
+    def en_milisegundos(self) -> Dict[str, float]:
+        """Milisegundos por categoría, redondeados a centésimas"""
+        return {categoria: round(segundos * 1000, 2) for categoria, segundos in self.segundos.items()}
+
+    def server_timing(self, total_segundos: float) -> str:
+        """
+        Valor de la cabecera Server-Timing
+
+        Args:
+            total_segundos: Duración de la petición hasta el envío de la cabecera
+
+        Returns:
+            Una métrica por categoría con su número de operaciones, más total
+        """
+        metricas = [
+            f'{categoria};dur={milisegundos};desc="{self.operaciones[categoria]}"'
+            for categoria, milisegundos in self.en_milisegundos().items()
+        ]
+        metricas.append(f"total;dur={round(total_segundos * 1000, 2)}")
+        return ", ".join(metricas)
+
+
+_tiempos: ContextVar[Optional[TiemposPeticion]] = ContextVar("tiempos_peticion", default=None)
+
+
+@contextmanager
+def medir_tiempos() -> Iterator[TiemposPeticion]:
+    """Acumular el tiempo por categoría de lo ejecutado dentro del bloque"""
+    tiempos = TiemposPeticion()
+    token = _tiempos.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _tiempos.reset(token)
+
+
+@contextmanager
+def tiempo(categoria: str) -> Iterator[None]:
+    """
+    Sumar la duración del bloque a una categoría de la petición medida
+
+    Args:
+        categoria: Categoría del desglose (db, hash, jwt, ...)
+    """
+    tiempos = _tiempos.get()
+    if tiempos is None:
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos.sumar(categoria, time.perf_counter() - inicio)
+
+
+def cronometrar(categoria: str) -> Callable:
+    """
+    Decorador de tiempo() para funciones síncronas o asíncronas
+
+    Args:
+        categoria: Categoría del desglose
+    """
+    def decorador(funcion: Callable) -> Callable:
+        if iscoroutinefunction(funcion):
+            @wraps(funcion)
+            async def medida_async(*args: Any, **kwargs: Any) -> Any:
+                with tiempo(categoria):
+                    return await funcion(*args, **kwargs)
+            return medida_async
+
+        @wraps(funcion)
+        def medida(*args: Any, **kwargs: Any) -> Any:
+            with tiempo(categoria):
+                return funcion(*args, **kwargs)
+        return medida
+
+    return decorador
+
+
+class JSONResponseMedida(JSONResponse):
+    """JSONResponse que suma el render del cuerpo a serializacion"""
+
+    def render(self, content: Any) -> bytes:
+        with tiempo("serializacion"):
+            return super().render(content)
+
+
+def instrumentar_serializacion() -> None:
+    """
+    Medir la validación y conversión del response_model de FastAPI
+
+    FastAPI no ofrece un punto de extensión para esta etapa: se envuelve
+    fastapi.routing.serialize_response, que el manejador de cada ruta
+    resuelve en el módulo en cada petición. Llamarla más de una vez no
+    tiene efecto.
+    """
+    original = fastapi.routing.serialize_response
+    if getattr(original, "medida", False):
+        return
+
+    medida = cronometrar("serializacion")(original)
+    medida.medida = True
+    fastapi.routing.serialize_response = medida
+
+
+# Las sentencias de una conexión no se solapan: basta un inicio por conexión
+@event.listens_for(Engine, "before_cursor_execute")
+def _iniciar_sentencia(conn, cursor, sentencia, parametros, contexto, executemany) -> None:
+    if _tiempos.get() is not None:
+        conn.info["tiempos_inicio"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _terminar_sentencia(conn, cursor, sentencia, parametros, contexto, executemany) -> None:
+    _sumar_sentencia(conn)
+
+
+@event.listens_for(Engine, "handle_error")
+def _terminar_sentencia_fallida(contexto_error) -> None:
+    if contexto_error.connection is not None:
+        _sumar_sentencia(contexto_error.connection)
+
+
+def _sumar_sentencia(conn) -> None:
+    inicio = conn.info.pop("tiempos_inicio", None)
+    tiempos = _tiempos.get()
+    if inicio is not None and tiempos is not None:
+        tiempos.sumar("db", time.perf_counter() - inicio)
@@ -1,15 +1,33 @@
 """
 Aplicación principal FastAPI
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.core.auditoria import escritor_auditoria
+import app.core.catalogo_tipos  # noqa: F401 - registra el catálogo de tipos
+import app.core.catalogo_tupa  # noqa: F401 - registra el catálogo TUPA
+import app.core.matriz_licencias  # noqa: F401 - registra la matriz de categorías
+import app.core.catalogo_empresas  # noqa: F401 - registra el estado de las empresas
+from app.core.catalogos import detener_catalogos, iniciar_catalogos
 from app.core.config import settings
+from app.core.eventos import distribuidor_eventos
 from app.core.logging_config import setup_logging
+from app.core.metricas import CONTENT_TYPE_LATEST, finalizar_proceso, generar_metricas
+from app.core.monitor_loop import monitor_loop
+from app.core.middleware import (
+    ConsultasMiddleware,
+    ContextoAuditoriaMiddleware,
+    GZipSinEventosMiddleware,
+    MetricasMiddleware,
+    PerfilMiddleware,
+    TiemposMiddleware,
+)
+from app.core.tiempos import JSONResponseMedida, instrumentar_serializacion
+import app.core.resumen_pagos  # noqa: F401 - mantiene el resumen diario de pagos
 
 # Configurar logging
 setup_logging()
@@ -21,9 +39,13 @@ app = FastAPI(
     description="Sistema de gestión de nómina de conductores para DRTC Puno",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=JSONResponseMedida
 )
 
+# Tiempo de serialización del response_model para el desglose por petición
+instrumentar_serializacion()
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,8 +55,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Comprimir respuestas
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Comprimir respuestas (excepto flujos SSE)
+app.add_middleware(GZipSinEventosMiddleware, minimum_size=1000)
+
+# IP y user agent para la auditoría
+app.add_middleware(ContextoAuditoriaMiddleware)
+
+# Desglose de tiempos (todas las peticiones en desarrollo, una muestra en producción)
+app.add_middleware(
+    TiemposMiddleware,
+    muestreo=1.0 if settings.ENVIRONMENT == "development" else settings.TIEMPOS_MUESTREO
+)
+
+# Sentencias SQL y cargas diferidas por petición (en cabeceras solo en desarrollo)
+app.add_middleware(ConsultasMiddleware, cabeceras=settings.ENVIRONMENT == "development")
+
+# Duración de las peticiones por ruta para /metrics
+app.add_middleware(MetricasMiddleware)
+
+# Perfil de las peticiones con token de perfil de SUPERUSUARIO (el más externo)
+app.add_middleware(PerfilMiddleware)
 
 # Rate limiting
 limiter = Limiter(key_func=get_remote_address)
@@ -42,6 +82,24 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
+@app.on_event("startup")
+async def startup():
+    """Arrancar el escritor de auditoría y el monitor del loop, y cargar los catálogos"""
+    escritor_auditoria.iniciar()
+    monitor_loop.iniciar()
+    await iniciar_catalogos()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Cerrar la suscripción de eventos y escribir la auditoría pendiente"""
+    await detener_catalogos()
+    await distribuidor_eventos.cerrar()
+    await escritor_auditoria.detener()
+    await monitor_loop.detener()
+    finalizar_proceso()
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz"""
@@ -62,6 +120,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metricas():
+    """Métricas de Prometheus (todos los workers si hay varios)"""
+    return Response(generar_metricas(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Importar y registrar routers
 from app.api.v1.api import api_router
 app.include_router(api_router, prefix="/api/v1")
@@ -6,7 +6,7 @@ from app.models.user import Usuario, RolUsuario
 from app.models.empresa import Empresa, TipoAutorizacion, AutorizacionEmpresa
 from app.models.conductor import Conductor, EstadoConductor
 from app.models.documento_conductor import DocumentoConductor, TipoDocumento
-from app.models.habilitacion import Habilitacion, Pago, ConceptoTUPA, EstadoHabilitacion, EstadoPago
+from app.models.habilitacion import Habilitacion, Pago, PagoResumenDiario, ConceptoTUPA, EstadoHabilitacion, EstadoPago
 from app.models.infraccion import (
     TipoInfraccion,
     Infraccion,
@@ -29,6 +29,7 @@ __all__ = [
     "TipoDocumento",
     "Habilitacion",
     "Pago",
+    "PagoResumenDiario",
     "ConceptoTUPA",
     "EstadoHabilitacion",
     "EstadoPago",
@@ -2,8 +2,9 @@
 Modelos de Auditoría y Notificación
 """
 import enum
+import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, Index, Boolean, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
@@ -25,10 +26,29 @@ class AccionAuditoria(str, enum.Enum):
 
 
 class Auditoria(BaseModel):
-    """Modelo para registro de auditoría de acciones críticas"""
+    """
+    Modelo para registro de auditoría de acciones críticas
+    
+    En PostgreSQL la tabla está particionada por rango mensual de created_at
+    (ver app.services.auditoria_service), por lo que la clave primaria
+    incluye created_at y el id no tiene un índice único propio.
+    """
     
     __tablename__ = "auditoria"
     
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        nullable=False,
+        index=True
+    )
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        default=datetime.utcnow,
+        nullable=False
+    )
     usuario_id = Column(
         UUID(as_uuid=True),
         ForeignKey("usuarios.id"),
@@ -51,23 +71,37 @@ class Auditoria(BaseModel):
     # Relaciones
     usuario = relationship("Usuario", foreign_keys=[usuario_id])
     
-    # Índices compuestos
+    # Índices compuestos; terminan en (created_at, id) para la paginación keyset
     __table_args__ = (
-        Index('idx_auditoria_usuario_fecha', 'usuario_id', 'created_at'),
+        Index('idx_auditoria_usuario_fecha', 'usuario_id', 'created_at', 'id'),
         Index('idx_auditoria_tabla_accion', 'tabla', 'accion'),
-        Index('idx_auditoria_registro', 'tabla', 'registro_id'),
-        Index('idx_auditoria_fecha', 'created_at'),
+        Index('idx_auditoria_registro', 'tabla', 'registro_id', 'created_at', 'id'),
+        Index('idx_auditoria_tabla_fecha', 'tabla', 'created_at', 'id'),
+        Index('idx_auditoria_fecha', 'created_at', 'id'),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
     
     def __repr__(self):
         return f"<Auditoria {self.accion} en {self.tabla} por {self.usuario_id}>"
 
 
+# Con create_all en PostgreSQL, la partición por defecto evita que las
+# inserciones fallen antes de que el mantenimiento cree las mensuales
+event.listen(
+    Auditoria.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS auditoria_default PARTITION OF auditoria DEFAULT").execute_if(
+        dialect="postgresql"
+    )
+)
+
+
 class TipoNotificacion(str, enum.Enum):
     """Enum para tipos de notificaciones"""
     SOLICITUD_OBSERVADA = "solicitud_observada"
     CONDUCTOR_HABILITADO = "conductor_habilitado"
     LICENCIA_POR_VENCER = "licencia_por_vencer"
+    CERTIFICADO_POR_VENCER = "certificado_por_vencer"
     CERTIFICADO_VENCIDO = "certificado_vencido"
     INFRACCION_GRAVE = "infraccion_grave"
     ACTUALIZACION_TUPA = "actualizacion_tupa"
@@ -102,6 +136,9 @@ class Notificacion(BaseModel):
     # Datos adicionales en JSON
     datos_adicionales = Column(JSON, nullable=True)
     
+    # Clave para evitar notificaciones automáticas duplicadas
+    clave_deduplicacion = Column(String(255), nullable=True)
+    
     # Relaciones
     usuario = relationship("Usuario", back_populates="notificaciones")
     
@@ -110,6 +147,7 @@ class Notificacion(BaseModel):
         Index('idx_notificacion_usuario_leida', 'usuario_id', 'leida'),
         Index('idx_notificacion_tipo_fecha', 'tipo', 'enviada_at'),
         Index('idx_notificacion_usuario_fecha', 'usuario_id', 'enviada_at'),
+        Index('idx_notificacion_clave_deduplicacion', 'clave_deduplicacion', unique=True),
     )
     
     def __repr__(self):
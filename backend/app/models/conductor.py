@@ -121,34 +121,45 @@ class Conductor(BaseModel):
         comment="Observaciones sobre el conductor"
     )
     
-    # Relaciones
+    # Relaciones (las colecciones se cargan de forma explícita,
+    # ver app.repositories.carga)
     empresa = relationship(
         "Empresa",
         back_populates="conductores"
     )
     
+    # Sin passive_deletes: al eliminar el conductor el ORM carga y elimina
+    # sus habilitaciones y pagos, que así se auditan y se restan del
+    # resumen diario de pagos
     habilitaciones = relationship(
         "Habilitacion",
         back_populates="conductor",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
     
     infracciones = relationship(
         "Infraccion",
         back_populates="conductor",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
     )
     
     asignaciones_vehiculo = relationship(
         "AsignacionVehiculo",
         back_populates="conductor",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
     )
     
     documentos = relationship(
         "DocumentoConductor",
         back_populates="conductor",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
     )
     
     # Índices compuestos
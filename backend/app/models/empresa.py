@@ -105,10 +105,13 @@ class Empresa(BaseModel):
         cascade="all, delete-orphan"
     )
     
+    # Sin passive_deletes: la eliminación llega por el ORM hasta los pagos
+    # (ver Conductor.habilitaciones)
     conductores = relationship(
         "Conductor",
         back_populates="empresa",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise"
     )
     
     # Índices compuestos
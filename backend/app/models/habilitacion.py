@@ -4,9 +4,10 @@ Modelos de Habilitación y Pago
 import enum
 from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Text, Date, DateTime, Numeric, Index, Boolean
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Text, Date, DateTime, Numeric, Index, Boolean, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
 from app.models.base import BaseModel
 
 
@@ -18,6 +19,7 @@ class EstadoHabilitacion(str, enum.Enum):
     OBSERVADO = "observado"
     RECHAZADO = "rechazado"
     HABILITADO = "habilitado"
+    VENCIDO = "vencido"  # Asignado por el barrido nocturno de vencimientos
 
 
 class EstadoPago(str, enum.Enum):
@@ -72,7 +74,8 @@ class ConceptoTUPA(BaseModel):
     # Relaciones
     pagos = relationship(
         "Pago",
-        back_populates="concepto_tupa"
+        back_populates="concepto_tupa",
+        lazy="raise"
     )
     
     # Índices
@@ -415,3 +418,49 @@ class Pago(BaseModel):
             self.observaciones += f"\nRechazado: {motivo}"
         else:
             self.observaciones = f"Rechazado: {motivo}"
+
+
+class PagoResumenDiario(Base):
+    """
+    Resumen diario de pagos por estado y concepto TUPA
+    
+    Se mantiene de forma incremental al escribir pagos (ver
+    app.core.resumen_pagos) para que los reportes de ingresos lean unas
+    pocas filas por día en lugar de recorrer todos los pagos. La clave
+    natural es la primaria, lo que permite acumular con un upsert y
+    reconstruir con INSERT ... SELECT.
+    """
+    
+    __tablename__ = "pagos_resumen_diario"
+    
+    fecha = Column(Date, primary_key=True)
+    
+    estado = Column(
+        SQLEnum(EstadoPago),
+        primary_key=True
+    )
+    
+    concepto_tupa_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("conceptos_tupa.id", ondelete="RESTRICT"),
+        primary_key=True
+    )
+    
+    cantidad = Column(Integer, nullable=False, default=0)
+    
+    monto_total = Column(
+        Numeric(14, 2),
+        nullable=False,
+        default=Decimal('0'),
+        comment="Suma de montos en soles (PEN)"
+    )
+    
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+    
+    def __repr__(self):
+        return f"<PagoResumenDiario {self.fecha} {self.estado} x{self.cantidad}>"
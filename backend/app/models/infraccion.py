@@ -40,7 +40,7 @@ class TipoInfraccion(BaseModel):
     activo = Column(String(10), nullable=False, default="true")
     
     # Relaciones
-    infracciones = relationship("Infraccion", back_populates="tipo_infraccion")
+    infracciones = relationship("Infraccion", back_populates="tipo_infraccion", lazy="raise")
     
     def __repr__(self):
         return f"<TipoInfraccion {self.codigo}: {self.descripcion[:50]}>"
@@ -7,6 +7,8 @@ from app.repositories.empresa_repository import EmpresaRepository
 from app.repositories.conductor_repository import ConductorRepository
 from app.repositories.habilitacion_repository import HabilitacionRepository
 from app.repositories.infraccion_repository import InfraccionRepository
+from app.repositories.notificacion_repository import NotificacionRepository
+from app.repositories.auditoria_repository import AuditoriaRepository
 
 __all__ = [
     "BaseRepository",
@@ -15,4 +17,6 @@ __all__ = [
     "ConductorRepository",
     "HabilitacionRepository",
     "InfraccionRepository",
+    "NotificacionRepository",
+    "AuditoriaRepository",
 ]
@@ -0,0 +1,145 @@
+"""
+Repositorio para Auditoria
+"""
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.auditoria import Auditoria
+from app.repositories.base import BaseRepository
+
+
+class AuditoriaRepository(BaseRepository[Auditoria]):
+    """
+    Repositorio específico para Auditoria
+
+    Incluye la consulta paginada por keyset y las operaciones sobre las
+    particiones mensuales de la tabla (solo PostgreSQL).
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(Auditoria, db)
+
+    async def listar_keyset(
+        self,
+        tabla: Optional[str] = None,
+        registro_id: Optional[str] = None,
+        usuario_id: Optional[UUID] = None,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        despues_de: Optional[Tuple[datetime, UUID]] = None,
+        limite: int = 50
+    ) -> List[Auditoria]:
+        """
+        Listar registros de auditoría del más reciente al más antiguo
+
+        Pagina por keyset sobre (created_at, id): cada página continúa
+        desde la última fila de la anterior, por lo que el costo no crece
+        con la profundidad y el filtro por created_at limita las particiones
+        que se recorren.
+
+        Args:
+            tabla: Filtrar por tabla auditada
+            registro_id: Filtrar por registro (junto con tabla)
+            usuario_id: Filtrar por usuario que realizó la acción
+            desde: Fecha y hora mínima (inclusive)
+            hasta: Fecha y hora máxima (exclusive)
+            despues_de: (created_at, id) de la última fila de la página anterior
+            limite: Número máximo de registros
+
+        Returns:
+            Lista de registros de auditoría
+        """
+        query = select(Auditoria)
+
+        if tabla is not None:
+            query = query.where(Auditoria.tabla == tabla)
+        if registro_id is not None:
+            query = query.where(Auditoria.registro_id == registro_id)
+        if usuario_id is not None:
+            query = query.where(Auditoria.usuario_id == usuario_id)
+        if desde is not None:
+            query = query.where(Auditoria.created_at >= desde)
+        if hasta is not None:
+            query = query.where(Auditoria.created_at < hasta)
+        if despues_de is not None:
+            # La cota simple sobre created_at permite descartar particiones;
+            # la comparación de tuplas sola no se usa para podarlas
+            query = query.where(
+                Auditoria.created_at <= despues_de[0],
+                tuple_(Auditoria.created_at, Auditoria.id) < tuple_(*despues_de)
+            )
+
+        query = query.order_by(
+            Auditoria.created_at.desc(),
+            Auditoria.id.desc()
+        ).limit(limite)
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def listar_particiones(self) -> List[str]:
+        """
+        Obtener los nombres de las particiones adjuntas a auditoria
+
+        Returns:
+            Nombres de las particiones (incluida la partición por defecto)
+        """
+        result = await self.db.execute(text(
+            "SELECT hija.relname FROM pg_inherits "
+            "JOIN pg_class padre ON padre.oid = pg_inherits.inhparent "
+            "JOIN pg_class hija ON hija.oid = pg_inherits.inhrelid "
+            "WHERE padre.relname = :tabla"
+        ), {"tabla": Auditoria.__tablename__})
+        return sorted(result.scalars().all())
+
+    async def crear_particion(self, nombre: str, inicio: date, fin: date) -> int:
+        """
+        Crear y adjuntar la partición de un rango de fechas
+
+        La partición se crea como tabla independiente y luego se adjunta,
+        lo que solo toma un bloqueo SHARE UPDATE EXCLUSIVE sobre auditoria
+        y no detiene las escrituras. Las filas del rango que hubieran caído
+        en la partición por defecto se mueven a la nueva partición.
+
+        Args:
+            nombre: Nombre de la partición
+            inicio: Inicio del rango (inclusive)
+            fin: Fin del rango (exclusive)
+
+        Returns:
+            Número de filas movidas desde la partición por defecto
+        """
+        await self.db.execute(text(
+            f"CREATE TABLE {nombre} "
+            f"(LIKE {Auditoria.__tablename__} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        movidas = await self.db.execute(text(
+            f"WITH movidas AS ("
+            f"DELETE FROM {Auditoria.__tablename__}_default "
+            f"WHERE created_at >= :inicio AND created_at < :fin RETURNING *"
+            f") INSERT INTO {nombre} SELECT * FROM movidas"
+        ), {"inicio": inicio, "fin": fin})
+        await self.db.execute(text(
+            f"ALTER TABLE {Auditoria.__tablename__} ATTACH PARTITION {nombre} "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+        ))
+        return movidas.rowcount
+
+    async def archivar_particion(self, nombre: str, esquema_archivo: str) -> None:
+        """
+        Desadjuntar una partición y moverla al esquema de archivo
+
+        Los datos dejan de ser visibles en auditoria pero se conservan en
+        `<esquema_archivo>.<nombre>` para exportarlos (pg_dump) o eliminarlos.
+
+        Args:
+            nombre: Nombre de la partición
+            esquema_archivo: Esquema de destino
+        """
+        await self.db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {esquema_archivo}"))
+        await self.db.execute(text(
+            f"ALTER TABLE {Auditoria.__tablename__} DETACH PARTITION {nombre}"
+        ))
+        await self.db.execute(text(f"ALTER TABLE {nombre} SET SCHEMA {esquema_archivo}"))
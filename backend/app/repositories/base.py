@@ -5,6 +5,7 @@ from typing import Generic, TypeVar, Type, Optional, List, Dict, Any
 from uuid import UUID
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.metricas import medir_repositorio
 from app.models.base import BaseModel
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
@@ -35,6 +36,11 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
         self.db = db
     
+    def __init_subclass__(cls, **kwargs):
+        """Medir los métodos públicos de cada repositorio (ver app.core.metricas)"""
+        super().__init_subclass__(**kwargs)
+        medir_repositorio(cls)
+    
     async def get_by_id(self, id: UUID) -> Optional[ModelType]:
         """
         Obtener registro por ID
@@ -239,3 +245,6 @@ class BaseRepository(Generic[ModelType]):
         )
         count = result.scalar()
         return count > 0
+
+
+medir_repositorio(BaseRepository)
@@ -0,0 +1,131 @@
+"""
+Política de carga de relaciones para los repositorios
+
+Las colecciones que crecen con el historial de un registro (habilitaciones,
+infracciones, documentos de un conductor, conductores de una empresa, ...)
+se declaran con lazy="raise" en los modelos: acceder a una colección que
+el repositorio no cargó es un error inmediato, en vez de una consulta
+implícita o de un grafo completo en memoria. Los repositorios deciden qué
+cargar con estas piezas:
+
+- ultimos() y cargar_ultimos(): las N filas más recientes de una colección
+  para cada padre, en una sola consulta con ROW_NUMBER() OVER (PARTITION BY).
+- proyeccion(): selectinload de una relación limitado a algunas columnas
+  (load_only); leer otra columna también es un error.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, load_only, selectinload
+from sqlalchemy.orm.attributes import InstrumentedAttribute, set_committed_value
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+@dataclass(frozen=True)
+class Ultimos:
+    """Límite de filas de una colección: las primeras `limite` según `orden`"""
+
+    relacion: InstrumentedAttribute
+    limite: int
+    orden: Tuple[Any, ...]
+    columnas: Tuple[InstrumentedAttribute, ...] = ()
+
+
+def ultimos(
+    relacion: InstrumentedAttribute,
+    limite: int,
+    *orden: Any,
+    columnas: Sequence[InstrumentedAttribute] = ()
+) -> Ultimos:
+    """
+    Declarar la carga de las N filas más recientes de una colección
+
+    Args:
+        relacion: Colección uno a muchos, p. ej. Conductor.habilitaciones
+        limite: Filas por padre
+        orden: Columnas del hijo que definen "más reciente" (p. ej. fecha.desc())
+        columnas: Columnas del hijo a cargar; por defecto, todas
+
+    Returns:
+        Límite para cargar_ultimos()
+    """
+    if not relacion.property.uselist:
+        raise ValueError(f"{relacion} no es una colección")
+    return Ultimos(relacion, limite, tuple(orden), tuple(columnas))
+
+
+def proyeccion(
+    relacion: InstrumentedAttribute,
+    *columnas: InstrumentedAttribute
+) -> LoaderOption:
+    """
+    selectinload de una relación cargando solo algunas columnas
+
+    La clave primaria se carga siempre. Leer una columna no incluida lanza
+    un error en lugar de consultar la base de datos.
+
+    Args:
+        relacion: Relación a cargar, p. ej. Infraccion.conductor
+        columnas: Columnas del destino a cargar
+
+    Returns:
+        Opción de carga para Select.options(); admite cadenas como
+        .selectinload(Conductor.empresa)
+    """
+    return selectinload(relacion).load_only(*columnas, raiseload=True)
+
+
+async def cargar_ultimos(db: AsyncSession, padres: Sequence[Any], *limites: Ultimos) -> None:
+    """
+    Cargar en los padres las colecciones limitadas
+
+    Cada límite es una consulta para todos los padres. La colección queda
+    cargada (sin historial de cambios) con solo esas filas, en orden.
+
+    Args:
+        db: Sesión de base de datos
+        padres: Instancias ya cargadas, todas del modelo de las relaciones
+        limites: Colecciones a cargar, declaradas con ultimos()
+    """
+    if not padres:
+        return
+
+    for limite in limites:
+        propiedad = limite.relacion.property
+        hijo = propiedad.mapper
+        # Relaciones uno a muchos simples: padre.<local> = hijo.<remota>
+        (local, remota), = propiedad.local_remote_pairs
+        clave_padre = propiedad.parent.get_property_by_column(local).key
+        clave_hijo = hijo.get_property_by_column(remota).key
+
+        ids = {getattr(padre, clave_padre) for padre in padres}
+        columna_hijo = getattr(hijo.class_, clave_hijo)
+        rango = func.row_number().over(partition_by=columna_hijo, order_by=limite.orden).label("rango")
+        numeradas = (
+            select(hijo.class_, rango)
+            .where(columna_hijo.in_(ids))
+            .subquery()
+        )
+        fila = aliased(hijo.class_, numeradas)
+        query = (
+            select(fila)
+            .where(numeradas.c.rango <= limite.limite)
+            .order_by(numeradas.c.rango)
+        )
+        if limite.columnas:
+            query = query.options(load_only(
+                *(getattr(fila, columna.key) for columna in limite.columnas),
+                getattr(fila, clave_hijo),
+                raiseload=True
+            ))
+
+        result = await db.execute(query)
+        por_padre: Dict[Any, List[Any]] = defaultdict(list)
+        for instancia in result.scalars():
+            por_padre[getattr(instancia, clave_hijo)].append(instancia)
+
+        for padre in padres:
+            set_committed_value(padre, limite.relacion.key, por_padre.get(getattr(padre, clave_padre), []))
@@ -1,14 +1,41 @@
 """
 Repositorio para Conductor
 """
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, AsyncIterator, Iterable, Sequence, Set
 from uuid import UUID
-from datetime import date, timedelta
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import selectinload
+from datetime import date, datetime, timedelta
+from sqlalchemy import JSON, select, or_, and_, update, exists, case, func, literal_column, true, type_coerce, Row
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import selectinload, aliased
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.models.conductor import Conductor, EstadoConductor
 from app.repositories.base import BaseRepository
+from app.repositories.carga import cargar_ultimos, ultimos
+
+
+# Columnas del conductor que se cargan junto a habilitaciones e infracciones
+COLUMNAS_RESUMEN_CONDUCTOR = (
+    Conductor.dni,
+    Conductor.nombres,
+    Conductor.apellidos,
+    Conductor.empresa_id,
+    Conductor.estado,
+    Conductor.licencia_numero,
+    Conductor.licencia_categoria,
+)
+
+
+def _objeto_json(constructor: Callable, campos: Dict[str, Any]):
+    """Objeto JSON con las claves como literales (json_build_object no admite parámetros sin tipo)"""
+    argumentos = []
+    for clave, valor in campos.items():
+        argumentos.extend((literal_column(f"'{clave}'"), valor))
+    return constructor(*argumentos)
+
+
+def _contar_si(condicion):
+    return func.count(case((condicion, literal_column("1"))))
 
 
 class ConductorRepository(BaseRepository[Conductor]):
@@ -17,26 +44,45 @@ class ConductorRepository(BaseRepository[Conductor]):
     def __init__(self, db: AsyncSession):
         super().__init__(Conductor, db)
     
-    async def get_by_dni(self, dni: str) -> Optional[Conductor]:
+    async def get_by_dni(self, dni: str, historial: Optional[int] = None) -> Optional[Conductor]:
         """
         Obtener conductor por DNI
         
+        Carga la empresa y solo las habilitaciones e infracciones más
+        recientes; el historial completo se consulta paginado en sus
+        repositorios.
+        
         Args:
             dni: DNI del conductor
+            historial: Habilitaciones e infracciones a cargar
+                (por defecto CONDUCTORES_HISTORIAL_RECIENTE)
             
         Returns:
             Conductor o None si no existe
         """
+        from app.models.habilitacion import Habilitacion
+        from app.models.infraccion import Infraccion
+        
         result = await self.db.execute(
             select(Conductor)
-            .options(
-                selectinload(Conductor.empresa),
-                selectinload(Conductor.habilitaciones),
-                selectinload(Conductor.infracciones)
-            )
+            .options(selectinload(Conductor.empresa))
             .where(Conductor.dni == dni)
         )
-        return result.scalar_one_or_none()
+        conductor = result.scalar_one_or_none()
+        if conductor is not None:
+            limite = historial or settings.CONDUCTORES_HISTORIAL_RECIENTE
+            await cargar_ultimos(
+                self.db,
+                [conductor],
+                ultimos(Conductor.habilitaciones, limite, Habilitacion.fecha_solicitud.desc()),
+                ultimos(
+                    Conductor.infracciones,
+                    limite,
+                    Infraccion.fecha_infraccion.desc(),
+                    Infraccion.created_at.desc()
+                )
+            )
+        return conductor
     
     async def get_by_licencia(self, licencia_numero: str) -> Optional[Conductor]:
         """
@@ -217,6 +263,59 @@ class ConductorRepository(BaseRepository[Conductor]):
         )
         return list(result.scalars().all())
     
+    async def stream_documentos_por_vencer(
+        self,
+        fecha_referencia: date,
+        dias_anticipacion: int = 30,
+        tamano_lote: int = 500
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Recorrer por lotes los conductores con licencia o certificado por vencer
+        
+        Usa un cursor del lado del servidor y devuelve solo columnas (no
+        entidades ORM), por lo que la memoria depende del tamaño del lote y
+        no del total de conductores. Las filas se ordenan por empresa e
+        incluyen el gerente de la empresa como destinatario.
+        
+        Args:
+            fecha_referencia: Fecha desde la que se cuentan los días
+            dias_anticipacion: Días de anticipación para alertar
+            tamano_lote: Filas por lote
+            
+        Yields:
+            Lotes de filas con los datos del conductor y de su empresa
+        """
+        from app.models.empresa import Empresa
+        
+        fecha_limite = fecha_referencia + timedelta(days=dias_anticipacion)
+        
+        result = await self.db.stream(
+            select(
+                Conductor.id,
+                Conductor.dni,
+                Conductor.nombres,
+                Conductor.apellidos,
+                Conductor.licencia_vencimiento,
+                Conductor.certificado_medico_vencimiento,
+                Conductor.empresa_id,
+                Empresa.razon_social,
+                Empresa.gerente_id
+            )
+            .join(Empresa, Empresa.id == Conductor.empresa_id)
+            .where(
+                Conductor.estado == EstadoConductor.HABILITADO,
+                Empresa.gerente_id.is_not(None),
+                or_(
+                    Conductor.licencia_vencimiento.between(fecha_referencia, fecha_limite),
+                    Conductor.certificado_medico_vencimiento.between(fecha_referencia, fecha_limite)
+                )
+            )
+            .order_by(Conductor.empresa_id, Conductor.id)
+            .execution_options(yield_per=tamano_lote)
+        )
+        async for lote in result.partitions():
+            yield lote
+    
     async def get_conductores_con_certificado_por_vencer(
         self,
         dias_anticipacion: int = 30
@@ -286,3 +385,369 @@ class ConductorRepository(BaseRepository[Conductor]):
             Número de conductores de la empresa
         """
         return await self.count(filters={"empresa_id": empresa_id})
+    
+    async def stream_nomina(
+        self,
+        empresa_id: UUID,
+        columnas: Sequence[str],
+        tamano_lote: int = 1000
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Recorrer por lotes los conductores de una empresa
+        
+        Usa un cursor del lado del servidor y devuelve solo columnas.
+        
+        Args:
+            empresa_id: ID de la empresa
+            columnas: Columnas de Conductor a incluir además de id, dni y estado
+            tamano_lote: Filas por lote
+            
+        Yields:
+            Lotes de filas con id, dni, estado y las columnas pedidas
+        """
+        result = await self.db.stream(
+            select(
+                Conductor.id,
+                Conductor.dni,
+                Conductor.estado,
+                *(getattr(Conductor, columna) for columna in columnas)
+            )
+            .where(Conductor.empresa_id == empresa_id)
+            .execution_options(yield_per=tamano_lote)
+        )
+        async for lote in result.partitions():
+            yield lote
+    
+    async def get_nomina_para_actualizar(
+        self,
+        empresa_id: UUID,
+        ids: Sequence[UUID],
+        columnas: Sequence[str]
+    ) -> List[Row]:
+        """
+        Obtener y bloquear conductores de una empresa por ID
+        
+        Args:
+            empresa_id: ID de la empresa
+            ids: IDs de los conductores
+            columnas: Columnas de Conductor a incluir además de id, dni y estado
+            
+        Returns:
+            Filas de los conductores encontrados (bloqueadas hasta el fin de la transacción)
+        """
+        if not ids:
+            return []
+        result = await self.db.execute(
+            select(
+                Conductor.id,
+                Conductor.dni,
+                Conductor.estado,
+                *(getattr(Conductor, columna) for columna in columnas)
+            )
+            .where(Conductor.empresa_id == empresa_id, Conductor.id.in_(ids))
+            .with_for_update()
+        )
+        return list(result.all())
+    
+    async def get_valores_registrados(
+        self,
+        columna: str,
+        valores: Iterable[str],
+        excluir_ids: Iterable[UUID] = ()
+    ) -> Set[str]:
+        """
+        Valores de una columna única que ya están registrados
+        
+        Args:
+            columna: Columna única (dni o licencia_numero)
+            valores: Valores a buscar
+            excluir_ids: Conductores que no se consideran
+            
+        Returns:
+            Subconjunto de `valores` que ya usa algún conductor
+        """
+        valores = list(valores)
+        if not valores:
+            return set()
+        campo = getattr(Conductor, columna)
+        query = select(campo).where(campo.in_(valores))
+        excluir_ids = list(excluir_ids)
+        if excluir_ids:
+            query = query.where(Conductor.id.not_in(excluir_ids))
+        result = await self.db.execute(query)
+        return set(result.scalars().all())
+    
+    async def cambiar_estado_empresa(
+        self,
+        empresa_id: UUID,
+        estado_actual: EstadoConductor,
+        nuevo_estado: EstadoConductor,
+        nota: str,
+        conductor_ids: Optional[Sequence[UUID]] = None
+    ) -> List[Row]:
+        """
+        Cambiar en una sentencia el estado de los conductores de una empresa
+        
+        Es un único UPDATE ... WHERE estado = ... RETURNING, sin cargar
+        entidades: la condición sobre el estado se evalúa al bloquear cada
+        fila, así que un cambio concurrente no se sobrescribe.
+        
+        Args:
+            empresa_id: ID de la empresa
+            estado_actual: Estado de los conductores que cambian
+            nuevo_estado: Estado de destino
+            nota: Texto agregado a las observaciones del conductor
+            conductor_ids: Limitar el cambio a estos conductores
+            
+        Returns:
+            Filas con id y dni de cada conductor actualizado
+        """
+        condiciones = [
+            Conductor.empresa_id == empresa_id,
+            Conductor.estado == estado_actual
+        ]
+        if conductor_ids is not None:
+            condiciones.append(Conductor.id.in_(conductor_ids))
+        
+        result = await self.db.execute(
+            update(Conductor)
+            .where(*condiciones)
+            .values(
+                estado=nuevo_estado,
+                observaciones=case(
+                    (Conductor.observaciones.is_(None), nota),
+                    else_=Conductor.observaciones + "\n" + nota
+                ),
+                updated_at=datetime.utcnow()
+            )
+            .returning(Conductor.id, Conductor.dni)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.all())
+    
+    async def suspender_con_documentos_vencidos(
+        self,
+        fecha_corte: date,
+        limite: int = 1000,
+        motivo: str = "Suspendido automáticamente por vencimiento"
+    ) -> int:
+        """
+        Suspender un lote de conductores habilitados con documentos vencidos
+        
+        Se suspenden los conductores HABILITADO cuya licencia o certificado
+        médico venció, o cuya habilitación fue marcada como VENCIDO sin tener
+        otra habilitación vigente.
+        
+        Args:
+            fecha_corte: Fecha de referencia para el vencimiento
+            limite: Tamaño máximo del lote
+            motivo: Texto agregado a las observaciones del conductor
+            
+        Returns:
+            Número de conductores suspendidos
+        """
+        from app.models.habilitacion import Habilitacion, EstadoHabilitacion
+        
+        candidato = aliased(Conductor)
+        habilitacion_vencida = exists().where(
+            Habilitacion.conductor_id == candidato.id,
+            Habilitacion.estado == EstadoHabilitacion.VENCIDO
+        )
+        habilitacion_vigente = exists().where(
+            Habilitacion.conductor_id == candidato.id,
+            Habilitacion.estado == EstadoHabilitacion.HABILITADO
+        )
+        lote = (
+            select(candidato.id)
+            .where(
+                candidato.estado == EstadoConductor.HABILITADO,
+                or_(
+                    candidato.licencia_vencimiento < fecha_corte,
+                    candidato.certificado_medico_vencimiento < fecha_corte,
+                    and_(habilitacion_vencida, ~habilitacion_vigente)
+                )
+            )
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        
+        # Misma convención que Conductor.cambiar_estado()
+        nota = f"{fecha_corte}: {motivo}"
+        result = await self.db.execute(
+            update(Conductor)
+            .where(Conductor.id.in_(lote))
+            .values(
+                estado=EstadoConductor.SUSPENDIDO,
+                observaciones=case(
+                    (Conductor.observaciones.is_(None), nota),
+                    else_=Conductor.observaciones + "\n" + nota
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    async def get_ficha(self, conductor_id: UUID, limite_infracciones: int) -> Optional[Row]:
+        """
+        Obtener la ficha de un conductor en una sola consulta
+        
+        Cada parte de la ficha es una subconsulta que devuelve un único
+        valor JSON: la última habilitación con su pago, los agregados de
+        infracciones, los conteos de documentos y las últimas infracciones.
+        En PostgreSQL las subconsultas se unen como LATERAL
+        (json_build_object/json_agg); en otros motores van como subconsultas
+        escalares con las funciones JSON de SQLite.
+        
+        Las claves de estados, gravedades y tipos de documento son los
+        valores de los enums; los estados dentro de la habilitación y de
+        cada infracción quedan con el nombre del enum, como en la tabla.
+        
+        Args:
+            conductor_id: ID del conductor
+            limite_infracciones: Máximo de infracciones recientes incluidas
+            
+        Returns:
+            Fila con el conductor, el resumen de su empresa y las partes
+            JSON de la ficha, o None si el conductor no existe
+        """
+        from app.models.documento_conductor import DocumentoConductor, TipoDocumento
+        from app.models.empresa import Empresa
+        from app.models.habilitacion import Habilitacion, Pago
+        from app.models.infraccion import Infraccion, TipoInfraccion, EstadoInfraccion, GravedadInfraccion
+        
+        postgresql = self.db.bind.dialect.name == "postgresql"
+        objeto = func.json_build_object if postgresql else func.json_object
+        
+        ultima_habilitacion = (
+            select(
+                _objeto_json(objeto, {
+                    "id": Habilitacion.id,
+                    "codigo_habilitacion": Habilitacion.codigo_habilitacion,
+                    "estado": Habilitacion.estado,
+                    "fecha_solicitud": Habilitacion.fecha_solicitud,
+                    "fecha_habilitacion": Habilitacion.fecha_habilitacion,
+                    "vigencia_hasta": Habilitacion.vigencia_hasta,
+                    "observaciones": Habilitacion.observaciones,
+                    "pago": _objeto_json(objeto, {
+                        "id": Pago.id,
+                        "numero_recibo": Pago.numero_recibo,
+                        "monto": Pago.monto,
+                        "fecha_pago": Pago.fecha_pago,
+                        "entidad_bancaria": Pago.entidad_bancaria,
+                        "estado": Pago.estado,
+                        "fecha_confirmacion": Pago.fecha_confirmacion,
+                    }),
+                })
+            )
+            .select_from(Habilitacion)
+            .outerjoin(Pago, Pago.habilitacion_id == Habilitacion.id)
+            .where(Habilitacion.conductor_id == Conductor.id)
+            .order_by(Habilitacion.fecha_solicitud.desc())
+            .limit(1)
+        )
+        
+        resumen_infracciones = (
+            select(
+                _objeto_json(objeto, {
+                    "total": func.count(Infraccion.id),
+                    "puntos": func.coalesce(
+                        func.sum(case((Infraccion.estado != EstadoInfraccion.ANULADA, TipoInfraccion.puntos))),
+                        literal_column("0")
+                    ),
+                    "ultima_fecha": func.max(Infraccion.fecha_infraccion),
+                    "por_estado": _objeto_json(objeto, {
+                        estado.value: _contar_si(Infraccion.estado == estado)
+                        for estado in EstadoInfraccion
+                    }),
+                    "por_gravedad": _objeto_json(objeto, {
+                        gravedad.value: _contar_si(TipoInfraccion.gravedad == gravedad)
+                        for gravedad in GravedadInfraccion
+                    }),
+                })
+            )
+            .select_from(Infraccion)
+            .join(TipoInfraccion, TipoInfraccion.id == Infraccion.tipo_infraccion_id)
+            .where(Infraccion.conductor_id == Conductor.id)
+        )
+        
+        documentos = (
+            select(
+                _objeto_json(objeto, {
+                    "total": func.count(DocumentoConductor.id),
+                    "por_tipo": _objeto_json(objeto, {
+                        tipo.value: _contar_si(DocumentoConductor.tipo_documento == tipo)
+                        for tipo in TipoDocumento
+                    }),
+                })
+            )
+            .where(DocumentoConductor.conductor_id == Conductor.id)
+        )
+        
+        # Las N más recientes se limitan antes de agregar
+        recientes = (
+            select(
+                Infraccion.id,
+                Infraccion.fecha_infraccion,
+                Infraccion.numero_acta,
+                Infraccion.entidad_fiscalizadora,
+                Infraccion.estado,
+                Infraccion.created_at,
+                TipoInfraccion.codigo,
+                TipoInfraccion.gravedad,
+                TipoInfraccion.puntos
+            )
+            .join(TipoInfraccion, TipoInfraccion.id == Infraccion.tipo_infraccion_id)
+            .where(Infraccion.conductor_id == Conductor.id)
+            .order_by(Infraccion.fecha_infraccion.desc(), Infraccion.created_at.desc())
+            .limit(limite_infracciones)
+            .correlate(Conductor)
+            .subquery("recientes")
+        )
+        infraccion = _objeto_json(objeto, {
+            "id": recientes.c.id,
+            "fecha_infraccion": recientes.c.fecha_infraccion,
+            "numero_acta": recientes.c.numero_acta,
+            "entidad_fiscalizadora": recientes.c.entidad_fiscalizadora,
+            "estado": recientes.c.estado,
+            "tipo_codigo": recientes.c.codigo,
+            "gravedad": recientes.c.gravedad,
+            "puntos": recientes.c.puntos,
+        })
+        if postgresql:
+            agregado = func.json_agg(aggregate_order_by(
+                infraccion, recientes.c.fecha_infraccion.desc(), recientes.c.created_at.desc()
+            ))
+        else:
+            # SQLite agrega en el orden de la subconsulta
+            agregado = func.json_group_array(infraccion)
+        ultimas_infracciones = select(agregado).select_from(recientes)
+        
+        partes = {
+            "ultima_habilitacion": ultima_habilitacion,
+            "infracciones": resumen_infracciones,
+            "documentos": documentos,
+            "ultimas_infracciones": ultimas_infracciones,
+        }
+        query = (
+            select(
+                Conductor,
+                Empresa.ruc.label("empresa_ruc"),
+                Empresa.razon_social.label("empresa_razon_social"),
+                Empresa.activo.label("empresa_activo")
+            )
+            .outerjoin(Empresa, Empresa.id == Conductor.empresa_id)
+            .where(Conductor.id == conductor_id)
+        )
+        for nombre, parte in partes.items():
+            parte = parte.with_only_columns(
+                type_coerce(parte.selected_columns[0], JSON).label("dato"),
+                maintain_column_froms=True
+            ).correlate(Conductor)
+            if postgresql:
+                lateral = parte.lateral(f"ficha_{nombre}")
+                query = query.outerjoin(lateral, true()).add_columns(lateral.c.dato.label(nombre))
+            else:
+                query = query.add_columns(parte.scalar_subquery().label(nombre))
+        
+        result = await self.db.execute(query)
+        return result.first()
@@ -3,10 +3,12 @@ Repositorio para Empresa
 """
 from typing import Optional, List
 from uuid import UUID
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from datetime import date
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload, aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.empresa import Empresa, AutorizacionEmpresa, TipoAutorizacion
+from app.models.empresa import Empresa, AutorizacionEmpresa
+from app.core.catalogo_tipos import catalogo_tipos
 from app.repositories.base import BaseRepository
 
 
@@ -179,12 +181,16 @@ class EmpresaRepository(BaseRepository[Empresa]):
         Returns:
             Lista de empresas
         """
+        indice = await catalogo_tipos.obtener(self.db)
+        tipo = indice.tipos_autorizacion_por_codigo.get(tipo_autorizacion_codigo)
+        if tipo is None:
+            return []
+        
         result = await self.db.execute(
             select(Empresa)
             .join(Empresa.autorizaciones)
-            .join(AutorizacionEmpresa.tipo_autorizacion)
             .where(
-                TipoAutorizacion.codigo == tipo_autorizacion_codigo,
+                AutorizacionEmpresa.tipo_autorizacion_id == tipo.id,
                 AutorizacionEmpresa.vigente == True,
                 Empresa.activo == True
             )
@@ -193,3 +199,39 @@ class EmpresaRepository(BaseRepository[Empresa]):
             )
         )
         return list(result.scalars().unique().all())
+    
+    async def marcar_autorizaciones_vencidas(
+        self,
+        fecha_corte: date,
+        limite: int = 1000
+    ) -> int:
+        """
+        Marcar como no vigentes un lote de autorizaciones vencidas
+        
+        Equivalente en bloque a AutorizacionEmpresa.actualizar_vigencia().
+        
+        Args:
+            fecha_corte: Se vencen las autorizaciones con fecha_vencimiento anterior a esta fecha
+            limite: Tamaño máximo del lote
+            
+        Returns:
+            Número de autorizaciones actualizadas
+        """
+        candidata = aliased(AutorizacionEmpresa)
+        lote = (
+            select(candidata.id)
+            .where(
+                candidata.vigente == True,
+                candidata.fecha_vencimiento < fecha_corte
+            )
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        
+        result = await self.db.execute(
+            update(AutorizacionEmpresa)
+            .where(AutorizacionEmpresa.id.in_(lote))
+            .values(vigente=False)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
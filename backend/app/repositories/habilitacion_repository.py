@@ -4,11 +4,14 @@ Repositorio para Habilitacion
 from typing import Optional, List
 from uuid import UUID
 from datetime import date
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, or_, update
+from sqlalchemy.orm import selectinload, aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.habilitacion import Habilitacion, EstadoHabilitacion, Pago
+from app.models.conductor import Conductor
+from app.models.habilitacion import Habilitacion, EstadoHabilitacion, EstadoPago, Pago
 from app.repositories.base import BaseRepository
+from app.repositories.carga import proyeccion
+from app.repositories.conductor_repository import COLUMNAS_RESUMEN_CONDUCTOR
 
 
 class HabilitacionRepository(BaseRepository[Habilitacion]):
@@ -63,14 +66,18 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
     async def get_by_conductor(
         self,
         conductor_id: UUID,
-        estado: Optional[EstadoHabilitacion] = None
+        estado: Optional[EstadoHabilitacion] = None,
+        skip: int = 0,
+        limit: int = 100
     ) -> List[Habilitacion]:
         """
-        Obtener habilitaciones de un conductor
+        Obtener habilitaciones de un conductor, de la más reciente a la más antigua
         
         Args:
             conductor_id: ID del conductor
             estado: Estado de la habilitación (opcional)
+            skip: Número de registros a saltar
+            limit: Número máximo de registros
             
         Returns:
             Lista de habilitaciones
@@ -80,6 +87,8 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
             filters["estado"] = estado.value
         
         return await self.get_all(
+            skip=skip,
+            limit=limit,
             filters=filters,
             order_by="fecha_solicitud",
             order_desc=True
@@ -105,7 +114,7 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         result = await self.db.execute(
             select(Habilitacion)
             .options(
-                selectinload(Habilitacion.conductor).selectinload(Conductor.empresa),
+                proyeccion(Habilitacion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR).selectinload(Conductor.empresa),
                 selectinload(Habilitacion.pago)
             )
             .where(Habilitacion.estado == estado)
@@ -175,7 +184,7 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         result = await self.db.execute(
             select(Habilitacion)
             .options(
-                selectinload(Habilitacion.conductor).selectinload(Conductor.empresa),
+                proyeccion(Habilitacion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR).selectinload(Conductor.empresa),
                 selectinload(Habilitacion.pago)
             )
             .outerjoin(Habilitacion.pago)
@@ -200,6 +209,9 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         """
         Obtener habilitaciones vigentes
         
+        El barrido nocturno de vencimientos mueve a VENCIDO las habilitaciones
+        cuya vigencia terminó, por lo que basta con filtrar por estado.
+        
         Args:
             skip: Número de registros a saltar
             limit: Número máximo de registros
@@ -210,15 +222,9 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         result = await self.db.execute(
             select(Habilitacion)
             .options(
-                selectinload(Habilitacion.conductor).selectinload(Conductor.empresa)
-            )
-            .where(
-                Habilitacion.estado == EstadoHabilitacion.HABILITADO,
-                or_(
-                    Habilitacion.vigencia_hasta.is_(None),
-                    Habilitacion.vigencia_hasta >= date.today()
-                )
+                proyeccion(Habilitacion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR).selectinload(Conductor.empresa)
             )
+            .where(Habilitacion.estado == EstadoHabilitacion.HABILITADO)
             .order_by(Habilitacion.fecha_habilitacion.desc())
             .offset(skip)
             .limit(limit)
@@ -248,7 +254,7 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         result = await self.db.execute(
             select(Habilitacion)
             .options(
-                selectinload(Habilitacion.conductor).selectinload(Conductor.empresa)
+                proyeccion(Habilitacion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR).selectinload(Conductor.empresa)
             )
             .where(
                 Habilitacion.estado == EstadoHabilitacion.HABILITADO,
@@ -284,6 +290,73 @@ class HabilitacionRepository(BaseRepository[Habilitacion]):
         )
         return result.scalar_one_or_none()
     
+    async def eliminar_de_conductores(self, conductor_ids: List[UUID]) -> int:
+        """
+        Eliminar por el ORM las habilitaciones y pagos de varios conductores
+        
+        Se usa antes de borrar conductores con una sentencia masiva: así
+        las bajas de habilitaciones y pagos pasan por los eventos de sesión
+        (auditoría y resumen diario de pagos) en lugar de perderse en el
+        ON DELETE CASCADE de la base de datos.
+        
+        Args:
+            conductor_ids: IDs de los conductores
+            
+        Returns:
+            Número de habilitaciones eliminadas
+        """
+        if not conductor_ids:
+            return 0
+        
+        result = await self.db.execute(
+            select(Habilitacion)
+            .options(selectinload(Habilitacion.pago))
+            .where(Habilitacion.conductor_id.in_(conductor_ids))
+        )
+        habilitaciones = list(result.scalars().all())
+        for habilitacion in habilitaciones:
+            await self.db.delete(habilitacion)
+        await self.db.flush()
+        return len(habilitaciones)
+    
+    async def marcar_vencidas(
+        self,
+        fecha_corte: date,
+        limite: int = 1000
+    ) -> int:
+        """
+        Marcar como VENCIDO un lote de habilitaciones cuya vigencia terminó
+        
+        Ejecuta un único UPDATE sobre un lote acotado de IDs para no mantener
+        bloqueos largos. Las filas bloqueadas por otra transacción se omiten
+        y se procesan en la siguiente pasada.
+        
+        Args:
+            fecha_corte: Se vencen las habilitaciones con vigencia_hasta anterior a esta fecha
+            limite: Tamaño máximo del lote
+            
+        Returns:
+            Número de habilitaciones actualizadas
+        """
+        candidata = aliased(Habilitacion)
+        lote = (
+            select(candidata.id)
+            .where(
+                candidata.estado == EstadoHabilitacion.HABILITADO,
+                candidata.vigencia_hasta < fecha_corte
+            )
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        
+        result = await self.db.execute(
+            update(Habilitacion)
+            .where(Habilitacion.id.in_(lote))
+            .values(estado=EstadoHabilitacion.VENCIDO)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     async def count_by_estado(self, estado: EstadoHabilitacion) -> int:
         """
         Contar habilitaciones por estado
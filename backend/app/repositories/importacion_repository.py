@@ -0,0 +1,292 @@
+"""
+Repositorio de la tabla de preparación para importar conductores
+
+Las filas ya validadas de un archivo se cargan en una tabla temporal de la
+conexión (con COPY en PostgreSQL). Las verificaciones contra el propio
+archivo y contra conductores se hacen con sentencias sobre conjuntos y las
+filas que quedan sin error se insertan con un único INSERT ... SELECT.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Column, Date, Integer, MetaData, String, Table,
+    and_, cast, exists, insert, literal, or_, select, text, update,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.core.metricas import medir_repositorio
+from app.models.conductor import Conductor, EstadoConductor
+
+
+# Columnas de conductores que provienen del archivo
+COLUMNAS_IMPORTACION = (
+    "dni",
+    "nombres",
+    "apellidos",
+    "fecha_nacimiento",
+    "direccion",
+    "telefono",
+    "email",
+    "licencia_numero",
+    "licencia_categoria",
+    "licencia_emision",
+    "licencia_vencimiento",
+    "certificado_medico_numero",
+    "certificado_medico_vencimiento",
+    "observaciones",
+)
+
+_metadata = MetaData()
+
+tabla_importacion = Table(
+    "importacion_conductores",
+    _metadata,
+    Column("fila", Integer, primary_key=True),
+    Column("id", PG_UUID(as_uuid=True), nullable=False),
+    Column("dni", String(8), nullable=False),
+    Column("nombres", String(100), nullable=False),
+    Column("apellidos", String(100), nullable=False),
+    Column("fecha_nacimiento", Date, nullable=False),
+    Column("direccion", String(500), nullable=False),
+    Column("telefono", String(20), nullable=False),
+    Column("email", String(255), nullable=False),
+    Column("licencia_numero", String(20), nullable=False),
+    Column("licencia_categoria", String(10), nullable=False),
+    Column("licencia_emision", Date, nullable=False),
+    Column("licencia_vencimiento", Date, nullable=False),
+    Column("certificado_medico_numero", String(50)),
+    Column("certificado_medico_vencimiento", Date),
+    Column("observaciones", String(1000)),
+    Column("campo", String(50)),
+    Column("error", String(500)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# Se crean después de la carga, que así no mantiene índices fila a fila. Son
+# DDL sueltas: un Index asociado a la tabla se crearía junto con ella
+_indices_importacion = (
+    "CREATE INDEX idx_importacion_conductores_dni ON importacion_conductores (dni)",
+    "CREATE INDEX idx_importacion_conductores_licencia ON importacion_conductores (licencia_numero)",
+)
+
+_COLUMNAS_CARGA = ("fila", "id", *COLUMNAS_IMPORTACION)
+
+
+@medir_repositorio
+class ImportacionRepository:
+    """Operaciones sobre la tabla temporal de importación de conductores"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def _es_postgresql(self) -> bool:
+        return self.db.bind.dialect.name == "postgresql"
+
+    async def crear_tabla(self) -> None:
+        """
+        Crear la tabla temporal en la conexión de la sesión
+
+        En PostgreSQL desaparece al confirmar la transacción. En otros
+        motores se descarta primero la que pudiera quedar en la conexión.
+        """
+        conexion = await self.db.connection()
+        if not self._es_postgresql:
+            await conexion.run_sync(tabla_importacion.drop, checkfirst=True)
+        await conexion.run_sync(tabla_importacion.create)
+
+    async def eliminar_tabla(self) -> None:
+        """Eliminar la tabla temporal antes de confirmar"""
+        conexion = await self.db.connection()
+        await conexion.run_sync(tabla_importacion.drop, checkfirst=True)
+
+    async def cargar(self, filas: Sequence[Dict[str, Any]]) -> None:
+        """
+        Cargar un lote de filas validadas
+
+        En PostgreSQL usa COPY en formato binario por la conexión de asyncpg
+        de la misma transacción; en otros motores, un INSERT con varias filas.
+
+        Args:
+            filas: Diccionarios con fila, id y COLUMNAS_IMPORTACION
+        """
+        if not filas:
+            return
+
+        if self._es_postgresql:
+            conexion = await self.db.connection()
+            crudo = await conexion.get_raw_connection()
+            await crudo.driver_connection.copy_records_to_table(
+                tabla_importacion.name,
+                records=[tuple(fila.get(columna) for columna in _COLUMNAS_CARGA) for fila in filas],
+                columns=list(_COLUMNAS_CARGA)
+            )
+        else:
+            await self.db.execute(insert(tabla_importacion), list(filas))
+
+    async def preparar_verificaciones(self) -> None:
+        """Indexar la tabla cargada y actualizar sus estadísticas"""
+        for indice in _indices_importacion:
+            await self.db.execute(text(indice))
+        if self._es_postgresql:
+            # autovacuum no analiza tablas temporales
+            await self.db.execute(text(f"ANALYZE {tabla_importacion.name}"))
+
+    async def _marcar(self, condicion: ColumnElement, campo: str, mensaje: ColumnElement) -> int:
+        t = tabla_importacion
+        result = await self.db.execute(
+            update(t)
+            .where(t.c.error.is_(None), condicion)
+            .values(campo=campo, error=mensaje)
+        )
+        return result.rowcount
+
+    async def marcar_repetidos(self, mensajes: Sequence[Tuple[str, str]]) -> int:
+        """
+        Marcar las filas que repiten un valor único de una fila anterior aceptada
+
+        Se acepta cada fila sin error que no repite el DNI ni la licencia de
+        una fila anterior aceptada, en el orden del archivo. Una fila
+        rechazada por otro motivo no cuenta, por lo que debe ejecutarse
+        después de las demás verificaciones.
+
+        Es un punto fijo por rondas: una fila sin error que no comparte
+        valores con ninguna anterior sin error ya es definitiva, y las que
+        repiten un valor de ella se marcan. Cada marca puede dejar definitivas
+        a otras filas (A y B con la misma licencia, B y C con el mismo DNI:
+        al marcar B, C se acepta), así que se repite hasta que ninguna
+        sentencia marca filas; casi siempre bastan una o dos rondas.
+
+        Args:
+            mensajes: Pares (columna, mensaje) de las columnas que deben ser
+                únicas (dni, licencia_numero)
+
+        Returns:
+            Número de filas marcadas
+        """
+        t = tabla_importacion
+        aceptada = t.alias("aceptada")
+        previa = t.alias("previa")
+        columnas = [columna for columna, _ in mensajes]
+
+        def comparte(fila, otra) -> ColumnElement:
+            return or_(*(fila.c[columna] == otra.c[columna] for columna in columnas))
+
+        # Sin error y sin filas anteriores sin error que compartan valores
+        definitiva = and_(
+            aceptada.c.error.is_(None),
+            ~exists().where(
+                previa.c.error.is_(None),
+                previa.c.fila < aceptada.c.fila,
+                comparte(previa, aceptada)
+            )
+        )
+
+        total = 0
+        while True:
+            marcadas = 0
+            for columna, mensaje in mensajes:
+                marcadas += await self._marcar(
+                    exists().where(
+                        aceptada.c[columna] == t.c[columna],
+                        aceptada.c.fila < t.c.fila,
+                        definitiva
+                    ),
+                    columna,
+                    literal(mensaje, String)
+                )
+            if not marcadas:
+                return total
+            total += marcadas
+
+    async def marcar_existentes(self, columna: str, mensaje: str) -> int:
+        """
+        Marcar las filas cuyo valor ya está registrado en conductores
+
+        Args:
+            columna: Columna única de conductores (dni o licencia_numero)
+            mensaje: Prefijo del mensaje de error, seguido del valor
+
+        Returns:
+            Número de filas marcadas
+        """
+        t = tabla_importacion
+        conductor = Conductor.__table__
+        return await self._marcar(
+            exists().where(conductor.c[columna] == t.c[columna]),
+            columna,
+            literal(mensaje, String) + t.c[columna]
+        )
+
+    async def marcar_categorias_no_permitidas(self, permitidas: Iterable[str]) -> int:
+        """
+        Marcar las filas cuya categoría de licencia no admite la empresa
+
+        Args:
+            permitidas: Categorías válidas para las autorizaciones vigentes
+
+        Returns:
+            Número de filas marcadas
+        """
+        t = tabla_importacion
+        return await self._marcar(
+            t.c.licencia_categoria.not_in(list(permitidas)),
+            "licencia_categoria",
+            literal("La categoría de licencia ", String) + t.c.licencia_categoria
+            + literal(" no es válida para los tipos de autorización de la empresa", String)
+        )
+
+    async def insertar_conductores(self, empresa_id: UUID) -> List[Row]:
+        """
+        Insertar en conductores las filas sin error, en estado PENDIENTE
+
+        Args:
+            empresa_id: Empresa de los conductores
+
+        Returns:
+            Filas insertadas con id, empresa_id, estado y COLUMNAS_IMPORTACION
+        """
+        t = tabla_importacion
+        conductor = Conductor.__table__
+        ahora = datetime.utcnow()
+        columnas = ("id", *COLUMNAS_IMPORTACION)
+
+        sentencia = insert(conductor).from_select(
+            [*columnas, "empresa_id", "estado", "created_at", "updated_at"],
+            select(
+                *(t.c[columna] for columna in columnas),
+                literal(empresa_id, conductor.c.empresa_id.type),
+                cast(literal(EstadoConductor.PENDIENTE, conductor.c.estado.type), conductor.c.estado.type),
+                literal(ahora, conductor.c.created_at.type),
+                literal(ahora, conductor.c.updated_at.type),
+            )
+            .where(t.c.error.is_(None))
+            .order_by(t.c.fila)
+        ).returning(
+            *(conductor.c[columna] for columna in columnas),
+            conductor.c.empresa_id,
+            conductor.c.estado
+        )
+        result = await self.db.execute(sentencia)
+        return list(result.all())
+
+    async def get_errores(self) -> List[Row]:
+        """
+        Filas marcadas con error
+
+        Returns:
+            Filas con fila, campo y error, en el orden del archivo
+        """
+        t = tabla_importacion
+        result = await self.db.execute(
+            select(t.c.fila, t.c.campo, t.c.error)
+            .where(t.c.error.is_not(None))
+            .order_by(t.c.fila)
+        )
+        return list(result.all())
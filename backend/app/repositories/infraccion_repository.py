@@ -7,8 +7,11 @@ from datetime import date, datetime
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.infraccion import Infraccion, TipoInfraccion, GravedadInfraccion, EstadoInfraccion
+from app.models.infraccion import Infraccion, GravedadInfraccion, EstadoInfraccion
+from app.core.catalogo_tipos import catalogo_tipos
 from app.repositories.base import BaseRepository
+from app.repositories.carga import proyeccion
+from app.repositories.conductor_repository import COLUMNAS_RESUMEN_CONDUCTOR
 
 
 class InfraccionRepository(BaseRepository[Infraccion]):
@@ -38,7 +41,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
             .where(Infraccion.conductor_id == conductor_id)
             .order_by(Infraccion.fecha_infraccion.desc())
@@ -61,7 +64,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
             .where(Infraccion.numero_acta == numero_acta)
         )
@@ -88,14 +91,14 @@ class InfraccionRepository(BaseRepository[Infraccion]):
         Returns:
             Lista de infracciones
         """
+        indice = await catalogo_tipos.obtener(self.db)
         query = (
             select(Infraccion)
-            .join(Infraccion.tipo_infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
-            .where(TipoInfraccion.gravedad == gravedad)
+            .where(Infraccion.tipo_infraccion_id.in_(indice.ids_tipos_infraccion(gravedad)))
         )
         
         if fecha_desde:
@@ -130,7 +133,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
             .where(Infraccion.estado == estado)
             .order_by(Infraccion.fecha_infraccion.desc())
@@ -154,16 +157,16 @@ class InfraccionRepository(BaseRepository[Infraccion]):
         Returns:
             Lista de infracciones graves
         """
+        indice = await catalogo_tipos.obtener(self.db)
         query = (
             select(Infraccion)
-            .join(Infraccion.tipo_infraccion)
             .options(selectinload(Infraccion.tipo_infraccion))
             .where(
                 Infraccion.conductor_id == conductor_id,
-                TipoInfraccion.gravedad.in_([
+                Infraccion.tipo_infraccion_id.in_(indice.ids_tipos_infraccion(
                     GravedadInfraccion.GRAVE,
                     GravedadInfraccion.MUY_GRAVE
-                ])
+                ))
             )
         )
         
@@ -200,7 +203,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
             .where(
                 Infraccion.fecha_infraccion >= fecha_desde,
@@ -238,10 +241,9 @@ class InfraccionRepository(BaseRepository[Infraccion]):
         )
         
         if gravedad:
-            query = (
-                query
-                .join(Infraccion.tipo_infraccion)
-                .where(TipoInfraccion.gravedad == gravedad)
+            indice = await catalogo_tipos.obtener(self.db)
+            query = query.where(
+                Infraccion.tipo_infraccion_id.in_(indice.ids_tipos_infraccion(gravedad))
             )
         
         result = await self.db.execute(query)
@@ -260,23 +262,38 @@ class InfraccionRepository(BaseRepository[Infraccion]):
         Returns:
             Diccionario con estadísticas
         """
-        # Contar por gravedad
-        total = await self.count_by_conductor(conductor_id)
-        leves = await self.count_by_conductor(conductor_id, GravedadInfraccion.LEVE)
-        graves = await self.count_by_conductor(conductor_id, GravedadInfraccion.GRAVE)
-        muy_graves = await self.count_by_conductor(conductor_id, GravedadInfraccion.MUY_GRAVE)
+        # Una sola consulta agrupada por tipo; la gravedad sale del catálogo
+        result = await self.db.execute(
+            select(Infraccion.tipo_infraccion_id, func.count())
+            .where(Infraccion.conductor_id == conductor_id)
+            .group_by(Infraccion.tipo_infraccion_id)
+        )
+        indice = await catalogo_tipos.obtener(self.db)
+        por_gravedad = {gravedad: 0 for gravedad in GravedadInfraccion}
+        total = 0
+        for tipo_infraccion_id, cantidad in result.all():
+            total += cantidad
+            tipo = indice.tipos_infraccion.get(tipo_infraccion_id)
+            if tipo is not None:
+                por_gravedad[tipo.gravedad] += cantidad
         
         # Obtener última infracción
-        infracciones = await self.get_by_conductor(conductor_id, limit=1)
-        ultima_infraccion = infracciones[0] if infracciones else None
+        result = await self.db.execute(
+            select(Infraccion.fecha_infraccion, Infraccion.tipo_infraccion_id)
+            .where(Infraccion.conductor_id == conductor_id)
+            .order_by(Infraccion.fecha_infraccion.desc())
+            .limit(1)
+        )
+        ultima_infraccion = result.first()
+        ultimo_tipo = indice.tipos_infraccion.get(ultima_infraccion.tipo_infraccion_id) if ultima_infraccion else None
         
         return {
             "total": total,
-            "leves": leves,
-            "graves": graves,
-            "muy_graves": muy_graves,
+            "leves": por_gravedad[GravedadInfraccion.LEVE],
+            "graves": por_gravedad[GravedadInfraccion.GRAVE],
+            "muy_graves": por_gravedad[GravedadInfraccion.MUY_GRAVE],
             "ultima_infraccion_fecha": ultima_infraccion.fecha_infraccion if ultima_infraccion else None,
-            "ultima_infraccion_tipo": ultima_infraccion.tipo_infraccion.descripcion if ultima_infraccion else None
+            "ultima_infraccion_tipo": ultimo_tipo.descripcion if ultimo_tipo else None
         }
     
     async def get_infracciones_recientes(
@@ -303,7 +320,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor).selectinload(Conductor.empresa)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR).selectinload(Conductor.empresa)
             )
             .where(Infraccion.fecha_infraccion >= fecha_desde)
             .order_by(Infraccion.fecha_infraccion.desc())
@@ -337,7 +354,7 @@ class InfraccionRepository(BaseRepository[Infraccion]):
             select(Infraccion)
             .options(
                 selectinload(Infraccion.tipo_infraccion),
-                selectinload(Infraccion.conductor)
+                proyeccion(Infraccion.conductor, *COLUMNAS_RESUMEN_CONDUCTOR)
             )
             .where(Infraccion.entidad_fiscalizadora.ilike(f"%{entidad}%"))
         )
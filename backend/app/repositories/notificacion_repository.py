@@ -0,0 +1,86 @@
+"""
+Repositorio para Notificacion
+"""
+from typing import Any, Collection, Dict, List, Set
+from sqlalchemy import select, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.auditoria import Notificacion
+from app.repositories.base import BaseRepository
+
+
+class NotificacionRepository(BaseRepository[Notificacion]):
+    """Repositorio específico para Notificacion con inserción en bloque"""
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(Notificacion, db)
+    
+    async def get_claves_existentes(self, claves: Collection[str]) -> Set[str]:
+        """
+        Obtener las claves de deduplicación que ya están registradas
+        
+        Args:
+            claves: Claves a verificar
+            
+        Returns:
+            Subconjunto de claves que ya tienen notificación
+        """
+        if not claves:
+            return set()
+        
+        result = await self.db.execute(
+            select(Notificacion.clave_deduplicacion)
+            .where(Notificacion.clave_deduplicacion.in_(claves))
+        )
+        return set(result.scalars().all())
+    
+    async def crear_en_bloque(self, filas: List[Dict[str, Any]]) -> int:
+        """
+        Insertar varias notificaciones con un único INSERT multi-fila
+        
+        No carga las notificaciones en la sesión.
+        
+        Args:
+            filas: Valores de columna de cada notificación
+            
+        Returns:
+            Número de notificaciones insertadas
+        """
+        if not filas:
+            return 0
+        
+        await self.db.execute(insert(Notificacion).values(filas))
+        return len(filas)
+    
+    async def crear_sin_duplicados(self, filas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insertar en bloque las notificaciones cuya clave de deduplicación no existe
+        
+        En PostgreSQL el INSERT lleva ON CONFLICT DO NOTHING sobre la clave,
+        de modo que dos ejecuciones concurrentes (beat solapado, reintentos)
+        no abortan el lote por el índice único. En otros dialectos se
+        descartan antes las claves ya registradas.
+        
+        Args:
+            filas: Valores de columna de cada notificación, con clave_deduplicacion
+            
+        Returns:
+            Filas efectivamente insertadas
+        """
+        if not filas:
+            return []
+        
+        if self.db.bind.dialect.name != "postgresql":
+            existentes = await self.get_claves_existentes([f["clave_deduplicacion"] for f in filas])
+            nuevas = [f for f in filas if f["clave_deduplicacion"] not in existentes]
+            await self.crear_en_bloque(nuevas)
+            return nuevas
+        
+        result = await self.db.execute(
+            postgresql_insert(Notificacion)
+            .values(filas)
+            .on_conflict_do_nothing(index_elements=["clave_deduplicacion"])
+            .returning(Notificacion.clave_deduplicacion)
+        )
+        insertadas = set(result.scalars().all())
+        return [f for f in filas if f["clave_deduplicacion"] in insertadas]
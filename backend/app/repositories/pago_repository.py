@@ -1,13 +1,16 @@
 """
 Repositorio para Pago y ConceptoTUPA
 """
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
 from uuid import UUID
-from datetime import date
-from sqlalchemy import select, and_, or_, func, extract
+from datetime import date, datetime
+from sqlalchemy import select, and_, or_, func, extract, case, literal, literal_column, tuple_, union_all, delete, insert, text, Row
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from app.models.habilitacion import Pago, ConceptoTUPA, EstadoPago
+from app.core.metricas import medir_repositorio
+from app.models.habilitacion import Habilitacion, Pago, PagoResumenDiario, ConceptoTUPA, EstadoPago
 from app.repositories.base import BaseRepository
 
 
@@ -23,6 +26,15 @@ class ConceptoTUPARepository(BaseRepository[ConceptoTUPA]):
         )
         return result.scalar_one_or_none()
     
+    async def get_activos(self) -> List[ConceptoTUPA]:
+        """Todos los conceptos activos, para el catálogo en memoria"""
+        result = await self.db.execute(
+            select(ConceptoTUPA)
+            .where(ConceptoTUPA.activo == True)
+            .order_by(ConceptoTUPA.codigo, ConceptoTUPA.vigencia_desde)
+        )
+        return list(result.scalars().all())
+    
     async def get_vigentes(self, fecha: Optional[date] = None) -> List[ConceptoTUPA]:
         if fecha is None:
             fecha = date.today()
@@ -109,30 +121,209 @@ class PagoRepository(BaseRepository[Pago]):
         )
         return list(result.scalars().all())
     
+    async def stream_exportacion(self, estado: Optional[EstadoPago] = None, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, tamano_lote: int = 1000) -> AsyncIterator[List[Row]]:
+        """
+        Recorrer por lotes los pagos a exportar con su concepto y habilitación
+        
+        Usa un cursor del lado del servidor y devuelve solo columnas, por lo
+        que la memoria depende del tamaño del lote y no del total de pagos.
+        
+        Args:
+            estado: Filtrar por estado
+            fecha_inicio: Fecha de pago mínima
+            fecha_fin: Fecha de pago máxima
+            tamano_lote: Filas por lote
+            
+        Yields:
+            Lotes de filas ordenadas por fecha de pago
+        """
+        from app.models.conductor import Conductor
+        
+        conditions = []
+        if estado:
+            conditions.append(Pago.estado == estado)
+        if fecha_inicio:
+            conditions.append(Pago.fecha_pago >= fecha_inicio)
+        if fecha_fin:
+            conditions.append(Pago.fecha_pago <= fecha_fin)
+        result = await self.db.stream(
+            select(
+                Pago.numero_recibo, Pago.fecha_pago, Pago.monto, Pago.estado, Pago.entidad_bancaria, Pago.fecha_confirmacion,
+                ConceptoTUPA.codigo.label('concepto_codigo'), ConceptoTUPA.descripcion.label('concepto_descripcion'),
+                Habilitacion.codigo_habilitacion, Conductor.dni.label('conductor_dni')
+            )
+            .join(ConceptoTUPA, ConceptoTUPA.id == Pago.concepto_tupa_id)
+            .join(Habilitacion, Habilitacion.id == Pago.habilitacion_id)
+            .join(Conductor, Conductor.id == Habilitacion.conductor_id)
+            .where(*conditions)
+            .order_by(Pago.fecha_pago, Pago.numero_recibo)
+            .execution_options(yield_per=tamano_lote)
+        )
+        async for lote in result.partitions():
+            yield lote
+    
     async def get_estadisticas_por_periodo(self, fecha_inicio: date, fecha_fin: date) -> dict:
-        result_estados = await self.db.execute(
-            select(Pago.estado, func.count(Pago.id).label('cantidad'), func.sum(Pago.monto).label('monto_total'))
-            .where(and_(Pago.fecha_pago >= fecha_inicio, Pago.fecha_pago <= fecha_fin))
-            .group_by(Pago.estado)
+        """Estadísticas del período calculadas sobre los pagos individuales"""
+        query = _query_estadisticas(
+            self.db.bind.dialect.name,
+            Pago.fecha_pago, Pago.estado, Pago.concepto_tupa_id,
+            func.count(Pago.id), func.sum(Pago.monto),
+            fecha_inicio, fecha_fin
         )
-        estadisticas_estados = {}
-        for row in result_estados:
-            estadisticas_estados[row.estado] = {'cantidad': row.cantidad, 'monto_total': float(row.monto_total) if row.monto_total else 0}
-        result_conceptos = await self.db.execute(
-            select(ConceptoTUPA.codigo, ConceptoTUPA.descripcion, func.count(Pago.id).label('cantidad'), func.sum(Pago.monto).label('monto_total'))
-            .join(Pago.concepto_tupa)
-            .where(and_(Pago.fecha_pago >= fecha_inicio, Pago.fecha_pago <= fecha_fin))
-            .group_by(ConceptoTUPA.codigo, ConceptoTUPA.descripcion)
+        return _estadisticas_desde_filas(await self.db.execute(query))
+
+
+@medir_repositorio
+class PagoResumenDiarioRepository:
+    """
+    Repositorio para el resumen diario de pagos
+    
+    El resumen usa una clave natural compuesta, por lo que no hereda de
+    BaseRepository (que asume un id UUID).
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_estadisticas_por_periodo(self, fecha_inicio: date, fecha_fin: date) -> dict:
+        """
+        Estadísticas del período calculadas sobre el resumen diario
+        
+        Retorna la misma estructura que PagoRepository.get_estadisticas_por_periodo.
+        """
+        query = _query_estadisticas(
+            self.db.bind.dialect.name,
+            PagoResumenDiario.fecha, PagoResumenDiario.estado, PagoResumenDiario.concepto_tupa_id,
+            func.sum(PagoResumenDiario.cantidad), func.sum(PagoResumenDiario.monto_total),
+            fecha_inicio, fecha_fin
         )
-        pagos_por_concepto = []
-        for row in result_conceptos:
-            pagos_por_concepto.append({'codigo': row.codigo, 'descripcion': row.descripcion, 'cantidad': row.cantidad, 'monto_total': float(row.monto_total) if row.monto_total else 0})
-        result_meses = await self.db.execute(
-            select(extract('year', Pago.fecha_pago).label('anio'), extract('month', Pago.fecha_pago).label('mes'), func.count(Pago.id).label('cantidad'), func.sum(Pago.monto).label('monto_total'))
-            .where(and_(Pago.fecha_pago >= fecha_inicio, Pago.fecha_pago <= fecha_fin))
-            .group_by('anio', 'mes').order_by('anio', 'mes')
+        return _estadisticas_desde_filas(await self.db.execute(query))
+    
+    async def reconstruir(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> int:
+        """
+        Recalcular el resumen a partir de los pagos
+        
+        Reemplaza las filas del rango con un INSERT ... SELECT. En PostgreSQL
+        bloquea las escrituras sobre pagos hasta el commit para que ningún
+        pago concurrente quede fuera del recálculo.
+        
+        Args:
+            fecha_inicio: Primer día a reconstruir (por defecto, desde el primer pago)
+            fecha_fin: Último día a reconstruir (por defecto, hasta el último pago)
+            
+        Returns:
+            Número de filas de resumen generadas
+        """
+        if self.db.bind.dialect.name == 'postgresql':
+            await self.db.execute(text("LOCK TABLE pagos IN SHARE MODE"))
+        
+        filtro_resumen, filtro_pagos = [], []
+        if fecha_inicio is not None:
+            filtro_resumen.append(PagoResumenDiario.fecha >= fecha_inicio)
+            filtro_pagos.append(Pago.fecha_pago >= fecha_inicio)
+        if fecha_fin is not None:
+            filtro_resumen.append(PagoResumenDiario.fecha <= fecha_fin)
+            filtro_pagos.append(Pago.fecha_pago <= fecha_fin)
+        
+        await self.db.execute(delete(PagoResumenDiario).where(*filtro_resumen))
+        result = await self.db.execute(
+            insert(PagoResumenDiario).from_select(
+                ['fecha', 'estado', 'concepto_tupa_id', 'cantidad', 'monto_total', 'updated_at'],
+                select(
+                    Pago.fecha_pago, Pago.estado, Pago.concepto_tupa_id,
+                    func.count(Pago.id), func.sum(Pago.monto), literal(datetime.utcnow())
+                )
+                .where(*filtro_pagos)
+                .group_by(Pago.fecha_pago, Pago.estado, Pago.concepto_tupa_id)
+            )
+        )
+        return result.rowcount
+
+
+def sentencia_acumular_resumen(dialecto: str, filas: List[Dict[str, Any]]):
+    """
+    INSERT ... ON CONFLICT que suma cantidades y montos al resumen diario
+    
+    Se usa desde los eventos de sesión, que ejecutan en la conexión síncrona
+    de la transacción en curso.
+    
+    Args:
+        dialecto: Nombre del dialecto ('postgresql' o 'sqlite')
+        filas: Deltas con fecha, estado, concepto_tupa_id, cantidad y monto_total
+    """
+    insertar = postgresql_insert if dialecto == 'postgresql' else sqlite_insert
+    sentencia = insertar(PagoResumenDiario).values(
+        [{**fila, 'updated_at': datetime.utcnow()} for fila in filas]
+    )
+    return sentencia.on_conflict_do_update(
+        index_elements=['fecha', 'estado', 'concepto_tupa_id'],
+        set_={
+            'cantidad': PagoResumenDiario.cantidad + sentencia.excluded.cantidad,
+            'monto_total': PagoResumenDiario.monto_total + sentencia.excluded.monto_total,
+            'updated_at': sentencia.excluded.updated_at,
+        }
+    )
+
+
+def _query_estadisticas(dialecto: str, fecha, estado, concepto_tupa_id, cantidad, monto, fecha_inicio: date, fecha_fin: date):
+    """
+    Agregado por estado, por concepto y por año/mes en una sola sentencia
+    
+    En PostgreSQL usa GROUPING SETS (un único recorrido de la tabla) y
+    GROUPING() para identificar el desglose de cada fila. Otros motores
+    (SQLite en tests) no soportan GROUPING SETS y reciben la unión
+    equivalente con las mismas columnas. Los grupos sin pagos (posibles en
+    el resumen tras cambios de estado) se descartan.
+    """
+    anio = extract('year', fecha)
+    mes = extract('month', fecha)
+    periodo = and_(fecha >= fecha_inicio, fecha <= fecha_fin)
+    metricas = (cantidad.label('cantidad'), monto.label('monto_total'))
+    con_pagos = cantidad > 0
+    
+    if dialecto == 'postgresql':
+        return (
+            select(
+                case(
+                    (func.grouping(estado) == 0, literal_column("'estado'")),
+                    (func.grouping(ConceptoTUPA.codigo) == 0, literal_column("'concepto'")),
+                    else_=literal_column("'mes'")
+                ).label('desglose'),
+                estado, ConceptoTUPA.codigo, ConceptoTUPA.descripcion,
+                anio.label('anio'), mes.label('mes'), *metricas
+            )
+            .join(ConceptoTUPA, ConceptoTUPA.id == concepto_tupa_id)
+            .where(periodo)
+            .group_by(func.grouping_sets(
+                tuple_(estado),
+                tuple_(ConceptoTUPA.codigo, ConceptoTUPA.descripcion),
+                tuple_(anio, mes)
+            ))
+            .having(con_pagos)
         )
-        pagos_por_mes = []
-        for row in result_meses:
-            pagos_por_mes.append({'anio': int(row.anio), 'mes': int(row.mes), 'cantidad': row.cantidad, 'monto_total': float(row.monto_total) if row.monto_total else 0})
-        return {'por_estado': estadisticas_estados, 'por_concepto': pagos_por_concepto, 'por_mes': pagos_por_mes}
+    
+    nulo = literal(None)
+    return union_all(
+        select(literal('estado').label('desglose'), estado.label('estado'), nulo.label('codigo'), nulo.label('descripcion'), nulo.label('anio'), nulo.label('mes'), *metricas)
+        .where(periodo).group_by(estado).having(con_pagos),
+        select(literal('concepto'), nulo, ConceptoTUPA.codigo, ConceptoTUPA.descripcion, nulo, nulo, *metricas)
+        .join(ConceptoTUPA, ConceptoTUPA.id == concepto_tupa_id).where(periodo).group_by(ConceptoTUPA.codigo, ConceptoTUPA.descripcion).having(con_pagos),
+        select(literal('mes'), nulo, nulo, nulo, anio, mes, *metricas)
+        .where(periodo).group_by(anio, mes).having(con_pagos),
+    )
+
+
+def _estadisticas_desde_filas(result) -> dict:
+    estadisticas_estados = {}
+    pagos_por_concepto = []
+    pagos_por_mes = []
+    for row in result:
+        monto_total = float(row.monto_total) if row.monto_total else 0
+        if row.desglose == 'estado':
+            estadisticas_estados[EstadoPago(row.estado)] = {'cantidad': row.cantidad, 'monto_total': monto_total}
+        elif row.desglose == 'concepto':
+            pagos_por_concepto.append({'codigo': row.codigo, 'descripcion': row.descripcion, 'cantidad': row.cantidad, 'monto_total': monto_total})
+        else:
+            pagos_por_mes.append({'anio': int(row.anio), 'mes': int(row.mes), 'cantidad': row.cantidad, 'monto_total': monto_total})
+    pagos_por_mes.sort(key=lambda m: (m['anio'], m['mes']))
+    return {'por_estado': estadisticas_estados, 'por_concepto': pagos_por_concepto, 'por_mes': pagos_por_mes}
@@ -25,7 +25,14 @@ from app.schemas.empresa import (
     EmpresaCreate,
     EmpresaUpdate,
     EmpresaResponse,
-    EmpresaListResponse
+    EmpresaListResponse,
+    NominaAlta,
+    NominaCambio,
+    NominaCambioAplicar,
+    NominaBaja,
+    NominaDiferenciasResponse,
+    NominaAplicar,
+    NominaAplicarResponse
 )
 from app.schemas.conductor import (
     ConductorBase,
@@ -36,7 +43,15 @@ from app.schemas.conductor import (
     ConductorEstadoUpdate,
     ConductorBusqueda,
     ConductorValidacionCategoria,
-    ConductorValidacionCategoriaResponse
+    ConductorValidacionCategoriaResponse,
+    ConductorCategoriaEmpresa,
+    ConductorValidacionCategoriasLote,
+    ConductorValidacionCategoriasLoteResponse,
+    ConductorImportacionError,
+    ConductorImportacionResponse,
+    ConductorCambioEstadoMasivo,
+    ConductorCambioEstadoMasivoResponse,
+    ConductorFicha
 )
 from app.schemas.documento import (
     DocumentoBase,
@@ -95,6 +110,13 @@ __all__ = [
     "EmpresaUpdate",
     "EmpresaResponse",
     "EmpresaListResponse",
+    "NominaAlta",
+    "NominaCambio",
+    "NominaCambioAplicar",
+    "NominaBaja",
+    "NominaDiferenciasResponse",
+    "NominaAplicar",
+    "NominaAplicarResponse",
     # Conductor schemas
     "ConductorBase",
     "ConductorCreate",
@@ -105,6 +127,14 @@ __all__ = [
     "ConductorBusqueda",
     "ConductorValidacionCategoria",
     "ConductorValidacionCategoriaResponse",
+    "ConductorCategoriaEmpresa",
+    "ConductorValidacionCategoriasLote",
+    "ConductorValidacionCategoriasLoteResponse",
+    "ConductorImportacionError",
+    "ConductorImportacionResponse",
+    "ConductorCambioEstadoMasivo",
+    "ConductorCambioEstadoMasivoResponse",
+    "ConductorFicha",
     # Documento schemas
     "DocumentoBase",
     "DocumentoCreate",
@@ -0,0 +1,32 @@
+"""
+Schemas para consulta de auditoría
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class AuditoriaResponse(BaseModel):
+    """Schema de respuesta de un registro de auditoría"""
+    id: UUID
+    created_at: datetime
+    usuario_id: UUID
+    tabla: str
+    accion: str
+    registro_id: Optional[str] = None
+    datos_anteriores: Optional[Dict[str, Any]] = None
+    datos_nuevos: Optional[Dict[str, Any]] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    descripcion: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AuditoriaPaginaResponse(BaseModel):
+    """Schema de una página de registros de auditoría"""
+    items: List[AuditoriaResponse]
+    siguiente_cursor: Optional[str] = Field(
+        None, description="Cursor para la página siguiente; null si no hay más registros"
+    )
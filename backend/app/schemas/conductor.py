@@ -3,6 +3,7 @@ Schemas Pydantic para Conductor
 """
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from datetime import date, datetime
+from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
@@ -367,6 +368,44 @@ class ConductorValidacionCategoriaResponse(BaseModel):
     categorias_requeridas: list[str]
 
 
+class ConductorCategoriaEmpresa(BaseModel):
+    """Par categoría de licencia y empresa a validar"""
+    licencia_categoria: str = Field(..., max_length=10)
+    empresa_id: UUID
+
+
+class ConductorValidacionCategoriasLote(BaseModel):
+    """Schema para validar categorías de licencia en lote (importaciones)"""
+    pares: list[ConductorCategoriaEmpresa] = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        description="Pares categoría-empresa, como máximo 10000 por solicitud"
+    )
+
+
+class ConductorValidacionCategoriasLoteResponse(BaseModel):
+    """Schema para respuesta de validación de categorías en lote"""
+    resultados: list[bool] = Field(..., description="Resultado de cada par, en el orden recibido")
+    validos: int
+    invalidos: int
+
+
+class ConductorImportacionError(BaseModel):
+    """Error de una fila del archivo de importación"""
+    fila: int = Field(..., description="Número de fila en el archivo (la 1 es el encabezado)")
+    campo: Optional[str] = None
+    mensaje: str
+
+
+class ConductorImportacionResponse(BaseModel):
+    """Schema para respuesta de importación masiva de conductores"""
+    total_filas: int
+    importados: int
+    rechazados: int
+    errores: list[ConductorImportacionError]
+
+
 
 class ConductorCambioEstado(BaseModel):
     """Schema para cambio de estado de conductor"""
@@ -404,3 +443,116 @@ class ConductorCambioEstado(BaseModel):
             }]
         }
     )
+
+
+class ConductorCambioEstadoMasivo(ConductorCambioEstado):
+    """Schema para cambiar en bloque el estado de los conductores de una empresa"""
+    empresa_id: UUID = Field(..., description="Empresa de los conductores")
+    estados: Optional[list[str]] = Field(
+        None,
+        description="Cambiar solo a los conductores en estos estados (por defecto, todos los que admiten la transición)"
+    )
+    conductor_ids: Optional[list[UUID]] = Field(
+        None,
+        max_length=10000,
+        description="Cambiar solo a estos conductores de la empresa"
+    )
+    
+    @field_validator('estados')
+    @classmethod
+    def validate_estados(cls, v: Optional[list[str]]) -> Optional[list[str]]:
+        """Valida que los estados de origen sean válidos"""
+        if v is None:
+            return v
+        return [cls.validate_estado(estado) for estado in v]
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [{
+                "empresa_id": "123e4567-e89b-12d3-a456-426614174000",
+                "nuevo_estado": "suspendido",
+                "estados": ["habilitado"],
+                "motivo": "Autorización de la empresa vencida",
+                "observaciones": "Resolución N° 456-2024"
+            }]
+        }
+    )
+
+
+class ConductorCambioEstadoMasivoResponse(BaseModel):
+    """Schema para el resumen de un cambio de estado masivo"""
+    empresa_id: UUID
+    estado: str
+    actualizados: int
+    por_estado_anterior: dict[str, int]
+    conductor_ids: list[UUID]
+
+
+class ConductorFichaEmpresa(BaseModel):
+    """Resumen de la empresa en la ficha del conductor"""
+    id: UUID
+    ruc: str
+    razon_social: str
+    activo: bool
+
+
+class ConductorFichaPago(BaseModel):
+    """Pago de la última habilitación"""
+    id: UUID
+    numero_recibo: str
+    monto: Decimal
+    fecha_pago: date
+    entidad_bancaria: str
+    estado: str
+    fecha_confirmacion: Optional[datetime] = None
+
+
+class ConductorFichaHabilitacion(BaseModel):
+    """Última habilitación del conductor con su pago"""
+    id: UUID
+    codigo_habilitacion: str
+    estado: str
+    fecha_solicitud: datetime
+    fecha_habilitacion: Optional[datetime] = None
+    vigencia_hasta: Optional[date] = None
+    observaciones: Optional[str] = None
+    pago: Optional[ConductorFichaPago] = None
+
+
+class ConductorFichaInfracciones(BaseModel):
+    """Agregados de todas las infracciones del conductor"""
+    total: int
+    puntos: int = Field(..., description="Puntos de las infracciones no anuladas")
+    ultima_fecha: Optional[date] = None
+    por_estado: dict[str, int]
+    por_gravedad: dict[str, int]
+
+
+class ConductorFichaDocumentos(BaseModel):
+    """Conteo de documentos del conductor"""
+    total: int
+    por_tipo: dict[str, int]
+
+
+class ConductorFichaInfraccion(BaseModel):
+    """Infracción reciente en la ficha del conductor"""
+    id: UUID
+    fecha_infraccion: date
+    numero_acta: Optional[str] = None
+    entidad_fiscalizadora: str
+    estado: str
+    tipo_codigo: str
+    gravedad: str
+    puntos: int
+
+
+class ConductorFicha(BaseModel):
+    """Schema para la ficha completa de un conductor"""
+    conductor: ConductorResponse
+    empresa: Optional[ConductorFichaEmpresa] = None
+    ultima_habilitacion: Optional[ConductorFichaHabilitacion] = None
+    infracciones: ConductorFichaInfracciones
+    documentos: ConductorFichaDocumentos
+    ultimas_infracciones: list[ConductorFichaInfraccion] = Field(
+        ..., description="Infracciones más recientes, de la más nueva a la más antigua"
+    )
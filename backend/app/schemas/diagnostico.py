@@ -0,0 +1,50 @@
+"""
+Schemas para los endpoints de diagnóstico
+"""
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+
+class ConsultaLentaResponse(BaseModel):
+    """Schema de una huella del registro de consultas lentas"""
+    huella: str
+    sentencia: str = Field(..., description="SQL normalizado, con ? en lugar de valores")
+    ejecuciones: int
+    total_ms: float
+    promedio_ms: float
+    max_ms: float
+    ultima_vez: datetime
+    plan: Optional[Any] = Field(None, description="Salida de EXPLAIN; null si aún no se capturó")
+    plan_analyze: bool = False
+    plan_capturado_en: Optional[datetime] = None
+
+
+class ConsultasLentasResponse(BaseModel):
+    """Schema del registro de consultas lentas del proceso"""
+    umbral_ms: float
+    consultas: List[ConsultaLentaResponse]
+
+
+class BloqueoLoopResponse(BaseModel):
+    """Schema de un bloqueo del event loop"""
+    detectado_en: datetime
+    duracion_ms: float
+    pila: List[str] = Field(..., description="Pila del hilo del loop durante el bloqueo, de afuera hacia adentro")
+
+
+class BloqueosLoopResponse(BaseModel):
+    """Schema de los bloqueos del event loop capturados por el proceso"""
+    umbral_ms: float
+    capturando_pilas: bool
+    bloqueos: List[BloqueoLoopResponse]
+
+
+class PerfilTokenResponse(BaseModel):
+    """Schema del token para perfilar peticiones"""
+    token: str
+    expira_en: datetime
+    cabecera: str = Field("X-Perfil", description="Cabecera donde enviar el token")
+    parametro: Optional[str] = Field(
+        None, description="Parámetro de consulta alternativo a la cabecera (solo en desarrollo)"
+    )
@@ -2,8 +2,10 @@
 Schemas para Empresa y Autorizaciones
 """
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime, date
+from uuid import UUID
+from app.schemas.conductor import ConductorBase, ConductorImportacionError, ConductorUpdate
 
 
 class TipoAutorizacionBase(BaseModel):
@@ -299,3 +301,57 @@ class EmpresaListResponse(BaseModel):
             ]
         }
     }
+
+
+class NominaAlta(BaseModel):
+    """Conductor del archivo que no está en la nómina"""
+    fila: int = Field(..., description="Número de fila en el archivo")
+    conductor: ConductorBase
+
+
+class NominaCambio(BaseModel):
+    """Conductor de la nómina con datos distintos en el archivo"""
+    conductor_id: UUID
+    dni: str
+    version: str = Field(..., description="Huella del registro al calcular las diferencias")
+    campos: Dict[str, Any] = Field(..., description="Campos modificados con su nuevo valor")
+
+
+class NominaCambioAplicar(BaseModel):
+    """Cambio a aplicar sobre un conductor de la nómina"""
+    conductor_id: UUID
+    dni: str
+    version: str
+    campos: ConductorUpdate
+
+
+class NominaBaja(BaseModel):
+    """Conductor de la nómina que no figura en el archivo"""
+    conductor_id: UUID
+    dni: str
+    version: str
+    estado: str
+
+
+class NominaDiferenciasResponse(BaseModel):
+    """Schema para las diferencias entre un archivo y la nómina de la empresa"""
+    empresa_id: UUID
+    altas: List[NominaAlta]
+    cambios: List[NominaCambio]
+    bajas: List[NominaBaja]
+    sin_cambios: int = Field(..., description="Conductores del archivo idénticos a la nómina")
+    errores: List[ConductorImportacionError]
+
+
+class NominaAplicar(BaseModel):
+    """Schema para aplicar un conjunto de diferencias de nómina"""
+    altas: List[NominaAlta] = Field(default_factory=list)
+    cambios: List[NominaCambioAplicar] = Field(default_factory=list)
+    bajas: List[NominaBaja] = Field(default_factory=list)
+
+
+class NominaAplicarResponse(BaseModel):
+    """Schema para el resultado de aplicar diferencias de nómina"""
+    altas: int
+    cambios: int
+    bajas: int
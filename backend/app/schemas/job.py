@@ -0,0 +1,25 @@
+"""
+Schemas para trabajos en segundo plano (Celery)
+"""
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+
+
+class JobEncoladoResponse(BaseModel):
+    """Schema de respuesta al encolar un trabajo"""
+    job_id: str = Field(..., description="ID del trabajo encolado")
+    estado: str = Field(..., description="Estado inicial del trabajo")
+    cola: Optional[str] = Field(None, description="Cola a la que fue enviado")
+
+
+class JobEstadoResponse(BaseModel):
+    """Schema de respuesta con el estado de un trabajo"""
+    job_id: str = Field(..., description="ID del trabajo")
+    estado: str = Field(..., description="PENDING, STARTED, RETRY, SUCCESS o FAILURE")
+    listo: bool = Field(..., description="Indica si el trabajo terminó")
+    exitoso: Optional[bool] = Field(None, description="Indica si terminó correctamente (solo si listo)")
+    tarea: Optional[str] = Field(None, description="Nombre de la tarea")
+    resultado: Optional[Any] = Field(None, description="Resultado del trabajo si terminó correctamente")
+    error: Optional[str] = Field(None, description="Mensaje de error si falló")
+    fecha_fin: Optional[datetime] = Field(None, description="Fecha de finalización")
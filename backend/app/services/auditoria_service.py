@@ -0,0 +1,205 @@
+"""
+Servicio de Auditoría
+
+Consulta paginada de los registros de auditoría y mantenimiento de las
+particiones mensuales de la tabla: crea los meses siguientes por
+adelantado y archiva los que superan el periodo de retención.
+"""
+import base64
+import binascii
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.auditoria_repository import AuditoriaRepository
+from app.core.config import settings
+from app.core.exceptions import ValidacionError
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+PATRON_PARTICION = re.compile(r"^auditoria_p(\d{4})_(\d{2})$")
+
+
+def sumar_meses(mes: date, meses: int) -> date:
+    """Retorna el primer día del mes desplazado `meses` (puede ser negativo)"""
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    """Nombre de la partición mensual que contiene `mes`"""
+    return f"auditoria_p{mes:%Y_%m}"
+
+
+def planificar_particiones(
+    existentes: Iterable[str],
+    fecha_referencia: date,
+    meses_futuros: int,
+    meses_retencion: int
+) -> Tuple[List[date], List[str]]:
+    """
+    Calcular qué particiones crear y cuáles archivar
+
+    Args:
+        existentes: Nombres de las particiones adjuntas
+        fecha_referencia: Fecha actual
+        meses_futuros: Meses siguientes al actual que deben existir
+        meses_retencion: Meses anteriores al actual que se conservan
+
+    Returns:
+        (meses a crear, nombres de particiones a archivar)
+    """
+    mes_actual = fecha_referencia.replace(day=1)
+    limite_retencion = sumar_meses(mes_actual, -meses_retencion)
+
+    meses_existentes = {}
+    for nombre in existentes:
+        coincidencia = PATRON_PARTICION.match(nombre)
+        if coincidencia:
+            mes = date(int(coincidencia.group(1)), int(coincidencia.group(2)), 1)
+            meses_existentes[mes] = nombre
+
+    crear = [
+        mes
+        for mes in (sumar_meses(mes_actual, i) for i in range(meses_futuros + 1))
+        if mes not in meses_existentes
+    ]
+    archivar = [
+        nombre
+        for mes, nombre in sorted(meses_existentes.items())
+        if mes < limite_retencion
+    ]
+    return crear, archivar
+
+
+def codificar_cursor(created_at: datetime, id: UUID) -> str:
+    """Codifica la posición (created_at, id) como cursor opaco"""
+    valor = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decodifica un cursor generado por codificar_cursor
+
+    Raises:
+        ValidacionError: Si el cursor no es válido
+    """
+    try:
+        valor = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        fecha, id = valor.split("|")
+        return datetime.fromisoformat(fecha), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidacionError("cursor", "El cursor de paginación no es válido")
+
+
+class AuditoriaService:
+    """Servicio para consulta y mantenimiento de la auditoría"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.auditoria_repo = AuditoriaRepository(db)
+
+    async def consultar(
+        self,
+        tabla: Optional[str] = None,
+        registro_id: Optional[str] = None,
+        usuario_id: Optional[UUID] = None,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limite: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Consultar registros de auditoría por páginas
+
+        Args:
+            tabla: Filtrar por tabla auditada
+            registro_id: Filtrar por registro (requiere tabla)
+            usuario_id: Filtrar por usuario
+            desde: Fecha y hora mínima (inclusive)
+            hasta: Fecha y hora máxima (exclusive)
+            cursor: Cursor retornado por la página anterior
+            limite: Registros por página
+
+        Returns:
+            {"items": registros, "siguiente_cursor": cursor o None si no hay más}
+
+        Raises:
+            ValidacionError: Si los filtros o el cursor no son válidos
+        """
+        if registro_id is not None and tabla is None:
+            raise ValidacionError("registro_id", "Debe indicarse la tabla del registro")
+        if desde is not None and hasta is not None and desde >= hasta:
+            raise ValidacionError("desde", "Debe ser anterior a hasta")
+
+        registros = await self.auditoria_repo.listar_keyset(
+            tabla=tabla,
+            registro_id=registro_id,
+            usuario_id=usuario_id,
+            desde=desde,
+            hasta=hasta,
+            despues_de=decodificar_cursor(cursor) if cursor else None,
+            limite=limite + 1
+        )
+
+        siguiente_cursor = None
+        if len(registros) > limite:
+            registros = registros[:limite]
+            ultimo = registros[-1]
+            siguiente_cursor = codificar_cursor(ultimo.created_at, ultimo.id)
+
+        return {"items": registros, "siguiente_cursor": siguiente_cursor}
+
+    async def mantener_particiones(
+        self,
+        fecha_referencia: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Crear las particiones futuras y archivar las vencidas
+
+        Cada partición se procesa en su propia transacción para no retener
+        bloqueos sobre auditoria. Solo aplica en PostgreSQL; en otros
+        motores la tabla no está particionada y no se hace nada.
+
+        Args:
+            fecha_referencia: Fecha actual (por defecto, hoy)
+
+        Returns:
+            Particiones creadas, archivadas y filas movidas desde la partición por defecto
+        """
+        resultado: Dict[str, Any] = {"creadas": [], "archivadas": [], "filas_movidas": 0}
+        if self.db.bind.dialect.name != "postgresql":
+            return resultado
+
+        crear, archivar = planificar_particiones(
+            await self.auditoria_repo.listar_particiones(),
+            fecha_referencia or date.today(),
+            settings.AUDITORIA_PARTICIONES_FUTURAS,
+            settings.AUDITORIA_RETENCION_MESES
+        )
+
+        for mes in crear:
+            nombre = nombre_particion(mes)
+            resultado["filas_movidas"] += await self.auditoria_repo.crear_particion(
+                nombre, mes, sumar_meses(mes, 1)
+            )
+            await self.db.commit()
+            resultado["creadas"].append(nombre)
+
+        for nombre in archivar:
+            await self.auditoria_repo.archivar_particion(nombre, settings.AUDITORIA_ESQUEMA_ARCHIVO)
+            await self.db.commit()
+            resultado["archivadas"].append(nombre)
+
+        logger.info(
+            "Particiones de auditoría: %d creadas, %d archivadas en %s, %d filas movidas",
+            len(resultado["creadas"]),
+            len(resultado["archivadas"]),
+            settings.AUDITORIA_ESQUEMA_ARCHIVO,
+            resultado["filas_movidas"]
+        )
+        return resultado
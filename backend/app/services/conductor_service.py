@@ -1,20 +1,27 @@
 """
 Servicio para gestión de conductores
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from collections import Counter
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conductor import Conductor, EstadoConductor
+from app.models.auditoria import AccionAuditoria, TipoNotificacion
 from app.models.empresa import Empresa
 from app.repositories.conductor_repository import ConductorRepository
 from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.notificacion_repository import NotificacionRepository
 from app.schemas.conductor import (
     ConductorCreate,
     ConductorUpdate,
     ConductorResponse,
     ConductorBusqueda
 )
+from app.core.auditoria import anotar, auditar_masivo
+from app.core.config import settings
+from app.core.eventos import EVENTO_NOTIFICACION, canal_usuario, publicar_eventos
+from app.core.matriz_licencias import REQUISITOS_CATEGORIA, matriz_licencias
 from app.core.exceptions import (
     RecursoNoEncontrado,
     ValidacionError,
@@ -22,6 +29,34 @@ from app.core.exceptions import (
 )
 
 
+# Transiciones de estado permitidas (REVOCADO es irreversible)
+TRANSICIONES_ESTADO = {
+    EstadoConductor.PENDIENTE: [EstadoConductor.HABILITADO, EstadoConductor.OBSERVADO],
+    EstadoConductor.OBSERVADO: [EstadoConductor.PENDIENTE, EstadoConductor.HABILITADO],
+    EstadoConductor.HABILITADO: [EstadoConductor.SUSPENDIDO, EstadoConductor.REVOCADO],
+    EstadoConductor.SUSPENDIDO: [EstadoConductor.HABILITADO],
+    EstadoConductor.REVOCADO: []
+}
+
+
+def nota_cambio_estado(
+    estado_actual: EstadoConductor,
+    nuevo_estado: EstadoConductor,
+    motivo: str,
+    observaciones: Optional[str] = None,
+    fecha: Optional[datetime] = None
+) -> str:
+    """Texto que se agrega a las observaciones del conductor al cambiar de estado"""
+    fecha = fecha or datetime.now()
+    nota = (
+        f"[{fecha.strftime('%Y-%m-%d %H:%M')}] Cambio de estado: "
+        f"{estado_actual.value} → {nuevo_estado.value}. Motivo: {motivo}"
+    )
+    if observaciones:
+        nota += f". Observaciones: {observaciones}"
+    return nota
+
+
 class ConductorService:
     """Servicio para gestión de conductores"""
     
@@ -50,8 +85,8 @@ class ConductorService:
             ValidacionError: Si hay errores de validación
             ConflictoError: Si DNI o licencia ya existen
         """
-        # Verificar que la empresa existe
-        empresa = await self.empresa_repo.get_by_id(conductor_data.empresa_id)
+        # Verificar que la empresa existe (las autorizaciones se validan con la matriz)
+        empresa = await self.db.get(Empresa, conductor_data.empresa_id)
         if not empresa:
             raise RecursoNoEncontrado("Empresa", str(conductor_data.empresa_id))
         
@@ -114,39 +149,38 @@ class ConductorService:
         Raises:
             RecursoNoEncontrado: Si la empresa no existe
         """
-        empresa = await self.empresa_repo.get_by_id(empresa_id)
-        if not empresa:
-            raise RecursoNoEncontrado("Empresa", str(empresa_id))
-        
-        # Si la empresa no tiene autorizaciones, no se puede validar
-        if not empresa.autorizaciones:
+        categorias = await matriz_licencias.categorias(self.db, empresa_id)
+        if categorias is None:
+            if not await self.empresa_repo.exists(empresa_id):
+                raise RecursoNoEncontrado("Empresa", str(empresa_id))
+            # Si la empresa no tiene autorizaciones, no se puede validar
             raise ValidacionError(
                 "empresa",
                 "La empresa no tiene autorizaciones registradas"
             )
         
-        # Mapeo de tipos de autorización a categorías mínimas requeridas
-        requisitos = {
-            'MERCANCIAS': ['A-IIIb', 'A-IIIc'],
-            'TURISMO': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'TRABAJADORES': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'ESPECIALES': ['A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'ESTUDIANTES': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'RESIDUOS_PELIGROSOS': ['A-IIIb', 'A-IIIc'],
-        }
+        # Válida si lo es para al menos una autorización vigente
+        return licencia_categoria in categorias
+    
+    async def validar_categorias_lote(
+        self,
+        pares: Iterable[Tuple[str, UUID]]
+    ) -> List[bool]:
+        """
+        Valida muchos pares (categoría de licencia, empresa) de una vez
         
-        # Verificar si la categoría es válida para al menos una autorización vigente
-        for autorizacion in empresa.autorizaciones:
-            if not autorizacion.vigente:
-                continue
-            
-            tipo_codigo = autorizacion.tipo_autorizacion.codigo
-            categorias_requeridas = requisitos.get(tipo_codigo, [])
-            
-            if licencia_categoria in categorias_requeridas:
-                return True
+        Pensado para importaciones: resuelve todos los pares con la matriz
+        en memoria, sin consultas por par. Una empresa inexistente o sin
+        autorizaciones vigentes no admite ninguna categoría.
         
-        return False
+        Args:
+            pares: Pares (licencia_categoria, empresa_id)
+            
+        Returns:
+            Resultado de cada par, en el mismo orden
+        """
+        matriz = await matriz_licencias.obtener(self.db)
+        return matriz.validar_lote(pares)
     
     async def obtener_requisitos_categoria(
         self,
@@ -161,16 +195,7 @@ class ConductorService:
         Returns:
             Lista de categorías válidas
         """
-        requisitos = {
-            'MERCANCIAS': ['A-IIIb', 'A-IIIc'],
-            'TURISMO': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'TRABAJADORES': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'ESPECIALES': ['A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'ESTUDIANTES': ['A-IIb', 'A-IIIa', 'A-IIIb', 'A-IIIc'],
-            'RESIDUOS_PELIGROSOS': ['A-IIIb', 'A-IIIc'],
-        }
-        
-        return requisitos.get(tipo_autorizacion_codigo, [])
+        return list(REQUISITOS_CATEGORIA.get(tipo_autorizacion_codigo, ()))
     
     async def actualizar_conductor(
         self,
@@ -225,81 +250,6 @@ class ConductorService:
         
         return conductor
     
-    async def cambiar_estado_conductor(
-        self,
-        conductor_id: UUID,
-        nuevo_estado: EstadoConductor,
-        observacion: Optional[str] = None,
-        usuario_id: Optional[UUID] = None
-    ) -> Conductor:
-        """
-        Cambia el estado de un conductor
-        
-        Args:
-            conductor_id: ID del conductor
-            nuevo_estado: Nuevo estado
-            observacion: Observación sobre el cambio
-            usuario_id: ID del usuario que realiza el cambio
-            
-        Returns:
-            Conductor actualizado
-            
-        Raises:
-            RecursoNoEncontrado: Si el conductor no existe
-            ValidacionError: Si el cambio de estado no es válido
-        """
-        conductor = await self.conductor_repo.get_by_id(conductor_id)
-        if not conductor:
-            raise RecursoNoEncontrado("Conductor", str(conductor_id))
-        
-        # Validar transiciones de estado
-        estado_actual = conductor.estado
-        
-        # Reglas de transición de estados
-        transiciones_validas = {
-            EstadoConductor.PENDIENTE: [
-                EstadoConductor.HABILITADO,
-                EstadoConductor.OBSERVADO,
-                EstadoConductor.REVOCADO
-            ],
-            EstadoConductor.OBSERVADO: [
-                EstadoConductor.PENDIENTE,
-                EstadoConductor.HABILITADO,
-                EstadoConductor.REVOCADO
-            ],
-            EstadoConductor.HABILITADO: [
-                EstadoConductor.SUSPENDIDO,
-                EstadoConductor.REVOCADO,
-                EstadoConductor.OBSERVADO
-            ],
-            EstadoConductor.SUSPENDIDO: [
-                EstadoConductor.HABILITADO,
-                EstadoConductor.REVOCADO
-            ],
-            EstadoConductor.REVOCADO: []  # Estado final
-        }
-        
-        if nuevo_estado not in transiciones_validas.get(estado_actual, []):
-            raise ValidacionError(
-                "estado",
-                f"No se puede cambiar de estado {estado_actual.value} a {nuevo_estado.value}"
-            )
-        
-        # Cambiar estado
-        conductor.cambiar_estado(nuevo_estado, observacion)
-        
-        # Actualizar en base de datos
-        update_data = {
-            "estado": nuevo_estado,
-            "observaciones": conductor.observaciones
-        }
-        conductor = await self.conductor_repo.update(conductor.id, update_data)
-        
-        # TODO: Registrar en auditoría (tarea 15)
-        # TODO: Enviar notificación (tarea 16)
-        
-        return conductor
-    
     async def buscar_conductores(
         self,
         busqueda: ConductorBusqueda
@@ -407,6 +357,74 @@ class ConductorService:
         
         return conductor
     
+    async def obtener_ficha(
+        self,
+        conductor_id: UUID,
+        limite_infracciones: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Obtiene la ficha de un conductor con una sola consulta
+        
+        Incluye el resumen de la empresa, la última habilitación con su pago,
+        los agregados de infracciones, los conteos de documentos y las
+        últimas infracciones. El historial completo no se carga, así que el
+        tamaño de la ficha no crece con la antigüedad del conductor.
+        
+        Args:
+            conductor_id: ID del conductor
+            limite_infracciones: Infracciones recientes a incluir
+                (por defecto CONDUCTORES_FICHA_INFRACCIONES)
+            
+        Returns:
+            Diccionario con el formato de ConductorFicha
+            
+        Raises:
+            RecursoNoEncontrado: Si el conductor no existe
+        """
+        from app.models.habilitacion import EstadoHabilitacion, EstadoPago
+        from app.models.infraccion import EstadoInfraccion, GravedadInfraccion
+        
+        fila = await self.conductor_repo.get_ficha(
+            conductor_id,
+            limite_infracciones or settings.CONDUCTORES_FICHA_INFRACCIONES
+        )
+        if fila is None:
+            raise RecursoNoEncontrado("Conductor", str(conductor_id))
+        
+        conductor = fila.Conductor
+        empresa = None
+        if conductor.empresa_id is not None:
+            empresa = {
+                "id": conductor.empresa_id,
+                "ruc": fila.empresa_ruc,
+                "razon_social": fila.empresa_razon_social,
+                "activo": fila.empresa_activo
+            }
+        
+        # Los estados llegan en el JSON con el nombre del enum
+        habilitacion = fila.ultima_habilitacion
+        if habilitacion is not None:
+            habilitacion["estado"] = EstadoHabilitacion[habilitacion["estado"]]
+            pago = habilitacion["pago"]
+            if pago["id"] is None:
+                habilitacion["pago"] = None
+            else:
+                pago["estado"] = EstadoPago[pago["estado"]]
+        
+        ultimas_infracciones = fila.ultimas_infracciones or []
+        for infraccion in ultimas_infracciones:
+            infraccion["estado"] = EstadoInfraccion[infraccion["estado"]]
+            infraccion["gravedad"] = GravedadInfraccion[infraccion["gravedad"]]
+        
+        return {
+            "conductor": conductor,
+            "empresa": empresa,
+            "ultima_habilitacion": habilitacion,
+            "infracciones": fila.infracciones,
+            "documentos": fila.documentos,
+            "ultimas_infracciones": ultimas_infracciones
+        }
+    
     async def obtener_conductor_por_dni(
         self,
         dni: str
@@ -458,8 +476,6 @@ class ConductorService:
         
         # Soft delete
         await self.conductor_repo.delete(conductor_id)
-        
-        # TODO: Registrar en auditoría (tarea 15)
     
     async def obtener_conductores_por_empresa(
         self,
@@ -569,15 +585,7 @@ class ConductorService:
             raise ValidacionError("estado", f"Estado inválido: {nuevo_estado}")
         
         # Validar transiciones permitidas
-        transiciones_validas = {
-            EstadoConductor.PENDIENTE: [EstadoConductor.HABILITADO, EstadoConductor.OBSERVADO],
-            EstadoConductor.OBSERVADO: [EstadoConductor.PENDIENTE, EstadoConductor.HABILITADO],
-            EstadoConductor.HABILITADO: [EstadoConductor.SUSPENDIDO, EstadoConductor.REVOCADO],
-            EstadoConductor.SUSPENDIDO: [EstadoConductor.HABILITADO],
-            EstadoConductor.REVOCADO: []  # No se puede cambiar desde revocado
-        }
-        
-        if nuevo_estado_enum not in transiciones_validas.get(estado_actual, []):
+        if nuevo_estado_enum not in TRANSICIONES_ESTADO.get(estado_actual, []):
             raise ValidacionError(
                 "estado",
                 f"No se puede cambiar de {estado_actual.value} a {nuevo_estado_enum.value}"
@@ -587,19 +595,130 @@ class ConductorService:
         conductor.estado = nuevo_estado_enum
         
         # Agregar observaciones
-        obs_text = f"[{datetime.now().strftime('%Y-%m-%d %H:%M')}] Cambio de estado: {estado_actual.value} → {nuevo_estado_enum.value}. Motivo: {motivo}"
-        if observaciones:
-            obs_text += f". Observaciones: {observaciones}"
+        obs_text = nota_cambio_estado(estado_actual, nuevo_estado_enum, motivo, observaciones)
         
         if conductor.observaciones:
             conductor.observaciones += f"\n{obs_text}"
         else:
             conductor.observaciones = obs_text
         
+        anotar(conductor, f"Motivo: {motivo}")
+        
         await self.db.commit()
         await self.db.refresh(conductor)
         
-        # TODO: Registrar en auditoría
         # TODO: Enviar notificación
         
         return conductor
+    
+    async def cambiar_estado_empresa(
+        self,
+        empresa_id: UUID,
+        nuevo_estado: EstadoConductor,
+        motivo: str,
+        observaciones: Optional[str] = None,
+        estados: Optional[List[EstadoConductor]] = None,
+        conductor_ids: Optional[List[UUID]] = None
+    ) -> Dict[str, Any]:
+        """
+        Cambia en bloque el estado de los conductores de una empresa
+        
+        Por ejemplo, al caducar una autorización se suspende a todos los
+        conductores HABILITADO. Las reglas de TRANSICIONES_ESTADO se
+        aplican en el WHERE de un UPDATE por cada estado de origen: solo
+        cambian los conductores cuyo estado admite la transición. La
+        auditoría y un aviso resumido al gerente se registran en la misma
+        transacción.
+        
+        Args:
+            empresa_id: ID de la empresa
+            nuevo_estado: Estado de destino
+            motivo: Motivo del cambio
+            observaciones: Observaciones adicionales
+            estados: Limitar el cambio a conductores en estos estados
+            conductor_ids: Limitar el cambio a estos conductores
+            
+        Returns:
+            Resumen con el total actualizado, el conteo por estado anterior
+            y los IDs actualizados
+            
+        Raises:
+            RecursoNoEncontrado: Si la empresa no existe
+            ValidacionError: Si ningún estado admite la transición
+        """
+        empresa = await self.db.get(Empresa, empresa_id)
+        if not empresa:
+            raise RecursoNoEncontrado("Empresa", str(empresa_id))
+        gerente_id = empresa.gerente_id
+        
+        origenes = [
+            estado for estado, destinos in TRANSICIONES_ESTADO.items()
+            if nuevo_estado in destinos and (estados is None or estado in estados)
+        ]
+        if not origenes:
+            raise ValidacionError(
+                "estado",
+                f"Ningún estado seleccionado permite cambiar a {nuevo_estado.value}"
+            )
+        
+        ahora = datetime.now()
+        
+        try:
+            # Una sentencia por estado de origen (una sola para HABILITADO → SUSPENDIDO)
+            actualizados = []
+            for estado in origenes:
+                filas = await self.conductor_repo.cambiar_estado_empresa(
+                    empresa_id,
+                    estado,
+                    nuevo_estado,
+                    nota_cambio_estado(estado, nuevo_estado, motivo, observaciones, ahora),
+                    conductor_ids
+                )
+                actualizados.extend((fila.id, estado) for fila in filas)
+            
+            await auditar_masivo(
+                self.db,
+                Conductor.__tablename__,
+                AccionAuditoria.ACTUALIZAR,
+                (
+                    (conductor_id, {"estado": estado}, {"estado": nuevo_estado})
+                    for conductor_id, estado in actualizados
+                ),
+                descripcion=f"Cambio de estado masivo. Motivo: {motivo}"
+            )
+            
+            por_estado = Counter(estado.value for _, estado in actualizados)
+            notificar = bool(actualizados) and gerente_id is not None
+            if notificar:
+                await NotificacionRepository(self.db).crear_en_bloque([{
+                    "usuario_id": gerente_id,
+                    "tipo": TipoNotificacion.CAMBIO_ESTADO.value,
+                    "asunto": f"{len(actualizados)} conductores pasaron a {nuevo_estado.value}",
+                    "mensaje": (
+                        f"Se cambió a {nuevo_estado.value} el estado de {len(actualizados)} "
+                        f"conductores de {empresa.razon_social}. Motivo: {motivo}"
+                    ),
+                    "leida": False,
+                    "enviada_at": datetime.utcnow(),
+                    "datos_adicionales": {
+                        "empresa_id": str(empresa_id),
+                        "estado": nuevo_estado.value,
+                        "por_estado_anterior": dict(por_estado),
+                    },
+                }])
+            
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        
+        if notificar:
+            await publicar_eventos([(canal_usuario(gerente_id), EVENTO_NOTIFICACION, {"nuevas": 1})])
+        
+        return {
+            "empresa_id": empresa_id,
+            "estado": nuevo_estado.value,
+            "actualizados": len(actualizados),
+            "por_estado_anterior": dict(por_estado),
+            "conductor_ids": [conductor_id for conductor_id, _ in actualizados],
+        }
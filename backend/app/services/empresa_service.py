@@ -1,17 +1,34 @@
 """
 Servicio de Empresa - Lógica de negocio para gestión de empresas
 """
-from typing import Optional, List, Dict, Any
-from uuid import UUID
+import hashlib
+from datetime import datetime
+from typing import Optional, List, Dict, Any, BinaryIO, Mapping, Sequence, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.empresa import Empresa, AutorizacionEmpresa, TipoAutorizacion
-from app.models.conductor import Conductor
+from app.models.auditoria import AccionAuditoria
+from app.models.empresa import Empresa, AutorizacionEmpresa
+from app.models.conductor import Conductor, EstadoConductor
+from app.repositories.conductor_repository import ConductorRepository
 from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.habilitacion_repository import HabilitacionRepository
+from app.repositories.importacion_repository import COLUMNAS_IMPORTACION
 from app.schemas.empresa import (
     EmpresaCreate,
     EmpresaUpdate,
-    AutorizacionEmpresaCreate
+    AutorizacionEmpresaCreate,
+    AutorizacionEmpresaResponse,
+    TipoAutorizacionResponse,
+    NominaAplicar
 )
+from app.schemas.conductor import ConductorUpdate
+from app.services.importacion_service import ErrorFila, leer_archivo_conductores
+from app.core.auditoria import auditar_masivo
+import app.core.resumen_pagos  # noqa: F401 - las bajas de nómina eliminan pagos
+from app.core.catalogo_tipos import catalogo_tipos
+from app.core.matriz_licencias import matriz_licencias
 from app.core.exceptions import (
     RecursoNoEncontrado,
     ValidacionError,
@@ -19,6 +36,36 @@ from app.core.exceptions import (
 )
 
 
+# Columnas que una nómina puede modificar (las de ConductorUpdate, salvo observaciones)
+COLUMNAS_NOMINA = tuple(
+    columna for columna in COLUMNAS_IMPORTACION
+    if columna in ConductorUpdate.model_fields and columna != "observaciones"
+)
+
+# Columnas cuya huella identifica la versión de un registro
+COLUMNAS_VERSION = ("dni", "estado", *COLUMNAS_NOMINA)
+
+
+def huella_conductor(valores: Mapping[str, Any], columnas: Sequence[str]) -> str:
+    """
+    Huella de las columnas de un conductor
+
+    Sirve tanto para las filas del archivo (ya normalizadas por el schema)
+    como para las filas de la base de datos.
+
+    Args:
+        valores: Valores por columna
+        columnas: Columnas a considerar, en orden
+
+    Returns:
+        Resumen hexadecimal de 32 caracteres
+    """
+    contenido = "\x1f".join(
+        "" if valores[columna] is None else str(valores[columna]) for columna in columnas
+    )
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class EmpresaService:
     """Servicio para gestión de empresas"""
     
@@ -31,6 +78,8 @@ class EmpresaService:
         """
         self.db = db
         self.repository = EmpresaRepository(db)
+        self.conductor_repo = ConductorRepository(db)
+        self.habilitacion_repo = HabilitacionRepository(db)
     
     async def registrar_empresa(
         self,
@@ -99,7 +148,9 @@ class EmpresaService:
             result = await self.db.execute(
                 select(Empresa)
                 .where(Empresa.id == empresa.id)
-                .options(selectinload(Empresa.autorizaciones))
+                .options(
+                    selectinload(Empresa.autorizaciones).selectinload(AutorizacionEmpresa.tipo_autorizacion)
+                )
             )
             empresa = result.scalar_one()
         
@@ -132,13 +183,42 @@ class EmpresaService:
                 raise ValidacionError(campo="empresa_id", mensaje="ID de empresa inválido")
         
         # Verificar que la empresa existe
-        empresa = await self.repository.get_by_id(empresa_id)
-        if not empresa:
+        if not await self.repository.exists(empresa_id):
             raise RecursoNoEncontrado(recurso="Empresa", id=str(empresa_id))
         
         # Crear la autorización
         return await self._crear_autorizacion(empresa_id, autorizacion_data)
     
+    async def respuesta_autorizacion(
+        self,
+        autorizacion: AutorizacionEmpresa
+    ) -> AutorizacionEmpresaResponse:
+        """
+        Construye la respuesta de una autorización con su tipo
+        
+        El tipo se toma del catálogo en memoria en lugar de cargar la
+        relación AutorizacionEmpresa.tipo_autorizacion.
+        
+        Args:
+            autorizacion: Autorización con sus columnas cargadas
+            
+        Returns:
+            Autorización con los datos de su tipo
+        """
+        tipo = await catalogo_tipos.tipo_autorizacion(self.db, autorizacion.tipo_autorizacion_id)
+        return AutorizacionEmpresaResponse(
+            id=autorizacion.id,
+            empresa_id=autorizacion.empresa_id,
+            tipo_autorizacion_id=autorizacion.tipo_autorizacion_id,
+            numero_resolucion=autorizacion.numero_resolucion,
+            fecha_emision=autorizacion.fecha_emision,
+            fecha_vencimiento=autorizacion.fecha_vencimiento,
+            vigente=autorizacion.vigente,
+            tipo_autorizacion=TipoAutorizacionResponse.model_validate(tipo) if tipo else None,
+            created_at=autorizacion.created_at,
+            updated_at=autorizacion.updated_at
+        )
+    
     async def _crear_autorizacion(
         self,
         empresa_id: UUID,
@@ -170,11 +250,7 @@ class EmpresaService:
             )
         
         # Verificar que el tipo de autorización existe
-        from sqlalchemy import select
-        result = await self.db.execute(
-            select(TipoAutorizacion).where(TipoAutorizacion.id == tipo_autorizacion_id)
-        )
-        tipo_autorizacion = result.scalar_one_or_none()
+        tipo_autorizacion = await catalogo_tipos.tipo_autorizacion(self.db, tipo_autorizacion_id)
         
         if not tipo_autorizacion:
             raise RecursoNoEncontrado(
@@ -183,6 +259,7 @@ class EmpresaService:
             )
         
         # Verificar que el número de resolución no exista
+        from sqlalchemy import select
         result = await self.db.execute(
             select(AutorizacionEmpresa).where(
                 AutorizacionEmpresa.numero_resolucion == autorizacion_data.numero_resolucion
@@ -446,6 +523,277 @@ class EmpresaService:
         
         return count or 0
     
+    async def calcular_diferencias_nomina(
+        self,
+        empresa_id: UUID,
+        archivo: BinaryIO,
+        nombre_archivo: str
+    ) -> Dict[str, Any]:
+        """
+        Compara una nómina completa enviada en un archivo con la registrada
+        
+        Es un hash join: las filas válidas del archivo se indexan por DNI
+        con la huella de sus columnas comparables, y la nómina registrada se
+        recorre una sola vez con un cursor del lado del servidor. El DNI y la
+        fecha de nacimiento identifican a la persona, por lo que no se
+        comparan; tampoco las observaciones, que el sistema completa. Un
+        conductor registrado cuyo DNI aparece en una fila rechazada no es
+        baja: la fila tiene errores, pero el conductor sigue en la nómina.
+        
+        Args:
+            empresa_id: ID de la empresa
+            archivo: Archivo CSV o XLSX con el formato de importación
+            nombre_archivo: Nombre original, para detectar el formato
+            
+        Returns:
+            Altas, cambios (solo los campos modificados), bajas, cantidad sin
+            cambios y errores por fila del archivo
+            
+        Raises:
+            RecursoNoEncontrado: Si la empresa no existe
+            ValidacionError: Si el archivo no es válido
+        """
+        lotes = leer_archivo_conductores(archivo, nombre_archivo, empresa_id)
+        if not await self.repository.exists(empresa_id):
+            raise RecursoNoEncontrado(recurso="Empresa", id=str(empresa_id))
+        
+        # Lado de construcción: DNI -> (fila, datos) del archivo
+        archivo_por_dni: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        dni_rechazados: Set[str] = set()
+        errores: List[ErrorFila] = []
+        columnas: Sequence[str] = COLUMNAS_NOMINA
+        async for lote in lotes:
+            columnas = [columna for columna in COLUMNAS_NOMINA if columna in lote.columnas]
+            errores.extend(lote.errores)
+            dni_rechazados.update(lote.dni_rechazados)
+            for datos in lote.filas:
+                if datos["dni"] in archivo_por_dni:
+                    errores.append((datos["fila"], "dni", "DNI repetido en el archivo"))
+                    continue
+                archivo_por_dni[datos["dni"]] = (datos.pop("fila"), datos)
+        
+        # Lado de prueba: la nómina registrada, en una pasada
+        cambios: List[Dict[str, Any]] = []
+        bajas: List[Dict[str, Any]] = []
+        sin_cambios = 0
+        async for lote in self.conductor_repo.stream_nomina(empresa_id, COLUMNAS_NOMINA):
+            for registrado in lote:
+                actual = registrado._mapping
+                version = huella_conductor(actual, COLUMNAS_VERSION)
+                encontrado = archivo_por_dni.pop(registrado.dni, None)
+                if encontrado is None:
+                    if registrado.dni in dni_rechazados:
+                        continue
+                    bajas.append({
+                        "conductor_id": registrado.id,
+                        "dni": registrado.dni,
+                        "version": version,
+                        "estado": registrado.estado.value,
+                    })
+                    continue
+                
+                datos = encontrado[1]
+                if huella_conductor(actual, columnas) == huella_conductor(datos, columnas):
+                    sin_cambios += 1
+                    continue
+                cambios.append({
+                    "conductor_id": registrado.id,
+                    "dni": registrado.dni,
+                    "version": version,
+                    "campos": {
+                        columna: datos[columna]
+                        for columna in columnas
+                        if datos[columna] != actual[columna]
+                    },
+                })
+        
+        # Lo que queda del archivo no está en la nómina
+        altas = [
+            {"fila": fila, "conductor": datos}
+            for fila, datos in sorted(archivo_por_dni.values(), key=lambda par: par[0])
+        ]
+        errores.sort(key=lambda error: error[0])
+        
+        return {
+            "empresa_id": empresa_id,
+            "altas": altas,
+            "cambios": cambios,
+            "bajas": bajas,
+            "sin_cambios": sin_cambios,
+            "errores": [
+                {"fila": fila, "campo": campo, "mensaje": mensaje}
+                for fila, campo, mensaje in errores
+            ],
+        }
+    
+    async def aplicar_diferencias_nomina(
+        self,
+        empresa_id: UUID,
+        diferencias: NominaAplicar
+    ) -> Dict[str, int]:
+        """
+        Aplica en una transacción las diferencias de nómina calculadas
+        
+        Cada cambio y cada baja lleva la versión del registro al calcular
+        las diferencias; si algún conductor cambió desde entonces no se
+        aplica nada. Las bajas eliminan al conductor, con la misma regla que
+        ConductorService.eliminar_conductor, junto con sus habilitaciones y
+        pagos, que se auditan y se descuentan del resumen diario de pagos.
+        
+        Args:
+            empresa_id: ID de la empresa
+            diferencias: Altas, cambios y bajas de calcular_diferencias_nomina()
+            
+        Returns:
+            Número de altas, cambios y bajas aplicados
+            
+        Raises:
+            RecursoNoEncontrado: Si la empresa no existe
+            ValidacionError: Si algún cambio no es válido para la empresa
+            ConflictoError: Si la nómina cambió o un DNI o licencia ya existe
+        """
+        empresa = await self.db.get(Empresa, empresa_id)
+        if not empresa:
+            raise RecursoNoEncontrado(recurso="Empresa", id=str(empresa_id))
+        if not empresa.activo:
+            raise ValidacionError(campo="empresa", mensaje="La empresa no está activa")
+        
+        altas = [alta.conductor.model_dump() for alta in diferencias.altas]
+        cambios = {
+            cambio.conductor_id: (cambio.version, cambio.campos.model_dump(exclude_unset=True))
+            for cambio in diferencias.cambios
+        }
+        bajas = {baja.conductor_id: baja.version for baja in diferencias.bajas}
+        if cambios.keys() & bajas.keys():
+            raise ValidacionError(campo="nomina", mensaje="Un conductor no puede cambiar y darse de baja a la vez")
+        
+        try:
+            actuales = {
+                fila.id: fila
+                for fila in await self.conductor_repo.get_nomina_para_actualizar(
+                    empresa_id, [*cambios, *bajas], COLUMNAS_NOMINA
+                )
+            }
+            versiones = [*((i, v) for i, (v, _) in cambios.items()), *bajas.items()]
+            if any(
+                conductor_id not in actuales
+                or huella_conductor(actuales[conductor_id]._mapping, COLUMNAS_VERSION) != version
+                for conductor_id, version in versiones
+            ):
+                raise ConflictoError(
+                    "La nómina cambió desde que se calcularon las diferencias; vuelva a calcularlas"
+                )
+            
+            await self._validar_diferencias_nomina(empresa_id, altas, cambios, bajas, actuales)
+            
+            if bajas:
+                # Habilitaciones y pagos por el ORM: se auditan y se restan del resumen diario
+                await self.habilitacion_repo.eliminar_de_conductores(list(bajas))
+                await self.db.execute(delete(Conductor).where(Conductor.id.in_(list(bajas))))
+                await auditar_masivo(
+                    self.db, Conductor.__tablename__, AccionAuditoria.ELIMINAR,
+                    ((i, dict(actuales[i]._mapping), None) for i in bajas),
+                    descripcion="Baja por actualización de nómina"
+                )
+            
+            ahora = datetime.utcnow()
+            cambios = {i: (v, campos) for i, (v, campos) in cambios.items() if campos}
+            if cambios:
+                await self.db.execute(
+                    update(Conductor),
+                    [{"id": i, "updated_at": ahora, **campos} for i, (_, campos) in cambios.items()]
+                )
+                await auditar_masivo(
+                    self.db, Conductor.__tablename__, AccionAuditoria.ACTUALIZAR,
+                    (
+                        (i, {c: actuales[i]._mapping[c] for c in campos}, campos)
+                        for i, (_, campos) in cambios.items()
+                    ),
+                    descripcion="Actualización de nómina"
+                )
+            
+            if altas:
+                nuevos = [
+                    {
+                        **datos,
+                        "id": uuid4(),
+                        "empresa_id": empresa_id,
+                        "estado": EstadoConductor.PENDIENTE,
+                        "created_at": ahora,
+                        "updated_at": ahora,
+                    }
+                    for datos in altas
+                ]
+                await self.db.execute(insert(Conductor), nuevos)
+                await auditar_masivo(
+                    self.db, Conductor.__tablename__, AccionAuditoria.CREAR,
+                    ((datos["id"], None, datos) for datos in nuevos),
+                    descripcion="Alta por actualización de nómina"
+                )
+            
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ConflictoError(
+                "Otra operación registró conductores con los mismos DNI o licencias; "
+                "vuelva a calcular las diferencias"
+            )
+        except Exception:
+            await self.db.rollback()
+            raise
+        
+        return {"altas": len(altas), "cambios": len(cambios), "bajas": len(bajas)}
+    
+    async def _validar_diferencias_nomina(
+        self,
+        empresa_id: UUID,
+        altas: List[Dict[str, Any]],
+        cambios: Dict[UUID, Tuple[str, Dict[str, Any]]],
+        bajas: Dict[UUID, str],
+        actuales: Dict[UUID, Any]
+    ) -> None:
+        """Reglas de negocio de las diferencias, verificadas en conjunto"""
+        habilitados = sorted(
+            actuales[i].dni for i in bajas if actuales[i].estado == EstadoConductor.HABILITADO
+        )
+        if habilitados:
+            raise ValidacionError(
+                campo="bajas",
+                mensaje=f"No se puede dar de baja a conductores habilitados ({', '.join(habilitados)}). "
+                        "Primero debe suspenderlos o revocarlos."
+            )
+        
+        permitidas = await matriz_licencias.categorias(self.db, empresa_id) or frozenset()
+        categorias = [(datos["dni"], datos["licencia_categoria"]) for datos in altas]
+        categorias += [
+            (actuales[i].dni, campos["licencia_categoria"])
+            for i, (_, campos) in cambios.items()
+            if campos.get("licencia_categoria")
+        ]
+        invalidas = sorted(dni for dni, categoria in categorias if categoria not in permitidas)
+        if invalidas:
+            raise ValidacionError(
+                campo="licencia_categoria",
+                mensaje="La categoría de licencia no es válida para los tipos de autorización "
+                        f"de la empresa ({', '.join(invalidas)})"
+            )
+        
+        dnis = [datos["dni"] for datos in altas]
+        licencias = [datos["licencia_numero"] for datos in altas]
+        licencias += [campos["licencia_numero"] for _, campos in cambios.values() if campos.get("licencia_numero")]
+        if len(set(dnis)) < len(dnis) or len(set(licencias)) < len(licencias):
+            raise ValidacionError(campo="nomina", mensaje="Hay DNI o licencias repetidos en las diferencias")
+        
+        modificados = [*cambios, *bajas]
+        repetidos = (
+            await self.conductor_repo.get_valores_registrados("dni", dnis)
+            | await self.conductor_repo.get_valores_registrados("licencia_numero", licencias, modificados)
+        )
+        if repetidos:
+            raise ConflictoError(
+                f"Ya existen conductores con estos DNI o licencias: {', '.join(sorted(repetidos))}"
+            )
+    
     def _validar_ruc(self, ruc: str) -> bool:
         """
         Valida que el RUC tenga 11 dígitos numéricos
@@ -9,6 +9,7 @@ from app.models.habilitacion import Habilitacion, EstadoHabilitacion, Pago, Esta
 from app.models.conductor import Conductor, EstadoConductor
 from app.repositories.habilitacion_repository import HabilitacionRepository
 from app.repositories.conductor_repository import ConductorRepository
+from app.core.eventos import CANAL_HABILITACIONES, EVENTO_HABILITACION, publicar_evento
 from app.core.exceptions import (
     RecursoNoEncontrado,
     ValidacionError,
@@ -83,6 +84,8 @@ class HabilitacionService:
         conductor.estado = EstadoConductor.PENDIENTE
         await self.db.commit()
         
+        await self._publicar_cambio_estado(habilitacion, None)
+        
         return habilitacion
     
     async def obtener_solicitudes_pendientes(
@@ -155,6 +158,8 @@ class HabilitacionService:
                 f"Solo se pueden revisar habilitaciones en estado PENDIENTE. Estado actual: {habilitacion.estado.value}"
             )
         
+        estado_anterior = habilitacion.estado
+        
         # Actualizar estado
         habilitacion.estado = EstadoHabilitacion.EN_REVISION
         habilitacion.revisado_por = usuario_id
@@ -166,6 +171,8 @@ class HabilitacionService:
         await self.db.commit()
         await self.db.refresh(habilitacion, ['pago'])
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def aprobar_solicitud(
@@ -212,6 +219,8 @@ class HabilitacionService:
         conductor = await self.conductor_repo.get_by_id(habilitacion.conductor_id)
         await self._validar_documentos_conductor(conductor)
         
+        estado_anterior = habilitacion.estado
+        
         # Actualizar estado
         habilitacion.estado = EstadoHabilitacion.APROBADO
         habilitacion.aprobado_por = usuario_id
@@ -226,6 +235,8 @@ class HabilitacionService:
         await self.db.commit()
         await self.db.refresh(habilitacion, ['pago'])
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def observar_solicitud(
@@ -268,6 +279,8 @@ class HabilitacionService:
                 f"Solo se pueden observar habilitaciones en estado EN_REVISION. Estado actual: {habilitacion.estado.value}"
             )
         
+        estado_anterior = habilitacion.estado
+        
         # Actualizar estado
         habilitacion.estado = EstadoHabilitacion.OBSERVADO
         
@@ -288,6 +301,8 @@ class HabilitacionService:
         conductor.estado = EstadoConductor.OBSERVADO
         await self.db.commit()
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def habilitar_conductor(
@@ -348,6 +363,8 @@ class HabilitacionService:
                 "La fecha de vigencia debe ser futura"
             )
         
+        estado_anterior = habilitacion.estado
+        
         # Actualizar estado
         habilitacion.estado = EstadoHabilitacion.HABILITADO
         habilitacion.habilitado_por = usuario_id
@@ -368,6 +385,8 @@ class HabilitacionService:
         conductor.estado = EstadoConductor.HABILITADO
         await self.db.commit()
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def suspender_habilitacion(
@@ -410,6 +429,8 @@ class HabilitacionService:
                 f"Solo se pueden suspender habilitaciones HABILITADAS. Estado actual: {habilitacion.estado.value}"
             )
         
+        estado_anterior = habilitacion.estado
+        
         # Registrar suspensión
         timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
         suspension_info = f"[{timestamp}] SUSPENDIDO por usuario {usuario_id}:\nMotivo: {motivo}"
@@ -427,6 +448,8 @@ class HabilitacionService:
         conductor.estado = EstadoConductor.SUSPENDIDO
         await self.db.commit()
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def revocar_habilitacion(
@@ -463,6 +486,8 @@ class HabilitacionService:
                 f"Solo se pueden revocar habilitaciones HABILITADAS o APROBADAS. Estado actual: {habilitacion.estado.value}"
             )
         
+        estado_anterior = habilitacion.estado
+        
         # Actualizar estado
         habilitacion.estado = EstadoHabilitacion.RECHAZADO
         
@@ -483,6 +508,8 @@ class HabilitacionService:
         conductor.estado = EstadoConductor.REVOCADO
         await self.db.commit()
         
+        await self._publicar_cambio_estado(habilitacion, estado_anterior)
+        
         return habilitacion
     
     async def obtener_habilitacion(self, habilitacion_id: UUID) -> Habilitacion:
@@ -630,6 +657,30 @@ class HabilitacionService:
     
     # Métodos privados
     
+    async def _publicar_cambio_estado(
+        self,
+        habilitacion: Habilitacion,
+        estado_anterior: Optional[EstadoHabilitacion]
+    ) -> None:
+        """
+        Notificar a las colas de los operadores un cambio ya confirmado
+        
+        Args:
+            habilitacion: Habilitación actualizada
+            estado_anterior: Estado previo (None si la habilitación es nueva)
+        """
+        await publicar_evento(
+            CANAL_HABILITACIONES,
+            EVENTO_HABILITACION,
+            {
+                "habilitacion_id": str(habilitacion.id),
+                "codigo_habilitacion": habilitacion.codigo_habilitacion,
+                "conductor_id": str(habilitacion.conductor_id),
+                "estado_anterior": estado_anterior.value if estado_anterior else None,
+                "estado": habilitacion.estado.value
+            }
+        )
+    
     async def _generar_codigo_unico(self) -> str:
         """
         Generar código único de habilitación
@@ -0,0 +1,301 @@
+"""
+Servicio para la importación masiva de conductores desde CSV o XLSX
+
+El archivo se procesa por lotes sin cargarlo completo en memoria:
+
+1. Cada lote se valida con el schema ConductorCreate en una sola llamada.
+2. Las filas válidas se cargan en una tabla temporal (COPY en PostgreSQL).
+3. DNI y licencias repetidos en el archivo o ya registrados, y categorías
+   que la empresa no admite, se marcan con sentencias sobre conjuntos.
+4. Las filas sin error se insertan en conductores con un INSERT ... SELECT.
+
+Todo ocurre en una transacción: se importan todas las filas válidas o
+ninguna. El resultado incluye un error por cada fila rechazada.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, FrozenSet, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auditoria import auditar_masivo
+from app.core.config import settings
+from app.core.exceptions import ConflictoError, RecursoNoEncontrado, ValidacionError
+from app.core.logging_config import get_logger
+from app.core.matriz_licencias import matriz_licencias
+from app.models.auditoria import AccionAuditoria
+from app.models.conductor import Conductor
+from app.models.empresa import Empresa
+from app.repositories.importacion_repository import COLUMNAS_IMPORTACION, ImportacionRepository
+from app.schemas.conductor import ConductorCreate
+from app.utils.importacion import FilaArchivo, formato_archivo, leer_csv, leer_lotes, leer_xlsx
+
+logger = get_logger(__name__)
+
+
+COLUMNAS_OBLIGATORIAS = frozenset(
+    columna for columna in COLUMNAS_IMPORTACION
+    if ConductorCreate.model_fields[columna].is_required()
+)
+
+_validador_lote = TypeAdapter(List[ConductorCreate])
+
+# Error de una fila: (fila, campo, mensaje)
+ErrorFila = Tuple[int, Optional[str], str]
+
+
+def _normalizar_valor(columna: str, valor: Any) -> Any:
+    """Convierte un valor leído del archivo al tipo que espera el schema"""
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return valor or None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        # Excel guarda DNI y teléfonos como números y pierde los ceros iniciales
+        return str(valor).zfill(8) if columna == "dni" else str(valor)
+    return valor
+
+
+def _normalizar_fila(valores: Dict[str, Any], empresa_id: UUID) -> Dict[str, Any]:
+    datos = {}
+    for columna in COLUMNAS_IMPORTACION:
+        valor = _normalizar_valor(columna, valores.get(columna))
+        if valor is not None:
+            datos[columna] = valor
+    datos["empresa_id"] = empresa_id
+    return datos
+
+
+def _mensaje(error: Dict[str, Any]) -> str:
+    mensaje = error["msg"]
+    # Los ValueError de los field_validator llegan con este prefijo
+    return mensaje.removeprefix("Value error, ")
+
+
+def validar_lote(
+    lote: List[FilaArchivo],
+    empresa_id: UUID
+) -> Tuple[List[Dict[str, Any]], List[ErrorFila]]:
+    """
+    Validar un lote de filas del archivo con ConductorCreate
+
+    El lote se valida como una lista en una sola llamada. Si alguna fila
+    falla, se registran sus errores y se valida de nuevo solo el resto.
+
+    Args:
+        lote: Filas del archivo con su número
+        empresa_id: Empresa a la que se asignan los conductores
+
+    Returns:
+        Filas listas para la tabla temporal y errores por fila
+    """
+    datos = [_normalizar_fila(valores, empresa_id) for _, valores in lote]
+    errores: List[ErrorFila] = []
+    indices = list(range(len(lote)))
+
+    try:
+        validos = _validador_lote.validate_python(datos)
+    except ValidationError as e:
+        invalidos = set()
+        for error in e.errors():
+            indice, *ubicacion = error["loc"]
+            invalidos.add(indice)
+            errores.append((lote[indice][0], str(ubicacion[0]) if ubicacion else None, _mensaje(error)))
+        indices = [i for i in indices if i not in invalidos]
+        validos = _validador_lote.validate_python([datos[i] for i in indices])
+
+    filas = [
+        {"fila": lote[i][0], "id": uuid4(), **conductor.model_dump(include=set(COLUMNAS_IMPORTACION))}
+        for i, conductor in zip(indices, validos)
+    ]
+    return filas, errores
+
+
+@dataclass
+class LoteConductores:
+    """Lote validado de un archivo de conductores"""
+
+    # Filas leídas del archivo, válidas o no
+    total: int
+    filas: List[Dict[str, Any]]
+    errores: List[ErrorFila]
+    # Columnas de COLUMNAS_IMPORTACION presentes en el encabezado
+    columnas: FrozenSet[str]
+    # DNI de las filas rechazadas que lo traen, normalizado
+    dni_rechazados: FrozenSet[str]
+
+
+def leer_archivo_conductores(
+    archivo: BinaryIO,
+    nombre_archivo: str,
+    empresa_id: UUID
+) -> AsyncIterator[LoteConductores]:
+    """
+    Leer y validar por lotes un archivo de conductores CSV o XLSX
+
+    La primera fila contiene los nombres de los campos de ConductorCreate
+    (dni, nombres, apellidos, ...).
+
+    Args:
+        archivo: Archivo binario con acceso aleatorio
+        nombre_archivo: Nombre original, para detectar el formato
+        empresa_id: Empresa a la que se asignan los conductores
+
+    Returns:
+        Iterador asíncrono de lotes validados
+
+    Raises:
+        ValidacionError: Si el formato no es soportado; al iterar, si el
+            archivo no es legible, le faltan columnas o supera el máximo de filas
+    """
+    formato = formato_archivo(nombre_archivo)
+    if formato is None:
+        raise ValidacionError("archivo", "Formato no soportado. Use un archivo CSV o XLSX")
+    lector = leer_csv(archivo) if formato == "csv" else leer_xlsx(archivo)
+
+    async def lotes() -> AsyncIterator[LoteConductores]:
+        total = 0
+        try:
+            async for lote in leer_lotes(lector, settings.CONDUCTORES_IMPORTACION_TAMANO_LOTE):
+                columnas = frozenset(lote[0][1].keys()) & frozenset(COLUMNAS_IMPORTACION)
+                if total == 0 and COLUMNAS_OBLIGATORIAS - columnas:
+                    raise ValidacionError(
+                        "archivo",
+                        f"Faltan columnas obligatorias: {', '.join(sorted(COLUMNAS_OBLIGATORIAS - columnas))}"
+                    )
+
+                total += len(lote)
+                if total > settings.CONDUCTORES_IMPORTACION_MAX_FILAS:
+                    raise ValidacionError(
+                        "archivo",
+                        f"El archivo supera el máximo de {settings.CONDUCTORES_IMPORTACION_MAX_FILAS} filas"
+                    )
+
+                filas, errores = await run_in_threadpool(validar_lote, lote, empresa_id)
+                rechazadas = {fila for fila, _, _ in errores}
+                dni_rechazados = frozenset(
+                    dni for numero, valores in lote
+                    if numero in rechazadas and (dni := _normalizar_valor("dni", valores.get("dni")))
+                )
+                yield LoteConductores(len(lote), filas, errores, columnas, dni_rechazados)
+        except ValueError as e:
+            raise ValidacionError("archivo", str(e))
+
+    return lotes()
+
+
+class ImportacionService:
+    """Servicio para la importación masiva de conductores"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.importacion_repo = ImportacionRepository(db)
+
+    async def _verificar_empresa(self, empresa_id: UUID) -> frozenset:
+        empresa = await self.db.get(Empresa, empresa_id)
+        if not empresa:
+            raise RecursoNoEncontrado("Empresa", str(empresa_id))
+        if not empresa.activo:
+            raise ValidacionError("empresa", "La empresa no está activa")
+
+        categorias = await matriz_licencias.categorias(self.db, empresa_id)
+        if categorias is None:
+            raise ValidacionError("empresa", "La empresa no tiene autorizaciones registradas")
+        return categorias
+
+    async def importar_conductores(
+        self,
+        archivo: BinaryIO,
+        nombre_archivo: str,
+        empresa_id: UUID
+    ) -> Dict[str, Any]:
+        """
+        Importar los conductores de un archivo CSV o XLSX a una empresa
+
+        Formato del archivo en leer_archivo_conductores(). Los conductores
+        se crean en estado PENDIENTE.
+
+        Args:
+            archivo: Archivo binario con acceso aleatorio
+            nombre_archivo: Nombre original, para detectar el formato
+            empresa_id: Empresa a la que se asignan los conductores
+
+        Returns:
+            Total de filas, importados, rechazados y errores por fila
+
+        Raises:
+            RecursoNoEncontrado: Si la empresa no existe
+            ValidacionError: Si el archivo o la empresa no son válidos
+            ConflictoError: Si otra operación registró los mismos DNI o licencias
+        """
+        lotes = leer_archivo_conductores(archivo, nombre_archivo, empresa_id)
+        categorias = await self._verificar_empresa(empresa_id)
+        total = 0
+        errores: List[ErrorFila] = []
+
+        try:
+            await self.importacion_repo.crear_tabla()
+            async for lote in lotes:
+                total += lote.total
+                errores.extend(lote.errores)
+                await self.importacion_repo.cargar(lote.filas)
+
+            await self.importacion_repo.preparar_verificaciones()
+            await self.importacion_repo.marcar_existentes("dni", "Ya existe un conductor con DNI ")
+            await self.importacion_repo.marcar_existentes(
+                "licencia_numero", "Ya existe un conductor con licencia "
+            )
+            await self.importacion_repo.marcar_categorias_no_permitidas(categorias)
+            # Al final: una fila repetida se importa si la anterior se rechazó
+            await self.importacion_repo.marcar_repetidos((
+                ("dni", "DNI repetido en el archivo"),
+                ("licencia_numero", "Licencia repetida en el archivo"),
+            ))
+
+            insertados = await self.importacion_repo.insertar_conductores(empresa_id)
+            errores.extend(
+                (fila.fila, fila.campo, fila.error)
+                for fila in await self.importacion_repo.get_errores()
+            )
+
+            await auditar_masivo(
+                self.db,
+                Conductor.__tablename__,
+                AccionAuditoria.CREAR,
+                ((fila.id, None, fila._asdict()) for fila in insertados),
+                descripcion=f"Importación masiva desde {nombre_archivo}"
+            )
+            await self.importacion_repo.eliminar_tabla()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ConflictoError(
+                "Otra operación registró conductores con los mismos DNI o licencias; "
+                "reintente la importación"
+            )
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        errores.sort(key=lambda error: error[0])
+        rechazados = len({fila for fila, _, _ in errores})
+        logger.info(
+            "Importación de conductores para la empresa %s: %d filas, %d importados, %d rechazados",
+            empresa_id, total, len(insertados), rechazados
+        )
+        return {
+            "total_filas": total,
+            "importados": len(insertados),
+            "rechazados": rechazados,
+            "errores": [
+                {"fila": fila, "campo": campo, "mensaje": mensaje}
+                for fila, campo, mensaje in errores
+            ],
+        }
@@ -0,0 +1,159 @@
+"""
+Servicio de Notificaciones
+"""
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.auditoria import TipoNotificacion
+from app.repositories.conductor_repository import ConductorRepository
+from app.repositories.notificacion_repository import NotificacionRepository
+from app.core.config import settings
+from app.core.eventos import EVENTO_NOTIFICACION, canal_usuario, publicar_eventos
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Documento del conductor -> (columna de vencimiento, tipo de notificación, nombre, artículo)
+DOCUMENTOS_CON_VENCIMIENTO = (
+    ("licencia_vencimiento", TipoNotificacion.LICENCIA_POR_VENCER, "licencia de conducir", "La"),
+    ("certificado_medico_vencimiento", TipoNotificacion.CERTIFICADO_POR_VENCER, "certificado médico", "El"),
+)
+
+
+class NotificacionService:
+    """Servicio para generación de notificaciones del sistema"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.notificacion_repo = NotificacionRepository(db)
+        self.conductor_repo = ConductorRepository(db)
+    
+    @staticmethod
+    def _ventana_aviso(dias_restantes: int, ventanas: List[int]) -> Optional[int]:
+        """Retorna la menor ventana que contiene los días restantes"""
+        for ventana in ventanas:
+            if dias_restantes <= ventana:
+                return ventana
+        return None
+    
+    def _notificaciones_de_fila(
+        self,
+        fila: Row,
+        fecha_referencia: date,
+        ventanas: List[int],
+        enviada_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Construye las notificaciones para el gerente a partir de una fila
+        
+        La clave de deduplicación incluye la ventana y la fecha de vencimiento,
+        de modo que cada ventana se notifica una sola vez y la renovación del
+        documento vuelve a habilitar los avisos.
+        """
+        notificaciones = []
+        nombre = f"{fila.nombres} {fila.apellidos}"
+        
+        for columna, tipo, documento, articulo in DOCUMENTOS_CON_VENCIMIENTO:
+            vencimiento = getattr(fila, columna)
+            if vencimiento is None or vencimiento < fecha_referencia:
+                continue
+            
+            dias_restantes = (vencimiento - fecha_referencia).days
+            ventana = self._ventana_aviso(dias_restantes, ventanas)
+            if ventana is None:
+                continue
+            
+            notificaciones.append({
+                "usuario_id": fila.gerente_id,
+                "tipo": tipo.value,
+                "asunto": f"{documento.capitalize()} por vencer: {nombre}",
+                "mensaje": (
+                    f"{articulo} {documento} del conductor {nombre} (DNI {fila.dni}) de "
+                    f"{fila.razon_social} vence el {vencimiento.strftime('%d/%m/%Y')} "
+                    f"({dias_restantes} días)."
+                ),
+                "leida": False,
+                "enviada_at": enviada_at,
+                "datos_adicionales": {
+                    "conductor_id": str(fila.id),
+                    "empresa_id": str(fila.empresa_id),
+                    "fecha_vencimiento": vencimiento.isoformat(),
+                    "dias_restantes": dias_restantes,
+                    "ventana_dias": ventana
+                },
+                "clave_deduplicacion": (
+                    f"{tipo.value}:{fila.id}:{vencimiento.isoformat()}:{ventana}:{fila.gerente_id}"
+                )
+            })
+        
+        return notificaciones
+    
+    async def generar_notificaciones_vencimiento(
+        self,
+        fecha_referencia: Optional[date] = None,
+        ventanas: Optional[List[int]] = None,
+        tamano_lote: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Generar avisos de documentos por vencer para los gerentes de empresa
+        
+        Recorre los conductores con un cursor del lado del servidor y, por
+        cada lote, inserta con un único INSERT multi-fila las notificaciones
+        que no se emitieron antes (ver crear_sin_duplicados).
+        
+        Args:
+            fecha_referencia: Fecha desde la que se cuentan los días (por defecto, hoy)
+            ventanas: Ventanas de aviso en días (por defecto, NOTIFICACIONES_VENTANAS_DIAS)
+            tamano_lote: Conductores por lote (por defecto, NOTIFICACIONES_TAMANO_LOTE)
+            
+        Returns:
+            Conteo de conductores revisados, notificaciones creadas y duplicadas omitidas
+        """
+        fecha_referencia = fecha_referencia or date.today()
+        ventanas = sorted(ventanas or settings.notificaciones_ventanas_list)
+        tamano_lote = tamano_lote or settings.NOTIFICACIONES_TAMANO_LOTE
+        enviada_at = datetime.utcnow()
+        
+        resultado = {"conductores": 0, "creadas": 0, "omitidas": 0}
+        # Acotado por el número de gerentes, no por el de notificaciones
+        nuevas_por_usuario: Counter = Counter()
+        
+        async for lote in self.conductor_repo.stream_documentos_por_vencer(
+            fecha_referencia,
+            dias_anticipacion=ventanas[-1],
+            tamano_lote=tamano_lote
+        ):
+            resultado["conductores"] += len(lote)
+            
+            candidatas = {}
+            for fila in lote:
+                for notificacion in self._notificaciones_de_fila(
+                    fila, fecha_referencia, ventanas, enviada_at
+                ):
+                    candidatas[notificacion["clave_deduplicacion"]] = notificacion
+            
+            nuevas = await self.notificacion_repo.crear_sin_duplicados(list(candidatas.values()))
+            
+            resultado["creadas"] += len(nuevas)
+            resultado["omitidas"] += len(candidatas) - len(nuevas)
+            nuevas_por_usuario.update(n["usuario_id"] for n in nuevas)
+        
+        await self.db.commit()
+        
+        # Un aviso por gerente para que sus clientes conectados recarguen la bandeja
+        await publicar_eventos(
+            (canal_usuario(usuario_id), EVENTO_NOTIFICACION, {"nuevas": cantidad})
+            for usuario_id, cantidad in nuevas_por_usuario.items()
+        )
+        
+        logger.info(
+            "Notificaciones de vencimiento %s: %d conductores, %d creadas, %d omitidas",
+            fecha_referencia.isoformat(),
+            resultado["conductores"],
+            resultado["creadas"],
+            resultado["omitidas"]
+        )
+        return resultado
@@ -1,17 +1,22 @@
 """
 Servicio de Pagos TUPA
 """
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from uuid import UUID
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.habilitacion import Pago, ConceptoTUPA, EstadoPago
-from app.repositories.pago_repository import PagoRepository, ConceptoTUPARepository
+from app.repositories.pago_repository import PagoRepository, ConceptoTUPARepository, PagoResumenDiarioRepository
 from app.repositories.habilitacion_repository import HabilitacionRepository
 from app.repositories.conductor_repository import ConductorRepository
 from app.repositories.empresa_repository import EmpresaRepository
 from app.core.exceptions import RecursoNoEncontrado, ValidacionError
+from app.core.catalogo_tupa import catalogo_tupa
+from app.core.cache import leer_cache, escribir_cache, version_cache, invalidar_cache
+from app.core.config import settings
+import app.core.resumen_pagos  # noqa: F401 - mantiene el resumen diario al escribir pagos
+from app.utils.exportacion import Columna, exportar_csv, exportar_xlsx
 from app.schemas.pago import (
     PagoCreate,
     PagoResponse,
@@ -22,12 +27,33 @@ from app.schemas.pago import (
 )
 
 
+# Espacio de caché de las estadísticas de periodos ya cerrados
+CACHE_ESTADISTICAS = "pagos:estadisticas"
+
+
+COLUMNAS_EXPORTACION: List[Columna] = [
+    ("numero_recibo", "Número de recibo"),
+    ("fecha_pago", "Fecha de pago"),
+    ("monto", "Monto (S/.)"),
+    ("estado", "Estado"),
+    ("entidad_bancaria", "Entidad bancaria"),
+    ("fecha_confirmacion", "Fecha de confirmación"),
+    ("concepto_codigo", "Código TUPA"),
+    ("concepto_descripcion", "Concepto TUPA"),
+    ("codigo_habilitacion", "Código de habilitación"),
+    ("conductor_dni", "DNI conductor"),
+]
+
+FORMATOS_EXPORTACION = ("csv", "xlsx")
+
+
 class PagoService:
     """Servicio para gestión de pagos TUPA"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
         self.pago_repo = PagoRepository(db)
+        self.resumen_repo = PagoResumenDiarioRepository(db)
         self.concepto_repo = ConceptoTUPARepository(db)
         self.habilitacion_repo = HabilitacionRepository(db)
         self.conductor_repo = ConductorRepository(db)
@@ -85,10 +111,7 @@ class PagoService:
         if fecha is None:
             fecha = date.today()
         
-        concepto = await self.concepto_repo.get_concepto_vigente_por_codigo(
-            codigo=tipo_tramite,
-            fecha=fecha
-        )
+        concepto = await catalogo_tupa.obtener_vigente(self.db, tipo_tramite, fecha)
         
         if not concepto:
             raise RecursoNoEncontrado(
@@ -131,7 +154,7 @@ class PagoService:
             )
         
         # Obtener concepto TUPA vigente
-        concepto = await self.concepto_repo.get_concepto_vigente_por_codigo(concepto_tupa_codigo)
+        concepto = await catalogo_tupa.obtener_vigente(self.db, concepto_tupa_codigo)
         if not concepto:
             raise RecursoNoEncontrado(
                 recurso="ConceptoTUPA",
@@ -268,6 +291,7 @@ class PagoService:
         
         pago = await self.pago_repo.create(pago_dict)
         await self.db.commit()
+        await self._invalidar_estadisticas(pago.fecha_pago)
         
         # Obtener el pago con relaciones
         pago_completo = await self.pago_repo.get_by_id_with_relations(pago.id)
@@ -326,6 +350,7 @@ class PagoService:
         # Confirmar el pago
         pago.confirmar_pago(usuario_id)
         await self.db.commit()
+        await self._invalidar_estadisticas(pago.fecha_pago)
         
         # Obtener el pago con relaciones
         pago_completo = await self.pago_repo.get_by_id_with_relations(pago.id)
@@ -366,12 +391,60 @@ class PagoService:
         # Rechazar el pago
         pago.rechazar_pago(motivo)
         await self.db.commit()
+        await self._invalidar_estadisticas(pago.fecha_pago)
         
         # Obtener el pago con relaciones
         pago_completo = await self.pago_repo.get_by_id_with_relations(pago.id)
         
         return PagoConDetalles(**self._pago_to_dict(pago_completo))
     
+    async def _obtener_estadisticas(self, fecha_inicio: date, fecha_fin: date) -> dict:
+        """
+        Obtiene las estadísticas del período, usando la caché si ya cerró
+        
+        Se calculan sobre el resumen diario (pagos_resumen_diario), no
+        sobre los pagos individuales. Los períodos que terminan antes de
+        hoy solo cambian cuando se registra, confirma o rechaza un pago con
+        fecha pasada, lo que invalida la caché (ver _invalidar_estadisticas).
+        
+        Args:
+            fecha_inicio: Fecha inicial del período
+            fecha_fin: Fecha final del período
+            
+        Returns:
+            Estadísticas por estado, concepto y mes
+        """
+        if fecha_fin >= date.today():
+            return await self.resumen_repo.get_estadisticas_por_periodo(fecha_inicio, fecha_fin)
+        
+        version = await version_cache(CACHE_ESTADISTICAS)
+        if version is None:
+            return await self.resumen_repo.get_estadisticas_por_periodo(fecha_inicio, fecha_fin)
+        
+        clave = f"{CACHE_ESTADISTICAS}:v{version}:{fecha_inicio.isoformat()}:{fecha_fin.isoformat()}"
+        estadisticas = await leer_cache(clave)
+        if estadisticas is not None:
+            estadisticas['por_estado'] = {
+                EstadoPago(estado): datos for estado, datos in estadisticas['por_estado'].items()
+            }
+            return estadisticas
+        
+        estadisticas = await self.resumen_repo.get_estadisticas_por_periodo(fecha_inicio, fecha_fin)
+        await escribir_cache(
+            clave,
+            {
+                **estadisticas,
+                'por_estado': {estado.value: datos for estado, datos in estadisticas['por_estado'].items()}
+            },
+            settings.PAGOS_ESTADISTICAS_CACHE_SEGUNDOS
+        )
+        return estadisticas
+    
+    async def _invalidar_estadisticas(self, fecha_pago: date) -> None:
+        """Invalida las estadísticas en caché si el pago pertenece a un período cerrado"""
+        if fecha_pago < date.today():
+            await invalidar_cache(CACHE_ESTADISTICAS)
+    
     async def generar_reporte_ingresos(
         self,
         fecha_inicio: date,
@@ -396,11 +469,7 @@ class PagoService:
                 mensaje="La fecha de inicio debe ser anterior a la fecha de fin"
             )
         
-        # Obtener estadísticas del repositorio
-        estadisticas = await self.pago_repo.get_estadisticas_por_periodo(
-            fecha_inicio,
-            fecha_fin
-        )
+        estadisticas = await self._obtener_estadisticas(fecha_inicio, fecha_fin)
         
         # Calcular totales
         total_pagos = 0
@@ -482,6 +551,46 @@ class PagoService:
         
         return PagoConDetalles(**self._pago_to_dict(pago_completo))
     
+    def exportar_pagos(
+        self,
+        formato: str,
+        estado: Optional[EstadoPago] = None,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Generar la exportación de pagos en CSV o XLSX por partes
+        
+        Los pagos se leen por lotes desde un cursor del lado del servidor,
+        por lo que la memoria no depende del número de pagos exportados.
+        
+        Args:
+            formato: "csv" o "xlsx"
+            estado: Estado opcional para filtrar
+            fecha_inicio: Fecha inicial opcional
+            fecha_fin: Fecha final opcional
+            
+        Returns:
+            Iterador asíncrono con los bloques del archivo
+            
+        Raises:
+            ValidacionError: Si el formato o el rango de fechas no son válidos
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            raise ValidacionError("formato", f"Formato no soportado: {formato}")
+        if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+            raise ValidacionError("fecha_inicio", "La fecha de inicio debe ser anterior a la fecha de fin")
+        
+        lotes = self.pago_repo.stream_exportacion(
+            estado=estado,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            tamano_lote=settings.PAGOS_EXPORTACION_TAMANO_LOTE
+        )
+        if formato == "csv":
+            return exportar_csv(COLUMNAS_EXPORTACION, lotes)
+        return exportar_xlsx(COLUMNAS_EXPORTACION, lotes, titulo="Pagos")
+    
     async def get_pagos(
         self,
         estado: Optional[EstadoPago] = None,
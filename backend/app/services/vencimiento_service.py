@@ -0,0 +1,103 @@
+"""
+Servicio de barrido de vencimientos
+
+Actualiza en bloque el estado almacenado de autorizaciones, habilitaciones
+y conductores cuyos documentos vencieron, para que las consultas de lectura
+puedan confiar en el estado sin recalcular la vigencia fila por fila.
+"""
+from typing import Awaitable, Callable, Dict, Optional
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.habilitacion_repository import HabilitacionRepository
+from app.repositories.conductor_repository import ConductorRepository
+from app.core.catalogos import notificar_cambio
+from app.core.config import settings
+from app.core.matriz_licencias import matriz_licencias
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class VencimientoService:
+    """Servicio para el barrido periódico de vencimientos"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.empresa_repo = EmpresaRepository(db)
+        self.habilitacion_repo = HabilitacionRepository(db)
+        self.conductor_repo = ConductorRepository(db)
+    
+    async def _procesar_en_lotes(
+        self,
+        actualizar_lote: Callable[[date, int], Awaitable[int]],
+        fecha_corte: date,
+        tamano_lote: int
+    ) -> int:
+        """
+        Ejecuta un UPDATE por lotes hasta agotar las filas pendientes
+        
+        Cada lote se confirma por separado para liberar los bloqueos.
+        
+        Args:
+            actualizar_lote: Método de repositorio que actualiza un lote
+            fecha_corte: Fecha de referencia para el vencimiento
+            tamano_lote: Número máximo de filas por lote
+            
+        Returns:
+            Total de filas actualizadas
+        """
+        total = 0
+        while True:
+            actualizadas = await actualizar_lote(fecha_corte, tamano_lote)
+            await self.db.commit()
+            total += actualizadas
+            if actualizadas < tamano_lote:
+                return total
+    
+    async def barrer_vencimientos(
+        self,
+        fecha_corte: Optional[date] = None,
+        tamano_lote: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Marcar como vencidos los registros cuya vigencia terminó
+        
+        El orden importa: las habilitaciones se vencen antes que los
+        conductores, porque un conductor se suspende cuando su habilitación
+        quedó en estado VENCIDO.
+        
+        Args:
+            fecha_corte: Fecha de referencia (por defecto, hoy)
+            tamano_lote: Filas por lote (por defecto, VENCIMIENTOS_TAMANO_LOTE)
+            
+        Returns:
+            Conteo de registros actualizados por tipo
+        """
+        fecha_corte = fecha_corte or date.today()
+        tamano_lote = tamano_lote or settings.VENCIMIENTOS_TAMANO_LOTE
+        
+        resultado = {
+            "autorizaciones": await self._procesar_en_lotes(
+                self.empresa_repo.marcar_autorizaciones_vencidas, fecha_corte, tamano_lote
+            ),
+            "habilitaciones": await self._procesar_en_lotes(
+                self.habilitacion_repo.marcar_vencidas, fecha_corte, tamano_lote
+            ),
+            "conductores": await self._procesar_en_lotes(
+                self.conductor_repo.suspender_con_documentos_vencidos, fecha_corte, tamano_lote
+            ),
+        }
+        
+        if resultado["autorizaciones"]:
+            # UPDATE masivo: los eventos de sesión no lo detectan
+            await notificar_cambio(matriz_licencias)
+        
+        logger.info(
+            "Barrido de vencimientos %s: %d autorizaciones, %d habilitaciones, %d conductores",
+            fecha_corte.isoformat(),
+            resultado["autorizaciones"],
+            resultado["habilitaciones"],
+            resultado["conductores"]
+        )
+        return resultado
@@ -0,0 +1,8 @@
+"""
+Tareas en segundo plano (Celery)
+"""
+from app.tasks.celery_app import celery_app
+
+__all__ = [
+    "celery_app",
+]
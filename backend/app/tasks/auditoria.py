@@ -0,0 +1,42 @@
+"""
+Tareas de mantenimiento de la auditoría
+"""
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.auditoria_service import AuditoriaService
+from app.tasks.base import AsyncDatabaseTask
+from app.tasks.celery_app import celery_app
+
+
+async def _mantener_particiones(
+    session: AsyncSession,
+    fecha_referencia: Optional[str]
+) -> Dict[str, Any]:
+    service = AuditoriaService(session)
+    return await service.mantener_particiones(
+        fecha_referencia=date.fromisoformat(fecha_referencia) if fecha_referencia else None
+    )
+
+
+@celery_app.task(
+    bind=True,
+    base=AsyncDatabaseTask,
+    name="app.tasks.auditoria.mantener_particiones"
+)
+def mantener_particiones(self, fecha_referencia: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Crear las particiones mensuales futuras de auditoria y archivar las vencidas
+
+    Es idempotente: se programa a diario para que un fallo puntual no deje
+    el mes siguiente sin partición.
+
+    Args:
+        fecha_referencia: Fecha de referencia en formato ISO (por defecto, hoy)
+
+    Returns:
+        Particiones creadas, archivadas y filas movidas desde la partición por defecto
+    """
+    return self.run_with_session(_mantener_particiones, fecha_referencia)
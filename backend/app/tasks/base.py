@@ -0,0 +1,145 @@
+"""
+Clases base para tareas Celery con acceso asíncrono a base de datos
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from celery import Task
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.core.auditoria  # noqa: F401 - registra los eventos de auditoría en el worker
+import app.core.resumen_pagos  # noqa: F401 - mantiene el resumen diario de pagos en el worker
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+def _ejecutar_en_loop_nuevo(coro: Awaitable[T]) -> T:
+    """Ejecuta la corrutina en un loop propio sin alterar el loop global del hilo"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Ejecuta una corrutina desde código síncrono
+
+    Si el hilo actual ya tiene un event loop en ejecución (por ejemplo,
+    una tarea en modo eager llamada desde un endpoint), la corrutina se
+    ejecuta en un hilo auxiliar con su propio loop.
+
+    Args:
+        coro: Corrutina a ejecutar
+
+    Returns:
+        Resultado de la corrutina
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _ejecutar_en_loop_nuevo(coro)
+
+    resultado = {}
+
+    def _ejecutar():
+        try:
+            resultado["valor"] = _ejecutar_en_loop_nuevo(coro)
+        except BaseException as e:  # noqa: B902 - se relanza en el hilo original
+            resultado["error"] = e
+
+    hilo = threading.Thread(target=_ejecutar, name="celery-run-async")
+    hilo.start()
+    hilo.join()
+
+    if "error" in resultado:
+        raise resultado["error"]
+    return resultado["valor"]
+
+
+class AsyncDatabaseTask(Task):
+    """
+    Tarea base con sesión asíncrona de base de datos
+
+    Cada ejecución corre en su propio event loop, por lo que el engine usa
+    NullPool: las conexiones de asyncpg no pueden reutilizarse entre loops.
+    El engine se crea de forma perezosa una vez por proceso worker.
+
+    Example:
+        @celery_app.task(base=AsyncDatabaseTask, bind=True)
+        def mi_tarea(self, conductor_id: str):
+            return self.run_with_session(_mi_tarea_async, UUID(conductor_id))
+    """
+
+    abstract = True
+
+    _session_factory: Optional[async_sessionmaker] = None
+
+    @classmethod
+    def get_session_factory(cls) -> async_sessionmaker:
+        """Obtiene (o crea) la fábrica de sesiones del worker"""
+        if AsyncDatabaseTask._session_factory is None:
+            engine = create_async_engine(
+                settings.DATABASE_URL,
+                poolclass=NullPool,
+                future=True
+            )
+            AsyncDatabaseTask._session_factory = async_sessionmaker(
+                engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False
+            )
+        return AsyncDatabaseTask._session_factory
+
+    @classmethod
+    def configure_session_factory(cls, session_factory: Optional[async_sessionmaker]) -> None:
+        """
+        Reemplaza la fábrica de sesiones (usado en tests)
+
+        Args:
+            session_factory: Nueva fábrica o None para volver a la predeterminada
+        """
+        AsyncDatabaseTask._session_factory = session_factory
+
+    async def _ejecutar_en_sesion(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any
+    ) -> T:
+        async with self.get_session_factory()() as session:
+            try:
+                resultado = await func(session, *args, **kwargs)
+                await session.commit()
+                return resultado
+            except Exception:
+                await session.rollback()
+                raise
+
+    def run_with_session(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any
+    ) -> T:
+        """
+        Ejecuta `func(session, *args, **kwargs)` dentro de una transacción
+
+        Hace commit si la función termina correctamente y rollback si lanza
+        una excepción.
+
+        Args:
+            func: Corrutina que recibe la sesión como primer argumento
+
+        Returns:
+            Resultado de la función
+        """
+        return run_async(self._ejecutar_en_sesion(func, *args, **kwargs))
@@ -0,0 +1,181 @@
+"""
+Aplicación Celery para tareas en segundo plano
+
+Worker:
+    celery -A app.tasks.celery_app worker -Q default,pdf,reports,notifications --loglevel=info
+Beat:
+    celery -A app.tasks.celery_app beat --loglevel=info
+
+El worker publica la espera en cola y la duración de cada tarea en
+http://<worker>:CELERY_METRICAS_PUERTO/metrics. Con el pool prefork, definir
+PROMETHEUS_MULTIPROC_DIR (vacío al arrancar) para sumar los procesos hijos.
+"""
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from celery import Celery, Task, signals
+from celery.result import AsyncResult
+from celery.schedules import crontab
+from celery.utils import uuid
+from kombu import Queue
+
+from app.core.config import settings
+from app.core.metricas import TAREAS_DURACION, TAREAS_ESPERA, finalizar_proceso, iniciar_servidor
+
+
+# Colas de trabajo
+COLA_DEFAULT = "default"
+COLA_PDF = "pdf"
+COLA_REPORTES = "reports"
+COLA_NOTIFICACIONES = "notifications"
+
+
+celery_app = Celery(
+    "drtc_nomina",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=[
+        "app.tasks.pdf",
+        "app.tasks.reportes",
+        "app.tasks.vencimientos",
+        "app.tasks.notificaciones",
+        "app.tasks.auditoria",
+    ]
+)
+
+celery_app.conf.update(
+    # Serialización
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    timezone="America/Lima",
+    enable_utc=True,
+
+    # Resultados
+    result_expires=settings.CELERY_RESULT_EXPIRES,
+    result_extended=True,
+    task_track_started=True,
+
+    # Confiabilidad: confirmar al terminar y no acaparar tareas largas
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+
+    # Enrutamiento por colas
+    task_default_queue=COLA_DEFAULT,
+    task_queues=(
+        Queue(COLA_DEFAULT),
+        Queue(COLA_PDF),
+        Queue(COLA_REPORTES),
+        Queue(COLA_NOTIFICACIONES),
+    ),
+    task_routes={
+        "app.tasks.pdf.*": {"queue": COLA_PDF},
+        "app.tasks.reportes.*": {"queue": COLA_REPORTES},
+        "app.tasks.notificaciones.*": {"queue": COLA_NOTIFICACIONES},
+    },
+
+    # Modo eager (desarrollo y tests)
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    task_store_eager_result=True,
+
+    # Tareas programadas (celery-beat)
+    beat_schedule={
+        "barrer-vencimientos-nocturno": {
+            "task": "app.tasks.vencimientos.barrer_vencimientos",
+            "schedule": crontab(hour=0, minute=15),
+        },
+        "notificar-documentos-por-vencer": {
+            "task": "app.tasks.notificaciones.generar_notificaciones_vencimiento",
+            "schedule": crontab(hour=6, minute=0),
+        },
+        "mantener-particiones-auditoria": {
+            "task": "app.tasks.auditoria.mantener_particiones",
+            "schedule": crontab(hour=1, minute=0),
+        },
+    },
+)
+
+
+# Usuario que encoló cada trabajo; expira junto con su resultado
+PREFIJO_PROPIETARIO = "job-propietario-"
+
+
+def encolar_para_usuario(tarea: Task, usuario_id: UUID, *args: Any) -> AsyncResult:
+    """
+    Encola una tarea registrando qué usuario la pidió
+
+    El propietario se guarda en el backend de resultados antes de encolar,
+    para que GET /jobs/{job_id} pueda comprobarlo aunque la tarea aún no
+    haya empezado.
+
+    Args:
+        tarea: Tarea Celery a encolar
+        usuario_id: ID del usuario que pide el trabajo
+        *args: Argumentos de la tarea
+
+    Returns:
+        Resultado asíncrono con el ID del trabajo
+    """
+    job_id = uuid()
+    celery_app.backend.set(f"{PREFIJO_PROPIETARIO}{job_id}", str(usuario_id))
+    return tarea.apply_async(args=args, task_id=job_id)
+
+
+def propietario_job(job_id: str, backend) -> Optional[str]:
+    """ID del usuario que encoló el trabajo, o None si no se conoce (bloqueante)"""
+    propietario = backend.get(f"{PREFIJO_PROPIETARIO}{job_id}")
+    if propietario is None:
+        return None
+    return propietario.decode() if isinstance(propietario, bytes) else str(propietario)
+
+
+# Cabecera con el momento (epoch) en que se encoló la tarea
+CABECERA_ENCOLADA = "encolada_en"
+
+# Inicio de las tareas en ejecución en este proceso, por task_id
+_inicios: Dict[str, float] = {}
+
+
+def _cola(tarea: Task) -> str:
+    """Cola de la que salió la tarea; en modo eager, la que le asigna el router"""
+    cola = (tarea.request.delivery_info or {}).get("routing_key")
+    return cola or celery_app.amqp.router.route({}, tarea.name)["queue"].name
+
+
+@signals.before_task_publish.connect
+def _marcar_encolada(headers: Optional[dict] = None, **kwargs: Any) -> None:
+    if headers is not None:
+        headers[CABECERA_ENCOLADA] = time.time()
+
+
+@signals.task_prerun.connect
+def _iniciar_tarea(task_id: str, task: Task, **kwargs: Any) -> None:
+    _inicios[task_id] = time.perf_counter()
+    encolada = (task.request.headers or {}).get(CABECERA_ENCOLADA)
+    if encolada is not None:
+        TAREAS_ESPERA.labels(task=task.name, queue=_cola(task)).observe(
+            max(time.time() - encolada, 0)
+        )
+
+
+@signals.task_postrun.connect
+def _finalizar_tarea(task_id: str, task: Task, state: Optional[str] = None, **kwargs: Any) -> None:
+    inicio = _inicios.pop(task_id, None)
+    if inicio is not None:
+        TAREAS_DURACION.labels(task=task.name, queue=_cola(task), state=state or "UNKNOWN").observe(
+            time.perf_counter() - inicio
+        )
+
+
+@signals.worker_init.connect
+def _publicar_metricas(**kwargs: Any) -> None:
+    if settings.CELERY_METRICAS_PUERTO:
+        iniciar_servidor(settings.CELERY_METRICAS_PUERTO)
+
+
+@signals.worker_process_shutdown.connect
+def _finalizar_proceso_worker(**kwargs: Any) -> None:
+    finalizar_proceso()
@@ -0,0 +1,46 @@
+"""
+Tareas de generación de notificaciones
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.notificacion_service import NotificacionService
+from app.tasks.base import AsyncDatabaseTask
+from app.tasks.celery_app import celery_app
+
+
+async def _generar_notificaciones_vencimiento(
+    session: AsyncSession,
+    fecha_referencia: Optional[str],
+    ventanas: Optional[List[int]]
+) -> Dict[str, int]:
+    service = NotificacionService(session)
+    return await service.generar_notificaciones_vencimiento(
+        fecha_referencia=date.fromisoformat(fecha_referencia) if fecha_referencia else None,
+        ventanas=ventanas
+    )
+
+
+@celery_app.task(
+    bind=True,
+    base=AsyncDatabaseTask,
+    name="app.tasks.notificaciones.generar_notificaciones_vencimiento"
+)
+def generar_notificaciones_vencimiento(
+    self,
+    fecha_referencia: Optional[str] = None,
+    ventanas: Optional[List[int]] = None
+) -> Dict[str, int]:
+    """
+    Notificar a los gerentes los documentos de conductores por vencer
+
+    Args:
+        fecha_referencia: Fecha de referencia en formato ISO (por defecto, hoy)
+        ventanas: Ventanas de aviso en días (por defecto, NOTIFICACIONES_VENTANAS_DIAS)
+
+    Returns:
+        Conteo de conductores revisados, notificaciones creadas y omitidas
+    """
+    return self.run_with_session(_generar_notificaciones_vencimiento, fecha_referencia, ventanas)
@@ -0,0 +1,42 @@
+"""
+Tareas de generación de documentos PDF
+"""
+import base64
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.tasks.base import AsyncDatabaseTask
+from app.tasks.celery_app import celery_app
+
+
+async def _generar_certificado(db: AsyncSession, habilitacion_id: UUID) -> dict:
+    from app.services.habilitacion_service import HabilitacionService
+
+    service = HabilitacionService(db)
+    pdf_bytes = await service.generar_certificado(habilitacion_id)
+    habilitacion = await service.obtener_habilitacion(habilitacion_id)
+
+    return {
+        "nombre_archivo": f"certificado_{habilitacion.codigo_habilitacion}.pdf",
+        "tipo_mime": "application/pdf",
+        "contenido_base64": base64.b64encode(pdf_bytes).decode("ascii"),
+    }
+
+
+@celery_app.task(
+    base=AsyncDatabaseTask,
+    bind=True,
+    name="app.tasks.pdf.generar_certificado_habilitacion"
+)
+def generar_certificado_habilitacion(self, habilitacion_id: str) -> dict:
+    """
+    Genera el certificado PDF de una habilitación
+
+    Args:
+        habilitacion_id: ID de la habilitación
+
+    Returns:
+        Diccionario con nombre de archivo, tipo MIME y contenido en base64
+    """
+    return self.run_with_session(_generar_certificado, UUID(habilitacion_id))
@@ -0,0 +1,43 @@
+"""
+Tareas de generación de reportes
+"""
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.tasks.base import AsyncDatabaseTask
+from app.tasks.celery_app import celery_app
+
+
+async def _generar_reporte_ingresos(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date
+) -> dict:
+    from app.services.pago_service import PagoService
+
+    reporte = await PagoService(db).generar_reporte_ingresos(fecha_inicio, fecha_fin)
+    return reporte.model_dump(mode="json")
+
+
+@celery_app.task(
+    base=AsyncDatabaseTask,
+    bind=True,
+    name="app.tasks.reportes.generar_reporte_ingresos"
+)
+def generar_reporte_ingresos(self, fecha_inicio: str, fecha_fin: str) -> dict:
+    """
+    Genera el reporte de ingresos de un período
+
+    Args:
+        fecha_inicio: Fecha inicial en formato ISO (YYYY-MM-DD)
+        fecha_fin: Fecha final en formato ISO (YYYY-MM-DD)
+
+    Returns:
+        Reporte de ingresos serializado a JSON
+    """
+    return self.run_with_session(
+        _generar_reporte_ingresos,
+        date.fromisoformat(fecha_inicio),
+        date.fromisoformat(fecha_fin)
+    )
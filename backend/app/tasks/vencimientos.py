@@ -0,0 +1,46 @@
+"""
+Tareas programadas de vencimiento de documentos
+"""
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.vencimiento_service import VencimientoService
+from app.tasks.base import AsyncDatabaseTask
+from app.tasks.celery_app import celery_app
+
+
+async def _barrer_vencimientos(
+    session: AsyncSession,
+    fecha_corte: Optional[str],
+    tamano_lote: Optional[int]
+) -> Dict[str, int]:
+    service = VencimientoService(session)
+    return await service.barrer_vencimientos(
+        fecha_corte=date.fromisoformat(fecha_corte) if fecha_corte else None,
+        tamano_lote=tamano_lote
+    )
+
+
+@celery_app.task(
+    bind=True,
+    base=AsyncDatabaseTask,
+    name="app.tasks.vencimientos.barrer_vencimientos"
+)
+def barrer_vencimientos(
+    self,
+    fecha_corte: Optional[str] = None,
+    tamano_lote: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Barrido nocturno de autorizaciones, habilitaciones y conductores vencidos
+
+    Args:
+        fecha_corte: Fecha de referencia en formato ISO (por defecto, hoy)
+        tamano_lote: Filas por lote (por defecto, VENCIMIENTOS_TAMANO_LOTE)
+
+    Returns:
+        Conteo de registros actualizados por tipo
+    """
+    return self.run_with_session(_barrer_vencimientos, fecha_corte, tamano_lote)
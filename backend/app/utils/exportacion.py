@@ -0,0 +1,147 @@
+"""
+Utilidades para exportar datos tabulares en flujo (CSV y XLSX)
+
+Ambos formatos consumen lotes de filas de un cursor del lado del servidor
+y nunca mantienen el resultado completo en memoria.
+"""
+import csv
+import enum
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Sequence, Tuple
+
+import xlsxwriter
+from starlette.concurrency import run_in_threadpool
+
+
+# (atributo de la fila, encabezado)
+Columna = Tuple[str, str]
+
+MEDIA_TYPE_CSV = "text/csv; charset=utf-8"
+MEDIA_TYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+TAMANO_BLOQUE_ARCHIVO = 64 * 1024
+
+
+def _valor_csv(valor: Any) -> Any:
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return "" if valor is None else valor
+
+
+async def exportar_csv(
+    columnas: Sequence[Columna],
+    lotes: AsyncIterator[Sequence[Any]]
+) -> AsyncIterator[bytes]:
+    """
+    Generar un CSV por partes, un bloque de bytes por lote
+
+    Incluye BOM UTF-8 para que Excel reconozca los acentos.
+
+    Args:
+        columnas: Columnas a exportar
+        lotes: Lotes de filas con los atributos de `columnas`
+
+    Yields:
+        Bloques del archivo CSV
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([encabezado for _, encabezado in columnas])
+    yield ("﻿" + buffer.getvalue()).encode("utf-8")
+
+    async for lote in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(
+            [_valor_csv(getattr(fila, atributo)) for atributo, _ in columnas]
+            for fila in lote
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _HojaXlsx:
+    """Hoja de xlsxwriter en modo constant_memory sobre un archivo temporal"""
+
+    def __init__(self, columnas: Sequence[Columna], titulo: str):
+        descriptor, self.ruta = tempfile.mkstemp(suffix=".xlsx")
+        os.close(descriptor)
+        # constant_memory vuelca cada fila a disco al pasar a la siguiente
+        self.libro = xlsxwriter.Workbook(self.ruta, {"constant_memory": True})
+        self.hoja = self.libro.add_worksheet(titulo[:31])
+        self.formato_fecha = self.libro.add_format({"num_format": "dd/mm/yyyy"})
+        self.formato_fecha_hora = self.libro.add_format({"num_format": "dd/mm/yyyy hh:mm"})
+        self.formato_monto = self.libro.add_format({"num_format": "#,##0.00"})
+        self.columnas = columnas
+        self.fila = 0
+
+        negrita = self.libro.add_format({"bold": True})
+        for indice, (_, encabezado) in enumerate(columnas):
+            self.hoja.write_string(0, indice, encabezado, negrita)
+        self.hoja.freeze_panes(1, 0)
+
+    def escribir_lote(self, lote: Sequence[Any]) -> None:
+        for fila in lote:
+            self.fila += 1
+            for indice, (atributo, _) in enumerate(self.columnas):
+                valor = getattr(fila, atributo)
+                if valor is None:
+                    continue
+                if isinstance(valor, datetime):
+                    self.hoja.write_datetime(self.fila, indice, valor, self.formato_fecha_hora)
+                elif isinstance(valor, date):
+                    self.hoja.write_datetime(self.fila, indice, valor, self.formato_fecha)
+                elif isinstance(valor, Decimal):
+                    self.hoja.write_number(self.fila, indice, float(valor), self.formato_monto)
+                elif isinstance(valor, enum.Enum):
+                    self.hoja.write_string(self.fila, indice, valor.value)
+                else:
+                    self.hoja.write(self.fila, indice, valor)
+
+    def cerrar(self) -> None:
+        self.libro.close()
+
+
+async def exportar_xlsx(
+    columnas: Sequence[Columna],
+    lotes: AsyncIterator[Sequence[Any]],
+    titulo: str = "Datos"
+) -> AsyncIterator[bytes]:
+    """
+    Generar un XLSX con memoria acotada
+
+    Las filas se escriben a disco lote a lote (xlsxwriter en modo
+    constant_memory, en el threadpool para no bloquear el event loop). Un
+    XLSX es un ZIP cuyo índice se escribe al cerrar el libro, por lo que el
+    archivo se envía por bloques una vez terminado de generar.
+
+    Args:
+        columnas: Columnas a exportar
+        lotes: Lotes de filas con los atributos de `columnas`
+        titulo: Nombre de la hoja
+
+    Yields:
+        Bloques del archivo XLSX
+    """
+    hoja = await run_in_threadpool(_HojaXlsx, columnas, titulo)
+    try:
+        async for lote in lotes:
+            await run_in_threadpool(hoja.escribir_lote, lote)
+        await run_in_threadpool(hoja.cerrar)
+
+        archivo = await run_in_threadpool(open, hoja.ruta, "rb")
+        try:
+            while True:
+                bloque = await run_in_threadpool(archivo.read, TAMANO_BLOQUE_ARCHIVO)
+                if not bloque:
+                    break
+                yield bloque
+        finally:
+            archivo.close()
+    finally:
+        os.unlink(hoja.ruta)
@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Tuple
 from fastapi import UploadFile, HTTPException, status
 
+from app.core.tiempos import tiempo
+
 
 # Configuración
 UPLOAD_DIR = Path("uploads/conductores")
@@ -103,7 +105,8 @@ async def save_upload_file(upload_file: UploadFile) -> Tuple[str, str, int]:
         ensure_upload_directory()
         
         # Leer contenido del archivo
-        contents = await upload_file.read()
+        with tiempo("archivos"):
+            contents = await upload_file.read()
         file_size = len(contents)
         
         # Validar tamaño
@@ -119,7 +122,7 @@ async def save_upload_file(upload_file: UploadFile) -> Tuple[str, str, int]:
         file_path = UPLOAD_DIR / unique_filename
         
         # Guardar archivo
-        with open(file_path, 'wb') as f:
+        with tiempo("archivos"), open(file_path, 'wb') as f:
             f.write(contents)
         
         return unique_filename, str(file_path), file_size
@@ -143,8 +146,9 @@ def delete_file(file_path: str) -> None:
         file_path: Ruta del archivo a eliminar
     """
     try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        with tiempo("archivos"):
+            if os.path.exists(file_path):
+                os.remove(file_path)
     except Exception as e:
         # Log error pero no lanzar excepción
         print(f"Error al eliminar archivo {file_path}: {str(e)}")
@@ -0,0 +1,143 @@
+"""
+Utilidades para leer datos tabulares en flujo (CSV y XLSX)
+
+Los lectores recorren el archivo fila a fila y nunca cargan el contenido
+completo en memoria. Cada fila se entrega como un diccionario con los
+encabezados normalizados (sin espacios, en minúsculas) y su número de fila
+en el archivo, para reportar errores.
+"""
+import csv
+import io
+import zipfile
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from starlette.concurrency import run_in_threadpool
+
+
+# (número de fila en el archivo, valores por encabezado)
+FilaArchivo = Tuple[int, Dict[str, Any]]
+
+FORMATOS_IMPORTACION = ("csv", "xlsx")
+
+DELIMITADORES_CSV = ",;\t"
+
+
+def formato_archivo(nombre: Optional[str]) -> Optional[str]:
+    """
+    Formato de un archivo según su extensión
+
+    Returns:
+        "csv", "xlsx" o None si no es un formato soportado
+    """
+    extension = (nombre or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in FORMATOS_IMPORTACION else None
+
+
+def _encabezados(valores: Sequence[Any]) -> List[str]:
+    return [str(valor).strip().lower() if valor is not None else "" for valor in valores]
+
+
+def _vacia(valores: Sequence[Any]) -> bool:
+    return all(valor is None or (isinstance(valor, str) and not valor.strip()) for valor in valores)
+
+
+def leer_csv(archivo: BinaryIO) -> Iterator[FilaArchivo]:
+    """
+    Recorrer un CSV en UTF-8 (con o sin BOM)
+
+    El delimitador (coma, punto y coma o tabulación) se detecta con la
+    línea de encabezados, porque Excel usa punto y coma según la
+    configuración regional.
+
+    Args:
+        archivo: Archivo binario posicionado al inicio
+
+    Yields:
+        Filas no vacías con su número de línea
+
+    Raises:
+        ValueError: Si el archivo no es texto UTF-8 o no tiene encabezados
+    """
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    try:
+        primera = texto.readline()
+        if not primera.strip():
+            raise ValueError("El archivo no tiene encabezados")
+        try:
+            dialecto = csv.Sniffer().sniff(primera, delimiters=DELIMITADORES_CSV)
+        except csv.Error:
+            dialecto = csv.excel
+
+        encabezados = _encabezados(next(csv.reader([primera], dialecto)))
+        lector = csv.reader(texto, dialecto)
+        for valores in lector:
+            if _vacia(valores):
+                continue
+            yield lector.line_num + 1, dict(zip(encabezados, valores))
+    except UnicodeDecodeError:
+        raise ValueError("El archivo CSV debe estar codificado en UTF-8")
+    finally:
+        # Sin esto, cerrar el envoltorio cerraría también el archivo subido
+        texto.detach()
+
+
+def leer_xlsx(archivo: BinaryIO) -> Iterator[FilaArchivo]:
+    """
+    Recorrer la primera hoja de un XLSX en modo de solo lectura
+
+    openpyxl en modo read_only lee la hoja de forma incremental desde el
+    ZIP. Las fechas llegan como datetime y los números como int o float.
+
+    Args:
+        archivo: Archivo binario con acceso aleatorio
+
+    Yields:
+        Filas no vacías con su número de fila en la hoja
+
+    Raises:
+        ValueError: Si el archivo no es un XLSX válido o no tiene encabezados
+    """
+    try:
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError):
+        raise ValueError("El archivo no es un XLSX válido")
+
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        primera = next(filas, None)
+        if primera is None or _vacia(primera):
+            raise ValueError("El archivo no tiene encabezados")
+
+        encabezados = _encabezados(primera)
+        for numero, valores in enumerate(filas, start=2):
+            if _vacia(valores):
+                continue
+            yield numero, dict(zip(encabezados, valores))
+    finally:
+        libro.close()
+
+
+async def leer_lotes(
+    filas: Iterator[FilaArchivo],
+    tamano_lote: int
+) -> AsyncIterator[List[FilaArchivo]]:
+    """
+    Consumir un lector por lotes sin bloquear el event loop
+
+    Cada lote se lee del archivo en el threadpool.
+
+    Args:
+        filas: Lector de leer_csv() o leer_xlsx()
+        tamano_lote: Filas por lote
+
+    Yields:
+        Lotes de hasta `tamano_lote` filas
+    """
+    while True:
+        lote = await run_in_threadpool(lambda: list(islice(filas, tamano_lote)))
+        if not lote:
+            return
+        yield lote
@@ -13,6 +13,9 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.pdfgen import canvas
 
+from app.core.metricas import PDF_DURACION
+from app.core.tiempos import cronometrar
+
 
 class CertificadoHabilitacionPDF:
     """Generador de certificados de habilitación"""
@@ -21,6 +24,8 @@ class CertificadoHabilitacionPDF:
         self.pagesize = A4
         self.width, self.height = self.pagesize
         
+    @PDF_DURACION.labels(document="certificado_habilitacion").time()
+    @cronometrar("pdf")
     def generar(
         self,
         codigo_habilitacion: str,
@@ -0,0 +1,41 @@
+"""
+Reconstruir el resumen diario de pagos (pagos_resumen_diario)
+
+El resumen se mantiene de forma incremental al escribir pagos por el ORM.
+Este script lo recalcula desde la tabla pagos: para la carga inicial, tras
+correcciones manuales o actualizaciones masivas, o para verificarlo.
+
+Uso:
+    python scripts/reconstruir_resumen_pagos.py
+    python scripts/reconstruir_resumen_pagos.py --desde 2025-01-01 --hasta 2025-12-31
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import AsyncSessionLocal, engine
+from app.repositories.pago_repository import PagoResumenDiarioRepository
+
+
+async def reconstruir(desde: date = None, hasta: date = None) -> None:
+    """Reconstruir el resumen en una transacción"""
+    async with AsyncSessionLocal() as session:
+        filas = await PagoResumenDiarioRepository(session).reconstruir(desde, hasta)
+        await session.commit()
+    await engine.dispose()
+
+    rango = f"{desde or 'inicio'} a {hasta or 'fin'}"
+    print(f"✓ Resumen diario reconstruido ({rango}): {filas} filas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruir el resumen diario de pagos")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None, help="Primer día (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="Último día (AAAA-MM-DD)")
+    args = parser.parse_args()
+    asyncio.run(reconstruir(args.desde, args.hasta))
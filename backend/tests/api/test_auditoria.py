@@ -0,0 +1,81 @@
+"""
+Tests para los endpoints de auditoría
+"""
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from app.models.auditoria import Auditoria
+from app.models.user import Usuario
+
+
+@pytest_asyncio.fixture
+async def registros_auditoria(db_session, director_usuario: Usuario):
+    """Cinco registros de auditoría de un mismo conductor"""
+    base = datetime(2026, 10, 1, 9, 0, 0)
+    registros = [
+        Auditoria(
+            usuario_id=director_usuario.id,
+            tabla="conductores",
+            accion="actualizar",
+            registro_id="conductor-1",
+            datos_nuevos={"telefono": f"99900000{i}"},
+            created_at=base + timedelta(minutes=i),
+            updated_at=base
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(registros)
+    await db_session.commit()
+    return registros
+
+
+@pytest.mark.asyncio
+class TestListarAuditoria:
+    """Tests para GET /auditoria"""
+    
+    async def test_paginas_con_cursor(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        registros_auditoria
+    ):
+        """Test: El director recorre el historial de un registro por cursor"""
+        headers = {"Authorization": f"Bearer {director_token}"}
+        params = {"tabla": "conductores", "registro_id": "conductor-1", "limite": 3}
+        
+        primera = await client.get("/api/v1/auditoria", params=params, headers=headers)
+        assert primera.status_code == 200
+        datos = primera.json()
+        assert [r["datos_nuevos"]["telefono"] for r in datos["items"]] == [
+            "999000004", "999000003", "999000002"
+        ]
+        assert datos["siguiente_cursor"]
+        
+        segunda = await client.get(
+            "/api/v1/auditoria",
+            params={**params, "cursor": datos["siguiente_cursor"]},
+            headers=headers
+        )
+        assert segunda.status_code == 200
+        assert len(segunda.json()["items"]) == 2
+        assert segunda.json()["siguiente_cursor"] is None
+    
+    async def test_cursor_invalido(self, client: AsyncClient, director_token: str):
+        """Test: Un cursor inválido retorna 400"""
+        response = await client.get(
+            "/api/v1/auditoria",
+            params={"cursor": "%%%"},
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        assert response.status_code == 400
+    
+    async def test_operario_no_autorizado(self, client: AsyncClient, operario_token: str):
+        """Test: El operario no puede consultar la auditoría"""
+        response = await client.get(
+            "/api/v1/auditoria",
+            headers={"Authorization": f"Bearer {operario_token}"}
+        )
+        
+        assert response.status_code == 403
@@ -0,0 +1,144 @@
+"""
+Tests para la ficha del conductor
+"""
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import event
+from app.models.habilitacion import EstadoHabilitacion, EstadoPago
+from app.models.infraccion import EstadoInfraccion, GravedadInfraccion, Infraccion, TipoInfraccion
+
+
+@pytest_asyncio.fixture
+async def conductor_con_historial(
+    db_session,
+    director_usuario,
+    empresa_factory,
+    conductor_factory,
+    habilitacion_factory,
+    concepto_tupa_factory,
+    pago_factory
+):
+    """Conductor con dos habilitaciones y doce infracciones"""
+    empresa = await empresa_factory.create()
+    conductor = await conductor_factory.create(empresa_id=empresa.id)
+    await habilitacion_factory.create(
+        conductor_id=conductor.id,
+        estado=EstadoHabilitacion.VENCIDO,
+        fecha_solicitud=datetime(2023, 1, 10)
+    )
+    ultima = await habilitacion_factory.create(
+        conductor_id=conductor.id,
+        estado=EstadoHabilitacion.APROBADO,
+        fecha_solicitud=datetime(2024, 5, 20)
+    )
+    concepto = await concepto_tupa_factory.create()
+    await pago_factory.create(
+        habilitacion_id=ultima.id,
+        concepto_tupa_id=concepto.id,
+        estado=EstadoPago.CONFIRMADO
+    )
+
+    leve = TipoInfraccion(codigo="L001", descripcion="Leve", gravedad=GravedadInfraccion.LEVE, puntos=5)
+    grave = TipoInfraccion(codigo="G001", descripcion="Grave", gravedad=GravedadInfraccion.GRAVE, puntos=20)
+    db_session.add_all([leve, grave])
+    await db_session.flush()
+    for numero in range(12):
+        db_session.add(Infraccion(
+            conductor_id=conductor.id,
+            tipo_infraccion_id=(grave if numero % 3 == 0 else leve).id,
+            fecha_infraccion=date.today() - timedelta(days=numero),
+            descripcion=f"Infracción {numero}",
+            entidad_fiscalizadora="SUTRAN",
+            numero_acta=f"ACTA-{numero:03d}",
+            estado=EstadoInfraccion.ANULADA if numero == 0 else EstadoInfraccion.REGISTRADA,
+            registrado_por=director_usuario.id
+        ))
+    await db_session.commit()
+    return conductor, ultima
+
+
+@pytest.mark.asyncio
+class TestFichaConductor:
+    """Tests para GET /conductores/{id}/ficha"""
+
+    async def test_ficha_en_una_consulta(
+        self,
+        client: AsyncClient,
+        db_session,
+        director_token,
+        conductor_con_historial
+    ):
+        """Test la ficha completa sale de una sola consulta a la base de datos"""
+        conductor, ultima = conductor_con_historial
+        headers = {"Authorization": f"Bearer {director_token}"}
+
+        consultas = []
+        motor = db_session.bind.sync_engine
+
+        def registrar(conn, cursor, sentencia, parametros, contexto, executemany):
+            consultas.append(sentencia)
+
+        event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            response = await client.get(
+                f"/api/v1/conductores/{conductor.id}/ficha?infracciones=5", headers=headers
+            )
+        finally:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+        assert response.status_code == 200
+        assert len([c for c in consultas if "conductores" in c]) == 1
+        ficha = response.json()
+        assert ficha["conductor"]["id"] == str(conductor.id)
+        assert ficha["empresa"]["id"] == str(conductor.empresa_id)
+        assert ficha["ultima_habilitacion"]["id"] == str(ultima.id)
+        assert ficha["ultima_habilitacion"]["estado"] == EstadoHabilitacion.APROBADO.value
+        assert ficha["ultima_habilitacion"]["pago"]["estado"] == EstadoPago.CONFIRMADO.value
+
+        assert ficha["infracciones"]["total"] == 12
+        assert ficha["infracciones"]["por_gravedad"] == {"leve": 8, "grave": 4, "muy_grave": 0}
+        assert ficha["infracciones"]["por_estado"]["anulada"] == 1
+        assert ficha["infracciones"]["puntos"] == 8 * 5 + 3 * 20
+        assert ficha["documentos"]["total"] == 0
+
+        recientes = ficha["ultimas_infracciones"]
+        assert [i["numero_acta"] for i in recientes] == [f"ACTA-{n:03d}" for n in range(5)]
+        assert recientes[0]["gravedad"] == GravedadInfraccion.GRAVE.value
+        assert recientes[0]["estado"] == EstadoInfraccion.ANULADA.value
+
+    async def test_ficha_sin_historial(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_factory,
+        conductor_factory
+    ):
+        """Test un conductor sin habilitaciones ni infracciones"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+
+        response = await client.get(
+            f"/api/v1/conductores/{conductor.id}/ficha",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 200
+        ficha = response.json()
+        assert ficha["ultima_habilitacion"] is None
+        assert ficha["infracciones"]["total"] == 0
+        assert ficha["infracciones"]["ultima_fecha"] is None
+        assert ficha["ultimas_infracciones"] == []
+
+    async def test_ficha_limite_y_no_encontrado(
+        self,
+        client: AsyncClient,
+        director_token
+    ):
+        """Test el límite de infracciones está acotado y un ID inexistente da 404"""
+        headers = {"Authorization": f"Bearer {director_token}"}
+        url = "/api/v1/conductores/123e4567-e89b-12d3-a456-426614174000/ficha"
+
+        assert (await client.get(f"{url}?infracciones=500", headers=headers)).status_code == 422
+        assert (await client.get(url, headers=headers)).status_code == 404
@@ -383,3 +383,41 @@ class TestConductoresEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert all(c["estado"] == "habilitado" for c in data["items"])
+
+
+@pytest.mark.asyncio
+class TestAuditoriaConductores:
+    """Tests de la auditoría de cambios hechos por la API"""
+    
+    async def test_cambio_estado_queda_auditado(
+        self,
+        client: AsyncClient,
+        db_session,
+        director_usuario,
+        director_token: str,
+        conductor_factory
+    ):
+        """Test: El cambio de estado se audita con usuario, IP y motivo"""
+        from sqlalchemy import select
+        from app.models.auditoria import Auditoria, AccionAuditoria
+        
+        conductor = await conductor_factory.create(estado=EstadoConductor.PENDIENTE)
+        
+        response = await client.post(
+            f"/api/v1/conductores/{conductor.id}/cambiar-estado",
+            json={"nuevo_estado": "observado", "motivo": "Documentación incompleta"},
+            headers={"Authorization": f"Bearer {director_token}", "User-Agent": "pruebas"}
+        )
+        
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(Auditoria).where(Auditoria.registro_id == str(conductor.id))
+        )
+        registro = result.scalar_one()
+        assert registro.accion == AccionAuditoria.CAMBIO_ESTADO.value
+        assert registro.usuario_id == director_usuario.id
+        assert registro.datos_anteriores["estado"] == EstadoConductor.PENDIENTE.value
+        assert registro.datos_nuevos["estado"] == EstadoConductor.OBSERVADO.value
+        assert "Documentación incompleta" in registro.descripcion
+        assert registro.user_agent == "pruebas"
+        assert registro.ip_address is not None
@@ -0,0 +1,167 @@
+"""
+Tests para los endpoints de diagnóstico
+"""
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.consultas_lentas import consultas_lentas, huella, normalizar
+from app.models.conductor import Conductor
+
+
+@pytest_asyncio.fixture
+async def registro_sin_umbral():
+    """Registro de consultas lentas que anota todas las sentencias"""
+    umbral = consultas_lentas.umbral_ms
+    consultas_lentas.umbral_ms = 0
+    consultas_lentas.limpiar()
+    yield consultas_lentas
+    await consultas_lentas.esperar_capturas()
+    consultas_lentas.umbral_ms = umbral
+    consultas_lentas.limpiar()
+
+
+@pytest.mark.asyncio
+class TestConsultasLentas:
+    """Tests para el registro de consultas lentas y GET /diagnostico/consultas-lentas"""
+
+    async def test_normalizar_agrupa_por_forma(self):
+        """Test sentencias que solo difieren en valores tienen la misma huella"""
+        una = normalizar("SELECT * FROM conductores WHERE dni = $1 AND estado IN ($2, $3) LIMIT 10")
+        otra = normalizar("SELECT *\n  FROM conductores WHERE dni = '12345678' AND estado IN (?) LIMIT 50")
+
+        assert una == "SELECT * FROM conductores WHERE dni = ? AND estado IN (?) LIMIT ?"
+        assert huella(una) == huella(otra)
+
+    async def test_registra_y_captura_el_plan(
+        self,
+        client: AsyncClient,
+        db_session,
+        superusuario_token,
+        registro_sin_umbral
+    ):
+        """Test una consulta lenta se acumula con su plan y el endpoint la muestra"""
+        consulta = select(Conductor).where(Conductor.dni.ilike("%123%"))
+        await db_session.execute(consulta)
+        await db_session.execute(consulta)
+        await registro_sin_umbral.esperar_capturas()
+
+        response = await client.get(
+            "/api/v1/diagnostico/consultas-lentas",
+            params={"limite": 200},
+            headers={"Authorization": f"Bearer {superusuario_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["umbral_ms"] == 0
+        lentas = [c for c in data["consultas"] if "FROM conductores" in c["sentencia"] and "lower(" in c["sentencia"].lower()]
+        assert len(lentas) == 1
+        assert lentas[0]["ejecuciones"] == 2
+        assert lentas[0]["plan"] and "conductores" in str(lentas[0]["plan"])
+
+    async def test_solo_superusuario(self, client: AsyncClient, director_token):
+        """Test el registro no está disponible para otros roles"""
+        response = await client.get(
+            "/api/v1/diagnostico/consultas-lentas",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+class TestBloqueosLoop:
+    """Tests para GET /diagnostico/bloqueos"""
+
+    async def test_lista_bloqueos(self, client: AsyncClient, superusuario_token):
+        """Test el superusuario consulta el umbral y los bloqueos capturados"""
+        response = await client.get(
+            "/api/v1/diagnostico/bloqueos",
+            headers={"Authorization": f"Bearer {superusuario_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["umbral_ms"] > 0
+        assert isinstance(data["bloqueos"], list)
+
+
+@pytest_asyncio.fixture
+async def directorio_perfiles(tmp_path, monkeypatch):
+    """Directorio temporal para los perfiles guardados"""
+    monkeypatch.setattr(settings, "PERFILADOR_DIRECTORIO", str(tmp_path))
+    yield tmp_path
+
+
+@pytest.mark.asyncio
+class TestPerfilador:
+    """Tests para el perfilado de peticiones bajo demanda"""
+
+    async def test_perfila_la_peticion_con_token(
+        self,
+        client: AsyncClient,
+        superusuario_token,
+        directorio_perfiles
+    ):
+        """Test una petición con token de perfil guarda un perfil speedscope descargable"""
+        auth = {"Authorization": f"Bearer {superusuario_token}"}
+        response = await client.post("/api/v1/diagnostico/perfiles/token", headers=auth)
+        assert response.status_code == 201
+        token = response.json()["token"]
+
+        response = await client.get(
+            "/api/v1/diagnostico/bloqueos",
+            headers={**auth, "X-Perfil": token}
+        )
+        assert response.status_code == 200
+        perfil_id = response.headers["X-Perfil-Id"]
+        assert response.headers["X-Perfil-Url"] == f"/api/v1/diagnostico/perfiles/{perfil_id}"
+
+        response = await client.get(f"/api/v1/diagnostico/perfiles/{perfil_id}", headers=auth)
+        assert response.status_code == 200
+        perfil = response.json()
+        assert perfil["name"] == "GET /api/v1/diagnostico/bloqueos"
+        muestreado = perfil["profiles"][0]
+        assert muestreado["type"] == "sampled"
+        assert len(muestreado["samples"]) == len(muestreado["weights"])
+
+    async def test_sin_token_no_perfila(self, client: AsyncClient, superusuario_token, directorio_perfiles):
+        """Test las peticiones sin token no se perfilan"""
+        response = await client.get(
+            "/api/v1/diagnostico/bloqueos",
+            headers={"Authorization": f"Bearer {superusuario_token}"}
+        )
+
+        assert response.status_code == 200
+        assert "X-Perfil-Id" not in response.headers
+        assert not list(directorio_perfiles.iterdir())
+
+    async def test_token_invalido(self, client: AsyncClient, superusuario_token, directorio_perfiles):
+        """Test un token de acceso no sirve como token de perfil"""
+        response = await client.get(
+            "/api/v1/diagnostico/bloqueos",
+            headers={"Authorization": f"Bearer {superusuario_token}", "X-Perfil": superusuario_token}
+        )
+
+        assert response.status_code == 403
+        assert not list(directorio_perfiles.iterdir())
+
+    async def test_token_solo_superusuario(self, client: AsyncClient, director_token):
+        """Test otros roles no obtienen tokens de perfil"""
+        response = await client.post(
+            "/api/v1/diagnostico/perfiles/token",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 403
+
+    async def test_perfil_inexistente(self, client: AsyncClient, superusuario_token, directorio_perfiles):
+        """Test un perfil que no existe responde 404"""
+        response = await client.get(
+            f"/api/v1/diagnostico/perfiles/{'0' * 32}",
+            headers={"Authorization": f"Bearer {superusuario_token}"}
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,90 @@
+"""
+Tests para el flujo de eventos en tiempo real (SSE)
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from httpx import AsyncClient
+from app.api.v1.endpoints.eventos import canales_para_usuario, flujo_eventos
+from app.core.eventos import CANAL_HABILITACIONES, canal_usuario, publicar_evento
+from app.models.habilitacion import EstadoHabilitacion
+from app.models.user import Usuario, RolUsuario
+from app.services.habilitacion_service import HabilitacionService
+
+
+class _RequestConectada:
+    """Request mínima para el generador SSE"""
+    
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+async def _siguiente(flujo, timeout: float = 1.0) -> str:
+    return await asyncio.wait_for(flujo.__anext__(), timeout=timeout)
+
+
+@pytest.mark.asyncio
+class TestStreamEventos:
+    """Tests para GET /eventos/stream"""
+    
+    async def test_stream_requiere_autenticacion(self, client: AsyncClient):
+        """Test: Sin token no se abre el flujo"""
+        response = await client.get("/api/v1/eventos/stream")
+        
+        assert response.status_code in (401, 403)
+    
+    async def test_canales_por_rol(self, operario_usuario: Usuario):
+        """Test: El personal escucha la cola de habilitaciones; el gerente solo su canal"""
+        gerente = Usuario(rol=RolUsuario.GERENTE)
+        
+        assert CANAL_HABILITACIONES in canales_para_usuario(operario_usuario)
+        assert canales_para_usuario(gerente) == [canal_usuario(gerente.id)]
+    
+    async def test_flujo_envia_eventos_y_latidos(self, distribuidor, operario_usuario: Usuario):
+        """Test: El flujo formatea los eventos SSE y envía latidos en reposo"""
+        flujo = flujo_eventos(
+            _RequestConectada(),
+            canales_para_usuario(operario_usuario),
+            intervalo_latido=0.05
+        )
+        try:
+            assert (await _siguiente(flujo)).startswith("retry:")
+            assert await _siguiente(flujo) == ": latido\n\n"
+            
+            await publicar_evento(
+                canal_usuario(operario_usuario.id),
+                "notificacion",
+                {"nuevas": 1}
+            )
+            mensaje = await _siguiente(flujo)
+            while mensaje == ": latido\n\n":
+                mensaje = await _siguiente(flujo)
+            
+            assert mensaje == 'event: notificacion\ndata: {"nuevas": 1}\n\n'
+        finally:
+            await flujo.aclose()
+        
+        assert distribuidor.conexiones == 0
+    
+    async def test_cambio_de_estado_publica_evento(
+        self,
+        db_session,
+        distribuidor,
+        habilitacion_factory,
+        operario_usuario: Usuario
+    ):
+        """Test: Revisar una solicitud notifica a la cola de los operadores"""
+        habilitacion = await habilitacion_factory.create(estado=EstadoHabilitacion.PENDIENTE)
+        cola = await distribuidor.suscribir([CANAL_HABILITACIONES])
+        
+        await HabilitacionService(db_session).revisar_solicitud(
+            habilitacion.id,
+            operario_usuario.id
+        )
+        
+        mensaje = await asyncio.wait_for(cola.get(), timeout=1.0)
+        assert mensaje["evento"] == "habilitacion"
+        assert mensaje["datos"]["habilitacion_id"] == str(habilitacion.id)
+        assert mensaje["datos"]["estado_anterior"] == EstadoHabilitacion.PENDIENTE.value
+        assert mensaje["datos"]["estado"] == EstadoHabilitacion.EN_REVISION.value
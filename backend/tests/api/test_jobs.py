@@ -0,0 +1,134 @@
+"""
+Tests de integración para endpoints de trabajos en segundo plano
+"""
+import pytest
+from httpx import AsyncClient
+from datetime import date
+from uuid import uuid4
+
+
+@pytest.mark.asyncio
+class TestJobsEndpoints:
+    """Tests para GET /jobs/{id} y los endpoints que encolan trabajos"""
+    
+    async def test_encolar_reporte_y_consultar_estado(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        celery_eager
+    ):
+        """Test: Encolar reporte de ingresos y consultar su resultado"""
+        headers = {"Authorization": f"Bearer {director_token}"}
+        hoy = date.today().isoformat()
+        
+        response = await client.post(
+            f"/api/v1/pagos/reportes/ingresos/async?fecha_inicio={hoy}&fecha_fin={hoy}",
+            headers=headers
+        )
+        
+        assert response.status_code == 202
+        job = response.json()
+        assert job["cola"] == "reports"
+        
+        response = await client.get(f"/api/v1/jobs/{job['job_id']}", headers=headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["estado"] == "SUCCESS"
+        assert data["listo"] is True
+        assert data["exitoso"] is True
+        assert data["resultado"]["total_pagos"] == 0
+    
+    async def test_job_fallido_reporta_error(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        celery_eager
+    ):
+        """Test: Un certificado de habilitación inexistente termina en FAILURE"""
+        headers = {"Authorization": f"Bearer {director_token}"}
+        
+        response = await client.post(
+            f"/api/v1/habilitaciones/{uuid4()}/certificado/async",
+            headers=headers
+        )
+        assert response.status_code == 202
+        
+        response = await client.get(
+            f"/api/v1/jobs/{response.json()['job_id']}",
+            headers=headers
+        )
+        
+        data = response.json()
+        assert data["estado"] == "FAILURE"
+        assert data["exitoso"] is False
+        assert "no encontrado" in data["error"]
+    
+    async def test_job_desconocido_pendiente(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        celery_eager
+    ):
+        """Test: Un ID desconocido se reporta como PENDING"""
+        response = await client.get(
+            f"/api/v1/jobs/{uuid4()}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["estado"] == "PENDING"
+        assert response.json()["listo"] is False
+    
+    async def test_job_sin_autenticacion(self, client: AsyncClient):
+        """Test: Consultar un trabajo requiere autenticación"""
+        response = await client.get(f"/api/v1/jobs/{uuid4()}")
+        
+        assert response.status_code == 403
+    
+    async def test_job_de_otro_usuario_no_encontrado(
+        self,
+        client: AsyncClient,
+        operario_token: str,
+        director_token: str,
+        celery_eager
+    ):
+        """Test: Solo quien encoló el trabajo (o un administrador) puede consultarlo"""
+        hoy = date.today().isoformat()
+        response = await client.post(
+            f"/api/v1/pagos/reportes/ingresos/async?fecha_inicio={hoy}&fecha_fin={hoy}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        job_id = response.json()["job_id"]
+        
+        response = await client.get(
+            f"/api/v1/jobs/{job_id}",
+            headers={"Authorization": f"Bearer {operario_token}"}
+        )
+        assert response.status_code == 404
+        
+        response = await client.get(
+            f"/api/v1/jobs/{uuid4()}",
+            headers={"Authorization": f"Bearer {operario_token}"}
+        )
+        assert response.status_code == 404
+    
+    async def test_job_propio_de_no_administrador(
+        self,
+        client: AsyncClient,
+        operario_token: str,
+        celery_eager
+    ):
+        """Test: Un usuario que no es administrador consulta sus propios trabajos"""
+        headers = {"Authorization": f"Bearer {operario_token}"}
+        
+        response = await client.post(
+            f"/api/v1/habilitaciones/{uuid4()}/certificado/async",
+            headers=headers
+        )
+        assert response.status_code == 202
+        
+        response = await client.get(f"/api/v1/jobs/{response.json()['job_id']}", headers=headers)
+        
+        assert response.status_code == 200
+        assert response.json()["estado"] == "FAILURE"
@@ -250,3 +250,121 @@ class TestPagosEndpoints:
         assert "total_pagos" in data
         assert "monto_total" in data
         assert data["total_pagos"] >= 3
+
+
+@pytest.mark.asyncio
+class TestExportarPagos:
+    """Tests para GET /pagos/exportar"""
+    
+    async def test_exportar_pagos_csv(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test exportar pagos en CSV con concepto y habilitación"""
+        # Arrange
+        concepto = await concepto_tupa_factory.create(monto=Decimal("50.00"))
+        habilitaciones = []
+        for i in range(3):
+            habilitacion = await habilitacion_factory.create()
+            habilitaciones.append(habilitacion)
+            await pago_factory.create(
+                habilitacion_id=habilitacion.id,
+                concepto_tupa_id=concepto.id,
+                numero_recibo=f"EXP-{i:03d}",
+                monto=Decimal("50.00"),
+                fecha_pago=date.today()
+            )
+        
+        # Act
+        response = await client.get(
+            f"/api/v1/pagos/exportar?formato=csv&fecha_inicio={date.today().isoformat()}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        lineas = response.content.decode("utf-8-sig").splitlines()
+        assert lineas[0].startswith("Número de recibo,Fecha de pago,Monto (S/.)")
+        recibos = [linea for linea in lineas[1:] if linea.startswith("EXP-")]
+        assert len(recibos) == 3
+        assert concepto.codigo in recibos[0]
+        assert habilitaciones[0].codigo_habilitacion in "".join(recibos)
+    
+    async def test_exportar_pagos_xlsx(
+        self,
+        client: AsyncClient,
+        director_token: str,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test exportar pagos en Excel"""
+        import io
+        from openpyxl import load_workbook
+        
+        # Arrange
+        concepto = await concepto_tupa_factory.create(monto=Decimal("50.00"))
+        habilitacion = await habilitacion_factory.create()
+        await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            numero_recibo="EXP-XLSX",
+            monto=Decimal("50.00"),
+            estado=EstadoPago.CONFIRMADO
+        )
+        
+        # Act
+        response = await client.get(
+            "/api/v1/pagos/exportar?formato=xlsx&estado=confirmado",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        # Assert
+        assert response.status_code == 200
+        hoja = load_workbook(io.BytesIO(response.content)).active
+        filas = list(hoja.iter_rows(values_only=True))
+        assert filas[0][0] == "Número de recibo"
+        fila = next(f for f in filas[1:] if f[0] == "EXP-XLSX")
+        assert fila[2] == 50.0
+        assert fila[3] == "confirmado"
+        assert fila[8] == habilitacion.codigo_habilitacion
+    
+    async def test_exportar_pagos_rango_invalido(
+        self,
+        client: AsyncClient,
+        director_token: str
+    ):
+        """Test exportar pagos con fechas invertidas"""
+        response = await client.get(
+            "/api/v1/pagos/exportar?fecha_inicio=2024-02-01&fecha_fin=2024-01-01",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        assert response.status_code == 400
+    
+    async def test_exportar_pagos_gerente_prohibido(
+        self,
+        client: AsyncClient,
+        usuario_gerente
+    ):
+        """Test un gerente no puede exportar los pagos de todas las empresas"""
+        from app.core.security import create_access_token
+        
+        token = create_access_token({
+            "sub": str(usuario_gerente.id),
+            "email": usuario_gerente.email,
+            "rol": usuario_gerente.rol.value
+        })
+        
+        response = await client.get(
+            "/api/v1/pagos/exportar",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 403
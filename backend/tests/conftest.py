@@ -14,6 +14,13 @@ import app.models  # noqa: F401
 from app.core.database import Base
 from app.models.user import Usuario, RolUsuario
 
+
+def pytest_configure(config):
+    """Registrar el plugin de presupuestos de consultas"""
+    from tests import presupuesto_consultas
+    config.pluginmanager.register(presupuesto_consultas, "presupuesto_consultas")
+
+
 # URL de base de datos de prueba
 # Note: Using file-based SQLite for tests because in-memory databases
 # don't share state across connections in async context
@@ -834,6 +841,72 @@ async def client(db_session: AsyncSession):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def celery_eager(db_engine):
+    """
+    Ejecuta las tareas Celery en modo eager contra la base de datos de prueba
+    y usa fakeredis como backend de resultados
+    """
+    import fakeredis
+    from app.tasks.base import AsyncDatabaseTask
+    from app.tasks.celery_app import celery_app
+    
+    configuracion_original = {
+        "task_always_eager": celery_app.conf.task_always_eager,
+        "task_eager_propagates": celery_app.conf.task_eager_propagates,
+        "task_store_eager_result": celery_app.conf.task_store_eager_result,
+    }
+    celery_app.conf.update(
+        task_always_eager=True,
+        task_eager_propagates=False,
+        task_store_eager_result=True,
+    )
+    celery_app.backend.client = fakeredis.FakeStrictRedis()
+    AsyncDatabaseTask.configure_session_factory(
+        async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    
+    yield celery_app
+    
+    AsyncDatabaseTask.configure_session_factory(None)
+    celery_app.conf.update(**configuracion_original)
+    del celery_app.backend.client
+
+
+@pytest.fixture(autouse=True)
+def redis_eventos():
+    """Redis en memoria para los eventos en tiempo real"""
+    import fakeredis
+    from app.core.eventos import configurar_redis
+    
+    cliente = fakeredis.FakeAsyncRedis()
+    configurar_redis(cliente)
+    
+    yield cliente
+    
+    configurar_redis(None)
+
+
+@pytest.fixture(autouse=True)
+def catalogos_limpios():
+    """Catálogos en memoria vacíos en cada test (la base de datos se recrea)"""
+    from app.core.catalogos import invalidar_catalogos
+    
+    invalidar_catalogos()
+    yield
+    invalidar_catalogos()
+
+
+@pytest_asyncio.fixture
+async def distribuidor(redis_eventos):
+    """Distribuidor de eventos del proceso, detenido al terminar el test"""
+    from app.core.eventos import distribuidor_eventos
+    
+    yield distribuidor_eventos
+    
+    await distribuidor_eventos.cerrar()
+
+
 @pytest_asyncio.fixture
 async def auth_headers(usuario_superusuario: Usuario):
     """Fixture for authentication headers"""
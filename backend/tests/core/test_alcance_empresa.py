@@ -0,0 +1,120 @@
+"""
+Tests para el alcance de empresa de los gerentes
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from app.core.catalogo_empresas import catalogo_empresas
+from app.core.security import create_access_token
+from app.models.user import RolUsuario
+
+
+def _token(usuario, empresa_id=None) -> dict:
+    datos = {"sub": str(usuario.id), "email": usuario.email, "rol": usuario.rol.value}
+    if empresa_id is not None:
+        datos["empresa_id"] = str(empresa_id)
+    return {"Authorization": f"Bearer {create_access_token(datos)}"}
+
+
+@pytest.mark.asyncio
+class TestAlcanceEmpresa:
+    """Tests para get_alcance_empresa en los endpoints de conductores"""
+
+    async def test_claim_limita_sin_consultar_empresa(
+        self,
+        client: AsyncClient,
+        db_session,
+        empresa_factory,
+        conductor_factory,
+        usuario_factory
+    ):
+        """Test el gerente ve solo su empresa y la empresa no se consulta por petición"""
+        empresa = await empresa_factory.create()
+        otra = await empresa_factory.create()
+        propio = await conductor_factory.create(empresa_id=empresa.id)
+        await conductor_factory.create(empresa_id=otra.id)
+        gerente = await usuario_factory.create(
+            email="gerente.alcance@test.com", rol=RolUsuario.GERENTE, empresa_id=empresa.id
+        )
+        headers = _token(gerente, empresa.id)
+        await catalogo_empresas.obtener(db_session)
+
+        consultas = []
+        motor = db_session.bind.sync_engine
+
+        def registrar(conn, cursor, sentencia, parametros, contexto, executemany):
+            consultas.append(sentencia)
+
+        event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            response = await client.get("/api/v1/conductores", headers=headers)
+        finally:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()["items"]] == [str(propio.id)]
+        # La única consulta a empresas es la carga de la relación del listado
+        assert not any("empresas.gerente_id =" in sentencia for sentencia in consultas)
+        assert not any("WHERE empresas.id = " in sentencia for sentencia in consultas)
+
+    async def test_cambio_de_asignacion_invalida_token(
+        self,
+        client: AsyncClient,
+        db_session,
+        empresa_factory,
+        usuario_factory
+    ):
+        """Test un token con la empresa anterior deja de servir"""
+        empresa = await empresa_factory.create()
+        otra = await empresa_factory.create()
+        gerente = await usuario_factory.create(
+            email="gerente.reasignado@test.com", rol=RolUsuario.GERENTE, empresa_id=empresa.id
+        )
+        headers = _token(gerente, empresa.id)
+
+        gerente.empresa_id = otra.id
+        await db_session.commit()
+
+        response = await client.get("/api/v1/conductores", headers=headers)
+        assert response.status_code == 401
+        response = await client.get("/api/v1/conductores", headers=_token(gerente, otra.id))
+        assert response.status_code == 200
+
+    async def test_empresa_desactivada_invalida_catalogo(
+        self,
+        client: AsyncClient,
+        db_session,
+        empresa_factory,
+        usuario_factory
+    ):
+        """Test desactivar la empresa se refleja en la siguiente petición"""
+        empresa = await empresa_factory.create()
+        gerente = await usuario_factory.create(
+            email="gerente.inactiva@test.com", rol=RolUsuario.GERENTE, empresa_id=empresa.id
+        )
+        headers = _token(gerente, empresa.id)
+        assert (await client.get("/api/v1/conductores", headers=headers)).status_code == 200
+
+        empresa.activo = False
+        await db_session.commit()
+
+        response = await client.get("/api/v1/conductores", headers=headers)
+        assert response.status_code == 403
+        assert "inactiva" in response.json()["detail"]
+
+    async def test_token_sin_claim_usa_gerente_de_empresa(
+        self,
+        client: AsyncClient,
+        empresa_factory,
+        conductor_factory,
+        usuario_factory
+    ):
+        """Test tokens sin empresa_id usan la empresa de la que el usuario es gerente"""
+        gerente = await usuario_factory.create(email="gerente.legado@test.com", rol=RolUsuario.GERENTE)
+        empresa = await empresa_factory.create(gerente_id=gerente.id)
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+
+        response = await client.get(f"/api/v1/conductores/{conductor.id}", headers=_token(gerente))
+
+        assert response.status_code == 200
+        assert response.json()["empresa_id"] == str(empresa.id)
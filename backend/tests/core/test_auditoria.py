@@ -0,0 +1,246 @@
+"""
+Tests para el registro de auditoría por eventos de sesión
+"""
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import Headers
+from app.core.auditoria import (
+    EscritorAuditoria,
+    VALOR_ENMASCARADO,
+    anotar,
+    contexto_auditoria,
+    escritor_auditoria,
+)
+from app.core.middleware import ip_cliente
+from app.models.auditoria import Auditoria, AccionAuditoria
+from app.models.conductor import EstadoConductor
+
+
+async def _registros(db_session, tabla: str):
+    result = await db_session.execute(
+        select(Auditoria).where(Auditoria.tabla == tabla).order_by(Auditoria.created_at)
+    )
+    return list(result.scalars().all())
+
+
+@pytest_asyncio.fixture
+async def escritor_diferido(db_engine):
+    """Escritor de auditoría en ejecución contra la BD de prueba"""
+    escritor_auditoria.session_factory = async_sessionmaker(
+        db_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    escritor_auditoria.iniciar()
+    
+    yield escritor_auditoria
+    
+    await escritor_auditoria.detener()
+    escritor_auditoria.session_factory = None
+
+
+@pytest.mark.asyncio
+class TestCapturaAuditoria:
+    """Tests para la captura de cambios (modo durable)"""
+    
+    async def test_registra_creacion(self, db_session, usuario_superusuario, empresa_factory):
+        """Test: Al crear un registro se guardan sus datos nuevos"""
+        with contexto_auditoria(usuario_superusuario.id, ip_address="10.0.0.1"):
+            empresa = await empresa_factory.create()
+        
+        registros = await _registros(db_session, "empresas")
+        assert len(registros) == 1
+        assert registros[0].accion == AccionAuditoria.CREAR.value
+        assert registros[0].registro_id == str(empresa.id)
+        assert registros[0].datos_nuevos["ruc"] == empresa.ruc
+        assert registros[0].ip_address == "10.0.0.1"
+    
+    async def test_registra_solo_columnas_modificadas(
+        self,
+        db_session,
+        usuario_superusuario,
+        empresa_factory
+    ):
+        """Test: La actualización guarda los valores anterior y nuevo"""
+        empresa = await empresa_factory.create(telefono="111111111")
+        
+        with contexto_auditoria(usuario_superusuario.id):
+            empresa.telefono = "222222222"
+            await db_session.commit()
+        
+        registros = await _registros(db_session, "empresas")
+        assert len(registros) == 1
+        assert registros[0].accion == AccionAuditoria.ACTUALIZAR.value
+        assert registros[0].datos_anteriores == {"telefono": "111111111"}
+        assert registros[0].datos_nuevos == {"telefono": "222222222"}
+    
+    async def test_cambio_de_estado_con_descripcion(
+        self,
+        db_session,
+        usuario_superusuario,
+        conductor_factory
+    ):
+        """Test: Un cambio de estado se registra como CAMBIO_ESTADO con su motivo"""
+        conductor = await conductor_factory.create()
+        
+        with contexto_auditoria(usuario_superusuario.id):
+            conductor.estado = EstadoConductor.OBSERVADO
+            anotar(conductor, "Motivo: documentos incompletos")
+            await db_session.commit()
+        
+        registros = await _registros(db_session, "conductores")
+        assert registros[0].accion == AccionAuditoria.CAMBIO_ESTADO.value
+        assert registros[0].datos_nuevos["estado"] == EstadoConductor.OBSERVADO.value
+        assert registros[0].descripcion == "Motivo: documentos incompletos"
+    
+    async def test_registra_eliminacion(self, db_session, usuario_superusuario, empresa_factory):
+        """Test: Al eliminar se guardan los datos anteriores"""
+        empresa = await empresa_factory.create()
+        
+        with contexto_auditoria(usuario_superusuario.id):
+            await db_session.delete(empresa)
+            await db_session.commit()
+        
+        registros = await _registros(db_session, "empresas")
+        assert registros[0].accion == AccionAuditoria.ELIMINAR.value
+        assert registros[0].datos_anteriores["razon_social"] == empresa.razon_social
+        assert registros[0].datos_nuevos is None
+    
+    async def test_enmascara_password(self, db_session, usuario_superusuario, usuario_factory):
+        """Test: El hash de la contraseña no se copia a la auditoría"""
+        with contexto_auditoria(usuario_superusuario.id):
+            await usuario_factory.create()
+        
+        registros = await _registros(db_session, "usuarios")
+        assert registros[0].datos_nuevos["password_hash"] == VALOR_ENMASCARADO
+    
+    async def test_sin_usuario_no_audita(self, db_session, empresa_factory):
+        """Test: Los cambios sin usuario en el contexto no se auditan"""
+        await empresa_factory.create()
+        
+        assert await _registros(db_session, "empresas") == []
+    
+    async def test_rollback_descarta_registro_durable(
+        self,
+        db_session,
+        usuario_superusuario,
+        empresa_factory
+    ):
+        """Test: El registro durable se revierte junto con el cambio"""
+        empresa = await empresa_factory.create()
+        
+        with contexto_auditoria(usuario_superusuario.id):
+            empresa.telefono = "333333333"
+            await db_session.flush()
+            await db_session.rollback()
+        
+        assert await _registros(db_session, "empresas") == []
+
+
+@pytest.mark.asyncio
+class TestEscritorAuditoria:
+    """Tests para el modo diferido"""
+    
+    async def test_tabla_comun_se_escribe_en_segundo_plano(
+        self,
+        db_session,
+        escritor_diferido,
+        usuario_superusuario,
+        empresa_factory
+    ):
+        """Test: Las tablas no sensibles se encolan al confirmar y se escriben en lote"""
+        with contexto_auditoria(usuario_superusuario.id):
+            await empresa_factory.create()
+        
+        assert await _registros(db_session, "empresas") == []
+        assert escritor_diferido.pendientes == 1
+        
+        await escritor_diferido.escribir_pendientes()
+        
+        assert len(await _registros(db_session, "empresas")) == 1
+    
+    async def test_tabla_sensible_se_escribe_en_la_transaccion(
+        self,
+        db_session,
+        escritor_diferido,
+        usuario_superusuario,
+        usuario_factory
+    ):
+        """Test: Las tablas sensibles se auditan en la misma transacción"""
+        with contexto_auditoria(usuario_superusuario.id):
+            await usuario_factory.create()
+        
+        assert escritor_diferido.pendientes == 0
+        assert len(await _registros(db_session, "usuarios")) == 1
+    
+    async def test_rollback_descarta_pendientes(
+        self,
+        db_session,
+        escritor_diferido,
+        usuario_superusuario,
+        empresa_factory
+    ):
+        """Test: Lo capturado en una transacción revertida no se encola"""
+        empresa = await empresa_factory.create()
+        
+        with contexto_auditoria(usuario_superusuario.id):
+            empresa.telefono = "444444444"
+            await db_session.flush()
+            await db_session.rollback()
+        
+        assert escritor_diferido.pendientes == 0
+    
+    async def test_lote_completo_se_escribe_sin_esperar_el_intervalo(
+        self,
+        db_session,
+        db_engine,
+        usuario_superusuario,
+        empresa_factory
+    ):
+        """Test: Al alcanzar el tamaño de lote el escritor no espera al temporizador"""
+        escritor = EscritorAuditoria(
+            tamano_lote=2,
+            intervalo=60,
+            session_factory=async_sessionmaker(db_engine, class_=AsyncSession)
+        )
+        escritor.iniciar()
+        try:
+            registro = {
+                "usuario_id": usuario_superusuario.id,
+                "tabla": "empresas",
+                "accion": AccionAuditoria.ACTUALIZAR.value,
+            }
+            escritor.encolar([dict(registro), dict(registro)])
+            
+            for _ in range(100):
+                if escritor.escritos:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert escritor.escritos == 2
+        finally:
+            await escritor.detener()
+    
+    async def test_cola_llena_descarta(self):
+        """Test: La cola en memoria está acotada"""
+        escritor = EscritorAuditoria(max_pendientes=2)
+        
+        escritor.encolar([{}, {}, {}])
+        
+        assert escritor.pendientes == 2
+        assert escritor.descartados == 1
+
+
+class TestIpCliente:
+    """Tests para la IP registrada en la auditoría"""
+
+    def test_ignora_entradas_del_cliente_en_x_forwarded_for(self):
+        """Test se usa X-Real-IP o el último salto de X-Forwarded-For, no el primero"""
+        scope = {"client": ("10.0.0.9", 5000)}
+
+        assert ip_cliente(scope, Headers({"x-forwarded-for": "1.2.3.4, 200.1.1.1"})) == "200.1.1.1"
+        assert ip_cliente(scope, Headers({
+            "x-real-ip": "200.1.1.1", "x-forwarded-for": "1.2.3.4, 200.1.1.1"
+        })) == "200.1.1.1"
+        assert ip_cliente(scope, Headers({})) == "10.0.0.9"
@@ -0,0 +1,179 @@
+"""
+Tests para el catálogo en memoria de tipos de autorización e infracción
+"""
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+from app.core.catalogo_tipos import (
+    IndiceTipos,
+    TipoAutorizacionCatalogo,
+    TipoInfraccionCatalogo,
+    catalogo_tipos,
+)
+from app.models.empresa import AutorizacionEmpresa
+from app.models.infraccion import GravedadInfraccion, Infraccion, TipoInfraccion
+from app.repositories.infraccion_repository import InfraccionRepository
+from app.services.conductor_service import ConductorService
+from app.services.empresa_service import EmpresaService
+
+
+def _tipo_infraccion(codigo: str, gravedad: GravedadInfraccion) -> TipoInfraccionCatalogo:
+    return TipoInfraccionCatalogo(
+        id=uuid4(),
+        codigo=codigo,
+        descripcion=f"Infracción {codigo}",
+        gravedad=gravedad,
+        puntos=10,
+        activo=True
+    )
+
+
+@pytest_asyncio.fixture
+async def tipos_infraccion(db_session):
+    """Un tipo de infracción por gravedad"""
+    tipos = {
+        gravedad: TipoInfraccion(
+            codigo=f"T-{gravedad.value}",
+            descripcion=f"Infracción {gravedad.value}",
+            gravedad=gravedad,
+            puntos=10,
+            activo="true"
+        )
+        for gravedad in GravedadInfraccion
+    }
+    db_session.add_all(tipos.values())
+    await db_session.commit()
+    return tipos
+
+
+async def _infraccion(db_session, conductor, tipo, usuario, dias: int, acta: str):
+    infraccion = Infraccion(
+        conductor_id=conductor.id,
+        tipo_infraccion_id=tipo.id,
+        fecha_infraccion=date.today() - timedelta(days=dias),
+        descripcion="Infracción de prueba",
+        entidad_fiscalizadora="SUTRAN",
+        numero_acta=acta,
+        registrado_por=usuario.id
+    )
+    db_session.add(infraccion)
+    await db_session.commit()
+    return infraccion
+
+
+class TestIndiceTipos:
+    """Tests para los mapas del índice"""
+
+    def test_mapas_por_id_codigo_y_gravedad(self):
+        """Test cada tipo es accesible por id, código y gravedad"""
+        leve = _tipo_infraccion("L01", GravedadInfraccion.LEVE)
+        grave = _tipo_infraccion("G01", GravedadInfraccion.GRAVE)
+        muy_grave = _tipo_infraccion("MG01", GravedadInfraccion.MUY_GRAVE)
+        mercancias = TipoAutorizacionCatalogo(
+            id=uuid4(),
+            codigo="MERCANCIAS",
+            nombre="Mercancías",
+            descripcion=None,
+            requisitos_especiales=None,
+            created_at=datetime(2024, 1, 1),
+            updated_at=datetime(2024, 1, 1)
+        )
+        indice = IndiceTipos([mercancias], [leve, grave, muy_grave])
+
+        assert indice.tipos_autorizacion[mercancias.id] is mercancias
+        assert indice.tipos_autorizacion_por_codigo["MERCANCIAS"] is mercancias
+        assert indice.tipos_infraccion_por_codigo["G01"] is grave
+        assert indice.ids_tipos_infraccion(GravedadInfraccion.LEVE) == {leve.id}
+        assert indice.ids_tipos_infraccion(
+            GravedadInfraccion.GRAVE, GravedadInfraccion.MUY_GRAVE
+        ) == {grave.id, muy_grave.id}
+
+    def test_mapas_de_solo_lectura(self):
+        """Test los mapas no se pueden modificar"""
+        indice = IndiceTipos([], [])
+
+        with pytest.raises(TypeError):
+            indice.tipos_infraccion[uuid4()] = None
+        assert indice.ids_tipos_infraccion(GravedadInfraccion.GRAVE) == frozenset()
+
+
+@pytest.mark.asyncio
+class TestConsultasConCatalogo:
+    """Tests para las consultas que filtran con el catálogo"""
+
+    async def test_infracciones_por_gravedad_sin_join(
+        self,
+        db_session,
+        conductor_factory,
+        usuario_factory,
+        tipos_infraccion
+    ):
+        """Test filtro y estadísticas por gravedad resueltos con el catálogo"""
+        conductor = await conductor_factory.create()
+        usuario = await usuario_factory.create()
+        await _infraccion(db_session, conductor, tipos_infraccion[GravedadInfraccion.LEVE], usuario, 10, "A-1")
+        await _infraccion(db_session, conductor, tipos_infraccion[GravedadInfraccion.GRAVE], usuario, 5, "A-2")
+        await _infraccion(db_session, conductor, tipos_infraccion[GravedadInfraccion.MUY_GRAVE], usuario, 1, "A-3")
+        await _infraccion(db_session, conductor, tipos_infraccion[GravedadInfraccion.GRAVE], usuario, 20, "A-4")
+        repo = InfraccionRepository(db_session)
+
+        graves = await repo.get_by_gravedad(GravedadInfraccion.GRAVE)
+        assert {i.numero_acta for i in graves} == {"A-2", "A-4"}
+
+        graves_y_muy_graves = await repo.get_infracciones_graves_conductor(conductor.id)
+        assert [i.numero_acta for i in graves_y_muy_graves] == ["A-3", "A-2", "A-4"]
+
+        assert await repo.count_by_conductor(conductor.id, GravedadInfraccion.LEVE) == 1
+
+        estadisticas = await repo.get_estadisticas_conductor(conductor.id)
+        assert estadisticas["total"] == 4
+        assert (estadisticas["leves"], estadisticas["graves"], estadisticas["muy_graves"]) == (1, 2, 1)
+        assert estadisticas["ultima_infraccion_tipo"] == "Infracción muy_grave"
+        assert catalogo_tipos.cargas >= 1
+
+    async def test_nuevo_tipo_invalida_catalogo(self, db_session, tipos_infraccion):
+        """Test crear un tipo de infracción descarta el índice cargado"""
+        repo = InfraccionRepository(db_session)
+        await repo.get_by_gravedad(GravedadInfraccion.LEVE)
+        assert catalogo_tipos.vigente
+
+        db_session.add(TipoInfraccion(
+            codigo="L-NUEVO",
+            descripcion="Nueva infracción leve",
+            gravedad=GravedadInfraccion.LEVE,
+            puntos=5
+        ))
+        await db_session.commit()
+
+        assert not catalogo_tipos.vigente
+        indice = await catalogo_tipos.obtener(db_session)
+        assert len(indice.ids_tipos_infraccion(GravedadInfraccion.LEVE)) == 2
+
+    async def test_autorizacion_y_categoria_con_catalogo(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test validación de categoría y respuesta de autorización con tipos del catálogo"""
+        tipo = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        empresa = await empresa_factory.create()
+        autorizacion = AutorizacionEmpresa(
+            empresa_id=empresa.id,
+            tipo_autorizacion_id=tipo.id,
+            numero_resolucion="RD-CAT-001",
+            fecha_emision=date.today(),
+            vigente=True
+        )
+        db_session.add(autorizacion)
+        await db_session.commit()
+        await db_session.refresh(autorizacion)
+
+        conductor_service = ConductorService(db_session)
+        assert await conductor_service.validar_categoria_licencia("A-IIIb", empresa.id)
+        assert not await conductor_service.validar_categoria_licencia("A-IIa", empresa.id)
+
+        respuesta = await EmpresaService(db_session).respuesta_autorizacion(autorizacion)
+        assert respuesta.tipo_autorizacion.codigo == "MERCANCIAS"
+        assert respuesta.tipo_autorizacion.id == str(tipo.id)
@@ -0,0 +1,137 @@
+"""
+Tests para el catálogo en memoria de conceptos TUPA
+"""
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+from app.core.catalogo_tupa import (
+    CatalogoTUPA,
+    ConceptoTUPACatalogo,
+    IndiceVigencias,
+    catalogo_tupa,
+)
+from app.core.catalogos import EVENTO_INVALIDAR
+from app.core.eventos import publicar_evento
+from app.services.pago_service import PagoService
+
+
+def _concepto(codigo: str, desde: date, hasta=None, monto="100.00", activo=True):
+    return ConceptoTUPACatalogo(
+        id=uuid4(),
+        codigo=codigo,
+        descripcion=f"Concepto {codigo}",
+        monto=Decimal(monto),
+        vigencia_desde=desde,
+        vigencia_hasta=hasta,
+        activo=activo,
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1)
+    )
+
+
+class TestIndiceVigencias:
+    """Tests para la resolución de (código, fecha)"""
+
+    def test_resuelve_por_periodo(self):
+        """Test cada fecha cae en el periodo que la contiene"""
+        anterior = _concepto("HAB", date(2024, 1, 1), date(2024, 12, 31), "100.00")
+        actual = _concepto("HAB", date(2025, 1, 1), None, "120.00")
+        indice = IndiceVigencias([actual, anterior])
+
+        assert indice.resolver("HAB", date(2024, 6, 1)) is anterior
+        assert indice.resolver("HAB", date(2024, 12, 31)) is anterior
+        assert indice.resolver("HAB", date(2026, 3, 1)) is actual
+        assert indice.resolver("HAB", date(2023, 12, 31)) is None
+        assert indice.resolver("OTRO", date(2025, 1, 1)) is None
+
+    def test_hueco_entre_periodos_e_inactivos(self):
+        """Test sin vigencia entre periodos y conceptos inactivos ignorados"""
+        indice = IndiceVigencias([
+            _concepto("HAB", date(2024, 1, 1), date(2024, 3, 31)),
+            _concepto("HAB", date(2024, 6, 1), None, activo=False),
+        ])
+
+        assert indice.resolver("HAB", date(2024, 5, 1)) is None
+        assert indice.resolver("HAB", date(2024, 7, 1)) is None
+        assert len(indice) == 1
+
+
+@pytest.mark.asyncio
+class TestCatalogoTUPA:
+    """Tests para la carga e invalidación del catálogo"""
+
+    async def test_carga_una_vez(self, db_session, concepto_tupa_factory):
+        """Test las consultas repetidas no vuelven a la base de datos"""
+        concepto = await concepto_tupa_factory.create(codigo="CAT-001", monto=Decimal("75.00"))
+        catalogo = CatalogoTUPA()
+
+        for _ in range(3):
+            encontrado = await catalogo.obtener_vigente(db_session, "CAT-001")
+            assert encontrado.id == concepto.id
+            assert encontrado.monto == Decimal("75.00")
+        assert catalogo.cargas == 1
+
+    async def test_recarga_al_vencer_ttl(self, db_session, concepto_tupa_factory):
+        """Test el índice se recarga al superar el TTL"""
+        await concepto_tupa_factory.create(codigo="CAT-TTL")
+        catalogo = CatalogoTUPA(ttl_segundos=0)
+
+        await catalogo.obtener_vigente(db_session, "CAT-TTL")
+        await catalogo.obtener_vigente(db_session, "CAT-TTL")
+
+        assert catalogo.cargas == 2
+
+    async def test_invalida_al_modificar_concepto(
+        self,
+        db_session,
+        concepto_tupa_factory
+    ):
+        """Test confirmar un cambio de concepto descarta el índice del proceso"""
+        concepto = await concepto_tupa_factory.create(codigo="CAT-MOD", monto=Decimal("50.00"))
+        service = PagoService(db_session)
+        assert await service.calcular_monto_tupa("CAT-MOD") == Decimal("50.00")
+
+        concepto.monto = Decimal("65.00")
+        await db_session.commit()
+
+        assert not catalogo_tupa.vigente
+        assert await service.calcular_monto_tupa("CAT-MOD") == Decimal("65.00")
+
+    async def test_concepto_futuro_no_vigente(self, db_session, concepto_tupa_factory):
+        """Test un concepto aún no vigente no se resuelve para hoy"""
+        manana = date.today() + timedelta(days=1)
+        await concepto_tupa_factory.create(codigo="CAT-FUT", vigencia_desde=manana)
+        catalogo = CatalogoTUPA()
+
+        assert await catalogo.obtener_vigente(db_session, "CAT-FUT") is None
+        assert (await catalogo.obtener_vigente(db_session, "CAT-FUT", manana)).codigo == "CAT-FUT"
+
+    async def test_invalidacion_de_otro_proceso(
+        self,
+        db_session,
+        distribuidor,
+        concepto_tupa_factory
+    ):
+        """Test un aviso publicado en Redis descarta el índice"""
+        await concepto_tupa_factory.create(codigo="CAT-PUB")
+        catalogo = CatalogoTUPA()
+        await catalogo.obtener_vigente(db_session, "CAT-PUB")
+        tarea = asyncio.create_task(catalogo._escuchar())
+        try:
+            for _ in range(50):
+                if distribuidor.conexiones:
+                    break
+                await asyncio.sleep(0.01)
+            assert catalogo.vigente
+
+            await publicar_evento(catalogo.canal, EVENTO_INVALIDAR, {})
+            for _ in range(50):
+                if not catalogo.vigente:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert not catalogo.vigente
+        finally:
+            tarea.cancel()
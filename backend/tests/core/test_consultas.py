@@ -0,0 +1,74 @@
+"""
+Tests para el conteo de consultas por petición y los presupuestos
+"""
+import pytest
+from httpx import AsyncClient
+from app.api.v1.endpoints import conductores
+from app.core.consultas import Presupuesto, contar_consultas, vigilar_presupuestos
+from app.models.conductor import Conductor
+
+
+@pytest.mark.asyncio
+class TestConteoConsultas:
+    """Tests para ConsultasMiddleware y los listeners de SQLAlchemy"""
+
+    async def test_cabeceras_con_el_conteo(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_factory,
+        conductor_factory
+    ):
+        """Test la respuesta informa las sentencias y cargas diferidas de la petición"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+
+        response = await client.get(
+            f"/api/v1/conductores/{conductor.id}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 200
+        # Usuario autenticado y conductor
+        assert response.headers["X-DB-Queries"] == "2"
+        assert response.headers["X-DB-Lazy-Loads"] == "0"
+
+    async def test_registra_cargas_diferidas(self, db_session, empresa_factory, conductor_factory):
+        """Test una carga diferida se registra con la relación que la provocó"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+        db_session.expunge_all()
+
+        def leer_empresa(session):
+            return session.get(Conductor, conductor.id).empresa.ruc
+
+        with contar_consultas() as contador:
+            ruc = await db_session.run_sync(leer_empresa)
+
+        assert ruc == empresa.ruc
+        assert contador.cargas_diferidas == ["Conductor.empresa"]
+        assert contador.sentencias == 2
+
+    async def test_exceso_de_presupuesto(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_factory,
+        conductor_factory,
+        monkeypatch
+    ):
+        """Test una petición sobre el presupuesto de su endpoint se registra"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+        monkeypatch.setattr(conductores.obtener_conductor, "presupuesto_consultas", Presupuesto(1))
+
+        with vigilar_presupuestos() as excesos:
+            response = await client.get(
+                f"/api/v1/conductores/{conductor.id}",
+                headers={"Authorization": f"Bearer {director_token}"}
+            )
+
+        assert response.status_code == 200
+        assert [(e.ruta, e.sentencias) for e in excesos] == [
+            (f"GET /api/v1/conductores/{conductor.id}", 2)
+        ]
@@ -0,0 +1,131 @@
+"""
+Tests para los eventos en tiempo real sobre Redis pub/sub
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+from redis import asyncio as redis_asyncio
+from app.core.eventos import (
+    DistribuidorEventos,
+    EVENTO_NOTIFICACION,
+    canal_usuario,
+    configurar_redis,
+    publicar_evento,
+)
+from app.core.middleware import GZipSinEventosMiddleware
+
+
+def _app_respuesta(tipo: str):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", tipo.encode())],
+        })
+        await send({"type": "http.response.body", "body": b"data: 1\n\n" * 200, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+async def _llamar(app) -> list:
+    enviados = []
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/eventos",
+        "headers": [(b"accept", b"*/*"), (b"accept-encoding", b"gzip")],
+    }
+    await GZipSinEventosMiddleware(app, minimum_size=100)(scope, receive, send)
+    return enviados
+
+
+async def _esperar(cola: asyncio.Queue, timeout: float = 1.0):
+    return await asyncio.wait_for(cola.get(), timeout=timeout)
+
+
+@pytest.mark.asyncio
+class TestDistribuidorEventos:
+    """Tests para el reparto de eventos entre conexiones locales"""
+    
+    async def test_entrega_evento_al_suscriptor(self, distribuidor):
+        """Test: Un evento publicado llega a la cola del canal suscrito"""
+        canal = canal_usuario(uuid4())
+        cola = await distribuidor.suscribir([canal])
+        
+        await publicar_evento(canal, EVENTO_NOTIFICACION, {"nuevas": 2})
+        
+        mensaje = await _esperar(cola)
+        assert mensaje == {"evento": EVENTO_NOTIFICACION, "datos": {"nuevas": 2}}
+    
+    async def test_canales_aislados(self, distribuidor):
+        """Test: Un usuario no recibe los eventos de otro"""
+        canal_a = canal_usuario(uuid4())
+        canal_b = canal_usuario(uuid4())
+        cola_a = await distribuidor.suscribir([canal_a])
+        cola_b = await distribuidor.suscribir([canal_b])
+        
+        await publicar_evento(canal_b, EVENTO_NOTIFICACION, {"nuevas": 1})
+        
+        await _esperar(cola_b)
+        assert cola_a.empty()
+    
+    async def test_desuscribir_libera_el_canal(self, distribuidor):
+        """Test: Al desconectarse la cola deja de estar registrada"""
+        canal = canal_usuario(uuid4())
+        cola = await distribuidor.suscribir([canal])
+        assert distribuidor.conexiones == 1
+        
+        distribuidor.desuscribir(cola, [canal])
+        
+        assert distribuidor.conexiones == 0
+    
+    async def test_cola_llena_descarta_eventos(self, redis_eventos):
+        """Test: Un cliente lento no bloquea al resto; sus eventos se descartan"""
+        distribuidor = DistribuidorEventos(tamano_cola=1)
+        canal = canal_usuario(uuid4())
+        cola = await distribuidor.suscribir([canal])
+        try:
+            await publicar_evento(canal, EVENTO_NOTIFICACION, {"n": 1})
+            await publicar_evento(canal, EVENTO_NOTIFICACION, {"n": 2})
+            
+            for _ in range(50):
+                if distribuidor.descartados:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert distribuidor.descartados == 1
+            assert (await _esperar(cola))["datos"] == {"n": 1}
+        finally:
+            await distribuidor.cerrar()
+    
+    async def test_publicar_sin_redis_no_falla(self):
+        """Test: Si Redis no responde la publicación solo registra una advertencia"""
+        cliente = redis_asyncio.from_url("redis://127.0.0.1:1", socket_connect_timeout=0.1)
+        configurar_redis(cliente)
+        
+        await publicar_evento(canal_usuario(uuid4()), EVENTO_NOTIFICACION, {})
+
+
+@pytest.mark.asyncio
+class TestGZipSinEventos:
+    """Tests para la compresión de respuestas frente a los flujos SSE"""
+    
+    async def test_flujo_de_eventos_sin_comprimir(self):
+        """Test: Un text/event-stream se entrega tal cual aunque el Accept sea */*"""
+        enviados = await _llamar(_app_respuesta("text/event-stream"))
+        
+        assert b"content-encoding" not in dict(enviados[0]["headers"])
+        assert enviados[1]["body"] == b"data: 1\n\n" * 200
+    
+    async def test_otras_respuestas_se_comprimen(self):
+        """Test: El resto de las respuestas grandes sigue comprimiéndose"""
+        enviados = await _llamar(_app_respuesta("application/json"))
+        
+        assert dict(enviados[0]["headers"])[b"content-encoding"] == b"gzip"
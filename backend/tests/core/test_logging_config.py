@@ -0,0 +1,60 @@
+"""
+Tests para el logging en cola
+"""
+import logging
+import queue
+from app.core.logging_config import ColaLogHandler, niveles_por_modulo
+
+
+def logger_con_cola(nombre: str, capacidad: int):
+    """Logger aislado cuya salida es una cola sin consumidor"""
+    cola = queue.Queue(maxsize=capacidad)
+    handler = ColaLogHandler(cola)
+    logger = logging.getLogger(nombre)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    return logger, handler, cola
+
+
+class TestColaLogHandler:
+    """Tests para ColaLogHandler"""
+
+    def test_descarta_con_la_cola_llena_y_avisa(self):
+        """Test con la cola llena se descarta y se avisa al haber lugar"""
+        logger, handler, cola = logger_con_cola("tests.cola_llena", capacidad=2)
+
+        for i in range(5):
+            logger.info("registro %d", i)
+
+        assert handler.descartados == {"INFO": 3}
+        assert [cola.get_nowait().msg for _ in range(2)] == ["registro 0", "registro 1"]
+
+        logger.error("otro")
+
+        assert cola.get_nowait().msg == "otro"
+        aviso = cola.get_nowait()
+        assert aviso.levelno == logging.WARNING
+        assert aviso.msg == "Se descartaron 3 registros de log por cola llena"
+
+    def test_prepara_mensaje_y_excepcion(self):
+        """Test el registro encolado lleva el mensaje final y la traza como texto"""
+        logger, _, cola = logger_con_cola("tests.cola_excepcion", capacidad=10)
+
+        try:
+            raise ValueError("fallo")
+        except ValueError:
+            logger.exception("Error procesando %s", "lote", extra={"lote": 7})
+
+        registro = cola.get_nowait()
+        assert registro.msg == "Error procesando lote"
+        assert registro.args is None and registro.exc_info is None
+        assert "ValueError: fallo" in registro.exc_text
+        assert registro.lote == 7
+
+    def test_niveles_por_modulo(self):
+        """Test LOG_NIVELES se interpreta como pares logger=NIVEL"""
+        assert niveles_por_modulo("uvicorn=warning, app.core.consultas_lentas=DEBUG,") == {
+            "uvicorn": "WARNING",
+            "app.core.consultas_lentas": "DEBUG",
+        }
@@ -0,0 +1,176 @@
+"""
+Tests para la matriz de categorías de licencia por empresa
+"""
+import pytest
+from datetime import date, timedelta
+from uuid import uuid4
+from httpx import AsyncClient
+from sqlalchemy import insert
+from app.core.exceptions import RecursoNoEncontrado, ValidacionError
+from app.core.matriz_licencias import MatrizCategorias, matriz_licencias
+from app.models.empresa import AutorizacionEmpresa
+from app.services.conductor_service import ConductorService
+from app.services.vencimiento_service import VencimientoService
+
+
+async def _autorizar(db_session, empresa, tipo, numero: str, **kwargs) -> AutorizacionEmpresa:
+    autorizacion = AutorizacionEmpresa(
+        empresa_id=empresa.id,
+        tipo_autorizacion_id=tipo.id,
+        numero_resolucion=numero,
+        fecha_emision=date.today() - timedelta(days=30),
+        **kwargs
+    )
+    db_session.add(autorizacion)
+    await db_session.commit()
+    return autorizacion
+
+
+class TestMatrizCategorias:
+    """Tests para la consulta de la matriz"""
+
+    def test_validar_lote_conserva_orden(self):
+        """Test cada par se resuelve en el orden recibido"""
+        con_mercancias, sin_vigentes, desconocida = uuid4(), uuid4(), uuid4()
+        matriz = MatrizCategorias({
+            con_mercancias: frozenset({"A-IIIb", "A-IIIc"}),
+            sin_vigentes: frozenset(),
+        })
+
+        assert matriz.validar_lote([
+            ("A-IIIb", con_mercancias),
+            ("A-IIa", con_mercancias),
+            ("A-IIIb", sin_vigentes),
+            ("A-IIIb", desconocida),
+        ]) == [True, False, False, False]
+        assert matriz.categorias(sin_vigentes) == frozenset()
+        assert matriz.categorias(desconocida) is None
+
+
+@pytest.mark.asyncio
+class TestMatrizLicencias:
+    """Tests para la carga e invalidación de la matriz"""
+
+    async def test_union_de_autorizaciones_vigentes(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test las categorías son la unión de las autorizaciones vigentes"""
+        mercancias = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        turismo = await tipo_autorizacion_factory(codigo="TURISMO", nombre="Turismo")
+        empresa = await empresa_factory.create()
+        await _autorizar(db_session, empresa, mercancias, "RD-MAT-001")
+        await _autorizar(db_session, empresa, turismo, "RD-MAT-002", vigente=False)
+
+        matriz = await matriz_licencias.obtener(db_session)
+
+        assert matriz.categorias(empresa.id) == frozenset({"A-IIIb", "A-IIIc"})
+
+    async def test_agregar_autorizacion_invalida_matriz(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test una autorización nueva se refleja en la siguiente validación"""
+        mercancias = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        turismo = await tipo_autorizacion_factory(codigo="TURISMO", nombre="Turismo")
+        empresa = await empresa_factory.create()
+        await _autorizar(db_session, empresa, mercancias, "RD-MAT-003")
+        service = ConductorService(db_session)
+        assert not await service.validar_categoria_licencia("A-IIb", empresa.id)
+        cargas = matriz_licencias.cargas
+
+        await _autorizar(db_session, empresa, turismo, "RD-MAT-004")
+
+        assert not matriz_licencias.vigente
+        assert await service.validar_categoria_licencia("A-IIb", empresa.id)
+        assert matriz_licencias.cargas == cargas + 1
+
+    async def test_empresa_ausente_recarga_la_matriz(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test una autorización registrada por otro proceso se ve sin esperar el TTL"""
+        mercancias = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        empresa = await empresa_factory.create()
+        await matriz_licencias.obtener(db_session)
+        # Por SQL directo: este proceso no recibe la invalidación
+        await db_session.execute(insert(AutorizacionEmpresa).values(
+            id=uuid4(),
+            empresa_id=empresa.id,
+            tipo_autorizacion_id=mercancias.id,
+            numero_resolucion="RD-MAT-007",
+            fecha_emision=date.today() - timedelta(days=30),
+            vigente=True
+        ))
+        await db_session.commit()
+        assert matriz_licencias.vigente
+
+        assert await ConductorService(db_session).validar_categoria_licencia("A-IIIb", empresa.id)
+
+    async def test_barrido_de_vencimientos_invalida_matriz(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test las autorizaciones vencidas por UPDATE masivo dejan de contar"""
+        mercancias = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        empresa = await empresa_factory.create()
+        await _autorizar(
+            db_session, empresa, mercancias, "RD-MAT-005",
+            fecha_vencimiento=date.today() - timedelta(days=1)
+        )
+        service = ConductorService(db_session)
+        assert await service.validar_categoria_licencia("A-IIIb", empresa.id)
+
+        await VencimientoService(db_session).barrer_vencimientos()
+
+        assert not await service.validar_categoria_licencia("A-IIIb", empresa.id)
+
+    async def test_empresa_sin_autorizaciones(self, db_session, empresa_factory):
+        """Test errores para empresa inexistente o sin autorizaciones"""
+        empresa = await empresa_factory.create()
+        service = ConductorService(db_session)
+
+        with pytest.raises(ValidacionError):
+            await service.validar_categoria_licencia("A-IIIb", empresa.id)
+        with pytest.raises(RecursoNoEncontrado):
+            await service.validar_categoria_licencia("A-IIIb", uuid4())
+
+    async def test_endpoint_validar_categorias_lote(
+        self,
+        client: AsyncClient,
+        db_session,
+        director_token,
+        empresa_factory,
+        tipo_autorizacion_factory
+    ):
+        """Test validación en lote por la API con una sola carga de la matriz"""
+        mercancias = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+        empresa = await empresa_factory.create()
+        otra = await empresa_factory.create()
+        await _autorizar(db_session, empresa, mercancias, "RD-MAT-006")
+        pares = [
+            {"licencia_categoria": "A-IIIb", "empresa_id": str(empresa.id)},
+            {"licencia_categoria": "A-IIa", "empresa_id": str(empresa.id)},
+            {"licencia_categoria": "A-IIIb", "empresa_id": str(otra.id)},
+        ] * 1000
+        cargas = matriz_licencias.cargas
+
+        response = await client.post(
+            "/api/v1/conductores/validar-categorias",
+            json={"pares": pares},
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resultados"][:3] == [True, False, False]
+        assert (data["validos"], data["invalidos"]) == (1000, 2000)
+        assert matriz_licencias.cargas == cargas + 1
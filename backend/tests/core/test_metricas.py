@@ -0,0 +1,72 @@
+"""
+Tests para las métricas de Prometheus
+"""
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.metricas import PoolMedido, espacio_de_clave
+from app.core.security import hash_password
+
+
+def valor(nombre: str, **etiquetas) -> float:
+    """Valor actual de una serie del registro (0 si aún no existe)"""
+    return REGISTRY.get_sample_value(nombre, etiquetas) or 0.0
+
+
+@pytest.mark.asyncio
+class TestMetricas:
+    """Tests para /metrics y la instrumentación"""
+
+    async def test_peticiones_por_plantilla_de_ruta(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_factory,
+        conductor_factory
+    ):
+        """Test la latencia se agrupa por la ruta, no por la URL"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+        serie = dict(method="GET", route="/api/v1/conductores/{conductor_id}", status="200")
+        antes = valor("http_request_duration_seconds_count", **serie)
+
+        await client.get(
+            f"/api/v1/conductores/{conductor.id}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert valor("http_request_duration_seconds_count", **serie) == antes + 1
+        assert str(conductor.id) not in response.text
+        assert valor(
+            "repository_call_duration_seconds_count",
+            repository="ConductorRepository",
+            method="get_by_id"
+        ) >= 1
+
+    async def test_pool_publica_conexiones_en_uso(self):
+        """Test el pool informa las conexiones entregadas y la espera"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=PoolMedido)
+        esperas = valor("db_pool_checkout_wait_seconds_count")
+        try:
+            async with engine.connect() as conexion:
+                await conexion.execute(text("SELECT 1"))
+                assert valor("db_pool_connections_checked_out") == 1
+            assert valor("db_pool_connections_checked_out") == 0
+            assert valor("db_pool_checkout_wait_seconds_count") == esperas + 1
+        finally:
+            await engine.dispose()
+
+    async def test_bcrypt_y_espacios_de_cache(self):
+        """Test se mide el hash de contraseñas y se agrupan las claves de caché"""
+        hashes = valor("bcrypt_duration_seconds_count", operation="hash")
+
+        hash_password("secreto123")
+
+        assert valor("bcrypt_duration_seconds_count", operation="hash") == hashes + 1
+        assert espacio_de_clave("pagos:estadisticas:v3:2024-01-01:2024-01-31") == "pagos:estadisticas"
+        assert espacio_de_clave("sesiones:abc") == "sesiones"
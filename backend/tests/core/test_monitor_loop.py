@@ -0,0 +1,51 @@
+"""
+Tests para el monitor del event loop
+"""
+import asyncio
+import time
+import pytest
+from prometheus_client import REGISTRY
+from app.core.monitor_loop import MonitorLoop
+
+
+def bloquear_el_loop(segundos: float) -> None:
+    """Llamada síncrona que no cede el loop"""
+    time.sleep(segundos)
+
+
+@pytest.mark.asyncio
+class TestMonitorLoop:
+    """Tests para MonitorLoop"""
+
+    async def test_captura_la_pila_del_bloqueo(self):
+        """Test un bloqueo sobre el umbral se registra con la función que lo causó"""
+        monitor = MonitorLoop(intervalo=0.01, umbral=0.05, capturar_pilas=True)
+        bloqueos_antes = REGISTRY.get_sample_value("event_loop_blocked_total") or 0
+        monitor.iniciar()
+        try:
+            await asyncio.sleep(0.05)
+            bloquear_el_loop(0.3)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.detener()
+
+        assert len(monitor.bloqueos) == 1
+        bloqueo = monitor.bloqueos[0]
+        assert bloqueo.duracion_ms >= 250
+        assert "bloquear_el_loop" in bloqueo.pila[-1]
+        assert REGISTRY.get_sample_value("event_loop_blocked_total") >= bloqueos_antes + 1
+
+    async def test_sin_pilas_solo_mide(self):
+        """Test sin captura de pilas el retraso se publica pero no se guardan bloqueos"""
+        monitor = MonitorLoop(intervalo=0.01, umbral=0.05)
+        mediciones_antes = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+        monitor.iniciar()
+        try:
+            await asyncio.sleep(0.05)
+            bloquear_el_loop(0.1)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.detener()
+
+        assert not monitor.bloqueos
+        assert REGISTRY.get_sample_value("event_loop_lag_seconds_count") > mediciones_antes
@@ -0,0 +1,66 @@
+"""
+Tests para el perfilador por petición
+"""
+import asyncio
+import sys
+import time
+import pytest
+from app.core.config import settings
+from app.core.perfilador import Muestreador, token_de_perfil
+
+
+def calcular(segundos: float) -> None:
+    """Trabajo de CPU que no cede el loop"""
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        pass
+
+
+async def esperar_base_de_datos(segundos: float) -> None:
+    """Espera que simula una consulta"""
+    await asyncio.sleep(segundos)
+
+
+async def atender() -> Muestreador:
+    """Petición simulada: arranca su muestreador, calcula y espera"""
+    muestreador = Muestreador(asyncio.current_task(), sys._getframe().f_code, intervalo=0.002)
+    muestreador.iniciar()
+    try:
+        calcular(0.1)
+        await esperar_base_de_datos(0.1)
+    finally:
+        muestreador.detener()
+    return muestreador
+
+
+@pytest.mark.asyncio
+class TestMuestreador:
+    """Tests para Muestreador"""
+
+    async def test_muestrea_cpu_y_esperas(self):
+        """Test el perfil incluye el trabajo de CPU y el tiempo esperando un await"""
+        muestreador = await asyncio.create_task(atender())
+        perfil = muestreador.speedscope("GET /prueba")
+
+        nombres = [marco["name"] for marco in perfil["shared"]["frames"]]
+        muestras = perfil["profiles"][0]["samples"]
+        pesos = perfil["profiles"][0]["weights"]
+        pilas = [[nombres[i] for i in muestra] for muestra in muestras]
+
+        assert all(pila[0] == "atender" for pila in pilas)
+        cpu = sum(p for pila, p in zip(pilas, pesos) if pila[-1] == "calcular")
+        espera = sum(p for pila, p in zip(pilas, pesos) if pila[-3:] == ["esperar_base_de_datos", "sleep", "(esperando)"])
+        assert cpu > 30
+        assert espera > 30
+        assert sum(pesos) <= perfil["profiles"][0]["endValue"]
+
+    async def test_token_de_cabecera_o_parametro(self, monkeypatch):
+        """Test el token se lee de X-Perfil, y de _perfil solo en desarrollo"""
+        en_parametro = {"headers": [], "query_string": b"a=1&_perfil=xyz"}
+        assert token_de_perfil({"headers": [(b"x-perfil", b"abc")], "query_string": b""}) == "abc"
+        assert token_de_perfil({"headers": [(b"accept", b"*/*")], "query_string": b"a=1"}) is None
+
+        monkeypatch.setattr(settings, "ENVIRONMENT", "development")
+        assert token_de_perfil(en_parametro) == "xyz"
+        monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+        assert token_de_perfil(en_parametro) is None
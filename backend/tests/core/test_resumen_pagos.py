@@ -0,0 +1,173 @@
+"""
+Tests para el mantenimiento del resumen diario de pagos
+"""
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import UUID
+from sqlalchemy import select, update
+from app.models.conductor import Conductor
+from app.models.habilitacion import EstadoPago, Pago, PagoResumenDiario
+from app.repositories.conductor_repository import ConductorRepository
+from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.pago_repository import PagoResumenDiarioRepository
+from app.schemas.pago import PagoCreate
+from app.services.pago_service import PagoService
+
+
+async def _resumen(db_session):
+    """Filas del resumen con cantidad distinta de cero, como {(fecha, estado): (cantidad, monto)}"""
+    result = await db_session.execute(select(PagoResumenDiario))
+    return {
+        (fila.fecha, fila.estado): (fila.cantidad, fila.monto_total)
+        for fila in result.scalars().all()
+        if fila.cantidad
+    }
+
+
+@pytest.mark.asyncio
+class TestResumenPagos:
+    """Tests para el resumen diario mantenido por eventos de sesión"""
+    
+    async def test_registrar_confirmar_y_rechazar(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        usuario_factory
+    ):
+        """Test el resumen sigue el ciclo de vida de los pagos del servicio"""
+        concepto = await concepto_tupa_factory.create(monto=Decimal("50.00"))
+        usuario = await usuario_factory.create()
+        service = PagoService(db_session)
+        hoy = date.today()
+        
+        pagos = []
+        for i in range(3):
+            habilitacion = await habilitacion_factory.create()
+            pagos.append(await service.registrar_pago(
+                PagoCreate(
+                    habilitacion_id=str(habilitacion.id),
+                    concepto_tupa_id=str(concepto.id),
+                    numero_recibo=f"RES-{i}",
+                    monto=Decimal("50.00"),
+                    fecha_pago=hoy,
+                    entidad_bancaria="Banco de la Nación"
+                ),
+                usuario.id
+            ))
+        assert await _resumen(db_session) == {(hoy, EstadoPago.PENDIENTE): (3, Decimal("150.00"))}
+        
+        await service.confirmar_pago(UUID(pagos[0].id), usuario.id)
+        await service.rechazar_pago(UUID(pagos[1].id), "Voucher ilegible", usuario.id)
+        
+        assert await _resumen(db_session) == {
+            (hoy, EstadoPago.PENDIENTE): (1, Decimal("50.00")),
+            (hoy, EstadoPago.CONFIRMADO): (1, Decimal("50.00")),
+            (hoy, EstadoPago.RECHAZADO): (1, Decimal("50.00")),
+        }
+    
+    async def test_cambio_de_fecha_y_eliminacion(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test corregir la fecha mueve el pago de día y eliminarlo lo descuenta"""
+        concepto = await concepto_tupa_factory.create()
+        habilitacion = await habilitacion_factory.create()
+        pago = await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            monto=Decimal("50.00")
+        )
+        ayer = date.today() - timedelta(days=1)
+        
+        pago.fecha_pago = ayer
+        await db_session.commit()
+        assert await _resumen(db_session) == {(ayer, EstadoPago.PENDIENTE): (1, Decimal("50.00"))}
+        
+        await db_session.delete(pago)
+        await db_session.commit()
+        assert await _resumen(db_session) == {}
+    
+    async def test_eliminar_conductor_y_empresa_descuenta_sus_pagos(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test eliminar el conductor o la empresa descuenta los pagos de sus habilitaciones"""
+        concepto = await concepto_tupa_factory.create()
+        habilitaciones = [await habilitacion_factory.create() for _ in range(2)]
+        for habilitacion in habilitaciones:
+            await pago_factory.create(
+                habilitacion_id=habilitacion.id,
+                concepto_tupa_id=concepto.id,
+                monto=Decimal("50.00")
+            )
+        assert await _resumen(db_session) == {(date.today(), EstadoPago.PENDIENTE): (2, Decimal("100.00"))}
+        
+        assert await ConductorRepository(db_session).delete(habilitaciones[0].conductor_id)
+        await db_session.commit()
+        assert await _resumen(db_session) == {(date.today(), EstadoPago.PENDIENTE): (1, Decimal("50.00"))}
+        
+        conductor = await db_session.get(Conductor, habilitaciones[1].conductor_id)
+        assert await EmpresaRepository(db_session).delete(conductor.empresa_id)
+        await db_session.commit()
+        assert await _resumen(db_session) == {}
+        assert await db_session.scalar(select(Pago.id)) is None
+    
+    async def test_reporte_lee_el_resumen(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test el reporte de ingresos se calcula desde el resumen, no desde pagos"""
+        concepto = await concepto_tupa_factory.create()
+        habilitacion = await habilitacion_factory.create()
+        await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            estado=EstadoPago.CONFIRMADO
+        )
+        # Un UPDATE masivo no pasa por el ORM ni actualiza el resumen
+        await db_session.execute(update(Pago).values(estado=EstadoPago.RECHAZADO))
+        await db_session.commit()
+        
+        reporte = await PagoService(db_session).generar_reporte_ingresos(date.today(), date.today())
+        
+        assert reporte.total_confirmados == 1
+        assert reporte.total_rechazados == 0
+    
+    async def test_reconstruir_corrige_el_resumen(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test reconstruir recalcula el resumen desde los pagos"""
+        concepto = await concepto_tupa_factory.create()
+        for i in range(2):
+            habilitacion = await habilitacion_factory.create()
+            await pago_factory.create(
+                habilitacion_id=habilitacion.id,
+                concepto_tupa_id=concepto.id,
+                estado=EstadoPago.CONFIRMADO,
+                monto=Decimal("50.00")
+            )
+        await db_session.execute(update(Pago).values(estado=EstadoPago.RECHAZADO))
+        await db_session.commit()
+        
+        filas = await PagoResumenDiarioRepository(db_session).reconstruir(date.today(), date.today())
+        await db_session.commit()
+        
+        assert filas == 1
+        assert await _resumen(db_session) == {
+            (date.today(), EstadoPago.RECHAZADO): (2, Decimal("100.00"))
+        }
@@ -0,0 +1,81 @@
+"""
+Tests para el desglose de tiempos por petición
+"""
+import pytest
+from httpx import ASGITransport, AsyncClient
+from app.core.middleware import TiemposMiddleware
+from app.core.tiempos import TiemposPeticion, tiempo
+from app.models.user import Usuario
+
+
+def categorias(server_timing: str) -> dict:
+    """Duración por categoría de una cabecera Server-Timing"""
+    resultado = {}
+    for metrica in server_timing.split(", "):
+        nombre, *parametros = metrica.split(";")
+        resultado[nombre] = dict(parametro.split("=", 1) for parametro in parametros)
+    return resultado
+
+
+async def app_minima(scope, receive, send):
+    """Aplicación ASGI que mide un bloque propio y responde 204"""
+    with tiempo("archivos"):
+        pass
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+@pytest.mark.asyncio
+class TestTiemposPeticion:
+    """Tests para TiemposMiddleware y las categorías medidas"""
+
+    async def test_server_timing_de_una_consulta(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_factory,
+        conductor_factory
+    ):
+        """Test la respuesta desglosa SQL, JWT y serialización"""
+        empresa = await empresa_factory.create()
+        conductor = await conductor_factory.create(empresa_id=empresa.id)
+
+        response = await client.get(
+            f"/api/v1/conductores/{conductor.id}",
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 200
+        tiempos = categorias(response.headers["Server-Timing"])
+        assert tiempos["db"]["desc"] == '"2"'
+        assert {"jwt", "serializacion", "total"} <= tiempos.keys()
+        assert "hash" not in tiempos
+
+    async def test_login_mide_bcrypt(self, client: AsyncClient, test_user: Usuario):
+        """Test la verificación de la contraseña aparece como hash"""
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "password123"}
+        )
+
+        assert response.status_code == 200
+        assert categorias(response.headers["Server-Timing"])["hash"]["desc"] == '"1"'
+
+    async def test_muestreo(self):
+        """Test sin muestreo no hay cabecera ni desglose"""
+        for muestreo, con_cabecera in ((0.0, False), (1.0, True)):
+            transporte = ASGITransport(app=TiemposMiddleware(app_minima, muestreo=muestreo))
+            async with AsyncClient(transport=transporte, base_url="http://test") as cliente:
+                response = await cliente.get("/")
+
+            assert ("Server-Timing" in response.headers) is con_cabecera
+            if con_cabecera:
+                assert "archivos" in categorias(response.headers["Server-Timing"])
+
+    async def test_formato_server_timing(self):
+        """Test cada categoría lleva milisegundos y operaciones"""
+        tiempos = TiemposPeticion()
+        tiempos.sumar("db", 0.0125)
+        tiempos.sumar("db", 0.0025)
+
+        assert tiempos.server_timing(0.05) == 'db;dur=15.0;desc="2", total;dur=50.0'
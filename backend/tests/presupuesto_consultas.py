@@ -0,0 +1,47 @@
+"""
+Plugin de pytest para los presupuestos de consultas de los endpoints
+
+Durante cada test, toda petición a un endpoint con @presupuesto_consultas
+que lo supere hace fallar el test con el detalle de sentencias y cargas
+diferidas. Un test que provoca el exceso a propósito se marca con
+@pytest.mark.sin_presupuesto_consultas.
+
+Además ofrece el fixture contar_consultas para acotar las consultas de un
+bloque de código en tests de servicios y repositorios:
+
+    with contar_consultas() as contador:
+        await service.obtener_ficha(conductor_id)
+    assert contador.sentencias == 1
+"""
+import pytest
+
+from app.core import consultas
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "sin_presupuesto_consultas: no fallar si una petición supera el presupuesto de su endpoint"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    with consultas.vigilar_presupuestos() as excesos:
+        resultado = yield
+
+    if excesos and item.get_closest_marker("sin_presupuesto_consultas") is None:
+        detalle = "\n".join(
+            f"  {exceso.ruta}: {exceso.sentencias} sentencias (máximo {exceso.presupuesto.sentencias}), "
+            f"cargas diferidas {exceso.cargas_diferidas or 'ninguna'} "
+            f"(máximo {exceso.presupuesto.cargas_diferidas})"
+            for exceso in excesos
+        )
+        pytest.fail(f"Presupuesto de consultas superado:\n{detalle}", pytrace=False)
+    return resultado
+
+
+@pytest.fixture
+def contar_consultas():
+    """Context manager que cuenta las consultas de un bloque"""
+    return consultas.contar_consultas
@@ -0,0 +1,112 @@
+"""
+Tests para la política de carga de relaciones
+"""
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.conductor import Conductor
+from app.models.habilitacion import Habilitacion
+from app.models.infraccion import GravedadInfraccion, Infraccion, TipoInfraccion
+from app.repositories.carga import cargar_ultimos, ultimos
+from app.repositories.conductor_repository import ConductorRepository
+from app.repositories.infraccion_repository import InfraccionRepository
+
+
+@pytest_asyncio.fixture
+async def conductores_con_historial(db_session: AsyncSession, empresa_factory, conductor_factory, habilitacion_factory):
+    """Dos conductores: uno con cinco habilitaciones y otro sin ninguna"""
+    empresa = await empresa_factory.create()
+    con_historial = await conductor_factory.create(empresa_id=empresa.id)
+    sin_historial = await conductor_factory.create(empresa_id=empresa.id)
+    for anio in range(2019, 2024):
+        await habilitacion_factory.create(
+            conductor_id=con_historial.id,
+            fecha_solicitud=datetime(anio, 3, 1)
+        )
+    db_session.expunge_all()
+    return con_historial.id, sin_historial.id
+
+
+@pytest.mark.asyncio
+class TestPoliticaCarga:
+    """Tests para ultimos(), cargar_ultimos() y proyeccion()"""
+
+    async def test_colecciones_sin_cargar_fallan(self, db_session: AsyncSession, conductores_con_historial):
+        """Test las colecciones del historial no se cargan de forma implícita"""
+        conductor = await db_session.get(Conductor, conductores_con_historial[0])
+
+        with pytest.raises(InvalidRequestError):
+            conductor.habilitaciones
+        with pytest.raises(InvalidRequestError):
+            conductor.documentos
+
+    async def test_cargar_ultimos_por_padre(self, db_session: AsyncSession, conductores_con_historial):
+        """Test cada padre recibe sus N filas más recientes en orden"""
+        con_historial, sin_historial = conductores_con_historial
+        conductores = (await db_session.execute(
+            select(Conductor).where(Conductor.id.in_([con_historial, sin_historial]))
+        )).scalars().all()
+
+        await cargar_ultimos(
+            db_session,
+            conductores,
+            ultimos(
+                Conductor.habilitaciones,
+                2,
+                Habilitacion.fecha_solicitud.desc(),
+                columnas=[Habilitacion.fecha_solicitud]
+            )
+        )
+
+        por_id = {conductor.id: conductor for conductor in conductores}
+        fechas = [h.fecha_solicitud.year for h in por_id[con_historial].habilitaciones]
+        assert fechas == [2023, 2022]
+        assert por_id[sin_historial].habilitaciones == []
+        with pytest.raises(InvalidRequestError):
+            por_id[con_historial].habilitaciones[0].observaciones
+
+    async def test_ultimos_solo_colecciones(self):
+        """Test no se puede limitar una relación a uno"""
+        with pytest.raises(ValueError):
+            ultimos(Conductor.empresa, 1)
+
+    async def test_get_by_dni_limita_historial(self, db_session: AsyncSession, conductores_con_historial):
+        """Test la consulta por DNI carga solo el historial reciente"""
+        conductor = await db_session.get(Conductor, conductores_con_historial[0])
+
+        cargado = await ConductorRepository(db_session).get_by_dni(conductor.dni, historial=3)
+
+        assert [h.fecha_solicitud.year for h in cargado.habilitaciones] == [2023, 2022, 2021]
+        assert cargado.infracciones == []
+        assert cargado.empresa is not None
+
+    async def test_proyeccion_del_conductor(
+        self,
+        db_session: AsyncSession,
+        director_usuario,
+        conductores_con_historial
+    ):
+        """Test los listados de infracciones cargan solo el resumen del conductor"""
+        tipo = TipoInfraccion(codigo="L901", descripcion="Leve", gravedad=GravedadInfraccion.LEVE, puntos=5)
+        db_session.add(tipo)
+        await db_session.flush()
+        db_session.add(Infraccion(
+            conductor_id=conductores_con_historial[0],
+            tipo_infraccion_id=tipo.id,
+            fecha_infraccion=date.today() - timedelta(days=1),
+            descripcion="Infracción de prueba",
+            entidad_fiscalizadora="SUTRAN",
+            registrado_por=director_usuario.id
+        ))
+        await db_session.commit()
+        db_session.expunge_all()
+
+        infracciones = await InfraccionRepository(db_session).get_by_conductor(conductores_con_historial[0])
+
+        conductor = infracciones[0].conductor
+        assert conductor.dni and conductor.empresa_id
+        with pytest.raises(InvalidRequestError):
+            conductor.direccion
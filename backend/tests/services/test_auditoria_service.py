@@ -0,0 +1,143 @@
+"""
+Tests para el servicio de auditoría
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+from app.core.exceptions import ValidacionError
+from app.models.auditoria import Auditoria
+from app.models.user import Usuario
+from app.services.auditoria_service import (
+    AuditoriaService,
+    codificar_cursor,
+    decodificar_cursor,
+    nombre_particion,
+    planificar_particiones,
+    sumar_meses,
+)
+
+
+async def _crear_registros(db_session, usuario_id, cantidad, tabla="conductores", registro_id=None):
+    base = datetime(2026, 10, 1, 12, 0, 0)
+    registros = [
+        Auditoria(
+            usuario_id=usuario_id,
+            tabla=tabla,
+            accion="actualizar",
+            registro_id=registro_id or str(uuid4()),
+            # Pares con la misma fecha para probar el desempate por id
+            created_at=base + timedelta(minutes=i // 2),
+            updated_at=base
+        )
+        for i in range(cantidad)
+    ]
+    db_session.add_all(registros)
+    await db_session.commit()
+    return registros
+
+
+class TestParticiones:
+    """Tests para el cálculo de particiones mensuales"""
+    
+    def test_sumar_meses_cruza_anios(self):
+        """Test: El desplazamiento de meses cruza el cambio de año"""
+        assert sumar_meses(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert sumar_meses(date(2026, 2, 1), -3) == date(2025, 11, 1)
+    
+    def test_planificar_crea_meses_faltantes(self):
+        """Test: Se crean el mes actual y los futuros que no existen"""
+        existentes = ["auditoria_default", nombre_particion(date(2026, 10, 1))]
+        
+        crear, archivar = planificar_particiones(existentes, date(2026, 10, 19), 2, 24)
+        
+        assert crear == [date(2026, 11, 1), date(2026, 12, 1)]
+        assert archivar == []
+    
+    def test_planificar_archiva_fuera_de_retencion(self):
+        """Test: Se archivan los meses anteriores al periodo de retención"""
+        existentes = [
+            "auditoria_default",
+            "auditoria_p2026_06",
+            "auditoria_p2026_07",
+            "auditoria_p2026_08",
+            "auditoria_p2026_10",
+        ]
+        
+        crear, archivar = planificar_particiones(existentes, date(2026, 10, 19), 0, 3)
+        
+        assert crear == []
+        assert archivar == ["auditoria_p2026_06"]
+
+
+class TestCursor:
+    """Tests para el cursor de paginación"""
+    
+    def test_cursor_ida_y_vuelta(self):
+        """Test: El cursor conserva la fecha y el id"""
+        fecha, id = datetime(2026, 10, 19, 8, 30, 15, 123456), uuid4()
+        
+        assert decodificar_cursor(codificar_cursor(fecha, id)) == (fecha, id)
+    
+    def test_cursor_invalido(self):
+        """Test: Un cursor manipulado produce ValidacionError"""
+        with pytest.raises(ValidacionError):
+            decodificar_cursor("no-es-un-cursor")
+
+
+@pytest.mark.asyncio
+class TestConsultarAuditoria:
+    """Tests para AuditoriaService.consultar"""
+    
+    async def test_paginacion_keyset_recorre_todo_sin_repetir(self, db_session, director_usuario: Usuario):
+        """Test: Las páginas cubren todos los registros en orden y sin duplicados"""
+        registros = await _crear_registros(db_session, director_usuario.id, 7)
+        service = AuditoriaService(db_session)
+        
+        vistos, cursor = [], None
+        while True:
+            pagina = await service.consultar(tabla="conductores", cursor=cursor, limite=3)
+            vistos.extend(pagina["items"])
+            cursor = pagina["siguiente_cursor"]
+            if cursor is None:
+                break
+        
+        assert len(vistos) == 7
+        assert {r.id for r in vistos} == {r.id for r in registros}
+        claves = [(r.created_at, r.id) for r in vistos]
+        assert claves == sorted(claves, reverse=True)
+    
+    async def test_filtra_por_registro_y_usuario(self, db_session, director_usuario: Usuario):
+        """Test: Los filtros por registro y usuario se combinan"""
+        await _crear_registros(db_session, director_usuario.id, 3, registro_id="abc")
+        await _crear_registros(db_session, director_usuario.id, 2, tabla="pagos", registro_id="abc")
+        service = AuditoriaService(db_session)
+        
+        pagina = await service.consultar(
+            tabla="pagos", registro_id="abc", usuario_id=director_usuario.id
+        )
+        
+        assert len(pagina["items"]) == 2
+        assert pagina["siguiente_cursor"] is None
+    
+    async def test_filtra_por_rango_de_fechas(self, db_session, director_usuario: Usuario):
+        """Test: desde es inclusivo y hasta exclusivo"""
+        await _crear_registros(db_session, director_usuario.id, 6)
+        service = AuditoriaService(db_session)
+        
+        pagina = await service.consultar(
+            desde=datetime(2026, 10, 1, 12, 1),
+            hasta=datetime(2026, 10, 1, 12, 2)
+        )
+        
+        assert len(pagina["items"]) == 2
+    
+    async def test_registro_sin_tabla(self, db_session):
+        """Test: Filtrar por registro exige indicar la tabla"""
+        with pytest.raises(ValidacionError):
+            await AuditoriaService(db_session).consultar(registro_id="abc")
+    
+    async def test_mantener_particiones_fuera_de_postgresql(self, db_session):
+        """Test: En motores sin particiones el mantenimiento no hace nada"""
+        resultado = await AuditoriaService(db_session).mantener_particiones(date(2026, 10, 19))
+        
+        assert resultado == {"creadas": [], "archivadas": [], "filas_movidas": 0}
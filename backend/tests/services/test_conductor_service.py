@@ -403,3 +403,117 @@ class TestConductorService:
         requisitos_turismo = await service.obtener_requisitos_categoria("TURISMO")
         assert "A-IIb" in requisitos_turismo
         assert "A-IIIa" in requisitos_turismo
+
+
+@pytest.mark.asyncio
+class TestCambioEstadoMasivo:
+    """Tests para el cambio de estado en bloque de una empresa"""
+    
+    async def test_suspende_solo_habilitados(
+        self,
+        db_session,
+        empresa_factory,
+        conductor_factory,
+        usuario_factory
+    ):
+        """Test HABILITADO → SUSPENDIDO en una sentencia, con aviso al gerente"""
+        from sqlalchemy import select
+        from app.core.auditoria import contexto_auditoria
+        from app.models.auditoria import Auditoria, Notificacion
+        from app.models.conductor import Conductor
+        from app.models.user import RolUsuario
+        
+        gerente = await usuario_factory.create(rol=RolUsuario.GERENTE)
+        empresa = await empresa_factory.create(gerente_id=gerente.id)
+        otra = await empresa_factory.create()
+        empresa_id, gerente_id = empresa.id, gerente.id
+        habilitados = [
+            (await conductor_factory.create(estado=EstadoConductor.HABILITADO, empresa_id=empresa_id)).id
+            for _ in range(3)
+        ]
+        pendiente = await conductor_factory.create(estado=EstadoConductor.PENDIENTE, empresa_id=empresa_id)
+        ajeno = await conductor_factory.create(estado=EstadoConductor.HABILITADO, empresa_id=otra.id)
+        pendiente_id, ajeno_id = pendiente.id, ajeno.id
+        
+        with contexto_auditoria(gerente_id):
+            resultado = await ConductorService(db_session).cambiar_estado_empresa(
+                empresa_id=empresa_id,
+                nuevo_estado=EstadoConductor.SUSPENDIDO,
+                motivo="Autorización de la empresa vencida"
+            )
+        
+        assert resultado["actualizados"] == 3
+        assert resultado["por_estado_anterior"] == {"habilitado": 3}
+        assert set(resultado["conductor_ids"]) == set(habilitados)
+        
+        db_session.expire_all()
+        estados = dict((await db_session.execute(
+            select(Conductor.id, Conductor.estado).where(
+                Conductor.id.in_([*habilitados, pendiente_id, ajeno_id])
+            )
+        )).all())
+        assert {estados[i] for i in habilitados} == {EstadoConductor.SUSPENDIDO}
+        assert estados[pendiente_id] == EstadoConductor.PENDIENTE
+        assert estados[ajeno_id] == EstadoConductor.HABILITADO
+        
+        suspendido = await db_session.get(Conductor, habilitados[0])
+        assert "habilitado → suspendido. Motivo: Autorización de la empresa vencida" in suspendido.observaciones
+        
+        auditados = (await db_session.execute(
+            select(Auditoria).where(Auditoria.descripcion.like("Cambio de estado masivo%"))
+        )).scalars().all()
+        assert len(auditados) == 3
+        assert auditados[0].datos_anteriores == {"estado": "habilitado"}
+        
+        avisos = (await db_session.execute(
+            select(Notificacion).where(Notificacion.usuario_id == gerente_id)
+        )).scalars().all()
+        assert len(avisos) == 1
+        assert avisos[0].datos_adicionales["por_estado_anterior"] == {"habilitado": 3}
+    
+    async def test_transicion_sin_estados_de_origen(self, db_session, empresa_factory):
+        """Test error si ningún estado seleccionado admite la transición"""
+        empresa = await empresa_factory.create()
+        service = ConductorService(db_session)
+        
+        with pytest.raises(ValidacionError):
+            await service.cambiar_estado_empresa(
+                empresa_id=empresa.id,
+                nuevo_estado=EstadoConductor.SUSPENDIDO,
+                motivo="Autorización de la empresa vencida",
+                estados=[EstadoConductor.PENDIENTE]
+            )
+        with pytest.raises(RecursoNoEncontrado):
+            await service.cambiar_estado_empresa(
+                empresa_id=uuid4(),
+                nuevo_estado=EstadoConductor.SUSPENDIDO,
+                motivo="Autorización de la empresa vencida"
+            )
+    
+    async def test_endpoint_cambiar_estado_masivo(
+        self,
+        client,
+        director_token,
+        empresa_factory,
+        conductor_factory
+    ):
+        """Test cambio masivo por la API limitado a los estados indicados"""
+        empresa = await empresa_factory.create()
+        for estado in (EstadoConductor.PENDIENTE, EstadoConductor.OBSERVADO, EstadoConductor.SUSPENDIDO):
+            await conductor_factory.create(estado=estado, empresa_id=empresa.id)
+        
+        response = await client.post(
+            "/api/v1/conductores/cambiar-estado-masivo",
+            json={
+                "empresa_id": str(empresa.id),
+                "nuevo_estado": "habilitado",
+                "estados": ["pendiente", "observado"],
+                "motivo": "Documentación completa verificada"
+            },
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["actualizados"] == 2
+        assert data["por_estado_anterior"] == {"pendiente": 1, "observado": 1}
@@ -0,0 +1,240 @@
+"""
+Tests para las diferencias de nómina de una empresa
+"""
+import csv
+import io
+import pytest
+import pytest_asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from app.core.exceptions import ConflictoError, ValidacionError
+from app.models.conductor import Conductor, EstadoConductor
+from app.models.empresa import AutorizacionEmpresa
+from app.models.habilitacion import Habilitacion, Pago, PagoResumenDiario
+from app.schemas.empresa import NominaAplicar
+from app.services.empresa_service import EmpresaService
+from app.services.importacion_service import ImportacionService
+
+
+ENCABEZADOS = [
+    "dni", "nombres", "apellidos", "fecha_nacimiento", "direccion", "telefono", "email",
+    "licencia_numero", "licencia_categoria", "licencia_emision", "licencia_vencimiento",
+]
+
+
+def _fila(numero: int, **cambios) -> dict:
+    fila = {
+        "dni": f"{41000000 + numero}",
+        "nombres": "Rosa",
+        "apellidos": "Quispe",
+        "fecha_nacimiento": "1988-03-10",
+        "direccion": "Jr. Lima 456, Juliaca",
+        "telefono": "951111111",
+        "email": f"nomina{numero}@test.com",
+        "licencia_numero": f"N{41000000 + numero}",
+        "licencia_categoria": "A-IIIb",
+        "licencia_emision": "2021-06-01",
+        "licencia_vencimiento": (date.today() + timedelta(days=365)).isoformat(),
+    }
+    fila.update(cambios)
+    return fila
+
+
+def _csv(filas) -> io.BytesIO:
+    texto = io.StringIO()
+    escritor = csv.writer(texto)
+    escritor.writerow(ENCABEZADOS)
+    escritor.writerows([fila[c] for c in ENCABEZADOS] for fila in filas)
+    return io.BytesIO(texto.getvalue().encode("utf-8"))
+
+
+@pytest_asyncio.fixture
+async def empresa_con_nomina(db_session, empresa_factory, tipo_autorizacion_factory):
+    """Empresa autorizada para MERCANCIAS con cuatro conductores registrados"""
+    tipo = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+    empresa = await empresa_factory.create()
+    db_session.add(AutorizacionEmpresa(
+        empresa_id=empresa.id,
+        tipo_autorizacion_id=tipo.id,
+        numero_resolucion="RD-NOM-001",
+        fecha_emision=date.today() - timedelta(days=30),
+        vigente=True
+    ))
+    await db_session.commit()
+    await ImportacionService(db_session).importar_conductores(
+        _csv([_fila(numero) for numero in range(1, 5)]), "nomina.csv", empresa.id
+    )
+    return empresa
+
+
+async def _conductor(db_session, dni: str) -> Conductor:
+    return await db_session.scalar(select(Conductor).where(Conductor.dni == dni))
+
+
+@pytest.mark.asyncio
+class TestDiferenciasNomina:
+    """Tests para el cálculo y la aplicación de diferencias"""
+
+    async def test_clasifica_altas_cambios_y_bajas(self, db_session, empresa_con_nomina):
+        """Test cada conductor cae en una sola categoría con solo los campos modificados"""
+        filas = [
+            _fila(1),
+            _fila(2, telefono="952222222", licencia_categoria="A-IIIc"),
+            _fila(3),
+            _fila(5),
+            _fila(6, email="sin-arroba"),
+            _fila(7, dni=f"{41000000 + 5}"),
+        ]
+
+        diferencias = await EmpresaService(db_session).calcular_diferencias_nomina(
+            empresa_con_nomina.id, _csv(filas), "nomina.csv"
+        )
+
+        assert diferencias["sin_cambios"] == 2
+        assert [alta["conductor"]["dni"] for alta in diferencias["altas"]] == ["41000005"]
+        assert diferencias["altas"][0]["fila"] == 5
+        assert [(c["dni"], c["campos"]) for c in diferencias["cambios"]] == [
+            ("41000002", {"telefono": "952222222", "licencia_categoria": "A-IIIc"})
+        ]
+        assert [(b["dni"], b["estado"]) for b in diferencias["bajas"]] == [
+            ("41000004", EstadoConductor.PENDIENTE.value)
+        ]
+        assert [(e["fila"], e["campo"]) for e in diferencias["errores"]] == [(6, "email"), (7, "dni")]
+
+    async def test_fila_rechazada_no_es_baja(self, db_session, empresa_con_nomina):
+        """Test un conductor registrado cuya fila tiene errores no se da de baja"""
+        filas = [_fila(1), _fila(2), _fila(3), _fila(4, email="no-es-email")]
+
+        diferencias = await EmpresaService(db_session).calcular_diferencias_nomina(
+            empresa_con_nomina.id, _csv(filas), "nomina.csv"
+        )
+
+        assert diferencias["bajas"] == []
+        assert diferencias["sin_cambios"] == 3
+        assert [(e["fila"], e["campo"]) for e in diferencias["errores"]] == [(5, "email")]
+
+    async def test_aplicar_en_una_transaccion(self, db_session, empresa_con_nomina):
+        """Test las diferencias calculadas se aplican tal cual"""
+        empresa_id = empresa_con_nomina.id
+        service = EmpresaService(db_session)
+        diferencias = await service.calcular_diferencias_nomina(
+            empresa_id,
+            _csv([_fila(1), _fila(2, telefono="952222222"), _fila(3), _fila(5)]),
+            "nomina.csv"
+        )
+
+        resultado = await service.aplicar_diferencias_nomina(
+            empresa_id, NominaAplicar.model_validate(diferencias)
+        )
+
+        assert resultado == {"altas": 1, "cambios": 1, "bajas": 1}
+        dnis = (await db_session.execute(
+            select(Conductor.dni).where(Conductor.empresa_id == empresa_id)
+        )).scalars().all()
+        assert sorted(dnis) == ["41000001", "41000002", "41000003", "41000005"]
+        db_session.expire_all()
+        assert (await _conductor(db_session, "41000002")).telefono == "952222222"
+        recalculadas = await service.calcular_diferencias_nomina(
+            empresa_id, _csv([_fila(1), _fila(2, telefono="952222222"), _fila(3), _fila(5)]), "nomina.csv"
+        )
+        assert recalculadas["sin_cambios"] == 4
+
+    async def test_version_desactualizada_no_aplica_nada(self, db_session, empresa_con_nomina):
+        """Test un conductor modificado después del cálculo produce un conflicto"""
+        empresa_id = empresa_con_nomina.id
+        service = EmpresaService(db_session)
+        diferencias = await service.calcular_diferencias_nomina(
+            empresa_id, _csv([_fila(1), _fila(2, telefono="952222222"), _fila(3), _fila(5)]), "nomina.csv"
+        )
+        await db_session.execute(
+            update(Conductor).where(Conductor.dni == "41000002").values(direccion="Otra dirección")
+        )
+        await db_session.commit()
+
+        with pytest.raises(ConflictoError):
+            await service.aplicar_diferencias_nomina(empresa_id, NominaAplicar.model_validate(diferencias))
+
+        total = len((await db_session.execute(
+            select(Conductor.id).where(Conductor.empresa_id == empresa_id)
+        )).all())
+        assert total == 4
+
+    async def test_baja_de_habilitado(self, db_session, empresa_con_nomina):
+        """Test no se da de baja a un conductor habilitado"""
+        empresa_id = empresa_con_nomina.id
+        await db_session.execute(
+            update(Conductor).where(Conductor.dni == "41000004").values(estado=EstadoConductor.HABILITADO)
+        )
+        await db_session.commit()
+        service = EmpresaService(db_session)
+        diferencias = await service.calcular_diferencias_nomina(
+            empresa_id, _csv([_fila(1), _fila(2), _fila(3)]), "nomina.csv"
+        )
+
+        with pytest.raises(ValidacionError, match="41000004"):
+            await service.aplicar_diferencias_nomina(empresa_id, NominaAplicar.model_validate(diferencias))
+
+    async def test_baja_descuenta_pagos_del_resumen(
+        self,
+        db_session,
+        empresa_con_nomina,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test la baja elimina habilitaciones y pagos del conductor y los resta del resumen diario"""
+        empresa_id = empresa_con_nomina.id
+        conductor = await _conductor(db_session, "41000004")
+        concepto = await concepto_tupa_factory.create()
+        habilitacion = await habilitacion_factory.create(conductor_id=conductor.id)
+        await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            monto=Decimal("50.00")
+        )
+        service = EmpresaService(db_session)
+        diferencias = await service.calcular_diferencias_nomina(
+            empresa_id, _csv([_fila(1), _fila(2), _fila(3)]), "nomina.csv"
+        )
+
+        resultado = await service.aplicar_diferencias_nomina(
+            empresa_id, NominaAplicar.model_validate(diferencias)
+        )
+
+        assert resultado["bajas"] == 1
+        assert await db_session.scalar(
+            select(Habilitacion.id).where(Habilitacion.conductor_id == conductor.id)
+        ) is None
+        assert await db_session.scalar(select(Pago.id).where(Pago.habilitacion_id == habilitacion.id)) is None
+        resumen = (await db_session.execute(
+            select(PagoResumenDiario).where(PagoResumenDiario.concepto_tupa_id == concepto.id)
+        )).scalars().all()
+        assert [(fila.cantidad, fila.monto_total) for fila in resumen] == [(0, Decimal("0.00"))]
+
+    async def test_endpoints_nomina(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_con_nomina
+    ):
+        """Test cálculo y aplicación por la API"""
+        url = f"/api/v1/empresas/{empresa_con_nomina.id}/nomina"
+        headers = {"Authorization": f"Bearer {director_token}"}
+
+        response = await client.post(
+            f"{url}/diferencias",
+            files={"file": ("nomina.csv", _csv([_fila(1), _fila(2), _fila(3), _fila(4), _fila(5)]), "text/csv")},
+            headers=headers
+        )
+        assert response.status_code == 200
+        diferencias = response.json()
+        assert (len(diferencias["altas"]), diferencias["sin_cambios"]) == (1, 4)
+
+        response = await client.post(f"{url}/aplicar", json=diferencias, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"altas": 1, "cambios": 0, "bajas": 0}
+
+        response = await client.post(f"{url}/aplicar", json=diferencias, headers=headers)
+        assert response.status_code == 409
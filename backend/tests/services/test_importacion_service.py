@@ -0,0 +1,276 @@
+"""
+Tests para la importación masiva de conductores
+"""
+import csv
+import io
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+from httpx import AsyncClient
+from openpyxl import Workbook
+from sqlalchemy import func, select
+from app.core.auditoria import contexto_auditoria
+from app.core.exceptions import RecursoNoEncontrado, ValidacionError
+from app.models.auditoria import Auditoria
+from app.models.conductor import Conductor, EstadoConductor
+from app.models.empresa import AutorizacionEmpresa
+from app.services.importacion_service import ImportacionService, validar_lote
+
+
+ENCABEZADOS = [
+    "dni", "nombres", "apellidos", "fecha_nacimiento", "direccion", "telefono", "email",
+    "licencia_numero", "licencia_categoria", "licencia_emision", "licencia_vencimiento",
+]
+
+
+def _fila(numero: int, categoria: str = "A-IIIb", **cambios) -> dict:
+    fila = {
+        "dni": f"{40000000 + numero}",
+        "nombres": "Juan",
+        "apellidos": "Pérez",
+        "fecha_nacimiento": "1985-05-20",
+        "direccion": "Av. El Sol 123, Puno",
+        "telefono": "951000000",
+        "email": f"conductor{numero}@test.com",
+        "licencia_numero": f"Q{40000000 + numero}",
+        "licencia_categoria": categoria,
+        "licencia_emision": "2020-01-15",
+        "licencia_vencimiento": (date.today() + timedelta(days=365)).isoformat(),
+    }
+    fila.update(cambios)
+    return fila
+
+
+def _csv(filas, delimitador: str = ",") -> io.BytesIO:
+    texto = io.StringIO()
+    escritor = csv.writer(texto, delimiter=delimitador)
+    escritor.writerow(ENCABEZADOS)
+    escritor.writerows([fila[c] for c in ENCABEZADOS] for fila in filas)
+    return io.BytesIO(("﻿" + texto.getvalue()).encode("utf-8"))
+
+
+@pytest_asyncio.fixture
+async def empresa_mercancias(db_session, empresa_factory, tipo_autorizacion_factory):
+    """Empresa autorizada para MERCANCIAS (categorías A-IIIb y A-IIIc)"""
+    tipo = await tipo_autorizacion_factory(codigo="MERCANCIAS", nombre="Mercancías")
+    empresa = await empresa_factory.create()
+    db_session.add(AutorizacionEmpresa(
+        empresa_id=empresa.id,
+        tipo_autorizacion_id=tipo.id,
+        numero_resolucion="RD-IMP-001",
+        fecha_emision=date.today() - timedelta(days=30),
+        vigente=True
+    ))
+    await db_session.commit()
+    return empresa
+
+
+class TestValidarLote:
+    """Tests para la validación de un lote con el schema"""
+
+    def test_separa_validas_e_invalidas(self):
+        """Test las filas inválidas se reportan y el resto se valida igual"""
+        empresa_id = uuid4()
+        lote = [
+            (2, _fila(1)),
+            (3, _fila(2, dni="12AB")),
+            (4, _fila(3, email=None)),
+            (5, _fila(4)),
+        ]
+
+        filas, errores = validar_lote(lote, empresa_id)
+
+        assert [fila["fila"] for fila in filas] == [2, 5]
+        assert filas[0]["fecha_nacimiento"] == date(1985, 5, 20)
+        assert "empresa_id" not in filas[0]
+        assert {(fila, campo) for fila, campo, _ in errores} == {(3, "dni"), (4, "email")}
+
+    def test_normaliza_valores_de_excel(self):
+        """Test fechas como datetime y DNI numérico sin ceros iniciales"""
+        lote = [(2, _fila(
+            1,
+            dni=1234567,
+            telefono=951000000.0,
+            fecha_nacimiento=datetime(1985, 5, 20),
+            certificado_medico_numero="  "
+        ))]
+
+        filas, errores = validar_lote(lote, uuid4())
+
+        assert errores == []
+        assert filas[0]["dni"] == "01234567"
+        assert filas[0]["telefono"] == "951000000"
+        assert filas[0]["fecha_nacimiento"] == date(1985, 5, 20)
+        assert filas[0]["certificado_medico_numero"] is None
+
+
+@pytest.mark.asyncio
+class TestImportacionService:
+    """Tests para el flujo completo de importación"""
+
+    async def test_importa_y_reporta_errores_por_fila(
+        self,
+        db_session,
+        empresa_mercancias,
+        conductor_factory
+    ):
+        """Test filas válidas insertadas y cada rechazo con su fila y motivo"""
+        existente = await conductor_factory.create(dni="49999999", empresa_id=empresa_mercancias.id)
+        filas = [
+            _fila(1),
+            _fila(2, categoria="A-IIb"),
+            _fila(3, dni="40000001"),
+            _fila(4, dni=existente.dni),
+            _fila(5, licencia_numero=existente.licencia_numero),
+            _fila(6, email="sin-arroba"),
+            _fila(7, categoria="A-IIIc"),
+        ]
+
+        resultado = await ImportacionService(db_session).importar_conductores(
+            _csv(filas, ";"), "conductores.csv", empresa_mercancias.id
+        )
+
+        assert (resultado["total_filas"], resultado["importados"], resultado["rechazados"]) == (7, 2, 5)
+        assert [(e["fila"], e["campo"]) for e in resultado["errores"]] == [
+            (3, "licencia_categoria"),
+            (4, "dni"),
+            (5, "dni"),
+            (6, "licencia_numero"),
+            (7, "email"),
+        ]
+        assert resultado["errores"][2]["mensaje"] == f"Ya existe un conductor con DNI {existente.dni}"
+
+        importados = (await db_session.execute(
+            select(Conductor).where(Conductor.empresa_id == empresa_mercancias.id)
+        )).scalars().all()
+        assert {c.dni for c in importados} == {existente.dni, "40000001", "40000007"}
+        assert {c.estado for c in importados} == {EstadoConductor.PENDIENTE}
+
+    async def test_repetida_de_fila_rechazada_se_importa(self, db_session, empresa_mercancias):
+        """Test si la primera aparición se rechaza por otro motivo, la siguiente se importa"""
+        filas = [
+            _fila(1, categoria="A-IIb"),
+            _fila(2, dni="40000001"),
+            _fila(3, dni="40000001"),
+        ]
+
+        resultado = await ImportacionService(db_session).importar_conductores(
+            _csv(filas), "conductores.csv", empresa_mercancias.id
+        )
+
+        assert (resultado["importados"], resultado["rechazados"]) == (1, 2)
+        assert [(e["fila"], e["campo"]) for e in resultado["errores"]] == [
+            (2, "licencia_categoria"),
+            (4, "dni"),
+        ]
+        importado = (await db_session.execute(
+            select(Conductor).where(Conductor.dni == "40000001")
+        )).scalar_one()
+        assert importado.licencia_numero == "Q40000002"
+
+    async def test_repetidos_de_dni_y_licencia_en_cadena(self, db_session, empresa_mercancias):
+        """Test una fila solo se rechaza por repetir valores de una fila aceptada"""
+        filas = [
+            _fila(1),
+            _fila(2, licencia_numero="Q40000001"),
+            _fila(3, dni="40000002"),
+        ]
+
+        resultado = await ImportacionService(db_session).importar_conductores(
+            _csv(filas), "conductores.csv", empresa_mercancias.id
+        )
+
+        assert (resultado["importados"], resultado["rechazados"]) == (2, 1)
+        assert [(e["fila"], e["campo"]) for e in resultado["errores"]] == [(3, "licencia_numero")]
+        importado = (await db_session.execute(
+            select(Conductor).where(Conductor.dni == "40000002")
+        )).scalar_one()
+        assert importado.licencia_numero == "Q40000003"
+
+    async def test_importa_xlsx_con_auditoria(
+        self,
+        db_session,
+        empresa_mercancias,
+        usuario_factory
+    ):
+        """Test importación desde XLSX con un registro de auditoría por conductor"""
+        usuario = await usuario_factory.create()
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(ENCABEZADOS)
+        for numero in range(1, 4):
+            fila = _fila(numero, fecha_nacimiento=datetime(1985, 5, 20))
+            fila["dni"] = int(fila["dni"])
+            hoja.append([fila[c] for c in ENCABEZADOS])
+        archivo = io.BytesIO()
+        libro.save(archivo)
+        archivo.seek(0)
+
+        with contexto_auditoria(usuario.id):
+            resultado = await ImportacionService(db_session).importar_conductores(
+                archivo, "conductores.xlsx", empresa_mercancias.id
+            )
+
+        assert (resultado["importados"], resultado["rechazados"]) == (3, 0)
+        auditados = await db_session.scalar(
+            select(func.count()).select_from(Auditoria).where(
+                Auditoria.tabla == "conductores",
+                Auditoria.descripcion == "Importación masiva desde conductores.xlsx"
+            )
+        )
+        assert auditados == 3
+
+    async def test_miles_de_filas(self, db_session, empresa_mercancias):
+        """Test un archivo de varios lotes se importa en una sola operación"""
+        filas = [_fila(numero) for numero in range(1, 2501)]
+
+        resultado = await ImportacionService(db_session).importar_conductores(
+            _csv(filas), "conductores.csv", empresa_mercancias.id
+        )
+
+        assert (resultado["total_filas"], resultado["importados"]) == (2500, 2500)
+        total = await db_session.scalar(
+            select(func.count()).select_from(Conductor).where(
+                Conductor.empresa_id == empresa_mercancias.id
+            )
+        )
+        assert total == 2500
+
+    async def test_archivo_o_empresa_invalidos(self, db_session, empresa_mercancias, empresa_factory):
+        """Test errores que rechazan el archivo completo"""
+        service = ImportacionService(db_session)
+        empresa_id = empresa_mercancias.id
+        sin_columnas = io.BytesIO(b"dni,nombres\n40000001,Juan\n")
+
+        with pytest.raises(ValidacionError, match="Faltan columnas obligatorias"):
+            await service.importar_conductores(sin_columnas, "c.csv", empresa_id)
+        with pytest.raises(ValidacionError, match="Formato no soportado"):
+            await service.importar_conductores(_csv([_fila(1)]), "c.txt", empresa_id)
+        with pytest.raises(ValidacionError, match="XLSX"):
+            await service.importar_conductores(io.BytesIO(b"no es zip"), "c.xlsx", empresa_id)
+        with pytest.raises(RecursoNoEncontrado):
+            await service.importar_conductores(_csv([_fila(1)]), "c.csv", uuid4())
+
+        sin_autorizaciones = await empresa_factory.create()
+        with pytest.raises(ValidacionError, match="no tiene autorizaciones"):
+            await service.importar_conductores(_csv([_fila(1)]), "c.csv", sin_autorizaciones.id)
+
+    async def test_endpoint_importar(
+        self,
+        client: AsyncClient,
+        director_token,
+        empresa_mercancias
+    ):
+        """Test importación por la API con archivo multipart"""
+        response = await client.post(
+            "/api/v1/conductores/importar",
+            files={"file": ("conductores.csv", _csv([_fila(1), _fila(2, dni="1")]), "text/csv")},
+            data={"empresa_id": str(empresa_mercancias.id)},
+            headers={"Authorization": f"Bearer {director_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["importados"], data["rechazados"]) == (1, 1)
+        assert data["errores"][0]["fila"] == 3
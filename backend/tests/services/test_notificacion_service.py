@@ -0,0 +1,204 @@
+"""
+Tests para NotificacionService
+"""
+import asyncio
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import select
+from app.services.notificacion_service import NotificacionService
+from app.models.auditoria import Notificacion, TipoNotificacion
+from app.models.conductor import EstadoConductor
+from app.models.user import RolUsuario
+from app.core.eventos import canal_usuario
+
+
+@pytest.fixture
+def empresa_con_gerente(usuario_factory, empresa_factory):
+    """Crea una empresa con gerente asignado"""
+    async def _create():
+        gerente = await usuario_factory.create(rol=RolUsuario.GERENTE)
+        empresa = await empresa_factory.create(gerente_id=gerente.id)
+        return gerente, empresa
+    
+    return _create
+
+
+async def _notificaciones(db_session, usuario_id):
+    result = await db_session.execute(
+        select(Notificacion).where(Notificacion.usuario_id == usuario_id)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestNotificacionesVencimiento:
+    """Tests para la generación de avisos de vencimiento"""
+    
+    async def test_notifica_al_gerente_con_la_ventana_correspondiente(
+        self,
+        db_session,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Se asigna la menor ventana que contiene los días restantes"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        conductor = await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=10)
+        )
+        service = NotificacionService(db_session)
+        
+        # Act
+        resultado = await service.generar_notificaciones_vencimiento()
+        
+        # Assert
+        assert resultado == {"conductores": 1, "creadas": 1, "omitidas": 0}
+        notificaciones = await _notificaciones(db_session, gerente.id)
+        assert len(notificaciones) == 1
+        assert notificaciones[0].tipo == TipoNotificacion.LICENCIA_POR_VENCER.value
+        assert notificaciones[0].datos_adicionales["conductor_id"] == str(conductor.id)
+        assert notificaciones[0].datos_adicionales["ventana_dias"] == 15
+    
+    async def test_licencia_y_certificado_generan_avisos_separados(
+        self,
+        db_session,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Cada documento por vencer genera su propia notificación"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=5),
+            certificado_medico_vencimiento=date.today() + timedelta(days=25)
+        )
+        service = NotificacionService(db_session)
+        
+        # Act
+        resultado = await service.generar_notificaciones_vencimiento()
+        
+        # Assert
+        assert resultado["creadas"] == 2
+        tipos = {n.tipo for n in await _notificaciones(db_session, gerente.id)}
+        assert tipos == {
+            TipoNotificacion.LICENCIA_POR_VENCER.value,
+            TipoNotificacion.CERTIFICADO_POR_VENCER.value
+        }
+    
+    async def test_no_duplica_en_ejecuciones_repetidas(
+        self,
+        db_session,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Volver a ejecutar el job no crea notificaciones duplicadas"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=20)
+        )
+        service = NotificacionService(db_session)
+        await service.generar_notificaciones_vencimiento()
+        
+        # Act
+        resultado = await service.generar_notificaciones_vencimiento()
+        
+        # Assert
+        assert resultado == {"conductores": 1, "creadas": 0, "omitidas": 1}
+        assert len(await _notificaciones(db_session, gerente.id)) == 1
+    
+    async def test_nueva_ventana_genera_nuevo_aviso(
+        self,
+        db_session,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Al entrar en una ventana menor se notifica otra vez"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=20)
+        )
+        service = NotificacionService(db_session)
+        await service.generar_notificaciones_vencimiento()
+        
+        # Act: diez días después la licencia está en la ventana de 15 días
+        resultado = await service.generar_notificaciones_vencimiento(
+            fecha_referencia=date.today() + timedelta(days=10)
+        )
+        
+        # Assert
+        assert resultado["creadas"] == 1
+        ventanas = {
+            n.datos_adicionales["ventana_dias"]
+            for n in await _notificaciones(db_session, gerente.id)
+        }
+        assert ventanas == {30, 15}
+    
+    async def test_procesa_por_lotes_y_omite_fuera_de_ventana(
+        self,
+        db_session,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Con lotes pequeños se procesan todos y se ignoran los no habilitados"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        for _ in range(3):
+            await conductor_factory.create(
+                empresa_id=empresa.id,
+                estado=EstadoConductor.HABILITADO,
+                licencia_vencimiento=date.today() + timedelta(days=7)
+            )
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=90)
+        )
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.SUSPENDIDO,
+            licencia_vencimiento=date.today() + timedelta(days=7)
+        )
+        service = NotificacionService(db_session)
+        
+        # Act
+        resultado = await service.generar_notificaciones_vencimiento(tamano_lote=2)
+        
+        # Assert
+        assert resultado == {"conductores": 3, "creadas": 3, "omitidas": 0}
+        notificaciones = await _notificaciones(db_session, gerente.id)
+        assert all(n.datos_adicionales["ventana_dias"] == 7 for n in notificaciones)
+    
+    async def test_avisa_en_tiempo_real_al_gerente(
+        self,
+        db_session,
+        distribuidor,
+        conductor_factory,
+        empresa_con_gerente
+    ):
+        """Test: Se publica un evento con el número de notificaciones nuevas"""
+        # Arrange
+        gerente, empresa = await empresa_con_gerente()
+        await conductor_factory.create(
+            empresa_id=empresa.id,
+            estado=EstadoConductor.HABILITADO,
+            licencia_vencimiento=date.today() + timedelta(days=3)
+        )
+        cola = await distribuidor.suscribir([canal_usuario(gerente.id)])
+        service = NotificacionService(db_session)
+        
+        # Act
+        await service.generar_notificaciones_vencimiento()
+        
+        # Assert
+        mensaje = await asyncio.wait_for(cola.get(), timeout=1.0)
+        assert mensaje == {"evento": "notificacion", "datos": {"nuevas": 1}}
@@ -442,6 +442,93 @@ class TestPagoService:
         
         assert "fecha" in str(exc.value).lower()
     
+    async def test_reporte_ingresos_desgloses(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test el reporte desglosa por concepto y por mes en una sola consulta"""
+        # Arrange
+        concepto_a = await concepto_tupa_factory.create(codigo="HAB-A", monto=Decimal("50.00"))
+        concepto_b = await concepto_tupa_factory.create(codigo="HAB-B", monto=Decimal("80.00"))
+        for concepto, fecha_pago in [
+            (concepto_a, date(2025, 1, 10)),
+            (concepto_a, date(2025, 2, 5)),
+            (concepto_b, date(2025, 2, 20)),
+        ]:
+            habilitacion = await habilitacion_factory.create()
+            await pago_factory.create(
+                habilitacion_id=habilitacion.id,
+                concepto_tupa_id=concepto.id,
+                estado=EstadoPago.CONFIRMADO,
+                monto=concepto.monto,
+                fecha_pago=fecha_pago
+            )
+        service = PagoService(db_session)
+        
+        # Act
+        reporte = await service.generar_reporte_ingresos(date(2025, 1, 1), date(2025, 12, 31))
+        
+        # Assert
+        assert reporte.total_pagos == 3
+        assert reporte.monto_confirmado == Decimal("180.00")
+        por_concepto = {c["codigo"]: c for c in reporte.pagos_por_concepto}
+        assert por_concepto["HAB-A"]["cantidad"] == 2
+        assert por_concepto["HAB-B"]["monto_total"] == 80.0
+        assert [(m["anio"], m["mes"], m["cantidad"]) for m in reporte.pagos_por_mes] == [
+            (2025, 1, 1),
+            (2025, 2, 2),
+        ]
+    
+    async def test_reporte_periodo_cerrado_usa_cache(
+        self,
+        db_session,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory,
+        usuario_factory
+    ):
+        """Test los períodos pasados se cachean hasta que cambia un pago de ese período"""
+        # Arrange
+        concepto = await concepto_tupa_factory.create(monto=Decimal("50.00"))
+        ayer = date.today() - timedelta(days=1)
+        pagos = []
+        for i in range(2):
+            habilitacion = await habilitacion_factory.create()
+            pagos.append(await pago_factory.create(
+                habilitacion_id=habilitacion.id,
+                concepto_tupa_id=concepto.id,
+                estado=EstadoPago.PENDIENTE,
+                monto=Decimal("50.00"),
+                fecha_pago=ayer
+            ))
+        service = PagoService(db_session)
+        primero = await service.generar_reporte_ingresos(ayer, ayer)
+        
+        # Un pago insertado sin pasar por el servicio no invalida la caché
+        habilitacion = await habilitacion_factory.create()
+        await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            monto=Decimal("50.00"),
+            fecha_pago=ayer
+        )
+        cacheado = await service.generar_reporte_ingresos(ayer, ayer)
+        
+        # Confirmar un pago del período sí la invalida
+        usuario = await usuario_factory.create()
+        await service.confirmar_pago(pagos[0].id, usuario.id)
+        actualizado = await service.generar_reporte_ingresos(ayer, ayer)
+        
+        # Assert
+        assert primero.total_pagos == 2
+        assert cacheado.total_pagos == 2
+        assert cacheado.total_pendientes == 2
+        assert actualizado.total_pagos == 3
+        assert actualizado.total_confirmados == 1
+    
     async def test_get_pago_by_id(
         self,
         db_session,
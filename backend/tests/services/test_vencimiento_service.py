@@ -0,0 +1,131 @@
+"""
+Tests para VencimientoService
+"""
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import update
+from app.services.vencimiento_service import VencimientoService
+from app.models.conductor import Conductor, EstadoConductor
+from app.models.habilitacion import EstadoHabilitacion
+
+
+@pytest.mark.asyncio
+class TestVencimientoService:
+    """Tests para el barrido de vencimientos"""
+    
+    async def test_vence_habilitaciones_expiradas(self, db_session, habilitacion_factory):
+        """Test: Solo las habilitaciones con vigencia pasada pasan a VENCIDO"""
+        # Arrange
+        vencida = await habilitacion_factory.create(
+            estado=EstadoHabilitacion.HABILITADO,
+            vigencia_hasta=date.today() - timedelta(days=1)
+        )
+        vigente = await habilitacion_factory.create(
+            estado=EstadoHabilitacion.HABILITADO,
+            vigencia_hasta=date.today() + timedelta(days=30)
+        )
+        service = VencimientoService(db_session)
+        
+        # Act
+        resultado = await service.barrer_vencimientos()
+        
+        # Assert
+        assert resultado["habilitaciones"] == 1
+        await db_session.refresh(vencida)
+        await db_session.refresh(vigente)
+        assert vencida.estado == EstadoHabilitacion.VENCIDO
+        assert vigente.estado == EstadoHabilitacion.HABILITADO
+    
+    async def test_suspende_conductor_con_habilitacion_vencida(
+        self,
+        db_session,
+        conductor_factory,
+        habilitacion_factory
+    ):
+        """Test: El conductor sin habilitación vigente queda SUSPENDIDO"""
+        # Arrange
+        conductor = await conductor_factory.create(estado=EstadoConductor.HABILITADO)
+        await habilitacion_factory.create(
+            conductor_id=conductor.id,
+            estado=EstadoHabilitacion.HABILITADO,
+            vigencia_hasta=date.today() - timedelta(days=1)
+        )
+        service = VencimientoService(db_session)
+        
+        # Act
+        resultado = await service.barrer_vencimientos()
+        
+        # Assert
+        assert resultado["conductores"] == 1
+        await db_session.refresh(conductor)
+        assert conductor.estado == EstadoConductor.SUSPENDIDO
+        assert "vencimiento" in conductor.observaciones
+    
+    async def test_suspende_conductor_con_licencia_vencida(self, db_session, conductor_factory):
+        """Test: Una licencia vencida suspende al conductor habilitado"""
+        # Arrange
+        conductor = await conductor_factory.create(estado=EstadoConductor.HABILITADO)
+        al_dia = await conductor_factory.create(estado=EstadoConductor.HABILITADO)
+        # El modelo rechaza fechas pasadas, por lo que se fuerza con SQL
+        await db_session.execute(
+            update(Conductor)
+            .where(Conductor.id == conductor.id)
+            .values(licencia_vencimiento=date.today() - timedelta(days=1))
+        )
+        await db_session.commit()
+        service = VencimientoService(db_session)
+        
+        # Act
+        resultado = await service.barrer_vencimientos()
+        
+        # Assert
+        assert resultado["conductores"] == 1
+        await db_session.refresh(conductor)
+        await db_session.refresh(al_dia)
+        assert conductor.estado == EstadoConductor.SUSPENDIDO
+        assert al_dia.estado == EstadoConductor.HABILITADO
+    
+    async def test_vence_autorizaciones_de_empresa(
+        self,
+        db_session,
+        empresa_factory,
+        tipo_autorizacion_factory,
+        autorizacion_empresa_factory
+    ):
+        """Test: Las autorizaciones vencidas dejan de estar vigentes"""
+        # Arrange
+        empresa = await empresa_factory.create()
+        tipo = await tipo_autorizacion_factory()
+        autorizacion = await autorizacion_empresa_factory(
+            empresa_id=empresa.id,
+            tipo_autorizacion_id=tipo.id,
+            fecha_emision=date.today() - timedelta(days=400),
+            fecha_vencimiento=date.today() - timedelta(days=1)
+        )
+        service = VencimientoService(db_session)
+        
+        # Act
+        resultado = await service.barrer_vencimientos()
+        
+        # Assert
+        assert resultado["autorizaciones"] == 1
+        await db_session.refresh(autorizacion)
+        assert autorizacion.vigente is False
+    
+    async def test_procesa_en_lotes(self, db_session, habilitacion_factory):
+        """Test: Con lotes pequeños se procesan todas las filas"""
+        # Arrange
+        for _ in range(3):
+            await habilitacion_factory.create(
+                estado=EstadoHabilitacion.HABILITADO,
+                vigencia_hasta=date.today() - timedelta(days=1)
+            )
+        service = VencimientoService(db_session)
+        
+        # Act
+        resultado = await service.barrer_vencimientos(tamano_lote=2)
+        
+        # Assert
+        assert resultado["habilitaciones"] == 3
+        segundo = await service.barrer_vencimientos(tamano_lote=2)
+        assert segundo["habilitaciones"] == 0
@@ -0,0 +1,194 @@
+"""
+Tests para la aplicación Celery y las tareas base
+"""
+import asyncio
+import time
+import pytest
+from celery import signals
+from datetime import date, timedelta
+from decimal import Decimal
+from app.models.habilitacion import EstadoPago
+from app.tasks.base import AsyncDatabaseTask, run_async
+from app.tasks.celery_app import (
+    celery_app,
+    CABECERA_ENCOLADA,
+    COLA_DEFAULT,
+    COLA_PDF,
+    COLA_REPORTES,
+    COLA_NOTIFICACIONES,
+)
+from prometheus_client import REGISTRY
+
+# Registrar las tareas declaradas en `include`
+celery_app.loader.import_default_modules()
+
+
+class TestConfiguracionCelery:
+    """Tests para la configuración de colas y resultados"""
+    
+    def test_tareas_registradas(self):
+        """Test: Las tareas de PDF y reportes están registradas"""
+        assert "app.tasks.pdf.generar_certificado_habilitacion" in celery_app.tasks
+        assert "app.tasks.reportes.generar_reporte_ingresos" in celery_app.tasks
+        assert "app.tasks.vencimientos.barrer_vencimientos" in celery_app.tasks
+        assert "app.tasks.notificaciones.generar_notificaciones_vencimiento" in celery_app.tasks
+        assert "app.tasks.auditoria.mantener_particiones" in celery_app.tasks
+    
+    def test_barrido_vencimientos_programado(self):
+        """Test: El barrido de vencimientos está en el calendario de beat"""
+        tareas = [e["task"] for e in celery_app.conf.beat_schedule.values()]
+        assert "app.tasks.vencimientos.barrer_vencimientos" in tareas
+        assert "app.tasks.auditoria.mantener_particiones" in tareas
+    
+    def test_enrutamiento_por_colas(self):
+        """Test: Cada familia de tareas va a su cola"""
+        router = celery_app.amqp.router
+        
+        ruta_pdf = router.route({}, "app.tasks.pdf.generar_certificado_habilitacion")
+        ruta_reportes = router.route({}, "app.tasks.reportes.generar_reporte_ingresos")
+        ruta_notificaciones = router.route(
+            {}, "app.tasks.notificaciones.generar_notificaciones_vencimiento"
+        )
+        
+        assert ruta_pdf["queue"].name == COLA_PDF
+        assert ruta_reportes["queue"].name == COLA_REPORTES
+        assert ruta_notificaciones["queue"].name == COLA_NOTIFICACIONES
+    
+    def test_resultados_expiran(self):
+        """Test: Los resultados tienen expiración configurada"""
+        assert celery_app.conf.result_expires is not None
+
+
+@celery_app.task(name="tests.tasks.sumar")
+def _sumar_tarea(a: int, b: int) -> int:
+    return a + b
+
+
+def _valor(nombre: str, **etiquetas) -> float:
+    return REGISTRY.get_sample_value(nombre, etiquetas) or 0.0
+
+
+class TestMetricasTareas:
+    """Tests para la espera en cola y la duración de las tareas"""
+    
+    def test_publicar_marca_la_hora_de_encolado(self):
+        """Test: Al encolar se agrega la cabecera con la hora"""
+        cabeceras = {}
+        
+        signals.before_task_publish.send(sender="tests.tasks.sumar", headers=cabeceras)
+        
+        assert time.time() - cabeceras[CABECERA_ENCOLADA] < 5
+    
+    def test_mide_espera_y_duracion_por_tarea_y_cola(self, celery_eager):
+        """Test: Se observan la espera desde el encolado y la ejecución"""
+        serie = dict(task="tests.tasks.sumar", queue=COLA_DEFAULT)
+        ejecuciones = _valor("celery_task_duration_seconds_count", state="SUCCESS", **serie)
+        espera = _valor("celery_task_queue_wait_seconds_sum", **serie)
+        
+        resultado = _sumar_tarea.apply(args=(1, 2), headers={CABECERA_ENCOLADA: time.time() - 2})
+        
+        assert resultado.get() == 3
+        assert _valor("celery_task_duration_seconds_count", state="SUCCESS", **serie) == ejecuciones + 1
+        assert _valor("celery_task_queue_wait_seconds_sum", **serie) >= espera + 2
+
+
+class TestRunAsync:
+    """Tests para la ejecución de corrutinas desde tareas"""
+    
+    def test_run_async_sin_loop(self):
+        """Test: Ejecuta la corrutina en un loop nuevo"""
+        async def _sumar():
+            return 1 + 1
+        
+        assert run_async(_sumar()) == 2
+    
+    @pytest.mark.asyncio
+    async def test_run_async_con_loop_en_ejecucion(self):
+        """Test: Con un loop activo ejecuta en un hilo auxiliar"""
+        async def _loop_actual():
+            return asyncio.get_running_loop()
+        
+        loop_tarea = run_async(_loop_actual())
+        
+        assert loop_tarea is not asyncio.get_running_loop()
+    
+    def test_run_async_propaga_excepciones(self):
+        """Test: Las excepciones de la corrutina se propagan"""
+        async def _fallar():
+            raise ValueError("fallo")
+        
+        with pytest.raises(ValueError):
+            run_async(_fallar())
+
+
+@pytest.mark.asyncio
+class TestTareasEager:
+    """Tests de tareas ejecutadas en modo eager contra la BD de prueba"""
+    
+    async def test_reporte_ingresos_eager(
+        self,
+        celery_eager,
+        habilitacion_factory,
+        concepto_tupa_factory,
+        pago_factory
+    ):
+        """Test: El reporte de ingresos se ejecuta y guarda su resultado"""
+        from app.tasks.reportes import generar_reporte_ingresos
+        
+        concepto = await concepto_tupa_factory.create()
+        habilitacion = await habilitacion_factory.create()
+        await pago_factory.create(
+            habilitacion_id=habilitacion.id,
+            concepto_tupa_id=concepto.id,
+            monto=Decimal("50.00"),
+            estado=EstadoPago.CONFIRMADO
+        )
+        
+        resultado = generar_reporte_ingresos.delay(
+            (date.today() - timedelta(days=1)).isoformat(),
+            date.today().isoformat()
+        )
+        
+        assert resultado.successful()
+        assert resultado.result["total_pagos"] == 1
+        assert resultado.result["total_confirmados"] == 1
+        
+        # El resultado queda disponible en el backend (fakeredis)
+        almacenado = celery_app.AsyncResult(resultado.id)
+        assert almacenado.state == "SUCCESS"
+    
+    async def test_sesion_hace_rollback_en_error(self, celery_eager):
+        """Test: Un error en la tarea se registra como FAILURE"""
+        from app.tasks.pdf import generar_certificado_habilitacion
+        from uuid import uuid4
+        
+        fallidas = _valor(
+            "celery_task_duration_seconds_count",
+            task="app.tasks.pdf.generar_certificado_habilitacion",
+            queue=COLA_PDF,
+            state="FAILURE"
+        )
+        
+        resultado = generar_certificado_habilitacion.delay(str(uuid4()))
+        
+        assert resultado.failed()
+        assert celery_app.AsyncResult(resultado.id).state == "FAILURE"
+        assert _valor(
+            "celery_task_duration_seconds_count",
+            task="app.tasks.pdf.generar_certificado_habilitacion",
+            queue=COLA_PDF,
+            state="FAILURE"
+        ) == fallidas + 1
+    
+    async def test_barrido_vencimientos_eager(self, celery_eager):
+        """Test: El barrido retorna los conteos por tipo"""
+        from app.tasks.vencimientos import barrer_vencimientos
+        
+        resultado = barrer_vencimientos.delay(date.today().isoformat())
+        
+        assert resultado.successful()
+        assert resultado.result == {
+            "autorizaciones": 0,
+            "habilitaciones": 0,
+            "conductores": 0
+        }